@@ -1,6 +1,7 @@
 from flask import Flask, redirect, url_for
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from config import config
 from flask_migrate import Migrate
@@ -27,6 +28,7 @@ naming_convention = {
 db = SQLAlchemy(metadata=MetaData(naming_convention=naming_convention))
 migrate = Migrate()
 login_manager = LoginManager()
+jwt = JWTManager()
 # Load environment variables from .env file
 load_dotenv()
 
@@ -66,6 +68,9 @@ def create_app(config_name='default'):
     login_manager.login_view = 'auth.login'
     login_manager.login_message = 'Please log in to access this page.'
 
+    # Token authentication for the React API (used when JWT_AUTH_ENABLED is set)
+    jwt.init_app(app)
+
     # Import models to ensure SQLAlchemy registers them
     from app import models
 
@@ -100,10 +105,22 @@ def create_app(config_name='default'):
     app.register_blueprint(request_blueprint)
     app.register_blueprint(purchases_blueprint)
 
+    # Batched user lookups for templates that list many rows
+    from app import serialization
+    app.add_template_global(serialization.user_summary, 'user_summary')
+
     # Register custom CLI commands
-    from app.management.commands import import_stock_report, clean_reports
+    from app.management.commands import import_stock_report, clean_reports, rebuild_search_index, adjust_stock, rebuild_reservations, rebuild_dashboard_stats, archive_requests, refresh_forecasts, refresh_consumption_cube, import_purchases
     import_stock_report.register(app)
     clean_reports.register(app)
+    rebuild_search_index.register(app)
+    adjust_stock.register(app)
+    rebuild_reservations.register(app)
+    rebuild_dashboard_stats.register(app)
+    archive_requests.register(app)
+    refresh_forecasts.register(app)
+    refresh_consumption_cube.register(app)
+    import_purchases.register(app)
  
     # Initialize the scheduler
     from app.scheduler import init_scheduler
@@ -129,9 +146,26 @@ def load_user(user_id):
     Returns:
         User object or None
     """
+    from flask import request
+    from app.auth import tokens
+    # A bearer token takes precedence over a session cookie sent alongside it
+    if tokens.enabled() and tokens.bearer_token(request):
+        return None
     from app.models.user import User
     return User.query.get(int(user_id))
 
+@login_manager.request_loader
+def load_user_from_request(request):
+    """
+    Flask-Login request loader callback for bearer access tokens.
+    Args:
+        request: The incoming request
+    Returns:
+        TokenUser built from the token's claims, or None
+    """
+    from app.auth.tokens import user_from_request
+    return user_from_request(request)
+
 @event.listens_for(Engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
     if isinstance(dbapi_connection, sqlite3.Connection):
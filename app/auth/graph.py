@@ -0,0 +1,233 @@
+"""
+Shared Microsoft identity clients with bounded latency.
+
+Building an MSAL ``ConfidentialClientApplication`` fetches the authority's
+OpenID configuration over the network, so each worker builds one per
+client ID/authority and reuses it (with its token cache) for every login.
+Both MSAL and the Graph profile fetch go through one pooled HTTP session
+with connect/read timeouts and a short retry policy, so a slow Microsoft
+endpoint can hold a worker for at most about
+``(GRAPH_RETRIES + 1) * (GRAPH_CONNECT_TIMEOUT + GRAPH_READ_TIMEOUT)``
+seconds.
+
+A circuit breaker guards Graph: after ``GRAPH_BREAKER_THRESHOLD`` failed
+calls in a row it opens and calls fail at once with
+``GraphUnavailableError`` for ``GRAPH_BREAKER_COOLDOWN`` seconds, after
+which a single trial call decides whether it closes again. Callers fall
+back to the profile fields already stored for the user.
+"""
+import logging
+import threading
+import time
+
+import requests
+from flask import current_app, has_app_context
+from msal import ConfidentialClientApplication, TokenCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.exceptions import GraphUnavailableError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GRAPH_URL = 'https://graph.microsoft.com/v1.0'
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10
+DEFAULT_RETRIES = 2
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_COOLDOWN = 60
+
+PROFILE_FIELDS = ('id', 'displayName', 'userPrincipalName', 'mail', 'jobTitle', 'department',
+                  'companyName', 'officeLocation')
+
+# Responses worth retrying, and that count as Graph being unavailable
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_lock = threading.Lock()
+_session = None
+# (client_id, client_secret, authority) -> ConfidentialClientApplication
+_clients = {}
+
+
+def _setting(name, default):
+    if has_app_context():
+        value = current_app.config.get(name)
+        if value is not None:
+            return value
+    return default
+
+
+def _timeout():
+    return (float(_setting('GRAPH_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT)),
+            float(_setting('GRAPH_READ_TIMEOUT', DEFAULT_READ_TIMEOUT)))
+
+
+class _TimeoutSession(requests.Session):
+    """A session that applies a default timeout, since requests has no session-wide one."""
+
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def http_session():
+    """
+    Get the worker's pooled HTTP session for Microsoft endpoints.
+
+    Only GET requests are retried: the token request redeems a one-time
+    authorization code. Retry-After headers are not honoured, since Graph
+    may ask for a wait longer than a login should take.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            retries = int(_setting('GRAPH_RETRIES', DEFAULT_RETRIES))
+            retry = Retry(
+                total=retries, connect=retries, read=retries, status=retries,
+                backoff_factor=0.2, backoff_max=2,
+                status_forcelist=RETRY_STATUSES, allowed_methods=frozenset({'GET'}),
+                respect_retry_after_header=False, raise_on_status=False
+            )
+            adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=16)
+            session = _TimeoutSession(_timeout())
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+
+def msal_client():
+    """
+    Get the worker's MSAL client for the configured Azure AD application.
+
+    Returns:
+        ConfidentialClientApplication: Shared by all requests of this worker
+    """
+    config = current_app.config
+    key = (config['MICROSOFT_CLIENT_ID'], config['MICROSOFT_CLIENT_SECRET'], config['MICROSOFT_AUTHORITY'])
+    with _lock:
+        client = _clients.get(key)
+    if client is not None:
+        return client
+
+    client = ConfidentialClientApplication(
+        client_id=key[0],
+        client_credential=key[1],
+        authority=key[2],
+        token_cache=TokenCache(),
+        http_client=http_session()
+    )
+    with _lock:
+        return _clients.setdefault(key, client)
+
+
+class CircuitBreaker:
+    """Fails calls fast after repeated failures, until a trial call succeeds."""
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Close the breaker and forget past failures."""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        cooldown = float(_setting('GRAPH_BREAKER_COOLDOWN', DEFAULT_BREAKER_COOLDOWN))
+        if time.monotonic() - self.opened_at >= cooldown:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """Check whether a call may go ahead; once cooled down only one trial call is let through."""
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info("Microsoft Graph reachable again; circuit closed")
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        threshold = int(_setting('GRAPH_BREAKER_THRESHOLD', DEFAULT_BREAKER_THRESHOLD))
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= threshold:
+                if self.opened_at is None:
+                    logger.warning(f"Microsoft Graph failed {self.failures} time(s); circuit opened")
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+breaker = CircuitBreaker()
+
+
+def get_profile(access_token):
+    """
+    Get the signed-in user's profile from Microsoft Graph.
+
+    Args:
+        access_token (str): Delegated Graph access token
+
+    Returns:
+        dict or None: The profile, or None if Graph rejected the request (e.g. an invalid token)
+
+    Raises:
+        GraphUnavailableError: Graph timed out, failed, or has been failing recently
+    """
+    if not breaker.allow():
+        raise GraphUnavailableError("Microsoft Graph circuit is open")
+
+    url = f"{_setting('MICROSOFT_GRAPH_URL', DEFAULT_GRAPH_URL).rstrip('/')}/me"
+    try:
+        response = http_session().get(
+            url,
+            params={'$select': ','.join(PROFILE_FIELDS)},
+            headers={'Authorization': f'Bearer {access_token}'},
+            timeout=_timeout()
+        )
+    except requests.RequestException as e:
+        breaker.record_failure()
+        raise GraphUnavailableError(f"Microsoft Graph request failed: {e}") from e
+
+    if response.status_code in RETRY_STATUSES:
+        breaker.record_failure()
+        raise GraphUnavailableError(f"Microsoft Graph returned {response.status_code}")
+
+    breaker.record_success()
+    if response.status_code != 200:
+        return None
+    return response.json()
+
+
+def reset():
+    """Drop the worker's session and MSAL clients and close the circuit, e.g. after a config change."""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _clients.clear()
+    breaker.reset()
@@ -0,0 +1,207 @@
+"""
+Stateless token authentication for the React API.
+
+When ``JWT_AUTH_ENABLED`` is set, logging in also returns a short-lived
+access token and a longer-lived refresh token. Access tokens carry the
+user's ID, name, email and admin flag, so an API request sent with
+``Authorization: Bearer <token>`` is authorized from the token alone,
+without loading the user from the database. Other user attributes are
+loaded on first use.
+
+Revoked tokens (logout, refresh rotation) are kept in ``revoked_tokens``.
+Each worker holds the unexpired revoked token IDs in memory and reloads
+them every ``REVOKED_TOKEN_CACHE_TTL`` seconds, so checking a token costs
+no query; a revocation made by another worker takes effect within that
+interval, and at once in the worker that made it.
+
+Refresh tokens are single use. Each one carries the ID of its family, the
+chain of refresh tokens rotated from one login. A refresh token presented
+again after its rotation (a replay, or two refreshes racing) is refused,
+and its whole family is revoked, so whoever holds the newer token of that
+chain has to log in again too.
+"""
+import threading
+import time
+import uuid
+from datetime import datetime, UTC
+
+from flask import current_app, has_app_context
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
+from flask_login import UserMixin
+from jwt.exceptions import PyJWTError
+from flask_jwt_extended.exceptions import JWTExtendedException
+
+from app import db, jwt
+from app.models.revoked_token import RevokedToken
+
+DEFAULT_DENYLIST_TTL = 30
+
+_lock = threading.Lock()
+# Revoked token IDs and when this worker should reload them
+_denylist = {'jtis': set(), 'expires_at': 0.0}
+
+
+def enabled():
+    """Check whether token authentication is switched on."""
+    return bool(current_app.config.get('JWT_AUTH_ENABLED'))
+
+
+def _ttl():
+    if has_app_context():
+        return current_app.config.get('REVOKED_TOKEN_CACHE_TTL', DEFAULT_DENYLIST_TTL)
+    return DEFAULT_DENYLIST_TTL
+
+
+def is_revoked(jti):
+    """Check a token ID against this worker's copy of the denylist."""
+    now = time.monotonic()
+    with _lock:
+        if _denylist['expires_at'] > now:
+            return jti in _denylist['jtis']
+    jtis = RevokedToken.active_jtis()
+    with _lock:
+        _denylist['jtis'] = jtis
+        _denylist['expires_at'] = now + _ttl()
+    return jti in jtis
+
+
+def clear_local_cache():
+    """Drop this worker's copy of the denylist so the next check reloads it."""
+    with _lock:
+        _denylist['jtis'] = set()
+        _denylist['expires_at'] = 0.0
+
+
+def _payload_revoked(payload):
+    """Check a decoded token, and the refresh token family it belongs to, against the denylist."""
+    family = payload.get('family')
+    return is_revoked(payload['jti']) or (family is not None and is_revoked(family))
+
+
+@jwt.token_in_blocklist_loader
+def _check_if_token_revoked(jwt_header, jwt_payload):
+    return _payload_revoked(jwt_payload)
+
+
+def issue_tokens(user, family=None):
+    """
+    Create an access and a refresh token for a user.
+
+    Args:
+        user (User): The user to issue the tokens to
+        family (str, optional): Family of the refresh token being rotated; a new one for a login
+
+    Returns:
+        dict: 'access_token', 'refresh_token', 'token_type' and 'expires_in' (seconds)
+    """
+    claims = {'name': user.name, 'email': user.email, 'is_admin': bool(user.is_admin)}
+    expires = current_app.config['JWT_ACCESS_TOKEN_EXPIRES']
+    return {
+        'access_token': create_access_token(identity=str(user.id), additional_claims=claims),
+        'refresh_token': create_refresh_token(
+            identity=str(user.id), additional_claims={'family': family or str(uuid.uuid4())}
+        ),
+        'token_type': 'Bearer',
+        'expires_in': int(expires.total_seconds()),
+    }
+
+
+def revoke(*tokens):
+    """
+    Revoke decoded tokens, taking effect in this worker immediately.
+
+    Returns:
+        tuple: (number of tokens revoked, error message or None)
+    """
+    count, error = RevokedToken.revoke(tokens)
+    if not error:
+        with _lock:
+            _denylist['jtis'].update(token['jti'] for token in tokens)
+    return count, error
+
+
+def revoke_family(refresh_payload):
+    """
+    Revoke every refresh token rotated from the same login as the given one.
+
+    Returns:
+        tuple: (number of families revoked, error message or None)
+    """
+    family = refresh_payload.get('family')
+    if not family:
+        return 0, None
+    # No token of the family outlives a refresh token issued now
+    expires_at = datetime.now(UTC) + current_app.config['JWT_REFRESH_TOKEN_EXPIRES']
+    return revoke({'jti': family, 'type': 'family', 'sub': refresh_payload['sub'], 'exp': expires_at.timestamp()})
+
+
+def decode(encoded_token, token_type='access'):
+    """
+    Decode and verify a token of the given type that has not been revoked.
+
+    Returns:
+        dict or None: The token payload, or None if the token is not valid
+    """
+    try:
+        payload = decode_token(encoded_token)
+    except (PyJWTError, JWTExtendedException):
+        return None
+    if payload.get('type') != token_type or _payload_revoked(payload):
+        return None
+    return payload
+
+
+def bearer_token(req):
+    """Get the token from an 'Authorization: Bearer' header, or None."""
+    header = req.headers.get('Authorization', '')
+    scheme, _, token = header.partition(' ')
+    if scheme.lower() != 'bearer' or not token.strip():
+        return None
+    return token.strip()
+
+
+class TokenUser(UserMixin):
+    """
+    The user an access token was issued to, built from the token's claims.
+
+    Attributes not carried in the token (job title, last login, ...) are
+    read from the user's database row, loaded once on first use.
+    """
+    auth_method = 'token'
+
+    def __init__(self, payload):
+        self.id = int(payload['sub'])
+        self.name = payload.get('name')
+        self.email = payload.get('email')
+        self.is_admin = bool(payload.get('is_admin'))
+        self.token = payload
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        from app.models.user import User
+        user = self.__dict__.get('_user')
+        if user is None:
+            user = self.__dict__['_user'] = db.session.get(User, self.id)
+        if user is None:
+            raise AttributeError(name)
+        return getattr(user, name)
+
+    def __repr__(self):
+        return f'<TokenUser {self.id}>'
+
+
+def user_from_request(req):
+    """
+    Get the user of a request's bearer access token.
+
+    Returns:
+        TokenUser or None: None when token authentication is off or the token is missing or invalid
+    """
+    if not enabled():
+        return None
+    token = bearer_token(req)
+    if token is None:
+        return None
+    payload = decode(token)
+    return TokenUser(payload) if payload else None
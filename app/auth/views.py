@@ -1,6 +1,8 @@
 from flask import render_template, redirect, url_for, flash, request, current_app, session
 from flask_login import login_user, logout_user, login_required, current_user
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 from . import auth
+from . import tokens
 from app.models.user import User
 from app import db
 from app import login_manager
@@ -50,9 +52,15 @@ def api_local_login():
         
         if user:
             logger.info(f"API local authentication successful for user: {user.email}")
-            login_user(user)
-            
+            # Token clients authorize later requests from the token instead of the session,
+            # so no session cookie is set that would load the user on every request
+            token_fields = {}
+            if tokens.enabled():
+                token_fields = tokens.issue_tokens(user)
+            else:
+                login_user(user)
             return jsonify({
+                **token_fields,
                 'success': True,
                 'message': f'Welcome back, {user.name}!',
                 'user': {
@@ -105,12 +113,27 @@ def auth_callback():
 @auth.route('/api/logout', methods=['GET', 'POST'])
 @login_required
 def api_logout():
-    """API endpoint for user logout."""
+    """
+    API endpoint for user logout.
+
+    Token clients send their refresh token in the body so it is revoked
+    together with the access token.
+    """
     user_email = current_user.email if current_user.is_authenticated else 'Unknown'
     auth_method = getattr(current_user, 'auth_method', 'unknown')
     
     logger.info(f"API User logout: {user_email} (auth_method: {auth_method})")
-    
+
+    # Revoke the access token the request was made with and the client's refresh token
+    if isinstance(current_user._get_current_object(), tokens.TokenUser):
+        revoked = [current_user.token]
+        refresh_payload = _refresh_token_from_body(current_user.token['sub'])
+        if refresh_payload:
+            revoked.append(refresh_payload)
+        _, error = tokens.revoke(*revoked)
+        if error:
+            logger.error(error)
+
     # Remove user's session
     logout_user()
     
@@ -134,6 +157,67 @@ def logout():
     # Redirect to React login page
     return redirect('http://localhost:3000/login')
 
+@auth.route('/api/auth/token/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def api_refresh_token():
+    """
+    API endpoint exchanging a refresh token for a new access and refresh token.
+    The refresh token used is revoked, and the new access token carries the
+    user's current name and admin status. A refresh token that was already
+    used is refused and its token family revoked.
+    """
+    if not tokens.enabled():
+        return jsonify({'error': 'Token authentication is not enabled'}), 404
+
+    user = db.session.get(User, int(get_jwt_identity()))
+    if user is None:
+        return jsonify({'error': 'Not authenticated'}), 401
+
+    payload = get_jwt()
+    count, error = tokens.revoke(payload)
+    if error:
+        logger.error(error)
+        return jsonify({'error': 'Could not refresh the token. Please try again.'}), 500
+    if count == 0:
+        # Already rotated, by another worker or a concurrent refresh: treat it as stolen
+        logger.warning(f"Refresh token reused for user {user.id}; revoking its token family")
+        _, error = tokens.revoke_family(payload)
+        if error:
+            logger.error(error)
+        return jsonify({'error': 'Refresh token has already been used'}), 401
+    return jsonify({'success': True, **tokens.issue_tokens(user, family=payload.get('family'))}), 200
+
+def _refresh_token_from_body(identity):
+    """Get the decoded refresh token from the request body if it belongs to the given identity, else None."""
+    refresh_token = (request.get_json(silent=True) or {}).get('refresh_token')
+    if not refresh_token:
+        return None
+    payload = tokens.decode(refresh_token, token_type='refresh')
+    if payload and payload['sub'] == identity:
+        return payload
+    return None
+
+@auth.route('/api/auth/token/revoke', methods=['POST'])
+@jwt_required(verify_type=False)
+def api_revoke_token():
+    """
+    API endpoint revoking the token the request was made with, and the
+    refresh token in the request body if one is given.
+    """
+    if not tokens.enabled():
+        return jsonify({'error': 'Token authentication is not enabled'}), 404
+
+    revoked = [get_jwt()]
+    refresh_payload = _refresh_token_from_body(get_jwt_identity())
+    if refresh_payload:
+        revoked.append(refresh_payload)
+
+    count, error = tokens.revoke(*revoked)
+    if error:
+        logger.error(error)
+        return jsonify({'error': 'Could not revoke the token. Please try again.'}), 500
+    return jsonify({'success': True, 'revoked': count}), 200
+
 @auth.route('/api/auth/verify')
 def verify_token():
     """API endpoint to verify authentication token for React frontend."""
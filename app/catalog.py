@@ -0,0 +1,89 @@
+"""
+Process-local read-through cache for the category list and inventory catalog.
+
+Categories and the item dropdown data are read on almost every page but change
+rarely. Each worker keeps its own copy and compares it with the ``catalog``
+counter in ``cache_versions`` (checked at most once per request), so a write in
+any worker invalidates every other worker on its next request.
+"""
+import threading
+from collections import namedtuple
+
+from app import db
+from app.models.cache_version import CacheVersion
+from app.models.inventory import Category, Inventory
+
+CategoryEntry = namedtuple('CategoryEntry', ['id', 'name', 'description'])
+CatalogItem = namedtuple('CatalogItem', ['id', 'item_name', 'category_id', 'category_name', 'unit_price', 'location'])
+
+_lock = threading.Lock()
+_cache = {
+    'version': None,
+    'categories': [],
+    'items': [],
+    'items_by_id': {},
+}
+
+
+def _load(version):
+    """Rebuild the cached catalog from the database."""
+    categories = [
+        CategoryEntry(row.id, row.name, row.description)
+        for row in db.session.query(Category.id, Category.name, Category.description).order_by(Category.name)
+    ]
+    rows = (
+        db.session.query(
+            Inventory.id, Inventory.item_name, Inventory.category_id,
+            Category.name, Inventory.unit_price, Inventory.location
+        )
+        .join(Category, Inventory.category_id == Category.id)
+        .order_by(Inventory.item_name)
+        .all()
+    )
+    items = [CatalogItem(*row) for row in rows]
+    _cache.update(
+        version=version,
+        categories=categories,
+        items=items,
+        items_by_id={item.id: item for item in items},
+    )
+
+
+def _ensure_fresh():
+    version = CacheVersion.get_version(CacheVersion.CATALOG)
+    if _cache['version'] != version:
+        with _lock:
+            if _cache['version'] != version:
+                _load(version)
+    return _cache
+
+
+def get_categories():
+    """Get all categories as lightweight, read-only entries ordered by name."""
+    return _ensure_fresh()['categories']
+
+
+def get_catalog_items():
+    """Get the compact inventory catalog (no stock levels) ordered by item name."""
+    return _ensure_fresh()['items']
+
+
+def get_catalog_item(inventory_id):
+    """Get a single catalog entry by inventory ID, or None."""
+    return _ensure_fresh()['items_by_id'].get(inventory_id)
+
+
+def get_locations():
+    """Get the distinct locations used by catalog items."""
+    return sorted({item.location for item in get_catalog_items() if item.location})
+
+
+def invalidate():
+    """Mark the catalog as changed; takes effect when the caller commits."""
+    CacheVersion.bump(CacheVersion.CATALOG)
+
+
+def clear_local_cache():
+    """Drop this process's copy so the next read reloads it."""
+    with _lock:
+        _cache['version'] = None
@@ -1,3 +1,15 @@
 class InsufficientInventoryError(Exception):
     """Raised when inventory quantity is insufficient for a request."""
-    pass
\ No newline at end of file
+    pass
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+    pass
+
+class ImportFormatError(ValueError):
+    """Raised when an uploaded file cannot be read as an import."""
+    pass
+
+class GraphUnavailableError(Exception):
+    """Raised when Microsoft Graph cannot be reached or its circuit breaker is open."""
+    pass
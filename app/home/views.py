@@ -1,5 +1,8 @@
 from flask import render_template, redirect, url_for, flash, current_app, jsonify
 from flask_login import login_required, current_user
+from app import catalog
+from app.models.dashboard_stat import DashboardStat
+from app.models.request import RequestStatus
 from . import home
 
 @home.route('/admin/dashboard')
@@ -75,4 +78,50 @@ def api_dashboard_data():
         
     except Exception as e:
         current_app.logger.error(f"Error fetching dashboard data: {e}")
-        return jsonify({'error': 'Failed to fetch dashboard data'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to fetch dashboard data'}), 500
+
+@home.route('/api/dashboard/stats')
+@login_required
+def api_dashboard_stats():
+    """
+    API endpoint for dashboard counters (admin only).
+
+    Reads the pre-aggregated dashboard_stats table instead of scanning
+    requests and inventory.
+    """
+    if not current_user.is_admin:
+        return jsonify({'error': 'Access denied'}), 403
+
+    try:
+        stats = DashboardStat.get_all()
+        request_counts = stats.get(DashboardStat.REQUESTS, {})
+        stock_status = stats.get(DashboardStat.STOCK_STATUS, {})
+        stock_value = stats.get(DashboardStat.STOCK_VALUE, {})
+
+        by_category = [
+            {
+                'category_id': category.id,
+                'category_name': category.name,
+                'value': float(stock_value.get(str(category.id), 0))
+            }
+            for category in catalog.get_categories()
+        ]
+        return jsonify({
+            'success': True,
+            'data': {
+                'requests': {
+                    status.value: int(request_counts.get(status.name, 0)) for status in RequestStatus
+                },
+                'stock_status': {
+                    key: int(stock_status.get(key, 0))
+                    for key in (DashboardStat.IN_STOCK, DashboardStat.LOW_STOCK, DashboardStat.OUT_OF_STOCK)
+                },
+                'stock_value': {
+                    'total': float(sum(stock_value.values(), 0)),
+                    'by_category': by_category
+                }
+            }
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f"Error fetching dashboard stats: {e}")
+        return jsonify({'error': 'Failed to fetch dashboard stats'}), 500
@@ -3,7 +3,12 @@ from flask_login import login_required, current_user
 from app.models.inventory import Inventory, Category
 from app.models.inventory_transaction import InventoryTransaction
 from app.models.inventory_supplier import InventorySupplier
+from app.models.inventory_change import InventoryChange
+from app import db, catalog, search, serialization
 from . import inventory
+from app.exceptions import InvalidCursorError
+from datetime import datetime, timedelta
+from sqlalchemy.orm import joinedload
 import logging
 from flask import jsonify
 
@@ -46,11 +51,16 @@ def admin_required(f):
 @login_required
 def index():
     """Main inventory view - displays all items with filtering capabilities"""
-    inventories = Inventory.get_all_inventory()
-    categories = Category.query.all()
+    search_term = request.args.get('q', '').strip()
+    if search_term:
+        inventories = search.search_inventory(search_term, limit=200)
+    else:
+        inventories = Inventory.get_all_inventory()
+    categories = catalog.get_categories()
     return render_template('inventory/index.html',
                           inventories=inventories,
                           categories=categories,
+                          search_term=search_term,
                           is_admin=current_user.is_admin,
                           get_stock_status=get_stock_status,
                           get_stock_status_text=get_stock_status_text)
@@ -77,7 +87,7 @@ def view_item(inventory_id):
 @inventory.route('/bulk-create', methods=['GET', 'POST'])
 @admin_required
 def bulk_create_items():
-    categories = Category.query.all()
+    categories = catalog.get_categories()
     if request.method == 'POST':
         item_names = request.form.getlist('item_name')
         category_ids = request.form.getlist('category_id')
@@ -113,7 +123,7 @@ def bulk_create_items():
 @admin_required
 def create_item():
     """Admin only: Creates new inventory items with category assignment"""
-    categories = Category.query.all()
+    categories = catalog.get_categories()
     
     if request.method == 'POST':
         item_name = request.form['item_name']
@@ -151,7 +161,7 @@ def edit_item(inventory_id):
         flash('Inventory item not found.', 'error')
         return redirect(url_for('inventory.index'))
     
-    categories = Category.query.all()
+    categories = catalog.get_categories()
     
     if request.method == 'POST':
         item_name = request.form['item_name']
@@ -221,9 +231,14 @@ def adjust_quantity(inventory_id):
 @login_required
 def categories():
     """All users: Display all categories."""
-    categories = Category.query.all()
+    categories = catalog.get_categories()
+    # Counts change with every item added or moved, so they are read fresh in one grouped query
+    item_counts = dict(
+        db.session.query(Inventory.category_id, db.func.count(Inventory.id)).group_by(Inventory.category_id).all()
+    )
     return render_template('inventory/category/index.html', 
                           categories=categories,
+                          item_counts=item_counts,
                           is_admin=current_user.is_admin)
 
 @inventory.route('/category/create', methods=['GET', 'POST'])
@@ -290,25 +305,174 @@ def delete_category(category_id):
 @inventory.route('/api/items', methods=['GET'])
 @login_required
 def api_get_items():
-    """API endpoint to get all inventory items."""
+    """API endpoint to get all inventory items, or ranked matches when a search term is given."""
     try:
-        items = [item.to_dict() for item in Inventory.get_all_inventory()]
+        search_term = request.args.get('q', '').strip()
+        if search_term:
+            limit = min(request.args.get('limit', 50, type=int), 200)
+            items = serialization.to_dicts(search.search_inventory(search_term, limit=limit))
+            return jsonify(items)
+        items = serialization.to_dicts(Inventory.get_all_inventory())
         return jsonify(items)
     except Exception as e:
         # logger.error(f"Error fetching items: {e}")
         return jsonify({'error': 'Failed to fetch items'}), 500
 
+@inventory.route('/api/items/changes', methods=['GET'])
+@login_required
+def api_get_item_changes():
+    """
+    API endpoint for incremental sync of the item list.
+
+    Without ``since`` (or when the cursor is older than the retained change
+    log) the full item list is returned with ``reset: true``. Otherwise only
+    items created or updated after the cursor are returned, plus the IDs of
+    deleted items. Clients keep the returned cursor for the next call and
+    call again straight away while ``has_more`` is true. Changes are served
+    once INVENTORY_CHANGE_VISIBILITY_DELAY has passed, so none are skipped
+    by transactions committing out of order.
+    """
+    try:
+        since = request.args.get('since', '').strip()
+        limit = max(1, min(request.args.get('limit', 500, type=int), 2000))
+        if since:
+            try:
+                cursor = int(since)
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            if cursor < 0:
+                return jsonify({'error': 'Invalid cursor'}), 400
+
+        if not since or InventoryChange.is_expired(cursor):
+            # Read the cursor first so changes made while loading are replayed, not missed
+            cursor = InventoryChange.latest_cursor()
+            items = Inventory.query.options(joinedload(Inventory.category)).all()
+            return jsonify({
+                'reset': True,
+                'items': serialization.to_dicts(items),
+                'deleted': [],
+                'cursor': str(cursor),
+                'has_more': False
+            })
+
+        changes, new_cursor, has_more = InventoryChange.get_changes_since(cursor, limit=limit)
+        upserted_ids = [inventory_id for inventory_id, change_type in changes.items()
+                        if change_type == InventoryChange.UPSERT]
+        items = []
+        if upserted_ids:
+            items = (
+                Inventory.query.options(joinedload(Inventory.category))
+                .filter(Inventory.id.in_(upserted_ids))
+                .all()
+            )
+        found_ids = {item.id for item in items}
+        # An upsert whose row is gone was followed by a delete beyond this page
+        deleted = sorted(
+            inventory_id for inventory_id, change_type in changes.items()
+            if change_type == InventoryChange.DELETE or inventory_id not in found_ids
+        )
+        return jsonify({
+            'reset': False,
+            'items': serialization.to_dicts(items),
+            'deleted': deleted,
+            'cursor': str(new_cursor),
+            'has_more': has_more
+        })
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch item changes'}), 500
+
 @inventory.route('/api/items/<int:category_id>', methods=['GET'])
 @login_required
 def api_get_items_by_category(category_id):
     """API endpoint to get inventory items by category."""
     try:
-        items = [item.to_dict() for item in Inventory.get_inventory_by_category(category_id)]
+        items = serialization.to_dicts(Inventory.get_inventory_by_category(category_id))
         return jsonify(items)
     except Exception as e:
         # logger.error(f"Error fetching items by category: {e}")
         return jsonify({'error': 'Failed to fetch items'}), 500
 
+@inventory.route('/api/items/<int:inventory_id>/transactions', methods=['GET'])
+@login_required
+def api_get_item_transactions(inventory_id):
+    """
+    API endpoint to page through an item's transaction ledger, newest first.
+
+    Query parameters: cursor, limit (max 200), type (repeatable or comma
+    separated), start_date and end_date (YYYY-MM-DD, inclusive).
+    """
+    try:
+        if not Inventory.get_inventory_by_id(inventory_id):
+            return jsonify({'error': 'Inventory item not found'}), 404
+
+        limit = max(1, min(request.args.get('limit', 50, type=int), 200))
+        transaction_types = [
+            value.strip() for param in request.args.getlist('type')
+            for value in param.split(',') if value.strip()
+        ]
+        invalid_types = set(transaction_types) - set(InventoryTransaction.TRANSACTION_TYPES)
+        if invalid_types:
+            return jsonify({'error': f"Invalid transaction type: {', '.join(sorted(invalid_types))}"}), 400
+
+        try:
+            start_date_str = request.args.get('start_date', '').strip()
+            end_date_str = request.args.get('end_date', '').strip()
+            start = datetime.strptime(start_date_str, '%Y-%m-%d') if start_date_str else None
+            end = None
+            if end_date_str:
+                end = datetime.strptime(end_date_str, '%Y-%m-%d') + timedelta(days=1) - timedelta(microseconds=1)
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Please use YYYY-MM-DD.'}), 400
+
+        transactions, next_cursor = InventoryTransaction.get_item_ledger(
+            inventory_id,
+            limit=limit,
+            cursor=request.args.get('cursor') or None,
+            transaction_types=transaction_types or None,
+            start=start,
+            end=end
+        )
+        return jsonify({
+            'inventory_id': inventory_id,
+            'transactions': transactions,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        })
+    except InvalidCursorError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch transactions'}), 500
+
+@inventory.route('/api/items/adjustments', methods=['POST'])
+@login_required
+def api_batch_adjust():
+    """
+    API endpoint to apply a batch of stock adjustments in one transaction.
+
+    Expects JSON: {"adjustments": [{"inventory_id" | "item_name", "counted" | "delta",
+    "note"}], "note": "...", "dry_run": false}.
+    """
+    if not current_user.is_admin:
+        return jsonify({'error': 'Access denied'}), 403
+
+    data = request.get_json(silent=True) or {}
+    adjustments = data.get('adjustments')
+    if not isinstance(adjustments, list) or not adjustments:
+        return jsonify({'error': 'A non-empty list of adjustments is required'}), 400
+    if not all(isinstance(entry, dict) for entry in adjustments):
+        return jsonify({'error': 'Each adjustment must be an object'}), 400
+
+    summary, error = Inventory.batch_adjust(
+        adjustments,
+        note=data.get('note'),
+        dry_run=bool(data.get('dry_run'))
+    )
+    if error:
+        if summary is None:
+            return jsonify({'error': error}), 500
+        return jsonify({'error': error, 'summary': summary}), 400
+    return jsonify({'success': True, 'summary': summary})
+
 @inventory.route('/api/categories', methods=['GET'])
 @login_required
 def api_get_categories():
@@ -0,0 +1,58 @@
+import csv
+import click
+from flask.cli import with_appcontext
+from app.models.inventory import Inventory
+from app.models.user import User
+
+def register(app):
+    @app.cli.command("adjust-stock")
+    @click.argument('filepath')
+    @click.option('--admin-email', required=True, help='Email of the admin user recorded against the adjustments.')
+    @click.option('--note', default=None, help='Note for rows that do not have their own.')
+    @click.option('--dry-run', is_flag=True, help='Validate and show the deltas without writing anything.')
+    @with_appcontext
+    def adjust_stock(filepath, admin_email, note, dry_run):
+        """
+        Apply a stock-take CSV in one transaction.
+
+        Columns: item_id or item_name, then counted or delta, and an optional note.
+        """
+        admin_user = User.query.filter_by(email=admin_email.strip().lower(), is_admin=True).first()
+        if not admin_user:
+            click.echo(f"No admin user found with email '{admin_email}'.", err=True)
+            return
+
+        try:
+            with open(filepath, mode='r', encoding='utf-8-sig') as csvfile:
+                adjustments = [
+                    {
+                        'inventory_id': row.get('item_id'),
+                        'item_name': row.get('item_name'),
+                        'counted': row.get('counted'),
+                        'delta': row.get('delta'),
+                        'note': row.get('note'),
+                    }
+                    for row in csv.DictReader(csvfile)
+                ]
+        except FileNotFoundError:
+            click.echo(f"Error: The file at path '{filepath}' was not found.", err=True)
+            return
+
+        summary, error = Inventory.batch_adjust(
+            adjustments, performed_by=admin_user.id, note=note, dry_run=dry_run
+        )
+        if summary is None:
+            click.echo(error, err=True)
+            return
+
+        for line_error in summary['errors']:
+            click.echo(f"Row {line_error['line'] + 1}: {line_error['error']}", err=True)
+        if error:
+            click.echo(error, err=True)
+            return
+
+        action = "Would adjust" if dry_run else "Adjusted"
+        click.echo(
+            f"{action} {summary['adjusted']} item(s), {summary['unchanged']} unchanged, "
+            f"net change {summary['net_change']:+d}."
+        )
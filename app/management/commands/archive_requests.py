@@ -0,0 +1,22 @@
+import click
+from app.services import request_archive
+
+def register(app):
+    @app.cli.command("archive-requests")
+    @click.option('--months', type=int, default=None,
+                  help="Archive requests finished more than this many months ago (defaults to REQUEST_ARCHIVE_AFTER_MONTHS).")
+    @click.option('--batch-size', type=int, default=request_archive.DEFAULT_BATCH_SIZE, show_default=True,
+                  help="Number of requests moved per transaction.")
+    def archive_requests(months, batch_size):
+        """
+        Move old collected and rejected requests to the archive tables.
+        """
+        with app.app_context():
+            if months is None:
+                months = app.config.get('REQUEST_ARCHIVE_AFTER_MONTHS', 12)
+            cutoff = request_archive.archive_cutoff(months)
+            count, error = request_archive.archive_requests(cutoff, batch_size=batch_size)
+            if error:
+                click.echo(f"{error} ({count} request(s) archived before the error)", err=True)
+            else:
+                click.echo(f"Archived {count} request(s) finished before {cutoff:%Y-%m-%d}.")
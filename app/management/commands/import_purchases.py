@@ -0,0 +1,55 @@
+import csv
+import click
+from flask.cli import with_appcontext
+from app.exceptions import ImportFormatError
+from app.models.user import User
+from app.services import purchase_import
+
+def register(app):
+    @app.cli.command("import-purchases")
+    @click.argument('filepath')
+    @click.option('--admin-email', required=True, help='Email of the admin user recorded against the purchases.')
+    @click.option('--batch-size', type=int, default=purchase_import.DEFAULT_BATCH_SIZE, show_default=True,
+                  help='Number of rows recorded per transaction.')
+    @click.option('--dry-run', is_flag=True, help='Validate every row without writing anything.')
+    @click.option('--errors-file', default=None, help='Write rejected rows and their errors to this CSV file.')
+    @with_appcontext
+    def import_purchases(filepath, admin_email, batch_size, dry_run, errors_file):
+        """
+        Import purchases from a CSV or XLSX delivery note.
+
+        Columns: item (or inventory_id) and quantity, with optional supplier, unit_price and date.
+        """
+        admin_user = User.query.filter_by(email=admin_email.strip().lower(), is_admin=True).first()
+        if not admin_user:
+            click.echo(f"No admin user found with email '{admin_email}'.", err=True)
+            return
+
+        try:
+            with open(filepath, mode='rb') as upload:
+                rows = purchase_import.read_rows(upload, filepath)
+                summary, errors = purchase_import.import_purchases(
+                    rows, performed_by=admin_user.id, batch_size=batch_size, dry_run=dry_run
+                )
+        except FileNotFoundError:
+            click.echo(f"Error: The file at path '{filepath}' was not found.", err=True)
+            return
+        except ImportFormatError as e:
+            click.echo(f"Error: {e}", err=True)
+            return
+
+        if errors_file:
+            with open(errors_file, mode='w', newline='', encoding='utf-8') as output:
+                writer = csv.DictWriter(output, fieldnames=['row', 'error'])
+                writer.writeheader()
+                writer.writerows(errors)
+        else:
+            for row_error in errors:
+                click.echo(f"Row {row_error['row']}: {row_error['error']}", err=True)
+
+        action = "Would import" if dry_run else "Imported"
+        click.echo(
+            f"{action} {summary['imported']} of {summary['rows']} row(s) "
+            f"({summary['quantity']} unit(s)), {summary['rejected']} rejected, "
+            f"in {summary['seconds']}s ({summary['rows_per_second']} rows/s)."
+        )
@@ -0,0 +1,15 @@
+import click
+from app.models.dashboard_stat import DashboardStat
+
+def register(app):
+    @app.cli.command("rebuild-dashboard-stats")
+    def rebuild_dashboard_stats():
+        """
+        Recompute the dashboard counters from the requests and inventories tables.
+        """
+        with app.app_context():
+            count, error = DashboardStat.rebuild()
+            if error:
+                click.echo(error, err=True)
+            else:
+                click.echo(f"Dashboard stats rebuilt; {count} counter(s) written.")
@@ -0,0 +1,15 @@
+import click
+from app.models.inventory import Inventory
+
+def register(app):
+    @app.cli.command("rebuild-reservations")
+    def rebuild_reservations():
+        """
+        Recompute reserved quantities from approved, uncollected request items.
+        """
+        with app.app_context():
+            count, error = Inventory.rebuild_reservations()
+            if error:
+                click.echo(error, err=True)
+            else:
+                click.echo(f"Reservations rebuilt; {count} item(s) corrected.")
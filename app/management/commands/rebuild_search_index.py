@@ -0,0 +1,17 @@
+import click
+from app import search
+
+def register(app):
+    @app.cli.command("rebuild-search-index")
+    def rebuild_search_index():
+        """
+        Rebuild the inventory full-text search index from the inventories table.
+        """
+        try:
+            with app.app_context():
+                if search.rebuild_index():
+                    click.echo("Inventory search index rebuilt.")
+                else:
+                    click.echo("This database maintains its search index natively; nothing to rebuild.")
+        except Exception as e:
+            click.echo(f"An error occurred while rebuilding the search index: {e}", err=True)
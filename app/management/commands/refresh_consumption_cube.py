@@ -0,0 +1,16 @@
+import click
+from app.models.consumption_cube import ConsumptionCube
+
+def register(app):
+    @app.cli.command("refresh-consumption-cube")
+    @click.option('--rebuild', is_flag=True, help="Empty the cube and recompute it from the whole ledger.")
+    def refresh_consumption_cube(rebuild):
+        """
+        Fold issue transactions added since the last run into the consumption cube.
+        """
+        with app.app_context():
+            count, error = ConsumptionCube.refresh(rebuild=rebuild)
+            if error:
+                click.echo(error, err=True)
+            else:
+                click.echo(f"Consumption cube refreshed; {count} issue(s) added.")
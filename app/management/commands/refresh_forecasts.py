@@ -0,0 +1,15 @@
+import click
+from app.services import forecasting
+
+def register(app):
+    @app.cli.command("refresh-forecasts")
+    def refresh_forecasts():
+        """
+        Recompute consumption forecasts and reorder suggestions for every item.
+        """
+        with app.app_context():
+            count, error = forecasting.refresh_forecasts()
+            if error:
+                click.echo(error, err=True)
+            else:
+                click.echo(f"Forecasts refreshed for {count} item(s).")
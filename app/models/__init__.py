@@ -3,3 +3,14 @@ from .inventory import Category
 from .request import Request, RequestItem
 from .inventory_transaction import InventoryTransaction
 from .report_cache import ReportCache
+from .cache_version import CacheVersion
+from .inventory_change import InventoryChange
+from .dashboard_stat import DashboardStat
+from .archived_request import ArchivedRequest, ArchivedRequestItem
+from .request_event import RequestEvent
+from .item_forecast import ItemForecast
+from .consumption_cube import ConsumptionCube
+from .supplier import Supplier
+from .stock_import_file import StockImportFile
+from .stock_import_row import StockImportRow
+from .revoked_token import RevokedToken
@@ -0,0 +1,167 @@
+from app import db
+from datetime import datetime, UTC
+from sqlalchemy import Enum as SQLAEnum
+from sqlalchemy.orm import selectinload
+import sqlalchemy as sa
+from app.models.user import User
+from app.models.request import RequestStatus, ItemRequestStatus, DirectorateEnum
+from app.pagination import encode_cursor, decode_cursor, keyset_condition
+from app import serialization
+
+
+class ArchivedRequest(db.Model):
+    """
+    History table for old collected or rejected requests.
+
+    Rows get their own ID, which issue transactions point at through
+    ``InventoryTransaction.archived_request_id``; the ID the request had in
+    ``requests`` is kept in ``original_id``. Live IDs can be handed out again
+    once their row is gone (SQLite reuses the highest rowid, MySQL 5.7 resets
+    the AUTO_INCREMENT counter on restart), so it is not unique here.
+    """
+    __tablename__ = 'archived_requests'
+    __table_args__ = (
+        db.Index('ix_archived_requests_created_at_id', 'created_at', 'id'),
+        db.Index('ix_archived_requests_user_id_created_at', 'user_id', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    original_id = db.Column(db.Integer, nullable=False, index=True)
+    reference_number = db.Column(db.String(50), unique=True, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    status = db.Column(SQLAEnum(RequestStatus), nullable=False)
+    location = db.Column(db.String(100), nullable=False)
+    admin_message = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    approved_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    directorate = db.Column(sa.Enum(DirectorateEnum, name="directorate_enum"), nullable=False)
+    department = db.Column(db.String(100), nullable=True)
+    unit = db.Column(db.String(100), nullable=False)
+    archived_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+
+    # Relationships
+    user = db.relationship('User', foreign_keys=[user_id])
+    approved_by_user = db.relationship('User', foreign_keys=[approved_by])
+    items = db.relationship('ArchivedRequestItem', backref='request', cascade='all, delete-orphan')
+
+    @classmethod
+    def search(cls, term=None, user_id=None, statuses=None, location=None, start=None, end=None,
+               limit=50, cursor=None):
+        """
+        Get one page of archived requests, newest first, keyed on (created_at, id).
+
+        Args:
+            term (str, optional): Matches the reference number or the requester's name or email
+            user_id (int, optional): Only include this user's requests
+            statuses (list, optional): RequestStatus members to include
+            location (str, optional): Exact location to match
+            start (datetime, optional): Only include requests created at or after this time
+            end (datetime, optional): Only include requests created at or before this time
+            limit (int): Maximum number of requests to return
+            cursor (str, optional): Cursor from the previous page
+
+        Returns:
+            tuple: (list of ArchivedRequest objects, next cursor or None)
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        key_columns = [cls.created_at, cls.id]
+        query = cls.query.options(selectinload(cls.items).joinedload(ArchivedRequestItem.inventory))
+        if term:
+            pattern = f"%{term}%"
+            requester_ids = db.select(User.id).where(db.or_(User.name.ilike(pattern), User.email.ilike(pattern)))
+            query = query.filter(db.or_(cls.reference_number.ilike(pattern), cls.user_id.in_(requester_ids)))
+        if user_id is not None:
+            query = query.filter(cls.user_id == user_id)
+        if statuses:
+            query = query.filter(cls.status.in_(statuses))
+        if location:
+            query = query.filter(cls.location == location)
+        if start:
+            query = query.filter(cls.created_at >= start)
+        if end:
+            query = query.filter(cls.created_at <= end)
+        if cursor:
+            query = query.filter(keyset_condition(key_columns, decode_cursor(cursor, size=2)))
+
+        rows = query.order_by(cls.created_at.desc(), cls.id.desc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        serialization.prime_users(rows)
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+        return rows, next_cursor
+
+    def to_dict(self):
+        """Convert archived request to the same shape as Request.to_dict."""
+        requester = serialization.user_summary(self.user_id)
+        approver = serialization.user_summary(self.approved_by)
+        return {
+            'id': self.id,
+            'original_id': self.original_id,
+            'reference_number': self.reference_number,
+            'user_id': self.user_id,
+            'user_name': requester.name if requester else None,
+            'user_email': requester.email if requester else None,
+            'user_department': requester.department if requester else None,
+            'user_job_title': requester.job_title if requester else None,
+            'status': self.status.value,
+            'location': self.location,
+            'admin_message': self.admin_message,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'items': [item.to_dict() for item in self.items],
+            'approved_by': self.approved_by,
+            'approved_by_name': approver.name if approver else None,
+            'approved_by_email': approver.email if approver else None,
+            'approved_by_department': approver.department if approver else None,
+            'approved_by_job_title': approver.job_title if approver else None,
+            'directorate': self.directorate.value if self.directorate else None,
+            'department': self.department,
+            'unit': self.unit,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
+
+    def __repr__(self):
+        """String representation of ArchivedRequest object."""
+        return f'<ArchivedRequest {self.reference_number}>'
+
+
+class ArchivedRequestItem(db.Model):
+    """History table for the items of archived requests."""
+    __tablename__ = 'archived_request_items'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # ID the item had in request_items
+    original_id = db.Column(db.Integer, nullable=False, index=True)
+    request_id = db.Column(db.Integer, db.ForeignKey('archived_requests.id', ondelete="CASCADE"),
+                           nullable=False, index=True)
+    inventory_id = db.Column(db.Integer, db.ForeignKey('inventories.id', ondelete='CASCADE'), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    quantity_approved = db.Column(db.Integer, nullable=False)
+    status = db.Column(SQLAEnum(ItemRequestStatus), nullable=False)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+
+    # Relationships
+    inventory = db.relationship('Inventory')
+
+    def to_dict(self):
+        """Convert archived request item object to dictionary."""
+        return {
+            'id': self.id,
+            'original_id': self.original_id,
+            'request_id': self.request_id,
+            'inventory_id': self.inventory_id,
+            'item_name': self.inventory.item_name,
+            'quantity': self.quantity,
+            'quantity_approved': self.quantity_approved,
+            'status': self.status.value,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        """String representation of ArchivedRequestItem object."""
+        return f'<ArchivedRequestItem {self.id}>'
@@ -0,0 +1,84 @@
+from app import db
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, UTC
+from flask import g, has_request_context
+
+
+class CacheVersion(db.Model):
+    """
+    Model for shared cache version counters.
+
+    Each row is a named counter that writers bump inside their own transaction.
+    Process-local caches compare the stored version with the one they were
+    built from, so every worker notices a change on its next read without a
+    message broker.
+    """
+    __tablename__ = 'cache_versions'
+
+    # Known counter names
+    CATALOG = 'catalog'
+    PURCHASES = 'purchases'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+
+    @classmethod
+    def get_version(cls, name):
+        """
+        Get the current version for a counter, or 0 if it has never been bumped.
+
+        Inside a request the value is read once and reused, so several cached
+        lookups in one view cost a single primary-key query.
+        """
+        memo = g.setdefault('cache_versions', {}) if has_request_context() else {}
+        if name not in memo:
+            version = db.session.query(cls.version).filter(cls.name == name).scalar()
+            memo[name] = version or 0
+        return memo[name]
+
+    @classmethod
+    def bump(cls, name, connection=None):
+        """
+        Increment a counter as part of the current transaction.
+
+        The caller is responsible for committing, so the new version only
+        becomes visible together with the change it describes.
+
+        Args:
+            name (str): Counter name
+            connection: Connection to write with (e.g. from a flush listener); defaults to the session
+        """
+        executor = connection if connection is not None else db.session
+        now = datetime.now(UTC)
+        increment = (
+            db.update(cls)
+            .where(cls.name == name)
+            .values(version=cls.version + 1, updated_at=now)
+        )
+        if executor.execute(increment).rowcount == 0:
+            # The first bump creates the row. Insert it in a savepoint so that
+            # losing the race to a concurrent first bump only rolls back the
+            # insert, then increment the row the other transaction created.
+            try:
+                with executor.begin_nested():
+                    executor.execute(cls.__table__.insert().values(name=name, version=1, updated_at=now))
+            except IntegrityError:
+                executor.execute(increment)
+        if has_request_context():
+            g.get('cache_versions', {}).pop(name, None)
+
+    @classmethod
+    def set_version(cls, name, version):
+        """Set a counter to an explicit value as part of the current transaction."""
+        counter = db.session.get(cls, name)
+        if counter:
+            counter.version = version
+        else:
+            db.session.add(cls(name=name, version=version))
+        if has_request_context():
+            g.get('cache_versions', {}).pop(name, None)
+
+    def __repr__(self):
+        """String representation of CacheVersion object."""
+        return f'<CacheVersion {self.name}={self.version}>'
@@ -0,0 +1,307 @@
+from app import db
+from datetime import date, datetime, timedelta, UTC
+from decimal import Decimal
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.models.cache_version import CacheVersion
+
+
+class ConsumptionCube(db.Model):
+    """
+    Issued quantity and value aggregated by month, directorate, department,
+    unit, category and item.
+
+    Cells are built from 'issue' transactions and the request (live or
+    archived) they belong to. ``refresh`` folds in transactions added since
+    the last run, tracked by a watermark on the transaction ID, so rollups
+    never read the raw ledger. Issues without a request are filed under
+    empty directorate/department/unit values.
+
+    Transaction IDs are assigned on insert but become visible on commit, so
+    the watermark lags: each run notes the highest ID it sees, and a later
+    run folds up to that ID once it is CONSUMPTION_CUBE_SETTLE_SECONDS old,
+    by which time every lower ID has committed. Deleting or editing issues
+    that were already folded in marks the cube stale, and the next refresh
+    rebuilds it.
+    """
+    __tablename__ = 'consumption_cube'
+    __table_args__ = (
+        db.UniqueConstraint(
+            'month', 'directorate', 'department', 'unit', 'category_id', 'inventory_id',
+            name='uq_consumption_cube_cell'
+        ),
+        db.Index('ix_consumption_cube_directorate_month', 'directorate', 'month'),
+    )
+
+    # CacheVersion counter holding the highest transaction ID folded into the cube
+    WATERMARK = 'consumption_cube_watermark'
+    # CacheVersion counter holding the highest transaction ID seen by the last run, and when
+    OBSERVED = 'consumption_cube_observed'
+    # CacheVersion counters bumped when folded issues change, and copied when the cube is rebuilt
+    STALE = 'consumption_cube_stale'
+    BUILT = 'consumption_cube_built'
+
+    DEFAULT_SETTLE_SECONDS = 300
+
+    # Dimensions a rollup can be grouped by
+    DIMENSIONS = ('month', 'directorate', 'department', 'unit', 'category', 'item')
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    month = db.Column(db.Date, nullable=False)
+    directorate = db.Column(db.String(50), nullable=False, default='')
+    department = db.Column(db.String(100), nullable=False, default='')
+    unit = db.Column(db.String(100), nullable=False, default='')
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id', ondelete='CASCADE'), nullable=False)
+    inventory_id = db.Column(db.Integer, db.ForeignKey('inventories.id', ondelete='CASCADE'), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    value = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+
+    @classmethod
+    def _issue_rows(cls, after_id, through_id):
+        """Get issue transactions in an ID range with their cube dimensions."""
+        from app.models.archived_request import ArchivedRequest
+        from app.models.inventory import Inventory
+        from app.models.inventory_transaction import InventoryTransaction
+        from app.models.request import Request
+
+        return db.session.query(
+            InventoryTransaction.timestamp,
+            InventoryTransaction.inventory_id,
+            InventoryTransaction.quantity,
+            db.func.coalesce(InventoryTransaction.unit_price, Inventory.unit_price).label('unit_price'),
+            Inventory.category_id,
+            db.func.coalesce(Request.directorate, ArchivedRequest.directorate).label('directorate'),
+            db.func.coalesce(Request.department, ArchivedRequest.department).label('department'),
+            db.func.coalesce(Request.unit, ArchivedRequest.unit).label('unit'),
+        ).join(
+            Inventory, InventoryTransaction.inventory_id == Inventory.id
+        ).outerjoin(
+            Request, InventoryTransaction.related_request_id == Request.id
+        ).outerjoin(
+            ArchivedRequest, InventoryTransaction.archived_request_id == ArchivedRequest.id
+        ).filter(
+            InventoryTransaction.transaction_type == 'issue',
+            InventoryTransaction.id > after_id,
+            InventoryTransaction.id <= through_id
+        ).yield_per(1000)
+
+    @classmethod
+    def _apply(cls, cells):
+        """Add aggregated cells to the cube, creating missing ones."""
+        table = cls.__table__
+        now = datetime.now(UTC)
+        for key, (quantity, value) in cells.items():
+            month, directorate, department, unit, category_id, inventory_id = key
+            result = db.session.execute(
+                table.update()
+                .where(
+                    table.c.month == month,
+                    table.c.directorate == directorate,
+                    table.c.department == department,
+                    table.c.unit == unit,
+                    table.c.category_id == category_id,
+                    table.c.inventory_id == inventory_id
+                )
+                .values(quantity=table.c.quantity + quantity, value=table.c.value + value, updated_at=now)
+            )
+            if result.rowcount == 0:
+                db.session.execute(table.insert().values(
+                    month=month, directorate=directorate, department=department, unit=unit,
+                    category_id=category_id, inventory_id=inventory_id, quantity=quantity, value=value,
+                    updated_at=now
+                ))
+
+    @classmethod
+    def invalidate(cls, connection=None):
+        """Mark the cube for a rebuild on its next refresh, as part of the current transaction."""
+        CacheVersion.bump(cls.STALE, connection=connection)
+
+    @classmethod
+    def _settled_through(cls, watermark):
+        """
+        Get the highest transaction ID that is safe to fold in, noting the current one for a later run.
+
+        Returns:
+            int: Transaction ID all lower IDs have committed by
+        """
+        from app.models.inventory_transaction import InventoryTransaction
+
+        settle_seconds = cls.DEFAULT_SETTLE_SECONDS
+        if has_app_context():
+            settle_seconds = current_app.config.get('CONSUMPTION_CUBE_SETTLE_SECONDS', settle_seconds)
+        latest_id = db.session.query(db.func.max(InventoryTransaction.id)).scalar() or 0
+        if settle_seconds <= 0:
+            return latest_id
+
+        now = datetime.now(UTC)
+        observed = db.session.get(CacheVersion, cls.OBSERVED)
+        if observed is None:
+            db.session.add(CacheVersion(name=cls.OBSERVED, version=latest_id, updated_at=now))
+            return watermark
+        settled = db.session.query(CacheVersion.version).filter(
+            CacheVersion.name == cls.OBSERVED,
+            CacheVersion.updated_at <= now - timedelta(seconds=settle_seconds)
+        ).scalar()
+        if settled is None:
+            return watermark
+        observed.version = latest_id
+        observed.updated_at = now
+        return max(watermark, settled)
+
+    @classmethod
+    def refresh(cls, rebuild=False):
+        """
+        Fold settled issue transactions added since the last run into the cube.
+
+        The watermark row is locked for the duration, so concurrent runs
+        (one per worker) wait for each other instead of double counting.
+
+        Args:
+            rebuild (bool): Empty the cube and recompute it from the whole ledger;
+                also done when folded issues were deleted or edited since the last rebuild
+
+        Returns:
+            tuple: (number of transactions folded in, error message or None)
+        """
+        try:
+            watermark = db.session.query(CacheVersion).filter(
+                CacheVersion.name == cls.WATERMARK
+            ).with_for_update().first()
+            if watermark is None:
+                watermark = CacheVersion(name=cls.WATERMARK, version=0)
+                db.session.add(watermark)
+
+            through_id = cls._settled_through(watermark.version)
+            stale = CacheVersion.get_version(cls.STALE)
+            if rebuild or stale != CacheVersion.get_version(cls.BUILT):
+                cls.query.delete(synchronize_session=False)
+                watermark.version = 0
+                CacheVersion.set_version(cls.BUILT, stale)
+
+            cells = {}
+            count = 0
+            for row in cls._issue_rows(watermark.version, through_id):
+                timestamp = row.timestamp or datetime.now(UTC)
+                key = (
+                    date(timestamp.year, timestamp.month, 1),
+                    row.directorate.value if row.directorate else '',
+                    row.department or '',
+                    row.unit or '',
+                    row.category_id,
+                    row.inventory_id,
+                )
+                # Issues are stored as negative quantities
+                quantity = -(row.quantity or 0)
+                value = Decimal(quantity) * Decimal(row.unit_price or 0)
+                current = cells.get(key, (0, Decimal(0)))
+                cells[key] = (current[0] + quantity, current[1] + value)
+                count += 1
+
+            cls._apply(cells)
+            watermark.version = max(watermark.version, through_id)
+            db.session.commit()
+            return count, None
+        except Exception as e:
+            db.session.rollback()
+            return 0, f"Error refreshing consumption cube: {str(e)}"
+
+    @classmethod
+    def rollup(cls, group_by, start_month=None, end_month=None, directorates=None, department=None, unit=None,
+               category_id=None, inventory_id=None):
+        """
+        Sum the cube over every dimension not in ``group_by``.
+
+        Args:
+            group_by (list): Dimensions from DIMENSIONS, in output order
+            start_month (date, optional): First month to include
+            end_month (date, optional): Last month to include
+            directorates (list, optional): Directorate values to include
+            department (str, optional): Department to include
+            unit (str, optional): Unit to include
+            category_id (int, optional): Category to include
+            inventory_id (int, optional): Item to include
+
+        Returns:
+            list: Dicts with the grouped dimensions, quantity and value, largest value first
+
+        Raises:
+            ValueError: If a dimension is unknown
+        """
+        from app.models.inventory import Inventory, Category
+
+        unknown = [dimension for dimension in group_by if dimension not in cls.DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown dimension(s): {', '.join(unknown)}")
+
+        columns = {
+            'month': [cls.month],
+            'directorate': [cls.directorate],
+            'department': [cls.department],
+            'unit': [cls.unit],
+            'category': [cls.category_id, Category.name.label('category_name')],
+            'item': [cls.inventory_id, Inventory.item_name],
+        }
+        selected = [column for dimension in group_by for column in columns[dimension]]
+        query = db.session.query(
+            *selected,
+            db.func.sum(cls.quantity).label('quantity'),
+            db.func.sum(cls.value).label('value')
+        )
+        if 'category' in group_by:
+            query = query.join(Category, cls.category_id == Category.id)
+        if 'item' in group_by:
+            query = query.join(Inventory, cls.inventory_id == Inventory.id)
+
+        if start_month:
+            query = query.filter(cls.month >= start_month)
+        if end_month:
+            query = query.filter(cls.month <= end_month)
+        if directorates:
+            query = query.filter(cls.directorate.in_(directorates))
+        if department is not None:
+            query = query.filter(cls.department == department)
+        if unit is not None:
+            query = query.filter(cls.unit == unit)
+        if category_id is not None:
+            query = query.filter(cls.category_id == category_id)
+        if inventory_id is not None:
+            query = query.filter(cls.inventory_id == inventory_id)
+
+        if selected:
+            query = query.group_by(*selected)
+        rows = query.order_by(db.func.sum(cls.value).desc()).all()
+
+        results = []
+        for row in rows:
+            result = {}
+            for column in selected:
+                value = getattr(row, column.key)
+                result[column.key] = value.isoformat()[:7] if isinstance(value, date) else value
+            result['quantity'] = int(row.quantity or 0)
+            result['value'] = float(row.value or 0)
+            results.append(result)
+        return results
+
+    def __repr__(self):
+        """String representation of ConsumptionCube object."""
+        return f'<ConsumptionCube {self.month} {self.directorate}/{self.department}/{self.unit} {self.inventory_id}>'
+
+
+@event.listens_for(Session, 'after_flush')
+def invalidate_consumption_cube(session, flush_context):
+    """Mark the cube stale when a flush deletes or edits issue transactions it may have counted."""
+    from app.models.inventory_transaction import InventoryTransaction
+
+    def was_issue(obj):
+        if not isinstance(obj, InventoryTransaction):
+            return False
+        history = db.inspect(obj).attrs.transaction_type.history
+        return obj.transaction_type == 'issue' or 'issue' in (history.deleted or ())
+
+    changed = any(was_issue(obj) for obj in session.deleted) or any(
+        was_issue(obj) and session.is_modified(obj, include_collections=False) for obj in session.dirty
+    )
+    if changed:
+        ConsumptionCube.invalidate(connection=session.connection())
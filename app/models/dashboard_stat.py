@@ -0,0 +1,228 @@
+from app import db
+from contextlib import contextmanager
+from datetime import datetime, UTC
+from decimal import Decimal
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class DashboardStat(db.Model):
+    """
+    Pre-aggregated counters for the dashboard.
+
+    Each row is one counter: requests by status, items by stock status and
+    stock value per category. Counters are adjusted in the same transaction
+    as the change they describe: ORM flushes are diffed by the session
+    listeners below, and bulk statements run inside ``track``. ``rebuild``
+    recomputes everything from the source tables.
+    """
+    __tablename__ = 'dashboard_stats'
+
+    REQUESTS = 'requests'
+    STOCK_STATUS = 'stock_status'
+    STOCK_VALUE = 'stock_value'
+
+    OUT_OF_STOCK = 'out_of_stock'
+    LOW_STOCK = 'low_stock'
+    IN_STOCK = 'in_stock'
+    # Matches the low-stock badge on the inventory pages
+    LOW_STOCK_THRESHOLD = 15
+
+    stat_group = db.Column(db.String(30), primary_key=True)
+    stat_key = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+
+    @classmethod
+    def stock_status(cls, quantity):
+        """Get the stock status key for a quantity."""
+        if (quantity or 0) <= 0:
+            return cls.OUT_OF_STOCK
+        if quantity < cls.LOW_STOCK_THRESHOLD:
+            return cls.LOW_STOCK
+        return cls.IN_STOCK
+
+    @classmethod
+    def snapshot(cls, connection, inventory_ids=(), request_ids=()):
+        """
+        Get the counter contributions of specific rows as they are in the database.
+
+        Returns:
+            dict: (stat_group, stat_key) -> value
+        """
+        from app.models.inventory import Inventory
+        from app.models.request import Request
+
+        totals = {}
+
+        def add(key, value):
+            totals[key] = totals.get(key, 0) + value
+
+        if inventory_ids:
+            rows = connection.execute(
+                db.select(Inventory.quantity, Inventory.unit_price, Inventory.category_id)
+                .where(Inventory.id.in_(list(inventory_ids)))
+            )
+            for row in rows:
+                add((cls.STOCK_STATUS, cls.stock_status(row.quantity)), 1)
+                add((cls.STOCK_VALUE, str(row.category_id)), (row.quantity or 0) * (row.unit_price or Decimal(0)))
+        if request_ids:
+            rows = connection.execute(
+                db.select(Request.status)
+                .where(Request.id.in_(list(request_ids)), Request.deleted_at.is_(None))
+            )
+            for row in rows:
+                add((cls.REQUESTS, row.status.name), 1)
+        return totals
+
+    @classmethod
+    def apply(cls, deltas, connection=None):
+        """
+        Add deltas to counters, creating missing counters.
+
+        Args:
+            deltas (dict): (stat_group, stat_key) -> change
+            connection: Connection to write with; defaults to the session
+        """
+        executor = connection if connection is not None else db.session
+        now = datetime.now(UTC)
+        table = cls.__table__
+        for (stat_group, stat_key), delta in sorted(deltas.items()):
+            if not delta:
+                continue
+            result = executor.execute(
+                table.update()
+                .where(table.c.stat_group == stat_group, table.c.stat_key == stat_key)
+                .values(value=table.c.value + delta, updated_at=now)
+            )
+            if result.rowcount == 0:
+                executor.execute(table.insert().values(
+                    stat_group=stat_group, stat_key=stat_key, value=delta, updated_at=now
+                ))
+
+    @classmethod
+    def diff(cls, before, after):
+        """Subtract one snapshot from another."""
+        return {key: after.get(key, 0) - before.get(key, 0) for key in set(before) | set(after)}
+
+    @classmethod
+    @contextmanager
+    def track(cls, inventory_ids=(), request_ids=()):
+        """
+        Keep counters correct across bulk statements that bypass the ORM.
+
+        Snapshots the given rows before and after the block and applies the
+        difference, all in the current transaction.
+        """
+        inventory_ids, request_ids = list(inventory_ids), list(request_ids)
+        # Pending ORM changes are counted by the flush listener, not here
+        db.session.flush()
+        connection = db.session.connection()
+        before = cls.snapshot(connection, inventory_ids, request_ids)
+        yield
+        after = cls.snapshot(connection, inventory_ids, request_ids)
+        cls.apply(cls.diff(before, after), connection=connection)
+
+    @classmethod
+    def get_all(cls):
+        """
+        Read every counter.
+
+        Returns:
+            dict: stat_group -> {stat_key: value}
+        """
+        stats = {}
+        for row in db.session.query(cls.stat_group, cls.stat_key, cls.value).all():
+            stats.setdefault(row.stat_group, {})[row.stat_key] = row.value
+        return stats
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Recompute every counter from the requests, archived requests and inventories tables.
+
+        Returns:
+            tuple: (number of counters written, error message or None)
+        """
+        from app.models.archived_request import ArchivedRequest
+        from app.models.inventory import Inventory
+        from app.models.request import Request
+
+        try:
+            totals = {}
+            for status, count in (
+                db.session.query(Request.status, db.func.count(Request.id))
+                .filter(Request.deleted_at.is_(None))
+                .group_by(Request.status)
+            ):
+                totals[(cls.REQUESTS, status.name)] = count
+            # Archived requests still count towards the request totals
+            for status, count in (
+                db.session.query(ArchivedRequest.status, db.func.count(ArchivedRequest.id))
+                .group_by(ArchivedRequest.status)
+            ):
+                key = (cls.REQUESTS, status.name)
+                totals[key] = totals.get(key, 0) + count
+            for quantity, unit_price, category_id in db.session.query(
+                Inventory.quantity, Inventory.unit_price, Inventory.category_id
+            ):
+                status_key = (cls.STOCK_STATUS, cls.stock_status(quantity))
+                totals[status_key] = totals.get(status_key, 0) + 1
+                value_key = (cls.STOCK_VALUE, str(category_id))
+                totals[value_key] = totals.get(value_key, 0) + (quantity or 0) * (unit_price or Decimal(0))
+
+            now = datetime.now(UTC)
+            cls.query.delete(synchronize_session=False)
+            if totals:
+                db.session.execute(db.insert(cls), [
+                    {'stat_group': stat_group, 'stat_key': stat_key, 'value': value, 'updated_at': now}
+                    for (stat_group, stat_key), value in totals.items()
+                ])
+            db.session.commit()
+            return len(totals), None
+        except Exception as e:
+            db.session.rollback()
+            return 0, f"Error rebuilding dashboard stats: {str(e)}"
+
+    def __repr__(self):
+        """String representation of DashboardStat object."""
+        return f'<DashboardStat {self.stat_group}:{self.stat_key}={self.value}>'
+
+
+def _tracked_ids(session, objects):
+    """Split inventory and request objects into ID sets."""
+    from app.models.inventory import Inventory
+    from app.models.request import Request
+
+    inventory_ids, request_ids = set(), set()
+    for obj in objects:
+        if isinstance(obj, Inventory) and obj.id is not None:
+            inventory_ids.add(obj.id)
+        elif isinstance(obj, Request) and obj.id is not None:
+            request_ids.add(obj.id)
+    return inventory_ids, request_ids
+
+
+@event.listens_for(Session, 'before_flush')
+def snapshot_dashboard_rows(session, flush_context, instances):
+    """Record the counter contributions of rows this flush is about to change."""
+    changed = [obj for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+    inventory_ids, request_ids = _tracked_ids(session, changed + list(session.deleted))
+    session.info['dashboard_stats_before'] = None
+    if inventory_ids or request_ids:
+        connection = session.connection()
+        before = DashboardStat.snapshot(connection, inventory_ids, request_ids)
+        session.info['dashboard_stats_before'] = (inventory_ids, request_ids, before)
+
+
+@event.listens_for(Session, 'after_flush')
+def apply_dashboard_deltas(session, flush_context):
+    """Adjust counters by the difference the flush made, in the same transaction."""
+    inventory_ids, request_ids, before = session.info.pop('dashboard_stats_before', None) or (set(), set(), {})
+    new_inventory_ids, new_request_ids = _tracked_ids(session, session.new)
+    inventory_ids, request_ids = inventory_ids | new_inventory_ids, request_ids | new_request_ids
+    if not (inventory_ids or request_ids):
+        return
+    connection = session.connection()
+    after = DashboardStat.snapshot(connection, inventory_ids, request_ids)
+    DashboardStat.apply(DashboardStat.diff(before, after), connection=connection)
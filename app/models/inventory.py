@@ -5,6 +5,11 @@ from app.models.user import User
 import logging
 from app.models.inventory_transaction import InventoryTransaction
 from app.models.inventory_supplier import InventorySupplier
+from app.models.cache_version import CacheVersion
+from app.models.inventory_change import InventoryChange
+from app.models.dashboard_stat import DashboardStat
+from app import serialization
+from sqlalchemy import DDL, event
 
 # Configure logging
 # logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -38,6 +43,7 @@ class Category(db.Model):
                 
             category = cls(name=name, description=description)
             db.session.add(category)
+            CacheVersion.bump(CacheVersion.CATALOG)
             db.session.commit()
             # logger.info(f"Category '{name}' created by {current_user.email}")
             return category, None
@@ -72,6 +78,7 @@ class Category(db.Model):
                 category.description = description
                 
             category.updated_at = datetime.now(UTC)
+            CacheVersion.bump(CacheVersion.CATALOG)
             db.session.commit()
             # logger.info(f"Category {category_id} updated by {current_user.email}")
             return category, None
@@ -97,6 +104,7 @@ class Category(db.Model):
                 return False, "Cannot delete category with associated inventory items"
                 
             db.session.delete(category)
+            CacheVersion.bump(CacheVersion.CATALOG)
             db.session.commit()
             # logger.info(f"Category {category_id} deleted by {current_user.email}")
             return True, None
@@ -130,6 +138,8 @@ class Inventory(db.Model):
     item_name = db.Column(db.String(100), unique=True, nullable=False)
     description = db.Column(db.Text, nullable=True)
     quantity = db.Column(db.Integer, default=0)
+    # Approved but not yet collected; maintained by the request workflow
+    reserved_quantity = db.Column(db.Integer, default=0, server_default='0', nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False)
     unit_price = db.Column(db.Numeric(10, 2), nullable=True)
     supplier = db.Column(db.String(255), nullable=True)
@@ -147,6 +157,67 @@ class Inventory(db.Model):
     backref='inventory',
     passive_deletes=True)
     
+    @property
+    def available_quantity(self):
+        """Stock not yet promised to approved requests."""
+        return (self.quantity or 0) - (self.reserved_quantity or 0)
+
+    @classmethod
+    def adjust_reserved(cls, deltas):
+        """
+        Add to the reserved quantity of several items in the current transaction.
+
+        Args:
+            deltas (dict): inventory_id -> change in reserved quantity
+        """
+        rows = [{'b_id': inventory_id, 'b_delta': delta} for inventory_id, delta in deltas.items() if delta]
+        if not rows:
+            return
+        table = cls.__table__
+        db.session.execute(
+            table.update()
+            .where(table.c.id == db.bindparam('b_id'))
+            .values(reserved_quantity=table.c.reserved_quantity + db.bindparam('b_delta')),
+            rows
+        )
+        # The UPDATE bypasses the ORM: refresh loaded items and log the feed entries
+        for obj in db.session.identity_map.values():
+            if isinstance(obj, cls) and obj.id in deltas:
+                db.session.expire(obj, ['reserved_quantity'])
+        InventoryChange.record(row['b_id'] for row in rows)
+
+    @classmethod
+    def rebuild_reservations(cls):
+        """
+        Recompute every reserved quantity from approved, uncollected request items.
+
+        Returns:
+            tuple: (number of items whose reservation changed, error message or None)
+        """
+        from app.models.request import Request, RequestItem, ItemRequestStatus
+
+        try:
+            expected = dict(
+                db.session.query(RequestItem.inventory_id, db.func.sum(RequestItem.quantity_approved))
+                .join(Request, RequestItem.request_id == Request.id)
+                .filter(RequestItem.status == ItemRequestStatus.APPROVED, Request.deleted_at.is_(None))
+                .group_by(RequestItem.inventory_id)
+                .all()
+            )
+            current = db.session.query(cls.id, cls.reserved_quantity).with_for_update().all()
+            changed = [
+                {'id': row.id, 'reserved_quantity': int(expected.get(row.id) or 0)}
+                for row in current if (row.reserved_quantity or 0) != int(expected.get(row.id) or 0)
+            ]
+            if changed:
+                db.session.execute(db.update(cls), changed)
+                InventoryChange.record(row['id'] for row in changed)
+            db.session.commit()
+            return len(changed), None
+        except Exception as e:
+            db.session.rollback()
+            return 0, f"Error rebuilding reservations: {str(e)}"
+
     @classmethod
     def get_all_inventory(cls):
         """Get all inventory items."""
@@ -196,6 +267,7 @@ class Inventory(db.Model):
                 updated_by=current_user.id
             )
             db.session.add(inventory)
+            CacheVersion.bump(CacheVersion.CATALOG)
             db.session.commit()
 
            
@@ -269,6 +341,7 @@ class Inventory(db.Model):
                 
             inventory.updated_by = current_user.id
             inventory.updated_at = datetime.now(UTC)
+            CacheVersion.bump(CacheVersion.CATALOG)
             db.session.commit()
             return inventory, None
         except Exception as e:
@@ -287,6 +360,7 @@ class Inventory(db.Model):
                 return False, "Inventory item not found"
                 
             db.session.delete(inventory)
+            CacheVersion.bump(CacheVersion.CATALOG)
             db.session.commit()
             return True, None
         except Exception as e:
@@ -328,23 +402,161 @@ class Inventory(db.Model):
         except Exception as e:
             db.session.rollback()
             return None, f"Error adjusting inventory quantity: {str(e)}"
+
+    @classmethod
+    def batch_adjust(cls, adjustments, performed_by=None, note=None, dry_run=False):
+        """
+        Apply many stock adjustments (e.g. a stock-take) in a single transaction.
+
+        Each adjustment identifies an item by ``inventory_id`` or ``item_name``
+        and gives either a ``counted`` quantity or a ``delta``, plus an optional
+        ``note``. Current stock for all items is read (and locked) with one
+        query, and the quantity updates and ``adjustment`` transactions are
+        written with one bulk statement each. Nothing is written if any entry
+        is invalid.
+
+        Args:
+            adjustments (list[dict]): The adjustments to apply
+            performed_by (int, optional): User ID to record; defaults to the
+                current user, who must be an admin
+            note (str, optional): Note for entries that do not carry their own
+            dry_run (bool): Validate and compute deltas without writing
+
+        Returns:
+            tuple: (summary dict, error message or None)
+        """
+        if performed_by is None:
+            if not current_user.is_admin:
+                return None, "Permission denied: Admin privileges required"
+            performed_by = current_user.id
+
+        errors = []
+        parsed = []
+        for index, entry in enumerate(adjustments, start=1):
+            inventory_id = entry.get('inventory_id')
+            item_name = (entry.get('item_name') or '').strip()
+            counted = entry.get('counted')
+            delta = entry.get('delta')
+            if not inventory_id and not item_name:
+                errors.append({'line': index, 'error': "Either 'inventory_id' or 'item_name' is required"})
+                continue
+            if (counted is None or counted == '') == (delta is None or delta == ''):
+                errors.append({'line': index, 'error': "Provide exactly one of 'counted' or 'delta'"})
+                continue
+            try:
+                inventory_id = int(inventory_id) if inventory_id else None
+                counted = int(counted) if counted not in (None, '') else None
+                delta = int(delta) if delta not in (None, '') else None
+            except (TypeError, ValueError):
+                errors.append({'line': index, 'error': "Item ID and quantities must be whole numbers"})
+                continue
+            if counted is not None and counted < 0:
+                errors.append({'line': index, 'error': "Counted quantity cannot be negative"})
+                continue
+            parsed.append((index, inventory_id, item_name, counted, delta, entry.get('note')))
+
+        try:
+            ids = {inventory_id for _, inventory_id, _, _, _, _ in parsed if inventory_id}
+            names = {item_name.lower() for _, inventory_id, item_name, _, _, _ in parsed if not inventory_id}
+            conditions = []
+            if ids:
+                conditions.append(cls.id.in_(ids))
+            if names:
+                conditions.append(db.func.lower(cls.item_name).in_(names))
+
+            stock = {}
+            if conditions:
+                rows = (
+                    db.session.query(cls.id, cls.item_name, cls.quantity)
+                    .filter(db.or_(*conditions))
+                    .with_for_update()
+                    .all()
+                )
+                stock = {row.id: row for row in rows}
+            by_name = {row.item_name.lower(): row for row in stock.values()}
+
+            now = datetime.now(UTC)
+            seen = set()
+            results = []
+            for index, inventory_id, item_name, counted, delta, entry_note in parsed:
+                row = stock.get(inventory_id) if inventory_id else by_name.get(item_name.lower())
+                if not row:
+                    errors.append({'line': index, 'error': f"Inventory item '{inventory_id or item_name}' not found"})
+                    continue
+                if row.id in seen:
+                    errors.append({'line': index, 'error': f"Item '{row.item_name}' appears more than once"})
+                    continue
+                seen.add(row.id)
+
+                change = counted - row.quantity if counted is not None else delta
+                new_quantity = row.quantity + change
+                if new_quantity < 0:
+                    errors.append({'line': index, 'error': f"Insufficient quantity for '{row.item_name}'"})
+                    continue
+                results.append({
+                    'inventory_id': row.id,
+                    'item_name': row.item_name,
+                    'previous_quantity': row.quantity,
+                    'new_quantity': new_quantity,
+                    'delta': change,
+                    'note': entry_note or note or "Stock-take adjustment",
+                })
+
+            changed = [result for result in results if result['delta'] != 0]
+            summary = {
+                'total': len(adjustments),
+                'adjusted': len(changed),
+                'unchanged': len(results) - len(changed),
+                'net_change': sum(result['delta'] for result in changed),
+                'errors': sorted(errors, key=lambda error: error['line']),
+                'items': results,
+                'dry_run': dry_run,
+            }
+
+            if errors or dry_run or not changed:
+                db.session.rollback()
+                return summary, "Some adjustments are invalid; nothing was applied" if errors else None
+
+            with DashboardStat.track(inventory_ids=[result['inventory_id'] for result in changed]):
+                db.session.execute(db.update(cls), [
+                    {'id': result['inventory_id'], 'quantity': result['new_quantity'],
+                     'updated_by': performed_by, 'updated_at': now}
+                    for result in changed
+                ])
+            db.session.execute(db.insert(InventoryTransaction), [
+                {'inventory_id': result['inventory_id'], 'transaction_type': 'adjustment',
+                 'quantity': result['delta'], 'performed_by': performed_by,
+                 'timestamp': now, 'note': result['note']}
+                for result in changed
+            ])
+            # Bulk UPDATEs bypass the flush listener, so log the feed entries directly
+            InventoryChange.record(result['inventory_id'] for result in changed)
+            db.session.commit()
+            return summary, None
+        except Exception as e:
+            db.session.rollback()
+            return None, f"Error applying stock adjustments: {str(e)}"
     
     def to_dict(self):
-        """Convert inventory object to dictionary."""
+        """Convert inventory object to dictionary; use serialization.to_dicts for lists."""
+        creator = serialization.user_summary(self.created_by)
+        updater = serialization.user_summary(self.updated_by)
         return {
             'id': self.id,
             'item_name': self.item_name,
             'description': self.description,
             'quantity': self.quantity,
+            'reserved_quantity': self.reserved_quantity,
+            'available_quantity': self.available_quantity,
             'category_id': self.category_id,
             'category_name': self.category.name,
             'unit_price': self.unit_price,
             'supplier': self.supplier,
             'location': self.location,
             'created_by': self.created_by,
-            'creator_name': self.creator.name,
+            'creator_name': creator.name if creator else None,
             'updated_by': self.updated_by,
-            'updater_name': self.updater.name,
+            'updater_name': updater.name if updater else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -353,3 +565,44 @@ class Inventory(db.Model):
         """String representation of Inventory object."""
         return f'<Inventory {self.item_name}>'
 
+
+# Full-text search index over item_name, description and supplier.
+# SQLite (development/testing) uses an external-content FTS5 table kept in sync
+# by triggers; MySQL (production) uses a native FULLTEXT index. Both are created
+# with the inventories table and queried through app.search.
+INVENTORY_FTS_TABLE = 'inventory_fts'
+
+SQLITE_SEARCH_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {INVENTORY_FTS_TABLE} USING fts5(
+        item_name, description, supplier,
+        content='inventories', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS inventories_fts_ai AFTER INSERT ON inventories BEGIN
+        INSERT INTO {INVENTORY_FTS_TABLE}(rowid, item_name, description, supplier)
+        VALUES (new.id, new.item_name, new.description, new.supplier);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS inventories_fts_ad AFTER DELETE ON inventories BEGIN
+        INSERT INTO {INVENTORY_FTS_TABLE}({INVENTORY_FTS_TABLE}, rowid, item_name, description, supplier)
+        VALUES ('delete', old.id, old.item_name, old.description, old.supplier);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS inventories_fts_au AFTER UPDATE OF item_name, description, supplier ON inventories BEGIN
+        INSERT INTO {INVENTORY_FTS_TABLE}({INVENTORY_FTS_TABLE}, rowid, item_name, description, supplier)
+        VALUES ('delete', old.id, old.item_name, old.description, old.supplier);
+        INSERT INTO {INVENTORY_FTS_TABLE}(rowid, item_name, description, supplier)
+        VALUES (new.id, new.item_name, new.description, new.supplier);
+    END""",
+]
+
+MYSQL_SEARCH_DDL = [
+    "ALTER TABLE inventories ADD FULLTEXT INDEX ft_inventories_search (item_name, description, supplier)",
+]
+
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Inventory.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in MYSQL_SEARCH_DDL:
+    event.listen(Inventory.__table__, 'after_create', DDL(statement).execute_if(dialect='mysql'))
+event.listen(
+    Inventory.__table__, 'after_drop',
+    DDL(f"DROP TABLE IF EXISTS {INVENTORY_FTS_TABLE}").execute_if(dialect='sqlite')
+)
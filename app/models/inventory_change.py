@@ -0,0 +1,165 @@
+from app import db
+from flask import current_app, has_app_context
+from datetime import datetime, timedelta, UTC
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.models.cache_version import CacheVersion
+
+
+class InventoryChange(db.Model):
+    """
+    Append-only log of inventory item changes for incremental client sync.
+
+    The auto-increment ID is the feed cursor. Rows are written in the same
+    transaction as the change they describe: ORM flushes are captured by the
+    session listener below, and bulk statements call ``record`` themselves.
+    Deleted items leave a 'delete' tombstone.
+
+    IDs are assigned on insert but become visible on commit, so concurrent
+    transactions can commit out of ID order. The feed only serves changes
+    logged at least INVENTORY_CHANGE_VISIBILITY_DELAY seconds ago and stops
+    before the first newer one, so a cursor never moves past a change that
+    may still be committing.
+    """
+    __tablename__ = 'inventory_changes'
+
+    UPSERT = 'upsert'
+    DELETE = 'delete'
+
+    # CacheVersion counter holding the highest change ID removed by pruning
+    PRUNED_THROUGH = 'inventory_changes_pruned'
+
+    # Comfortably longer than a bulk request action or one import batch takes to commit
+    DEFAULT_VISIBILITY_DELAY = 120
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    inventory_id = db.Column(db.Integer, nullable=False)
+    change_type = db.Column(db.String(10), nullable=False)
+    changed_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC), index=True)
+
+    @classmethod
+    def record(cls, inventory_ids, change_type=UPSERT, connection=None):
+        """
+        Log changes for a set of inventory items in the current transaction.
+
+        Args:
+            inventory_ids (iterable): IDs of the changed items
+            change_type (str): 'upsert' or 'delete'
+            connection: Connection to write with; defaults to the session
+        """
+        now = datetime.now(UTC)
+        rows = [
+            {'inventory_id': inventory_id, 'change_type': change_type, 'changed_at': now}
+            for inventory_id in sorted(set(inventory_ids))
+        ]
+        if not rows:
+            return
+        executor = connection if connection is not None else db.session
+        executor.execute(cls.__table__.insert(), rows)
+
+    @classmethod
+    def _unsettled_after(cls, cursor):
+        """Get the lowest ID after a cursor logged too recently to serve, or None."""
+        delay = cls.DEFAULT_VISIBILITY_DELAY
+        if has_app_context():
+            delay = current_app.config.get('INVENTORY_CHANGE_VISIBILITY_DELAY', delay)
+        settled_before = datetime.now(UTC) - timedelta(seconds=delay)
+        return (
+            db.session.query(db.func.min(cls.id))
+            .filter(cls.id > cursor, cls.changed_at > settled_before)
+            .scalar()
+        )
+
+    @classmethod
+    def latest_cursor(cls):
+        """Get the ID of the most recent change that is safe to serve, or 0 if there are none."""
+        unsettled = cls._unsettled_after(0)
+        if unsettled is not None:
+            return unsettled - 1
+        return db.session.query(db.func.max(cls.id)).scalar() or 0
+
+    @classmethod
+    def get_changes_since(cls, cursor, limit=500):
+        """
+        Get changes after a cursor, collapsed to the latest change per item.
+
+        Returns:
+            tuple: (dict of inventory_id -> change_type, new cursor, has_more)
+        """
+        query = db.session.query(cls.id, cls.inventory_id, cls.change_type).filter(cls.id > cursor)
+        unsettled = cls._unsettled_after(cursor)
+        if unsettled is not None:
+            query = query.filter(cls.id < unsettled)
+        rows = query.order_by(cls.id).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        latest = {}
+        for row in rows:
+            latest[row.inventory_id] = row.change_type
+        new_cursor = rows[-1].id if rows else cursor
+        return latest, new_cursor, has_more
+
+    @classmethod
+    def is_expired(cls, cursor):
+        """Check whether changes after a cursor may already have been pruned."""
+        return cursor < CacheVersion.get_version(cls.PRUNED_THROUGH)
+
+    @classmethod
+    def prune(cls, retention_days):
+        """
+        Delete changes older than the retention period.
+
+        Clients holding a cursor from before the pruned range are told to
+        reload in full.
+        """
+        try:
+            cutoff = datetime.now(UTC) - timedelta(days=retention_days)
+            pruned_through = db.session.query(db.func.max(cls.id)).filter(cls.changed_at < cutoff).scalar()
+            if not pruned_through:
+                return 0
+            count = cls.query.filter(cls.id <= pruned_through).delete(synchronize_session=False)
+            CacheVersion.set_version(cls.PRUNED_THROUGH, pruned_through)
+            db.session.commit()
+            return count
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def __repr__(self):
+        """String representation of InventoryChange object."""
+        return f'<InventoryChange {self.id} {self.change_type} {self.inventory_id}>'
+
+
+@event.listens_for(Session, 'after_flush')
+def record_inventory_changes(session, flush_context):
+    """Log inventory rows written by an ORM flush, in the same transaction."""
+    from app.models.inventory import Inventory, Category
+
+    upserts = set()
+    deletes = set()
+    category_ids = set()
+    for obj in session.new:
+        if isinstance(obj, Inventory):
+            upserts.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Inventory) and session.is_modified(obj, include_collections=False):
+            upserts.add(obj.id)
+        elif isinstance(obj, Category) and session.is_modified(obj, include_collections=False):
+            category_ids.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Inventory):
+            deletes.add(obj.id)
+
+    if not (upserts or deletes or category_ids):
+        return
+
+    connection = session.connection()
+    if category_ids:
+        # Item payloads include the category name
+        upserts.update(
+            row.id for row in connection.execute(
+                db.select(Inventory.id).where(Inventory.category_id.in_(category_ids))
+            )
+        )
+    InventoryChange.record(upserts - deletes, InventoryChange.UPSERT, connection=connection)
+    InventoryChange.record(deletes, InventoryChange.DELETE, connection=connection)
@@ -2,14 +2,24 @@ from app import db
 from datetime import datetime, UTC
 from flask_login import current_user
 from app.models.user import User
+from app.models.supplier import Supplier
 import logging
 
 class InventorySupplier(db.Model):
-    """Model for inventory suppliers."""
+    """
+    Model linking inventory items to the suppliers they are bought from.
+
+    One row per (item, supplier) with that supplier's latest price for the
+    item. ``supplier_name`` keeps a copy of the registry name for display.
+    """
     __tablename__ = 'inventory_suppliers'
+    __table_args__ = (
+        db.UniqueConstraint('inventory_id', 'supplier_id', name='uq_inventory_suppliers_inventory_supplier'),
+    )
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     inventory_id = db.Column(db.Integer, db.ForeignKey('inventories.id', ondelete="CASCADE"), nullable=False)
+    supplier_id = db.Column(db.Integer, db.ForeignKey('suppliers.id'), nullable=False, index=True)
     supplier_name = db.Column(db.String(255), nullable=False)
     unit_price = db.Column(db.Float, nullable=True)
     last_purchase_date = db.Column(db.DateTime, default=datetime.now(UTC))
@@ -18,15 +28,19 @@ class InventorySupplier(db.Model):
     
     # Relationship
     # inventory = db.relationship('Inventory', backref='supplier_records')
+    supplier = db.relationship('Supplier')
     
     @classmethod
     def get_or_create_supplier(cls, inventory_id, supplier_name, unit_price=None):
         """Get an existing supplier or create a new one."""
         try:
+            registry_supplier = Supplier.get_or_create(supplier_name)
+            if registry_supplier is None:
+                return None, "Supplier name is required"
             # Check if supplier already exists for this inventory
             supplier = cls.query.filter_by(
                 inventory_id=inventory_id,
-                supplier_name=supplier_name
+                supplier_id=registry_supplier.id
             ).first()
             
             if supplier:
@@ -41,7 +55,8 @@ class InventorySupplier(db.Model):
                 # Create new supplier
                 supplier = cls(
                     inventory_id=inventory_id,
-                    supplier_name=supplier_name,
+                    supplier_id=registry_supplier.id,
+                    supplier_name=registry_supplier.name,
                     unit_price=unit_price
                 )
                 db.session.add(supplier)
@@ -63,8 +78,11 @@ class InventorySupplier(db.Model):
     
     @classmethod
     def get_supplier_by_name(cls, supplier_name):
-        """Get a supplier by name."""
-        return cls.query.filter_by(supplier_name=supplier_name).first()
+        """Get a supplier by name, matching any spelling variant through the registry."""
+        registry_supplier = Supplier.get_by_name(supplier_name)
+        if registry_supplier is None:
+            return None
+        return cls.query.filter_by(supplier_id=registry_supplier.id).first()
     
     @classmethod
     def get_suppliers(cls):
@@ -76,6 +94,7 @@ class InventorySupplier(db.Model):
         return {
             'id': self.id,
             'inventory_id': self.inventory_id,
+            'supplier_id': self.supplier_id,
             'supplier_name': self.supplier_name,
             'unit_price': self.unit_price,
             'last_purchase_date': self.last_purchase_date.isoformat() if self.last_purchase_date else None,
@@ -3,16 +3,33 @@ from datetime import datetime, UTC
 from flask_login import current_user
 from app.models.user import User
 from app.models.inventory_supplier import InventorySupplier
+from app.models.supplier import Supplier
+from app.models.cache_version import CacheVersion
+from app.pagination import encode_cursor, decode_cursor, keyset_condition
+from app import serialization
+from sqlalchemy import event
+from sqlalchemy.orm import Session, joinedload
 import logging
 
 
 class InventoryTransaction(db.Model):
     __tablename__ = 'inventory_transactions'
+    __table_args__ = (
+        # Supports per-item ledger reads ordered by (timestamp, id)
+        db.Index('ix_inventory_transactions_inventory_id_timestamp_id', 'inventory_id', 'timestamp', 'id'),
+        # Supports per-type lists (e.g. purchase history) ordered by (timestamp, id)
+        db.Index('ix_inventory_transactions_type_timestamp_id', 'transaction_type', 'timestamp', 'id'),
+    )
+
+    TRANSACTION_TYPES = ['initial', 'purchase', 'issue', 'adjustment']
+
     id = db.Column(db.Integer, primary_key=True)
     inventory_id = db.Column(db.Integer, db.ForeignKey('inventories.id', ondelete='CASCADE'),nullable=False)
     transaction_type = db.Column(db.String(50), nullable=False)  # 'purchase', 'issue', 'adjustment',  'initial'
     quantity = db.Column(db.Integer, nullable=False)  # +ve for in, -ve for out
     related_request_id = db.Column(db.Integer, db.ForeignKey('requests.id'), nullable=True)
+    # Set instead of related_request_id once the request has been moved to archived_requests
+    archived_request_id = db.Column(db.Integer, db.ForeignKey('archived_requests.id'), nullable=True, index=True)
     performed_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.now(UTC))
     note = db.Column(db.Text, nullable=True)
@@ -23,19 +40,205 @@ class InventoryTransaction(db.Model):
     inventory = db.relationship('Inventory')
     user = db.relationship('User')
     request = db.relationship('Request')
+    archived_request = db.relationship('ArchivedRequest')
     supplier = db.relationship('InventorySupplier')
 
+    @classmethod
+    def get_item_ledger(cls, inventory_id, limit=50, cursor=None, transaction_types=None,
+                        start=None, end=None):
+        """
+        Get one page of an item's transactions, newest first, with running balances.
+
+        Pages are keyed on (timestamp, id) so each page is a range scan on the
+        (inventory_id, timestamp, id) index. The balance on each row is the
+        item's ledger total up to and including that row, regardless of the
+        type and date filters applied to the page.
+
+        Args:
+            inventory_id (int): The inventory item ID
+            limit (int): Maximum number of rows to return
+            cursor (str, optional): Cursor from the previous page
+            transaction_types (list, optional): Only include these transaction types
+            start (datetime, optional): Only include rows at or after this time
+            end (datetime, optional): Only include rows at or before this time
+
+        Returns:
+            tuple: (list of row dicts, next cursor or None)
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        key_columns = [cls.timestamp, cls.id]
+        query = cls.query.options(joinedload(cls.supplier)).filter(cls.inventory_id == inventory_id)
+        if transaction_types:
+            query = query.filter(cls.transaction_type.in_(transaction_types))
+        if start:
+            query = query.filter(cls.timestamp >= start)
+        if end:
+            query = query.filter(cls.timestamp <= end)
+        if cursor:
+            query = query.filter(keyset_condition(key_columns, decode_cursor(cursor, size=2)))
+
+        rows = query.order_by(cls.timestamp.desc(), cls.id.desc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if not rows:
+            return [], None
+
+        first, last = rows[0], rows[-1]
+        # Ledger balance after the newest row on the page
+        balance = db.session.query(db.func.coalesce(db.func.sum(cls.quantity), 0)).filter(
+            cls.inventory_id == inventory_id,
+            db.not_(keyset_condition(key_columns, [first.timestamp, first.id], descending=False))
+        ).scalar()
+
+        balances = {}
+        if transaction_types and len(rows) > 1:
+            # Filtered rows are not contiguous in the ledger. Rather than load
+            # every movement in between, the database sums the movements that
+            # lie between each pair of neighbouring rows on the page: one
+            # grouped query returning at most one row per page row.
+            gap = db.case(
+                *[(keyset_condition(key_columns, [row.timestamp, row.id], descending=False), position)
+                  for position, row in enumerate(rows[1:])]
+            ).label('gap')
+            gap_totals = dict(db.session.query(gap, db.func.sum(cls.quantity)).filter(
+                cls.inventory_id == inventory_id,
+                db.not_(keyset_condition(key_columns, [first.timestamp, first.id], descending=False)),
+                keyset_condition(key_columns, [last.timestamp, last.id], descending=False)
+            ).group_by(gap).all())
+            for position, row in enumerate(rows):
+                balances[row.id] = balance
+                balance -= gap_totals.get(position) or 0
+        else:
+            for row in rows:
+                balances[row.id] = balance
+                balance -= row.quantity
+
+        serialization.prime_users(rows, ['performed_by'])
+        page = []
+        for row in rows:
+            data = row.to_dict()
+            data['balance'] = int(balances[row.id])
+            page.append(data)
+
+        next_cursor = encode_cursor(last.timestamp, last.id) if has_more else None
+        return page, next_cursor
+
+    @classmethod
+    def get_purchases_page(cls, supplier_name=None, item_name=None, start=None, end=None, limit=50, cursor=None):
+        """
+        Get one page of purchase transactions, newest first, keyed on (timestamp, id).
+
+        Every filter is a predicate the database can answer from an index:
+        the type and dates are a range on (transaction_type, timestamp, id),
+        the supplier name is matched against the normalized names in the
+        small supplier registry and applied as ``supplier_id IN (...)``, and the item name goes through
+        the full-text index. Items and suppliers are joined in the page query
+        and performers are loaded in one batch, so a page costs the same
+        number of queries whatever its size.
+
+        Args:
+            supplier_name (str, optional): Part of the supplier's name
+            item_name (str, optional): Full-text search over item name, description and supplier
+            start (datetime, optional): Only include purchases at or after this time
+            end (datetime, optional): Only include purchases at or before this time
+            limit (int): Maximum number of purchases to return
+            cursor (str, optional): Cursor from the previous page
+
+        Returns:
+            tuple: (list of InventoryTransaction objects, next cursor or None,
+                    page totals dict with quantity and spend)
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        from app import search
+        from app.models.inventory import Inventory
+
+        key_columns = [cls.timestamp, cls.id]
+        query = cls.query.options(joinedload(cls.inventory), joinedload(cls.supplier)).filter(
+            cls.transaction_type == 'purchase'
+        )
+        if supplier_name:
+            query = query.filter(cls.supplier_id.in_(
+                db.select(InventorySupplier.id).where(InventorySupplier.supplier_id.in_(Supplier.matching_ids(supplier_name)))
+            ))
+        if item_name:
+            matches = search.matching_ids(item_name)
+            if matches is not None:
+                query = query.filter(cls.inventory_id.in_(matches))
+        if start:
+            query = query.filter(cls.timestamp >= start)
+        if end:
+            query = query.filter(cls.timestamp <= end)
+        if cursor:
+            query = query.filter(keyset_condition(key_columns, decode_cursor(cursor, size=2)))
+
+        rows = query.order_by(cls.timestamp.desc(), cls.id.desc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        totals = {'quantity': 0, 'spend': 0.0}
+        if rows:
+            quantity, spend = db.session.query(
+                db.func.coalesce(db.func.sum(cls.quantity), 0),
+                db.func.coalesce(db.func.sum(cls.quantity * db.func.coalesce(cls.unit_price, Inventory.unit_price, 0)), 0)
+            ).join(Inventory, cls.inventory_id == Inventory.id).filter(
+                cls.id.in_([row.id for row in rows])
+            ).one()
+            totals = {'quantity': int(quantity), 'spend': float(spend)}
+
+        serialization.prime_users(rows, ['performed_by'])
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id) if has_more else None
+        return rows, next_cursor, totals
+
+    @property
+    def request_location(self):
+        """Location of the related request, whether it is live or archived."""
+        if self.request is not None:
+            return self.request.location
+        if self.archived_request is not None:
+            return self.archived_request.location
+        return None
+
     def to_dict(self):
+        performer = serialization.user_summary(self.performed_by)
         return {
             'id': self.id,
             'inventory_id': self.inventory_id,
             'transaction_type': self.transaction_type,
             'quantity': self.quantity,
             'related_request_id': self.related_request_id,
+            'archived_request_id': self.archived_request_id,
             'performed_by': self.performed_by,
+            'performed_by_name': performer.name if performer else None,
             'timestamp': self.timestamp.isoformat() if self.timestamp else None,
             'note': self.note,
             'supplier_id': self.supplier_id,
             'supplier_name': self.supplier.supplier_name if self.supplier else None,
             'unit_price': self.unit_price
-        }
\ No newline at end of file
+        }
+
+@event.listens_for(Session, 'after_flush')
+def bump_purchases_version(session, flush_context):
+    """Invalidate cached purchase analytics when a flush changes purchases or supplier names."""
+    def is_purchase(obj):
+        return isinstance(obj, InventoryTransaction) and obj.transaction_type == 'purchase'
+
+    changed = any(is_purchase(obj) for obj in session.new) or any(is_purchase(obj) for obj in session.deleted)
+    if not changed:
+        for obj in session.dirty:
+            if is_purchase(obj) and session.is_modified(obj, include_collections=False):
+                changed = True
+            elif isinstance(obj, InventoryTransaction) and db.inspect(obj).attrs.transaction_type.history.has_changes():
+                # Retyped to or from 'purchase'
+                changed = True
+            elif isinstance(obj, InventorySupplier) and db.inspect(obj).attrs.supplier_name.history.has_changes():
+                changed = True
+            elif isinstance(obj, Supplier) and db.inspect(obj).attrs.name.history.has_changes():
+                changed = True
+            if changed:
+                break
+    if changed:
+        CacheVersion.bump(CacheVersion.PURCHASES, connection=session.connection())
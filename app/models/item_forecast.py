@@ -0,0 +1,89 @@
+from app import db
+from datetime import datetime, UTC
+from sqlalchemy.orm import joinedload
+
+
+class ItemForecast(db.Model):
+    """
+    Latest consumption forecast and reorder suggestion for an inventory item.
+
+    One row per item, replaced as a whole by the nightly forecasting job
+    (see ``app.services.forecasting``). Usage figures are units issued per day.
+    """
+    __tablename__ = 'item_forecasts'
+
+    inventory_id = db.Column(db.Integer, db.ForeignKey('inventories.id', ondelete='CASCADE'), primary_key=True)
+    average_daily_usage = db.Column(db.Float, nullable=False, default=0)
+    smoothed_daily_usage = db.Column(db.Float, nullable=False, default=0)
+    available_quantity = db.Column(db.Integer, nullable=False, default=0)
+    # Empty when the item has no recent usage
+    days_of_cover = db.Column(db.Float, nullable=True)
+    reorder_point = db.Column(db.Integer, nullable=False, default=0)
+    suggested_quantity = db.Column(db.Integer, nullable=False, default=0, index=True)
+    computed_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+
+    # Relationships
+    inventory = db.relationship('Inventory')
+
+    @classmethod
+    def replace_all(cls, rows):
+        """
+        Replace every forecast with a freshly computed set, in one transaction.
+
+        Args:
+            rows (list): Dicts of column values, one per item
+        """
+        try:
+            cls.query.delete(synchronize_session=False)
+            if rows:
+                db.session.execute(db.insert(cls), rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    @classmethod
+    def get_forecasts(cls, reorder_only=False):
+        """Get forecasts with their items, lowest days of cover first."""
+        query = cls.query.options(joinedload(cls.inventory))
+        if reorder_only:
+            query = query.filter(cls.suggested_quantity > 0)
+        # Items without usage have no days of cover and sort last
+        return query.order_by(cls.days_of_cover.is_(None), cls.days_of_cover, cls.inventory_id).all()
+
+    @classmethod
+    def get_draft_purchase_rows(cls):
+        """
+        Get pre-filled purchase rows for every item with a reorder suggestion.
+
+        Returns:
+            list: Dicts with category_id, inventory_id, quantity, supplier and unit_price
+        """
+        return [
+            {
+                'category_id': forecast.inventory.category_id,
+                'inventory_id': forecast.inventory_id,
+                'quantity': forecast.suggested_quantity,
+                'supplier': forecast.inventory.supplier or '',
+                'unit_price': forecast.inventory.unit_price,
+            }
+            for forecast in cls.get_forecasts(reorder_only=True)
+        ]
+
+    def to_dict(self):
+        """Convert item forecast object to dictionary."""
+        return {
+            'inventory_id': self.inventory_id,
+            'item_name': self.inventory.item_name if self.inventory else None,
+            'average_daily_usage': self.average_daily_usage,
+            'smoothed_daily_usage': self.smoothed_daily_usage,
+            'available_quantity': self.available_quantity,
+            'days_of_cover': self.days_of_cover,
+            'reorder_point': self.reorder_point,
+            'suggested_quantity': self.suggested_quantity,
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None
+        }
+
+    def __repr__(self):
+        """String representation of ItemForecast object."""
+        return f'<ItemForecast {self.inventory_id} suggest {self.suggested_quantity}>'
@@ -5,9 +5,11 @@ from app.models.user import User
 from app.models.inventory import Inventory
 import enum
 import uuid
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy import Enum as SQLAEnum
 from app.models.inventory_transaction import InventoryTransaction
+from app.pagination import encode_cursor, decode_cursor, keyset_condition
+from app import serialization
 import sqlalchemy as sa
 
 class DirectorateEnum(enum.Enum):
@@ -39,6 +41,14 @@ class ItemRequestStatus(enum.Enum):
 class Request(db.Model):
     """Model for item requests."""
     __tablename__ = 'requests'
+    __table_args__ = (
+        # Keyset pagination of the request list, overall and per requester
+        db.Index('ix_requests_created_at_id', 'created_at', 'id'),
+        db.Index('ix_requests_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+    )
+
+    # Columns the paginated request list can be sorted by
+    SORT_COLUMNS = ['created_at', 'updated_at']
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     reference_number = db.Column(db.String(50), unique=True, nullable=False)
@@ -106,6 +116,76 @@ class Request(db.Model):
             .all()
         )
 
+    @classmethod
+    def get_requests_page(cls, user_id=None, statuses=None, directorates=None, location=None,
+                          start=None, end=None, requester=None, sort='created_at',
+                          descending=True, limit=50, cursor=None):
+        """
+        Get one page of non-deleted requests, keyed on (sort column, id).
+
+        Items are loaded with their inventory in one extra query and the
+        referenced users are primed in the serialization context, so
+        serializing a page with to_dict costs a fixed number of queries
+        whatever its size.
+
+        Args:
+            user_id (int, optional): Only include this user's requests
+            statuses (list, optional): RequestStatus members to include
+            directorates (list, optional): DirectorateEnum members to include
+            location (str, optional): Exact location to match
+            start (datetime, optional): Only include requests created at or after this time
+            end (datetime, optional): Only include requests created at or before this time
+            requester (str, optional): Case-insensitive match on requester name or email
+            sort (str): One of SORT_COLUMNS
+            descending (bool): Newest first when True
+            limit (int): Maximum number of requests to return
+            cursor (str, optional): Cursor from the previous page
+
+        Returns:
+            tuple: (list of Request objects, next cursor or None)
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        sort_column = getattr(cls, sort if sort in cls.SORT_COLUMNS else 'created_at')
+        key_columns = [sort_column, cls.id]
+        query = (
+            cls.query.options(selectinload(cls.items).joinedload(RequestItem.inventory))
+            .filter(cls.deleted_at.is_(None))
+        )
+        if user_id is not None:
+            query = query.filter(cls.user_id == user_id)
+        if statuses:
+            query = query.filter(cls.status.in_(statuses))
+        if directorates:
+            query = query.filter(cls.directorate.in_(directorates))
+        if location:
+            query = query.filter(cls.location == location)
+        if start:
+            query = query.filter(cls.created_at >= start)
+        if end:
+            query = query.filter(cls.created_at <= end)
+        if requester:
+            pattern = f"%{requester}%"
+            requester_ids = db.select(User.id).where(
+                db.or_(User.name.ilike(pattern), User.email.ilike(pattern))
+            )
+            query = query.filter(cls.user_id.in_(requester_ids))
+        if cursor:
+            values = decode_cursor(cursor, size=2)
+            query = query.filter(keyset_condition(key_columns, values, descending=descending))
+
+        order = [column.desc() if descending else column.asc() for column in key_columns]
+        rows = query.order_by(*order).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        serialization.prime_users(rows)
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = encode_cursor(getattr(last, sort_column.key), last.id)
+        return rows, next_cursor
+
     @classmethod
     def get_request_by_id(cls, request_id):
         """Get request by ID, eager load items and inventory."""
@@ -161,9 +241,14 @@ class Request(db.Model):
     def soft_delete(self, deleted_by_user_id, reason=None):
         """Soft delete the request."""
         try:
+            released = {}
+            for item in self.items:
+                if item.reserved_amount():
+                    released[item.inventory_id] = released.get(item.inventory_id, 0) - item.reserved_amount()
             self.deleted_at = datetime.now(UTC)
             self.deleted_by = deleted_by_user_id
             self.deletion_reason = reason
+            Inventory.adjust_reserved(released)
             db.session.commit()
             return True, None
         except Exception as e:
@@ -201,6 +286,11 @@ class Request(db.Model):
             self.deleted_at = None
             self.deleted_by = None
             self.deletion_reason = None
+            reserved = {}
+            for item in self.items:
+                if item.reserved_amount():
+                    reserved[item.inventory_id] = reserved.get(item.inventory_id, 0) + item.reserved_amount()
+            Inventory.adjust_reserved(reserved)
             db.session.commit()
             return True, None
         except Exception as e:
@@ -235,10 +325,12 @@ class Request(db.Model):
         try:
             if self.status not in [RequestStatus.APPROVED, RequestStatus.PARTIALLY_APPROVED]:
                 raise Exception("Only approved or partially approved requests can be marked as collected")
+            released = {}
             for item in self.items:
                 if item.status == ItemRequestStatus.APPROVED:
                     if not item.process_collection():
                         raise Exception(f"Failed to process collection for item {item.inventory.item_name}")
+                    released[item.inventory_id] = released.get(item.inventory_id, 0) - item.reserved_amount()
                     item.status = ItemRequestStatus.COLLECTED
                     item.updated_at = datetime.now(UTC)
                     transaction = InventoryTransaction(
@@ -251,7 +343,8 @@ class Request(db.Model):
                         note=f"Collected by {current_user.name}"
                     )
                     db.session.add(transaction)
-                    
+
+            Inventory.adjust_reserved(released)
             self.status = RequestStatus.COLLECTED
             
             if admin_note:
@@ -267,15 +360,23 @@ class Request(db.Model):
         
     
     def to_dict(self):
-        """Convert request object to dictionary."""
+        """
+        Convert request object to dictionary.
+
+        User fields come from the serialization context; call
+        serialization.prime_users on a list of requests first to resolve
+        them in one query.
+        """
+        requester = serialization.user_summary(self.user_id)
+        approver = serialization.user_summary(self.approved_by)
         return {
             'id': self.id,
             'reference_number': self.reference_number,
             'user_id': self.user_id,
-            'user_name': self.user.name,
-            'user_email': self.user.email,
-            'user_department': self.user.department,
-            'user_job_title': self.user.job_title,
+            'user_name': requester.name if requester else None,
+            'user_email': requester.email if requester else None,
+            'user_department': requester.department if requester else None,
+            'user_job_title': requester.job_title if requester else None,
             'status': self.status.value,
             'location': self.location,
             'admin_message': self.admin_message,
@@ -286,10 +387,10 @@ class Request(db.Model):
             "deleted_by": self.deleted_by,
             "deletion_reason": self.deletion_reason,
             "approved_by": self.approved_by,
-            "approved_by_name": User.query.get(self.approved_by).name if self.approved_by else None,
-            "approved_by_email": User.query.get(self.approved_by).email if self.approved_by else None,
-            "approved_by_department": User.query.get(self.approved_by).department if self.approved_by else None,
-            "approved_by_job_title": User.query.get(self.approved_by).job_title if self.approved_by else None,
+            "approved_by_name": approver.name if approver else None,
+            "approved_by_email": approver.email if approver else None,
+            "approved_by_department": approver.department if approver else None,
+            "approved_by_job_title": approver.job_title if approver else None,
             'directorate': self.directorate.value if self.directorate else None,
             'department': self.department,
             'unit': self.unit
@@ -337,25 +438,33 @@ class RequestItem(db.Model):
         """Approve the request item using Enum and set approved quantity."""
         # Allow quantity_approved > quantity for future flexibility, but comment for restriction
         # To restrict: if approved_quantity > self.quantity: raise Exception("Cannot approve more than requested")
+        before = self.reserved_amount()
         self.status = ItemRequestStatus.APPROVED
         self.quantity_approved = approved_quantity
         self.updated_at = datetime.now(UTC)
+        Inventory.adjust_reserved({self.inventory_id: self.reserved_amount() - before})
 
     def reject(self):
         """Reject the request item using Enum and set approved quantity to 0."""
+        before = self.reserved_amount()
         self.status = ItemRequestStatus.REJECTED
         self.quantity_approved = 0
         self.updated_at = datetime.now(UTC)
-        
+        Inventory.adjust_reserved({self.inventory_id: -before})
+
+    def reserved_amount(self):
+        """Quantity this item holds in its inventory's reservation."""
+        if self.status == ItemRequestStatus.APPROVED and self.request.deleted_at is None:
+            return self.quantity_approved or 0
+        return 0
+
     def validate_inventory_quantity(self, approved_quantity):
-        """Check if approved quantity is available in inventory."""
-        return self.inventory.quantity >= int(approved_quantity)
+        """Check if approved quantity is available, counting this item's own reservation."""
+        return self.inventory.available_quantity + self.reserved_amount() >= int(approved_quantity)
 
     def process_collection(self):
         """Process item collection and adjust inventory."""
         try:
-            if not self.validate_inventory_quantity(self.quantity_approved):
-                return False
             if self.inventory.quantity - self.quantity_approved < 0:
                 return False
             self.inventory.quantity -= self.quantity_approved
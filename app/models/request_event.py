@@ -0,0 +1,196 @@
+from app import db
+from flask import current_app, has_app_context
+from datetime import datetime, timedelta, UTC
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.models.cache_version import CacheVersion
+
+
+class RequestEvent(db.Model):
+    """
+    Append-only log of request lifecycle events for the live request stream.
+
+    The auto-increment ID is the stream cursor (the SSE event ID), so any
+    worker can serve any client from the database without a message broker.
+    Rows are written in the same transaction as the change they describe:
+    ORM flushes are captured by the session listener below, and bulk
+    statements call ``record`` themselves.
+
+    IDs are assigned on insert but become visible on commit, so concurrent
+    transactions can commit out of ID order. Like the inventory change feed,
+    the stream only serves events logged at least
+    REQUEST_EVENT_VISIBILITY_DELAY seconds ago and stops before the first
+    newer one, so a cursor never moves past an event that may still be
+    committing.
+    """
+    __tablename__ = 'request_events'
+    __table_args__ = (
+        db.Index('ix_request_events_user_id_id', 'user_id', 'id'),
+    )
+
+    CREATED = 'created'
+    DELETED = 'deleted'
+    RESTORED = 'restored'
+
+    # CacheVersion counter holding the highest event ID removed by pruning
+    PRUNED_THROUGH = 'request_events_pruned'
+
+    # Comfortably longer than a bulk request action or one import batch takes to commit
+    DEFAULT_VISIBILITY_DELAY = 120
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    request_id = db.Column(db.Integer, nullable=False)
+    # Owner of the request, so users can be sent only their own events
+    user_id = db.Column(db.Integer, nullable=False)
+    reference_number = db.Column(db.String(50), nullable=False)
+    event_type = db.Column(db.String(30), nullable=False)
+    status = db.Column(db.String(30), nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC), index=True)
+
+    @staticmethod
+    def status_event(status):
+        """Get the event type for a request moving into a status, e.g. 'partially_approved'."""
+        return status.name.lower()
+
+    @classmethod
+    def record(cls, request_ids, event_type=None, connection=None):
+        """
+        Log events for a set of requests as they are now, in the current transaction.
+
+        Args:
+            request_ids (iterable): IDs of the changed requests
+            event_type (str, optional): Event type; defaults to the event for each request's current status
+            connection: Connection to read and write with; defaults to the session
+        """
+        from app.models.request import Request
+
+        request_ids = sorted(set(request_ids))
+        if not request_ids:
+            return
+        executor = connection if connection is not None else db.session
+        now = datetime.now(UTC)
+        rows = [
+            {
+                'request_id': row.id,
+                'user_id': row.user_id,
+                'reference_number': row.reference_number,
+                'event_type': event_type or cls.status_event(row.status),
+                'status': row.status.value,
+                'created_at': now,
+            }
+            for row in executor.execute(
+                db.select(Request.id, Request.user_id, Request.reference_number, Request.status)
+                .where(Request.id.in_(request_ids))
+                .order_by(Request.id)
+            )
+        ]
+        if rows:
+            executor.execute(cls.__table__.insert(), rows)
+
+    @classmethod
+    def _unsettled_after(cls, cursor):
+        """Get the lowest ID after a cursor logged too recently to serve, or None."""
+        delay = cls.DEFAULT_VISIBILITY_DELAY
+        if has_app_context():
+            delay = current_app.config.get('REQUEST_EVENT_VISIBILITY_DELAY', delay)
+        settled_before = datetime.now(UTC) - timedelta(seconds=delay)
+        return (
+            db.session.query(db.func.min(cls.id))
+            .filter(cls.id > cursor, cls.created_at > settled_before)
+            .scalar()
+        )
+
+    @classmethod
+    def latest_cursor(cls):
+        """Get the ID of the most recent event that is safe to serve, or 0 if there are none."""
+        unsettled = cls._unsettled_after(0)
+        if unsettled is not None:
+            return unsettled - 1
+        return db.session.query(db.func.max(cls.id)).scalar() or 0
+
+    @classmethod
+    def get_events_since(cls, cursor, user_id=None, limit=100):
+        """
+        Get events after a cursor, oldest first.
+
+        Args:
+            cursor (int): ID of the last event the client has seen
+            user_id (int, optional): Only include events for this user's requests
+            limit (int): Maximum number of events to return
+        """
+        query = cls.query.filter(cls.id > cursor)
+        # Events of other users count too: the cursor must not pass any event still committing
+        unsettled = cls._unsettled_after(cursor)
+        if unsettled is not None:
+            query = query.filter(cls.id < unsettled)
+        if user_id is not None:
+            query = query.filter(cls.user_id == user_id)
+        return query.order_by(cls.id).limit(limit).all()
+
+    @classmethod
+    def is_expired(cls, cursor):
+        """Check whether events after a cursor may already have been pruned."""
+        return cursor < CacheVersion.get_version(cls.PRUNED_THROUGH)
+
+    @classmethod
+    def prune(cls, retention_days):
+        """
+        Delete events older than the retention period.
+
+        Clients resuming from before the pruned range are told to reload.
+        """
+        try:
+            cutoff = datetime.now(UTC) - timedelta(days=retention_days)
+            pruned_through = db.session.query(db.func.max(cls.id)).filter(cls.created_at < cutoff).scalar()
+            if not pruned_through:
+                return 0
+            count = cls.query.filter(cls.id <= pruned_through).delete(synchronize_session=False)
+            CacheVersion.set_version(cls.PRUNED_THROUGH, pruned_through)
+            db.session.commit()
+            return count
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def to_dict(self):
+        """Convert request event object to dictionary."""
+        return {
+            'id': self.id,
+            'request_id': self.request_id,
+            'user_id': self.user_id,
+            'reference_number': self.reference_number,
+            'event_type': self.event_type,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        """String representation of RequestEvent object."""
+        return f'<RequestEvent {self.id} {self.event_type} {self.request_id}>'
+
+
+@event.listens_for(Session, 'after_flush')
+def record_request_events(session, flush_context):
+    """Log request creations, status changes and (soft) deletions written by an ORM flush."""
+    from app.models.request import Request
+
+    events = {}
+    for obj in session.new:
+        if isinstance(obj, Request):
+            events.setdefault(RequestEvent.CREATED, set()).add(obj.id)
+    for obj in session.dirty:
+        if not isinstance(obj, Request):
+            continue
+        state = inspect(obj)
+        if state.attrs.status.history.has_changes():
+            events.setdefault(None, set()).add(obj.id)
+        deleted_at = state.attrs.deleted_at.history
+        if deleted_at.has_changes():
+            event_type = RequestEvent.DELETED if obj.deleted_at is not None else RequestEvent.RESTORED
+            events.setdefault(event_type, set()).add(obj.id)
+
+    if not events:
+        return
+    connection = session.connection()
+    for event_type, request_ids in events.items():
+        RequestEvent.record(request_ids, event_type, connection=connection)
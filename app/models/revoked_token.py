@@ -0,0 +1,72 @@
+from app import db
+from datetime import datetime, UTC
+from sqlalchemy.exc import IntegrityError
+
+
+class RevokedToken(db.Model):
+    """
+    Denylist of JSON Web Tokens revoked before they expire.
+
+    Rows are only needed until the token's own expiry; after that the token
+    is rejected anyway, so expired rows are pruned.
+    """
+    __tablename__ = 'revoked_tokens'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    jti = db.Column(db.String(36), nullable=False, unique=True, index=True)
+    token_type = db.Column(db.String(10), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+
+    @classmethod
+    def revoke(cls, tokens):
+        """
+        Add decoded tokens to the denylist.
+
+        Args:
+            tokens (iterable): Decoded token payloads ('jti', 'type', 'sub', 'exp')
+
+        Returns:
+            tuple: (number of tokens revoked, error message or None)
+        """
+        count = 0
+        try:
+            for token in tokens:
+                try:
+                    with db.session.begin_nested():
+                        db.session.add(cls(
+                            jti=token['jti'], token_type=token['type'], user_id=int(token['sub']),
+                            expires_at=datetime.fromtimestamp(token['exp'], UTC)
+                        ))
+                    count += 1
+                except IntegrityError:
+                    # Already revoked
+                    pass
+            db.session.commit()
+            return count, None
+        except Exception as e:
+            db.session.rollback()
+            return 0, f"Error revoking tokens: {str(e)}"
+
+    @classmethod
+    def active_jtis(cls):
+        """Get the IDs of revoked tokens that have not expired yet."""
+        now = datetime.now(UTC)
+        return set(db.session.scalars(db.select(cls.jti).where(cls.expires_at > now)))
+
+    @classmethod
+    def prune(cls):
+        """
+        Delete entries for tokens that have expired.
+
+        Returns:
+            int: Number of entries deleted
+        """
+        now = datetime.now(UTC)
+        count = cls.query.filter(cls.expires_at <= now).delete(synchronize_session=False)
+        db.session.commit()
+        return count
+
+    def __repr__(self):
+        return f'<RevokedToken {self.jti} {self.token_type}>'
@@ -0,0 +1,76 @@
+from app import db
+from datetime import datetime, UTC
+
+
+class StockImportFile(db.Model):
+    """
+    Progress of a stock report file imported into a category.
+
+    Files are identified by a hash of their content, so a renamed copy of a
+    file that was already imported is recognised and skipped. ``last_row`` is
+    the checkpoint: it is advanced in the same transaction as each batch of
+    rows, so an interrupted import resumes after the last committed batch.
+    """
+    __tablename__ = 'stock_import_files'
+    __table_args__ = (
+        db.UniqueConstraint('category_id', 'content_hash', name='uq_stock_import_files_category_hash'),
+    )
+
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id', ondelete='CASCADE'), nullable=False)
+    content_hash = db.Column(db.String(64), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    # First report date found in the file; files are loaded in this order
+    report_date = db.Column(db.DateTime, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default=RUNNING)
+    last_row = db.Column(db.Integer, nullable=False, default=0)
+    rows_imported = db.Column(db.Integer, nullable=False, default=0)
+    rows_rejected = db.Column(db.Integer, nullable=False, default=0)
+    imported_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    started_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    @classmethod
+    def for_hashes(cls, category_id, hashes):
+        """
+        Get the import records of a category for a set of content hashes.
+
+        Returns:
+            dict: content hash -> StockImportFile
+        """
+        if not hashes:
+            return {}
+        records = cls.query.filter(cls.category_id == category_id, cls.content_hash.in_(list(hashes))).all()
+        return {record.content_hash: record for record in records}
+
+    def checkpoint(self, row_number, imported, rejected):
+        """Advance the checkpoint; the caller commits it together with the batch."""
+        self.last_row = max(self.last_row or 0, row_number)
+        self.rows_imported = (self.rows_imported or 0) + imported
+        self.rows_rejected = (self.rows_rejected or 0) + rejected
+
+    def complete(self):
+        self.status = self.COMPLETED
+        self.completed_at = datetime.now(UTC)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'category_id': self.category_id,
+            'content_hash': self.content_hash,
+            'filename': self.filename,
+            'report_date': self.report_date.isoformat() if self.report_date else None,
+            'status': self.status,
+            'last_row': self.last_row,
+            'rows_imported': self.rows_imported,
+            'rows_rejected': self.rows_rejected,
+            'imported_by': self.imported_by,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+        }
+
+    def __repr__(self):
+        return f'<StockImportFile {self.filename} {self.status} row {self.last_row}>'
@@ -0,0 +1,33 @@
+from app import db
+from datetime import datetime, UTC
+
+
+class StockImportRow(db.Model):
+    """
+    The last imported stock report row for an item and report month.
+
+    ``row_hash`` fingerprints the row's values, so importing the same month
+    again only touches items whose row changed; the stored figures are the
+    baseline the differential transactions are computed from.
+    """
+    __tablename__ = 'stock_import_rows'
+    __table_args__ = (
+        db.UniqueConstraint('inventory_id', 'report_month', name='uq_stock_import_rows_inventory_month'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    inventory_id = db.Column(db.Integer, db.ForeignKey('inventories.id', ondelete='CASCADE'), nullable=False)
+    # First day of the report month
+    report_month = db.Column(db.Date, nullable=False)
+    row_hash = db.Column(db.String(64), nullable=False)
+    opening_stock = db.Column(db.Integer, nullable=False, default=0)
+    purchases = db.Column(db.Integer, nullable=False, default=0)
+    issued = db.Column(db.Integer, nullable=False, default=0)
+    closing_stock = db.Column(db.Integer, nullable=False, default=0)
+    unit_price = db.Column(db.Numeric(10, 2), nullable=True)
+    # Collected request holding the month's issues, if any
+    request_id = db.Column(db.Integer, db.ForeignKey('requests.id', ondelete='SET NULL'), nullable=True)
+    imported_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+
+    def __repr__(self):
+        return f'<StockImportRow {self.inventory_id} {self.report_month}>'
@@ -0,0 +1,127 @@
+from app import db
+from datetime import datetime, UTC
+from sqlalchemy.exc import IntegrityError
+import re
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class Supplier(db.Model):
+    """
+    Registry of suppliers, one row per normalized name.
+
+    Spelling variants that differ only in case, punctuation or spacing
+    ("Acme Ltd.", "ACME LTD") share a row. Items are linked to suppliers
+    through ``inventory_suppliers``, which holds the per-item price and last
+    purchase date. Every lookup goes through the unique index on
+    ``normalized_name``.
+    """
+    __tablename__ = 'suppliers'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    # Display name, as first recorded
+    name = db.Column(db.String(255), nullable=False)
+    normalized_name = db.Column(db.String(255), nullable=False, unique=True, index=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+
+    @staticmethod
+    def normalize_name(name):
+        """Case-fold a supplier name and reduce punctuation and runs of whitespace to single spaces."""
+        return ' '.join(re.sub(r'[^\w\s]', ' ', (name or '').casefold()).split())
+
+    @classmethod
+    def get_by_name(cls, name):
+        """Get the supplier matching a name or any of its spelling variants, or None."""
+        normalized = cls.normalize_name(name)
+        if not normalized:
+            return None
+        return cls.query.filter(cls.normalized_name == normalized).first()
+
+    @classmethod
+    def resolve(cls, names):
+        """
+        Get suppliers for a set of names, adding any that are missing.
+
+        Existing suppliers are read in one query. New rows are flushed, not
+        committed, so they become part of the caller's transaction; a row
+        added concurrently by another worker is picked up instead of
+        duplicated.
+
+        Args:
+            names (iterable): Supplier names as entered
+
+        Returns:
+            dict: Normalized name -> Supplier
+        """
+        wanted = {}
+        for name in names:
+            normalized = cls.normalize_name(name)
+            if normalized:
+                wanted.setdefault(normalized, name.strip())
+        if not wanted:
+            return {}
+
+        suppliers = {
+            supplier.normalized_name: supplier
+            for supplier in cls.query.filter(cls.normalized_name.in_(wanted)).all()
+        }
+        for normalized, name in wanted.items():
+            if normalized in suppliers:
+                continue
+            try:
+                with db.session.begin_nested():
+                    supplier = cls(name=name, normalized_name=normalized)
+                    db.session.add(supplier)
+            except IntegrityError:
+                # Added by a concurrent transaction. A plain read may still see this transaction's
+                # snapshot (MySQL REPEATABLE READ), so read the committed row with a locking read.
+                supplier = cls.query.filter(cls.normalized_name == normalized).with_for_update().one()
+            suppliers[normalized] = supplier
+        return suppliers
+
+    @classmethod
+    def get_or_create(cls, name):
+        """Get the supplier for a name, adding it (uncommitted) if missing; None for a blank name."""
+        return cls.resolve([name]).get(cls.normalize_name(name))
+
+    @classmethod
+    def autocomplete(cls, prefix, limit=10):
+        """
+        Get suppliers whose normalized name starts with a prefix.
+
+        The prefix match is a range scan on the normalized-name index.
+
+        Args:
+            prefix (str): Start of the supplier name, in any spelling
+            limit (int): Maximum number of suppliers to return
+
+        Returns:
+            list: Supplier objects ordered by normalized name
+        """
+        normalized = cls.normalize_name(prefix)
+        query = cls.query
+        if normalized:
+            query = query.filter(cls.normalized_name.like(f'{_escape_like(normalized)}%', escape='\\'))
+        return query.order_by(cls.normalized_name).limit(limit).all()
+
+    @classmethod
+    def matching_ids(cls, text):
+        """Select the IDs of suppliers whose normalized name contains ``text``, as a subquery."""
+        pattern = f'%{_escape_like(cls.normalize_name(text))}%'
+        return db.select(cls.id).where(cls.normalized_name.like(pattern, escape='\\'))
+
+    def to_dict(self):
+        """Convert supplier object to dictionary."""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'normalized_name': self.normalized_name,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        """String representation of Supplier object."""
+        return f'<Supplier {self.name}>'
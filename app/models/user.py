@@ -1,12 +1,11 @@
 from app import db, login_manager
 from flask_login import UserMixin
-from msal import ConfidentialClientApplication
-import requests
 from datetime import datetime, UTC
 from flask import current_app
 import logging
 import os
 from werkzeug.security import generate_password_hash, check_password_hash
+from app.exceptions import GraphUnavailableError
 
 # Configure logging
 # logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -39,12 +38,9 @@ class User(db.Model, UserMixin):
 
     @staticmethod
     def get_microsoft_client():
-        """Initialize and return Microsoft MSAL client instance."""
-        return ConfidentialClientApplication(
-            client_id=current_app.config['MICROSOFT_CLIENT_ID'],
-            client_credential=current_app.config['MICROSOFT_CLIENT_SECRET'],
-            authority=current_app.config['MICROSOFT_AUTHORITY']
-        )
+        """Return the worker's shared Microsoft MSAL client instance."""
+        from app.auth import graph
+        return graph.msal_client()
     
     @classmethod
     def authenticate_microsoft_user(cls, auth_code):
@@ -60,7 +56,12 @@ class User(db.Model, UserMixin):
             if 'error' in token_result or 'access_token' not in token_result:
                 return None
 
-            graph_data = cls.get_user_info(token_result['access_token'])
+            try:
+                graph_data = cls.get_user_info(token_result['access_token'])
+            except GraphUnavailableError as e:
+                # Sign in with the identity from the ID token and keep the stored profile
+                current_app.logger.warning(f"Microsoft Graph unavailable, using stored profile: {e}")
+                return cls.login_without_profile(token_result.get('id_token_claims') or {})
             if not graph_data:
                 return None
 
@@ -83,24 +84,29 @@ class User(db.Model, UserMixin):
 
     @staticmethod
     def get_user_info(access_token):
-        """Retrieve user information from Microsoft Graph API."""
-        headers = {'Authorization': f'Bearer {access_token}'}
+        """
+        Retrieve user information from Microsoft Graph API.
+
+        Raises:
+            GraphUnavailableError: Graph timed out, failed, or its circuit breaker is open
+        """
+        from app.auth import graph
         # Request user profile information including job title, department, etc.
-        response = requests.get(
-            'https://graph.microsoft.com/v1.0/me?$select=id,displayName,userPrincipalName,mail,jobTitle,department,companyName,officeLocation',
-            headers=headers
-        )
-        
-        if response.status_code != 200:
+        user_data = graph.get_profile(access_token)
+        if not user_data:
             return None
 
-        user_data = response.json()
         upn = user_data.get('userPrincipalName')
         
         if not upn:
             return None
 
-        # Handle external (guest) users
+        user_data['mail'] = User.email_from_upn(upn)
+        return user_data
+
+    @staticmethod
+    def email_from_upn(upn):
+        """Get the email address for a user principal name, unwrapping external (guest) users."""
         if '#EXT#' in upn:
             original_part = upn.split('#EXT#')[0]
             domain = original_part.split('_')[-1]
@@ -108,9 +114,37 @@ class User(db.Model, UserMixin):
             email = f"{username}@{domain}"
         else:
             email = upn
+        return email.lower()
 
-        user_data['mail'] = email.lower()
-        return user_data
+    @classmethod
+    def login_without_profile(cls, claims):
+        """
+        Sign in a Microsoft user from ID token claims alone, while Graph is unavailable.
+
+        Existing users keep their stored profile fields; new users are created
+        without them and get them on their next login.
+
+        Args:
+            claims (dict): ID token claims ('oid', 'preferred_username', 'name')
+
+        Returns:
+            User or None: The signed-in user, or None if the claims name no user
+        """
+        upn = claims.get('preferred_username') or claims.get('email')
+        if not upn:
+            return None
+        email = cls.email_from_upn(upn)
+
+        user = None
+        if claims.get('oid'):
+            user = cls.query.filter_by(azure_id=claims['oid']).first()
+        if user is None:
+            user = cls.query.filter_by(email=email).first()
+
+        if not user:
+            return cls.create_user({'mail': email, 'displayName': claims.get('name', ''), 'id': claims.get('oid')}, None)
+        user.update_login()
+        return user
 
     @classmethod
     def create_user(cls, graph_data, token_result):
@@ -150,6 +184,8 @@ class User(db.Model, UserMixin):
             self.department = graph_data.get('department', '')
             self.office_location = graph_data.get('officeLocation', '')
             db.session.commit()
+            from app.serialization import forget_user
+            forget_user(self.id)
             return True
         except Exception:
             db.session.rollback()
@@ -0,0 +1,73 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor carries the sort key of the last row on a page (for example its
+timestamp and id) so the next page can continue with an indexed range
+condition instead of an OFFSET.
+"""
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+from app.exceptions import InvalidCursorError
+
+_DATETIME_PREFIX = 'dt:'
+
+
+def encode_cursor(*values):
+    """Encode sort-key values (str, int, float, datetime or None) into an opaque cursor."""
+    payload = [
+        f"{_DATETIME_PREFIX}{value.isoformat()}" if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size=None):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor (str): The opaque cursor string
+        size (int, optional): Expected number of values
+
+    Returns:
+        list: The decoded sort-key values
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(payload, list):
+            raise ValueError("cursor payload is not a list")
+        values = [
+            datetime.fromisoformat(value[len(_DATETIME_PREFIX):])
+            if isinstance(value, str) and value.startswith(_DATETIME_PREFIX) else value
+            for value in payload
+        ]
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {e}")
+    if size is not None and len(values) != size:
+        raise InvalidCursorError("Invalid cursor: unexpected number of values")
+    return values
+
+
+def keyset_condition(columns, values, descending=True):
+    """
+    Build the "rows after this key" condition for keyset pagination.
+
+    Expands to ``c1 < v1 OR (c1 = v1 AND c2 < v2) ...`` (``>`` when ascending),
+    which every backend can answer with a range scan on an index over the
+    same columns.
+    """
+    clauses = []
+    for position, (column, value) in enumerate(zip(columns, values)):
+        equal_prefix = [columns[i] == values[i] for i in range(position)]
+        step = column < value if descending else column > value
+        clauses.append(and_(*equal_prefix, step))
+    return or_(*clauses)
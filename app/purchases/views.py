@@ -1,15 +1,23 @@
-from flask import render_template, request, redirect, url_for, flash
+from flask import render_template, request, redirect, url_for, flash, send_file
 from app.models.inventory import Inventory, Category
 from app.models.inventory_transaction import InventoryTransaction
 from app.models.inventory_supplier import InventorySupplier
+from app.models.supplier import Supplier
+from app.models.item_forecast import ItemForecast
 from app.models.user import User
 from app.models.request import Request
 from flask_login import login_required, current_user
 from . import purchases
-from app import db
+from app import db, catalog, serialization
+from app.exceptions import InvalidCursorError, ImportFormatError
+from app.services import purchase_recording, purchase_import, supplier_analytics
 from datetime import datetime, UTC, date, time, timedelta
 from sqlalchemy import and_, or_
 from flask import jsonify
+import io
+import pandas as pd
+from openpyxl.styles import Font, Alignment
+from openpyxl.utils import get_column_letter
 
 # Helper function to check admin access
 def admin_required(f):
@@ -23,6 +31,24 @@ def admin_required(f):
     decorated_function.__name__ = f.__name__
     return decorated_function
 
+def _purchase_date_range(start_date_str, end_date_str):
+    """
+    Parse the purchase list date filters.
+
+    Returns:
+        tuple: (start datetime or None, end-of-day datetime or None)
+
+    Raises:
+        ValueError: If a date is not YYYY-MM-DD
+    """
+    start = datetime.strptime(start_date_str, '%Y-%m-%d').replace(tzinfo=UTC) if start_date_str else None
+    end = None
+    if end_date_str:
+        # For end_date, filter up to the end of the day (23:59:59)
+        end_date_parsed = datetime.strptime(end_date_str, '%Y-%m-%d').replace(tzinfo=UTC)
+        end = end_date_parsed + timedelta(days=1) - timedelta(microseconds=1)
+    return start, end
+
 # Purchase Views
 @purchases.route('/')
 @admin_required
@@ -32,50 +58,39 @@ def list_purchases():
     item_name = request.args.get('item_name', '').strip()
     start_date_str = request.args.get('start_date', '').strip()
     end_date_str = request.args.get('end_date', '').strip()
+    cursor = request.args.get('cursor') or None
 
-    # Start with all purchase transactions
-    query = InventoryTransaction.query.filter_by(transaction_type='purchase')
-
-    # Apply filters based on provided parameters
-    if supplier_name:
-        # Filter by supplier name (case-insensitive search)
-        query = query.join(InventoryTransaction.supplier).filter(
-            InventorySupplier.supplier_name.ilike(f'%{supplier_name}%')
-        )
-
-    if item_name:
-        # Filter by inventory item name (case-insensitive search)
-        query = query.join(InventoryTransaction.inventory).filter(
-            Inventory.item_name.ilike(f'%{item_name}%')
-        )
-
-    # Date filtering
     try:
-        start_date = None
-        if start_date_str:
-            start_date = datetime.strptime(start_date_str, '%Y-%m-%d').replace(tzinfo=UTC)
-            query = query.filter(InventoryTransaction.timestamp >= start_date)
-
-        end_date = None
-        if end_date_str:
-            # For end_date, filter up to the end of the day (23:59:59)
-            end_date_parsed = datetime.strptime(end_date_str, '%Y-%m-%d').replace(tzinfo=UTC)
-            end_of_day = end_date_parsed + timedelta(days=1) - timedelta(microseconds=1)
-            query = query.filter(InventoryTransaction.timestamp <= end_of_day)
-
+        start_date, end_date = _purchase_date_range(start_date_str, end_date_str)
     except ValueError:
         flash("Invalid date format. Please use YYYY-MM-DD.", "danger")
         # Reset date filters if invalid to prevent breaking the page
-        start_date_str = ''
-        end_date_str = ''
+        start_date_str = end_date_str = ''
+        start_date = end_date = None
 
-    # Order the results
-    purchases = query.order_by(InventoryTransaction.timestamp.desc()).all()
+    try:
+        purchases, next_cursor, totals = InventoryTransaction.get_purchases_page(
+            supplier_name=supplier_name or None,
+            item_name=item_name or None,
+            start=start_date,
+            end=end_date,
+            limit=50,
+            cursor=cursor
+        )
+    except InvalidCursorError:
+        flash("That page link is no longer valid; showing the latest purchases.", "warning")
+        return redirect(url_for(
+            'purchases.list_purchases', supplier_name=supplier_name, item_name=item_name,
+            start_date=start_date_str, end_date=end_date_str
+        ))
 
     # Pass the current filter values back to the template to persist them in the form
     return render_template(
         'purchases/list.html',
         purchases=purchases,
+        next_cursor=next_cursor,
+        is_first_page=cursor is None,
+        page_totals=totals,
         current_supplier_name=supplier_name,
         current_item_name=item_name,
         current_start_date=start_date_str,
@@ -85,64 +100,34 @@ def list_purchases():
 @purchases.route('/new', methods=['GET', 'POST'])
 @admin_required
 def new_purchase():
-    items = Inventory.query.all()
-    categories = Category.query.all()
     if request.method == 'POST':
-        # Get the number of items in the purchase
-        num_items = len(request.form.getlist('inventory_id'))
-
-        try:
-            for i in range(num_items):
-                inventory_id = int(request.form.getlist('inventory_id')[i])
-                quantity = int(request.form.getlist('quantity')[i])
-                supplier_name = request.form.getlist('supplier')[i]
-                unit_price = float(request.form.getlist('unit_price')[i] or 0)
-
-                inventory = Inventory.query.get(inventory_id)
-                if not inventory or quantity <= 0:
-                    flash(f"Invalid item or quantity for item {i+1}.", "danger")
-                    return redirect(url_for('purchases.new_purchase'))
-
-                # Update inventory
-                inventory.quantity += quantity
-                if supplier_name:
-                    inventory.supplier = supplier_name  # Keep this for backward compatibility
-                if unit_price:
-                    inventory.unit_price = unit_price  # Keep this for backward compatibility
-                inventory.updated_by = current_user.id
-                inventory.updated_at = datetime.now(UTC)
-
-                # Create or update supplier record
-                supplier = None
-                if supplier_name:
-                    supplier, error = InventorySupplier.get_or_create_supplier(
-                        inventory_id=inventory.id,
-                        supplier_name=supplier_name,
-                        unit_price=unit_price
-                    )
-                    if error:
-                        flash(f"Error managing supplier: {error}", "warning")
-
-                # Log transaction
-                transaction = InventoryTransaction(
-                    inventory_id=inventory.id,
-                    transaction_type='purchase',
-                    quantity=quantity,
-                    performed_by=current_user.id,
-                    note=f"Purchased {quantity} of {inventory.item_name} from {supplier_name}",
-                    supplier_id=supplier.id if supplier else None,
-                    unit_price=unit_price
-                )
-                db.session.add(transaction)
-
-            db.session.commit()
-            flash("Purchase recorded!", "success")
-            return redirect(url_for('purchases.list_purchases'))
-        except Exception as e:
-            db.session.rollback()
-            flash(f"Failed to record purchase: {str(e)}", "danger")
+        # Read each column once and zip them into lines
+        columns = [request.form.getlist(field) for field in ('inventory_id', 'quantity', 'supplier', 'unit_price')]
+        if len({len(column) for column in columns}) > 1:
+            # zip would silently drop the lines missing from the shorter columns
+            flash("Failed to record purchase: every line needs an item, quantity, supplier and unit price field", "danger")
+            return redirect(url_for('purchases.new_purchase'))
+        lines = [
+            {'inventory_id': inventory_id, 'quantity': quantity, 'supplier': supplier, 'unit_price': unit_price}
+            for inventory_id, quantity, supplier, unit_price in zip(*columns)
+        ]
+        _, errors = purchase_recording.record_purchase(lines, performed_by=current_user.id)
+        if errors:
+            for error in errors:
+                flash(f"Failed to record purchase: {error}", "danger")
             return redirect(url_for('purchases.new_purchase'))
-    return render_template('purchases/new.html', items=items, categories=categories)
+        flash("Purchase recorded!", "success")
+        return redirect(url_for('purchases.list_purchases'))
+
+    items = catalog.get_catalog_items()
+    categories = catalog.get_categories()
+    # Stock levels change on every collection, so they are read fresh rather than cached
+    stock_levels = dict(db.session.query(Inventory.id, Inventory.quantity).all())
+    # ?draft=forecast pre-fills one row per item the nightly forecast suggests reordering
+    draft_rows = ItemForecast.get_draft_purchase_rows() if request.args.get('draft') == 'forecast' else []
+    return render_template(
+        'purchases/new.html', items=items, categories=categories, stock_levels=stock_levels, draft_rows=draft_rows
+    )
 
 @purchases.route('/<int:purchase_id>')
 @admin_required
@@ -163,38 +148,260 @@ def delete_purchase(purchase_id):
 @purchases.route('/api/purchases', methods=['GET'])
 @admin_required
 def api_get_purchases():
-    """API endpoint to get purchases with filters."""
+    """
+    API endpoint to page through purchases, newest first.
+
+    Query parameters: supplier_name, item_name, start_date and end_date
+    (YYYY-MM-DD, inclusive), cursor and limit (max 200). Totals cover the
+    returned page.
+    """
     try:
-        supplier_name = request.args.get('supplier_name', '').strip()
-        item_name = request.args.get('item_name', '').strip()
-        start_date_str = request.args.get('start_date', '').strip()
-        end_date_str = request.args.get('end_date', '').strip()
+        try:
+            start_date, end_date = _purchase_date_range(
+                request.args.get('start_date', '').strip(), request.args.get('end_date', '').strip()
+            )
+        except ValueError:
+            return jsonify({'error': 'Invalid date format'}), 400
 
-        query = InventoryTransaction.query.filter_by(transaction_type='purchase')
+        limit = max(1, min(request.args.get('limit', 50, type=int), 200))
+        purchases, next_cursor, totals = InventoryTransaction.get_purchases_page(
+            supplier_name=request.args.get('supplier_name', '').strip() or None,
+            item_name=request.args.get('item_name', '').strip() or None,
+            start=start_date,
+            end=end_date,
+            limit=limit,
+            cursor=request.args.get('cursor') or None
+        )
+        return jsonify({
+            'purchases': [purchase.to_dict() for purchase in purchases],
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None,
+            'totals': totals
+        })
+    except InvalidCursorError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch purchases'}), 500
 
-        if supplier_name:
-            query = query.join(InventoryTransaction.supplier).filter(
-                InventorySupplier.supplier_name.ilike(f'%{supplier_name}%')
-            )
+@purchases.route('/api/purchases', methods=['POST'])
+@admin_required
+def api_record_purchase():
+    """
+    API endpoint to record a multi-line purchase in one transaction.
 
-        if item_name:
-            query = query.join(InventoryTransaction.inventory).filter(
-                Inventory.item_name.ilike(f'%{item_name}%')
-            )
+    Expects JSON: {"lines": [{"inventory_id", "quantity", "supplier", "unit_price"}]}.
+    """
+    data = request.get_json(silent=True) or {}
+    lines = data.get('lines')
+    if not isinstance(lines, list) or not all(isinstance(line, dict) for line in lines):
+        return jsonify({'error': 'lines must be a list of objects'}), 400
 
+    transactions, errors = purchase_recording.record_purchase(lines, performed_by=current_user.id)
+    if errors:
+        return jsonify({'error': 'Purchase could not be recorded', 'errors': errors}), 400
+    return jsonify({'purchases': serialization.to_dicts(transactions)}), 201
+
+def _run_purchase_import():
+    """
+    Import the uploaded file in ``request.files['file']``.
+
+    Returns:
+        tuple: (summary dict, list of row errors)
+
+    Raises:
+        ImportFormatError: If no file was sent or it cannot be read
+    """
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        raise ImportFormatError("Choose a CSV or XLSX file to import")
+    dry_run = request.values.get('dry_run', 'false').lower() in ('true', '1', 'on')
+    rows = purchase_import.read_rows(upload.stream, upload.filename)
+    return purchase_import.import_purchases(rows, performed_by=current_user.id, dry_run=dry_run)
+
+@purchases.route('/import', methods=['POST'])
+@admin_required
+def import_purchases():
+    try:
+        summary, errors = _run_purchase_import()
+    except ImportFormatError as e:
+        flash(f"Failed to import purchases: {e}", "danger")
+        return redirect(url_for('purchases.new_purchase'))
+
+    action = "Would import" if summary['dry_run'] else "Imported"
+    flash(f"{action} {summary['imported']} of {summary['rows']} row(s), {summary['rejected']} rejected.",
+          "warning" if errors else "success")
+    # Flashing every error of a large file would swamp the page
+    for row_error in errors[:20]:
+        flash(f"Row {row_error['row']}: {row_error['error']}", "danger")
+    if len(errors) > 20:
+        flash(f"... and {len(errors) - 20} more row error(s); use the API or the import-purchases command "
+              f"for the full report.", "danger")
+    if summary['dry_run'] or not summary['imported']:
+        return redirect(url_for('purchases.new_purchase'))
+    return redirect(url_for('purchases.list_purchases'))
+
+@purchases.route('/api/purchases/import', methods=['POST'])
+@admin_required
+def api_import_purchases():
+    """
+    API endpoint to import purchases from an uploaded CSV or XLSX file.
+
+    Multipart form fields: file, and dry_run (true to validate only).
+    Returns the import summary and an error for every rejected row.
+    """
+    try:
+        summary, errors = _run_purchase_import()
+    except ImportFormatError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Failed to import purchases'}), 500
+    return jsonify({'summary': summary, 'errors': errors}), 200 if summary['dry_run'] else 201
+
+@purchases.route('/api/suppliers', methods=['GET'])
+@admin_required
+def api_supplier_autocomplete():
+    """
+    API endpoint for supplier name autocomplete from the supplier registry.
+
+    Query parameters: q (start of the name, in any spelling) and limit (max 50).
+    """
+    try:
+        limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+        suppliers = Supplier.autocomplete(request.args.get('q', ''), limit=limit)
+        return jsonify({'suppliers': [{'id': supplier.id, 'name': supplier.name} for supplier in suppliers]})
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch suppliers'}), 500
+
+@purchases.route('/api/forecasts', methods=['GET'])
+@admin_required
+def api_get_forecasts():
+    """
+    API endpoint to get consumption forecasts and reorder suggestions, lowest days of cover first.
+
+    Query parameters: reorder_only (true to only include items with a suggested quantity).
+    """
+    try:
+        reorder_only = request.args.get('reorder_only', 'false').lower() == 'true'
+        forecasts = ItemForecast.get_forecasts(reorder_only=reorder_only)
+        computed_at = max((forecast.computed_at for forecast in forecasts if forecast.computed_at), default=None)
+        return jsonify({
+            'forecasts': [forecast.to_dict() for forecast in forecasts],
+            'computed_at': computed_at.isoformat() if computed_at else None
+        })
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch forecasts'}), 500
+
+def _analytics_args():
+    """
+    Read supplier analytics filters from the query string.
+
+    Returns:
+        dict: Keyword arguments for supplier_analytics.get_supplier_analytics
+
+    Raises:
+        ValueError: If a date or ID is malformed
+    """
+    try:
+        start, end = _purchase_date_range(
+            request.args.get('start_date', '').strip(), request.args.get('end_date', '').strip()
+        )
+    except ValueError:
+        raise ValueError("Invalid date format. Please use YYYY-MM-DD.")
+
+    def int_arg(name):
+        value = request.args.get(name, '').strip()
+        if not value:
+            return None
         try:
-            if start_date_str:
-                start_date = datetime.strptime(start_date_str, '%Y-%m-%d').replace(tzinfo=UTC)
-                query = query.filter(InventoryTransaction.timestamp >= start_date)
-
-            if end_date_str:
-                end_date_parsed = datetime.strptime(end_date_str, '%Y-%m-%d').replace(tzinfo=UTC)
-                end_of_day = end_date_parsed + timedelta(days=1) - timedelta(microseconds=1)
-                query = query.filter(InventoryTransaction.timestamp <= end_of_day)
+            return int(value)
         except ValueError:
-            return jsonify({'error': 'Invalid date format'}), 400
+            raise ValueError(f"Invalid {name}: {value}")
+
+    return {
+        'start': start,
+        'end': end,
+        'supplier_name': request.args.get('supplier_name', '').strip() or None,
+        'inventory_id': int_arg('inventory_id'),
+        'category_id': int_arg('category_id'),
+    }
+
+@purchases.route('/api/supplier-analytics', methods=['GET'])
+@admin_required
+def api_supplier_analytics():
+    """
+    API endpoint for supplier spend, per-item spend and price history.
 
-        purchases = query.order_by(InventoryTransaction.timestamp.desc()).all()
-        return jsonify([purchase.to_dict() for purchase in purchases])
+    Query parameters: start_date and end_date (YYYY-MM-DD, inclusive),
+    supplier_name, inventory_id and category_id.
+    """
+    try:
+        return jsonify(supplier_analytics.get_supplier_analytics(**_analytics_args()))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        return jsonify({'error': 'Failed to fetch purchases'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to fetch supplier analytics'}), 500
+
+@purchases.route('/analytics/download/excel')
+@admin_required
+def download_supplier_analytics_excel():
+    """Download supplier analytics as an Excel file, one sheet per view; accepts the API filters."""
+    try:
+        analytics = supplier_analytics.get_supplier_analytics(**_analytics_args())
+    except ValueError as e:
+        flash(str(e), "danger")
+        return redirect(url_for('purchases.list_purchases'))
+
+    price_columns = {
+        'min_price': 'Min Price (₦)', 'max_price': 'Max Price (₦)', 'avg_price': 'Avg Price (₦)',
+        'last_price': 'Last Price (₦)', 'trend_pct': 'Price Trend (%)',
+    }
+    sheets = {
+        'Suppliers': pd.DataFrame(analytics['suppliers'], columns=[
+            'supplier_name', 'purchases', 'items', 'quantity', 'spend', 'first_purchase', 'last_purchase'
+        ]).rename(columns={
+            'supplier_name': 'Supplier', 'purchases': 'Purchases', 'items': 'Items', 'quantity': 'Quantity',
+            'spend': 'Spend (₦)', 'first_purchase': 'First Purchase', 'last_purchase': 'Last Purchase',
+        }),
+        'Items': pd.DataFrame(analytics['items'], columns=[
+            'inventory_id', 'item_name', 'suppliers', 'quantity', 'spend', 'min_price', 'max_price', 'avg_price',
+            'last_price', 'last_supplier', 'last_purchase', 'trend_pct'
+        ]).rename(columns={
+            'inventory_id': 'Item ID', 'item_name': 'Item', 'suppliers': 'Suppliers', 'quantity': 'Quantity',
+            'spend': 'Spend (₦)', 'last_supplier': 'Last Supplier', 'last_purchase': 'Last Purchase', **price_columns
+        }),
+        'Price History': pd.DataFrame([
+            {'inventory_id': price['inventory_id'], 'item_name': price['item_name'],
+             'supplier_name': price['supplier_name'], **month}
+            for price in analytics['prices'] for month in price['history']
+        ], columns=[
+            'inventory_id', 'item_name', 'supplier_name', 'month', 'quantity', 'spend', 'min_price', 'max_price',
+            'avg_price'
+        ]).rename(columns={
+            'inventory_id': 'Item ID', 'item_name': 'Item', 'supplier_name': 'Supplier', 'month': 'Month',
+            'quantity': 'Quantity', 'spend': 'Spend (₦)', **price_columns
+        }),
+    }
+
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        for sheet_name, frame in sheets.items():
+            frame.to_excel(writer, sheet_name=sheet_name, index=False)
+            ws = writer.sheets[sheet_name]
+            for cell in ws[1]:
+                cell.font = Font(bold=True)
+                cell.alignment = Alignment(horizontal='center')
+            for col in ws.columns:
+                if '(₦)' in str(col[0].value):
+                    for cell in col[1:]:
+                        cell.number_format = '#,##0.00'
+                width = max(len(str(cell.value)) if cell.value is not None else 0 for cell in col)
+                ws.column_dimensions[get_column_letter(col[0].column)].width = width + 2
+            ws.freeze_panes = 'A2'
+    output.seek(0)
+
+    return send_file(
+        output,
+        download_name=f"supplier_analytics_{datetime.now():%Y-%m-%d}.xlsx",
+        as_attachment=True,
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
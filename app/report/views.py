@@ -3,8 +3,11 @@ from flask_login import login_required, current_user
 from app.models.inventory import Inventory, Category
 from app.models.inventory_transaction import InventoryTransaction
 from app.models.request import Request
+from app.models.archived_request import ArchivedRequest
 from app.models.report_cache import ReportCache
-from app import db
+from app.models.consumption_cube import ConsumptionCube
+from app import db, catalog, search
+from sqlalchemy.orm import joinedload
 from datetime import datetime, timedelta, time
 import json
 from collections import OrderedDict
@@ -116,8 +119,11 @@ def search_inventory():
     if not search_term:
         return jsonify([])
 
-    items = Inventory.query.filter(Inventory.item_name.ilike(f'%{search_term}%')).limit(20).all()
-    return jsonify([{'id': item.id, 'text': item.item_name} for item in items])
+    category_id = request.args.get('category_id', type=int)
+    item_ids = search.search_inventory_ids(search_term, limit=20, category_id=category_id)
+    # Names come from the cached catalog, so the picker costs a single index query
+    items = [catalog.get_catalog_item(item_id) for item_id in item_ids]
+    return jsonify([{'id': item.id, 'text': item.item_name} for item in items if item])
 
 @reports.route('/inventory', methods=['GET', 'POST'])
 @login_required
@@ -145,9 +151,9 @@ def inventory_report():
     if request.method == 'GET':
         return render_template(
             'reports/inventory_report.html',
-            categories=Category.query.all(),
-            items=Inventory.query.all(),
-            locations=[loc[0] for loc in db.session.query(Inventory.location).distinct().all()],
+            categories=catalog.get_categories(),
+            items=catalog.get_catalog_items(),
+            locations=catalog.get_locations(),
             filters={},
             report_data=None,
             category_totals=None,
@@ -156,9 +162,9 @@ def inventory_report():
         )
  
     # POST request logic starts here
-    categories = Category.query.all()
-    items = Inventory.query.all()
-    locations = [loc[0] for loc in db.session.query(Inventory.location).distinct().all()]
+    categories = catalog.get_categories()
+    items = catalog.get_catalog_items()
+    locations = catalog.get_locations()
     filters = {}
     report_data = None
     meta = {}
@@ -291,9 +297,9 @@ def view_report(report_id):
 
     return render_template(
         'reports/inventory_report.html',
-        categories=Category.query.all(),
+        categories=catalog.get_categories(),
         items=[], # Pass empty list to avoid querying all items
-        locations=[loc[0] for loc in db.session.query(Inventory.location).distinct().all()],
+        locations=catalog.get_locations(),
         report_data=report_data,
         category_totals=cache.category_totals,
         grand_totals=cache.grand_totals,
@@ -453,6 +459,137 @@ def download_excel_report(report_id):
         mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
     )
 
+def _consumption_args():
+    """
+    Read rollup options from the query string.
+
+    Returns:
+        tuple: (group_by list, filter keyword arguments for ConsumptionCube.rollup)
+
+    Raises:
+        ValueError: If a month or ID is malformed
+    """
+    def list_arg(name):
+        return [value.strip() for param in request.args.getlist(name)
+                for value in param.split(',') if value.strip()]
+
+    def month_arg(name):
+        value = request.args.get(name, '').strip()
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m').date()
+        except ValueError:
+            raise ValueError(f"Invalid {name}. Please use YYYY-MM.")
+
+    def int_arg(name):
+        value = request.args.get(name, '').strip()
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"Invalid {name}: {value}")
+
+    group_by = list_arg('group_by') or ['directorate']
+    filters = {
+        'start_month': month_arg('start_month'),
+        'end_month': month_arg('end_month'),
+        'directorates': list_arg('directorate'),
+        'department': request.args.get('department'),
+        'unit': request.args.get('unit'),
+        'category_id': int_arg('category_id'),
+        'inventory_id': int_arg('inventory_id'),
+    }
+    return group_by, filters
+
+@reports.route('/api/consumption')
+@login_required
+def api_consumption_rollup():
+    """
+    API endpoint for consumption rollups from the precomputed cube.
+
+    Query parameters: group_by (any of month, directorate, department, unit,
+    category, item; comma separated, default directorate), start_month and
+    end_month (YYYY-MM), directorate (repeatable or comma separated),
+    department, unit, category_id and inventory_id.
+    """
+    if not current_user.is_admin:
+        return jsonify({'error': 'Access denied'}), 403
+    try:
+        group_by, filters = _consumption_args()
+        rows = ConsumptionCube.rollup(group_by, **filters)
+        return jsonify({
+            'group_by': group_by,
+            'rows': rows,
+            'total_quantity': sum(row['quantity'] for row in rows),
+            'total_value': round(sum(row['value'] for row in rows), 2)
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error fetching consumption rollup: {e}")
+        return jsonify({'error': 'Failed to fetch consumption rollup'}), 500
+
+@reports.route('/consumption/download/excel')
+@login_required
+def download_consumption_excel():
+    """
+    Download the consumption cube as an Excel file.
+
+    Accepts the same filters as the rollup API; without ``group_by`` every
+    cube dimension is included.
+    """
+    if not current_user.is_admin:
+        flash("You do not have permission to perform this action.", "danger")
+        return redirect(url_for('home.user_dashboard'))
+    try:
+        group_by, filters = _consumption_args()
+        if not request.args.get('group_by'):
+            group_by = list(ConsumptionCube.DIMENSIONS)
+        rows = ConsumptionCube.rollup(group_by, **filters)
+    except ValueError as e:
+        flash(str(e), "danger")
+        return redirect(url_for('reports.inventory_report'))
+
+    headers = {
+        'month': 'Month', 'directorate': 'Directorate', 'department': 'Department', 'unit': 'Unit',
+        'category_id': 'Category ID', 'category_name': 'Category', 'inventory_id': 'Item ID',
+        'item_name': 'Item', 'quantity': 'Quantity Issued', 'value': 'Value (₦)',
+    }
+    dimension_keys = {'category': ['category_id', 'category_name'], 'item': ['inventory_id', 'item_name']}
+    columns = [key for dimension in group_by for key in dimension_keys.get(dimension, [dimension])]
+    columns += ['quantity', 'value']
+    frame = pd.DataFrame(rows, columns=columns).rename(columns=headers)
+
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        frame.to_excel(writer, sheet_name='Consumption', index=False)
+        ws = writer.sheets['Consumption']
+        for cell in ws[1]:
+            cell.font = Font(bold=True)
+            cell.alignment = Alignment(horizontal='center')
+        for col in ws.columns:
+            header = col[0].value
+            if header == 'Value (₦)':
+                for cell in col[1:]:
+                    cell.number_format = '#,##0.00'
+            elif header == 'Quantity Issued':
+                for cell in col[1:]:
+                    cell.number_format = '#,##0'
+            width = max(len(str(cell.value)) if cell.value is not None else 0 for cell in col)
+            ws.column_dimensions[get_column_letter(col[0].column)].width = width + 2
+        ws.freeze_panes = 'A2'
+    output.seek(0)
+
+    return send_file(
+        output,
+        download_name=f"consumption_{datetime.now():%Y-%m-%d}.xlsx",
+        as_attachment=True,
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+
+
 def get_opening_stock(item_id, start_datetime, end_datetime):
     
     """
@@ -541,8 +678,12 @@ def get_issues(item_id, start_datetime, end_datetime, location=None):
         InventoryTransaction.timestamp <= end_datetime
     )
     if location:
-        # Join to Request to filter by location
-        query = query.join(Request).filter(Request.location == location)
+        # Issues of archived requests point at archived_requests instead
+        query = (
+            query.outerjoin(Request, InventoryTransaction.related_request_id == Request.id)
+            .outerjoin(ArchivedRequest, InventoryTransaction.archived_request_id == ArchivedRequest.id)
+            .filter(db.func.coalesce(Request.location, ArchivedRequest.location) == location)
+        )
     return db.session.query(db.func.sum(InventoryTransaction.quantity)).select_from(query.subquery()).scalar() or 0
 
 def get_unit_price(item_id):
@@ -613,7 +754,10 @@ def generate_report(start_dt, end_dt, filters):
     # Pre-fetch all transactions for the relevant items in one go
     transactions = db.session.query(
         InventoryTransaction
-    ).join(Request, InventoryTransaction.request, isouter=True).filter(
+    ).options(
+        joinedload(InventoryTransaction.request),
+        joinedload(InventoryTransaction.archived_request)
+    ).filter(
         InventoryTransaction.inventory_id.in_(item_ids)
     ).all()
 
@@ -653,9 +797,9 @@ def generate_report(start_dt, end_dt, filters):
             elif txn.transaction_type == 'adjustment':
                 item_data[item_id]['adjustments'] += txn.quantity
             elif txn.transaction_type == 'issue':
-                if txn.request and txn.request.location == 'Headquarters':
+                if txn.request_location == 'Headquarters':
                     item_data[item_id]['hq_issues'] += txn.quantity
-                elif txn.request and txn.request.location == 'Jabi':
+                elif txn.request_location == 'Jabi':
                     item_data[item_id]['jabi_issues'] += txn.quantity
 
     # Final calculations and structuring the report
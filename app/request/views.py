@@ -1,9 +1,15 @@
-from flask import Blueprint, request, render_template, redirect, url_for, flash, current_app
+from flask import Blueprint, request, render_template, redirect, url_for, flash, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
 from app.models.request import Request, RequestItem, RequestStatus, ItemRequestStatus, DirectorateEnum
 from app.models.inventory import Inventory  
-from app import db
-from datetime import datetime, UTC
+from app.models.archived_request import ArchivedRequest
+from app.models.request_event import RequestEvent
+from app import db, catalog, serialization
+from app.services import request_creation, request_workflow
+from app.exceptions import InvalidCursorError
+from datetime import datetime, timedelta, UTC
+import json
+import time
 from app.request import request as request_bp
 from app.models.request import RequestStatus
 from flask import jsonify
@@ -27,188 +33,67 @@ def get_stock_status_text(quantity):
         return 'In Stock'
 
 
-@request_bp.route('/create', methods=['GET', 'POST'])
-@login_required
-def create_request():
-    """Create a new request."""
-    directorate_choices = [d.value for d in DirectorateEnum]
-    request_form = {}
-
-    if request.method == 'POST':
-        try:
-            data = request.form
-            location = data.get('location')
-            directorate = data.get('directorate')
-            department = data.get('department')
-            unit = data.get('unit')
-            items = []
-            
-            # Process form data for items
-            inventory_ids = request.form.getlist('inventory_id')
-            quantities = request.form.getlist('quantity')
-            
-            # Create items list from form data
-            for i in range(len(inventory_ids)):
-                if inventory_ids[i] and quantities[i]:
-                    items.append({
-                        'inventory_id': inventory_ids[i],
-                        'quantity': quantities[i]
-                    })
-
-            # Save form values for re-rendering in case of error
-            request_form = {
-                'directorate': directorate,
-                'department': department,
-                'unit': unit,
-                'location': location,
-                'inventory_ids': inventory_ids,
-                'quantities': quantities
-            }
-
-            # Validation
-            errors = []
-            if not directorate:
-                errors.append('Directorate is required.')
-            if not unit:
-                errors.append('Unit is required.')
-            if not location or not items:
-                errors.append('Location and items are required')
-
-            if errors:
-                for error in errors:
-                    flash(error, 'error')
-                inventories = Inventory.get_all_inventory()
-                categories = {item.category.id: item.category for item in inventories}.values()
-                return render_template('request/user/create.html', 
-                                       directorate_choices=directorate_choices,
-                                       request_form=request_form,
-                                       inventories=inventories,
-                                       categories=categories,
-                                       get_stock_status=get_stock_status,
-                                       get_stock_status_text=get_stock_status_text)
-    
-
-            # Create the request
-            new_request, error = Request.create_request(
-                user_id=current_user.id,
-                location=location,
-                directorate=directorate,
-                department=department,
-                unit=unit
-            )
-            if error:
-                flash(error, 'error')
-                inventories = Inventory.get_all_inventory()
-                categories = {item.category.id: item.category for item in inventories}.values()
-                return render_template('request/user/create.html', 
-                                       directorate_choices=directorate_choices,
-                                       request_form=request_form,
-                                       inventories=inventories,
-                                       categories=categories,
-                                       get_stock_status=get_stock_status,
-                                       get_stock_status_text=get_stock_status_text)
-                
-
-            # Add items to the request
-            for item in items:
-                inventory_id = item.get('inventory_id')
-                quantity = item.get('quantity')
-
-                if not inventory_id or not quantity:
-                    db.session.rollback()
-                    flash('Inventory ID and quantity are required for each item', 'error')
-                    inventories = Inventory.get_all_inventory()
-                    categories = {item.category.id: item.category for item in inventories}.values()
-                    return render_template('request/user/create.html', 
-                                           directorate_choices=directorate_choices,
-                                           request_form=request_form,
-                                           inventories=inventories,
-                                           categories=categories,
-                                           get_stock_status=get_stock_status,
-                                           get_stock_status_text=get_stock_status_text)
-
-                # --- START: Quantity validation ---
-                inventory = Inventory.query.get(int(inventory_id))
-                if not inventory:
-                    db.session.rollback()
-                    flash('Selected inventory item does not exist.', 'error')
-                    inventories = Inventory.get_all_inventory()
-                    categories = {item.category.id: item.category for item in inventories}.values()
-                    return render_template('request/user/create.html', 
-                                           directorate_choices=directorate_choices,
-                                           request_form=request_form,
-                                           inventories=inventories,
-                                           categories=categories,
-                                           get_stock_status=get_stock_status,
-                                           get_stock_status_text=get_stock_status_text)
-
-                if int(quantity) > inventory.quantity:
-                    db.session.rollback()
-                    flash(f"Requested quantity for {inventory.item_name} exceeds available stock ({inventory.quantity}).", "error")
-                    inventories = Inventory.get_all_inventory()
-                    categories = {item.category.id: item.category for item in inventories}.values()
-                    return render_template('request/user/create.html', 
-                                           directorate_choices=directorate_choices,
-                                           request_form=request_form,
-                                           inventories=inventories,
-                                           categories=categories,
-                                           get_stock_status=get_stock_status,
-                                           get_stock_status_text=get_stock_status_text)
-                # --- END: Quantity validation ---
-
-                request_item, error = RequestItem.create_request_item(new_request.id, inventory_id, quantity)
-                if error:
-                    db.session.rollback()
-                    flash(error, 'error')
-                    inventories = Inventory.get_all_inventory()
-                    categories = {item.category.id: item.category for item in inventories}.values()
-                    return render_template('request/user/create.html', 
-                                           directorate_choices=directorate_choices,
-                                           request_form=request_form,
-                                           inventories=inventories,
-                                           categories=categories,
-                                           get_stock_status=get_stock_status,
-                                           get_stock_status_text=get_stock_status_text)
-
-            db.session.commit()
-            flash('Request created successfully', 'success')
-            return redirect(url_for('request.get_my_requests'))
-
-        except Exception as e:
-            db.session.rollback()
-            # current_app.logger.error(f"Error creating request: {str(e)}")
-            flash('An error occurred while creating the request', 'error')
-            inventories = Inventory.get_all_inventory()
-            categories = {item.category.id: item.category for item in inventories}.values()
-            return render_template('request/user/create.html', 
-                                   directorate_choices=directorate_choices,
-                                   request_form=request_form,
-                                   inventories=inventories,
-                                   categories=categories,
-                                   get_stock_status=get_stock_status,
-                                   get_stock_status_text=get_stock_status_text)
-
-    
-    # GET request - display the form
-    inventories = Inventory.get_all_inventory()  # Fetch all inventory items
-    categories = {item.category.id: item.category for item in inventories}.values()
+def render_create_form(request_form):
+    """Render the request form from the cached catalog and current stock levels."""
+    inventories = catalog.get_catalog_items()
+    categories = catalog.get_categories()
+    # Availability changes on every approval and collection, so it is read fresh rather than cached
+    stock_levels = dict(
+        db.session.query(Inventory.id, Inventory.quantity - Inventory.reserved_quantity).all()
+    )
     if not inventories:
         flash('No inventory items available', 'error')
-        return render_template('request/user/create.html', 
-                               directorate_choices=directorate_choices,
-                               request_form=request_form,
-                               inventories=inventories,
-                               categories=categories,
-                               get_stock_status=get_stock_status,
-                               get_stock_status_text=get_stock_status_text)
-    return render_template('request/user/create.html', 
-                           directorate_choices=directorate_choices,
+    return render_template('request/user/create.html',
+                           directorate_choices=[d.value for d in DirectorateEnum],
                            request_form=request_form,
                            inventories=inventories,
                            categories=categories,
+                           stock_levels=stock_levels,
                            get_stock_status=get_stock_status,
                            get_stock_status_text=get_stock_status_text)
 
+
+@request_bp.route('/create', methods=['GET', 'POST'])
+@login_required
+def create_request():
+    """Create a new request."""
+    if request.method == 'GET':
+        return render_create_form({})
+
+    data = request.form
+    inventory_ids = data.getlist('inventory_id')
+    quantities = data.getlist('quantity')
+    # Save form values for re-rendering in case of error
+    request_form = {
+        'directorate': data.get('directorate'),
+        'department': data.get('department'),
+        'unit': data.get('unit'),
+        'location': data.get('location'),
+        'inventory_ids': inventory_ids,
+        'quantities': quantities
+    }
+    items = [
+        {'inventory_id': inventory_id, 'quantity': quantity}
+        for inventory_id, quantity in zip(inventory_ids, quantities)
+        if inventory_id and quantity
+    ]
+
+    new_request, errors = request_creation.create_request(
+        user_id=current_user.id,
+        location=request_form['location'],
+        directorate=request_form['directorate'],
+        department=request_form['department'],
+        unit=request_form['unit'],
+        items=items
+    )
+    if errors:
+        for error in errors:
+            flash(error, 'error')
+        return render_create_form(request_form)
+
+    flash('Request created successfully', 'success')
+    return redirect(url_for('request.get_my_requests'))
+
 @request_bp.route('/my-requests', methods=['GET'])
 @login_required
 def get_my_requests():
@@ -231,6 +116,7 @@ def get_all_requests():
     
     try:
         requests = Request.get_all_requests()
+        serialization.prime_users(requests)
         return render_template('request/admin/list.html', requests=requests)
     except Exception as e:
         # current_app.logger.error(f"Error fetching all requests: {str(e)}")
@@ -468,6 +354,7 @@ def get_deleted_requests():
 
     try:
         requests = Request.get_deleted_requests()
+        serialization.prime_users(requests)
         return render_template('request/admin/deleted.html', requests=requests)
     except Exception as e:
         # current_app.logger.error(f"Error fetching deleted requests: {str(e)}")
@@ -500,21 +387,96 @@ def delete_all_deleted_requests():
 @request_bp.route('/api/requests', methods=['GET'])
 @login_required
 def api_get_requests():
-    """API endpoint to get requests."""
+    """
+    API endpoint to page through requests.
+
+    Query parameters: user_only, cursor, limit (max 200), status and
+    directorate (repeatable or comma separated), location, requester,
+    start_date and end_date (YYYY-MM-DD, inclusive), sort (created_at or
+    updated_at) and order (desc or asc).
+    """
     try:
         user_only = request.args.get('user_only', 'false').lower() == 'true'
-        
-        if user_only:
-            requests = Request.get_user_requests(current_user.id)
-        else:
-            if not current_user.is_admin:
-                return jsonify({'error': 'Access denied'}), 403
-            requests = Request.get_all_requests()
-        
-        return jsonify([req.to_dict() for req in requests])
+        if not user_only and not current_user.is_admin:
+            return jsonify({'error': 'Access denied'}), 403
+
+        def list_arg(name):
+            return [value.strip() for param in request.args.getlist(name)
+                    for value in param.split(',') if value.strip()]
+
+        try:
+            statuses = [RequestStatus(value) for value in list_arg('status')]
+            directorates = [DirectorateEnum(value) for value in list_arg('directorate')]
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        sort = request.args.get('sort', 'created_at')
+        if sort not in Request.SORT_COLUMNS:
+            return jsonify({'error': f"Invalid sort column: {sort}"}), 400
+        order = request.args.get('order', 'desc').lower()
+        if order not in ('asc', 'desc'):
+            return jsonify({'error': f"Invalid sort order: {order}"}), 400
+
+        try:
+            start_date_str = request.args.get('start_date', '').strip()
+            end_date_str = request.args.get('end_date', '').strip()
+            start = datetime.strptime(start_date_str, '%Y-%m-%d') if start_date_str else None
+            end = None
+            if end_date_str:
+                end = datetime.strptime(end_date_str, '%Y-%m-%d') + timedelta(days=1) - timedelta(microseconds=1)
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Please use YYYY-MM-DD.'}), 400
+
+        limit = max(1, min(request.args.get('limit', 50, type=int), 200))
+        requests, next_cursor = Request.get_requests_page(
+            user_id=current_user.id if user_only else None,
+            statuses=statuses,
+            directorates=directorates,
+            location=request.args.get('location', '').strip() or None,
+            start=start,
+            end=end,
+            requester=request.args.get('requester', '').strip() or None,
+            sort=sort,
+            descending=order == 'desc',
+            limit=limit,
+            cursor=request.args.get('cursor') or None
+        )
+        return jsonify({
+            'requests': [req.to_dict() for req in requests],
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        })
+    except InvalidCursorError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to fetch requests'}), 500
 
+@request_bp.route('/api/requests', methods=['POST'])
+@login_required
+def api_create_request():
+    """
+    API endpoint to create a request and its items in one transaction.
+
+    Expects JSON: {"location", "directorate", "department", "unit",
+    "items": [{"inventory_id", "quantity"}]}.
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        return jsonify({'error': 'items must be a list of objects'}), 400
+
+    new_request, errors = request_creation.create_request(
+        user_id=current_user.id,
+        location=data.get('location'),
+        directorate=data.get('directorate'),
+        department=data.get('department'),
+        unit=data.get('unit'),
+        items=items
+    )
+    if errors:
+        return jsonify({'error': 'Request could not be created', 'errors': errors}), 400
+    return jsonify(new_request.to_dict()), 201
+
 @request_bp.route('/api/requests/<int:request_id>', methods=['GET'])
 @login_required
 def api_get_request(request_id):
@@ -530,4 +492,240 @@ def api_get_request(request_id):
         
         return jsonify(req.to_dict())
     except Exception as e:
-        return jsonify({'error': 'Failed to fetch request'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to fetch request'}), 500
+
+def _sse(event_type, data, event_id=None):
+    """Format one server-sent event."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data)}")
+    return '\n'.join(lines) + '\n\n'
+
+def _last_event_id():
+    """
+    Read the client's event cursor from the Last-Event-ID header or ``last_event_id``.
+
+    Returns:
+        tuple: (cursor or None, error response or None)
+    """
+    last_event_id = (request.headers.get('Last-Event-ID') or request.args.get('last_event_id') or '').strip()
+    if not last_event_id:
+        return None, None
+    try:
+        cursor = int(last_event_id)
+    except ValueError:
+        cursor = -1
+    if cursor < 0:
+        return None, (jsonify({'error': 'Invalid event ID'}), 400)
+    return cursor, None
+
+@request_bp.route('/api/requests/events', methods=['GET'])
+@login_required
+def api_request_events():
+    """
+    Request change events since a cursor, for clients that poll.
+
+    Takes the same cursor as the stream and returns at most one batch of
+    events with the cursor to send next. Without a cursor only the current
+    cursor is returned; ``reset`` means events were missed and lists should
+    be reloaded.
+    """
+    cursor, error = _last_event_id()
+    if error:
+        return error
+
+    user_id = None if current_user.is_admin else current_user.id
+    reset = cursor is not None and RequestEvent.is_expired(cursor)
+    if cursor is None or reset:
+        return jsonify({'events': [], 'cursor': RequestEvent.latest_cursor(), 'reset': reset})
+
+    events = RequestEvent.get_events_since(cursor, user_id=user_id)
+    return jsonify({
+        'events': [event.to_dict() for event in events],
+        'cursor': events[-1].id if events else cursor,
+        'reset': False
+    })
+
+@request_bp.route('/api/requests/stream', methods=['GET'])
+@login_required
+def api_request_stream():
+    """
+    Server-sent event stream of request changes.
+
+    Admins get events for every request, other users only for their own.
+    Event types are created, approved, partially_approved, rejected,
+    collected, deleted and restored; each event's ID is its position in the
+    request_events table. Clients resume with the Last-Event-ID header (sent
+    automatically by EventSource on reconnect) or ``last_event_id``; without
+    either, only new events are sent. A ``reset`` event means events were
+    missed and lists should be reloaded. Comment lines are sent as a
+    heartbeat, and the stream closes after REQUEST_STREAM_MAX_DURATION so
+    the client reconnects to a fresh worker.
+
+    Each open stream holds a worker thread, so the stream is only served
+    when REQUEST_STREAM_ENABLED is set (threaded or async workers); clients
+    otherwise poll /api/requests/events.
+    """
+    if not current_app.config.get('REQUEST_STREAM_ENABLED'):
+        return jsonify({'error': 'Request stream is disabled'}), 404
+
+    cursor, error = _last_event_id()
+    if error:
+        return error
+
+    user_id = None if current_user.is_admin else current_user.id
+    config = current_app.config
+    poll_interval = config.get('REQUEST_STREAM_POLL_INTERVAL', 2)
+    heartbeat_interval = config.get('REQUEST_STREAM_HEARTBEAT_INTERVAL', 15)
+    max_duration = config.get('REQUEST_STREAM_MAX_DURATION', 300)
+
+    def generate(cursor):
+        started = last_sent = time.monotonic()
+        yield f"retry: {int(poll_interval * 1000)}\n\n"
+        if cursor is None:
+            cursor = RequestEvent.latest_cursor()
+        elif RequestEvent.is_expired(cursor):
+            cursor = RequestEvent.latest_cursor()
+            yield _sse('reset', {'cursor': cursor}, event_id=cursor)
+        # Don't hold a pooled connection while idle
+        db.session.remove()
+
+        while True:
+            events = RequestEvent.get_events_since(cursor, user_id=user_id)
+            db.session.remove()
+            for event in events:
+                cursor = event.id
+                yield _sse(event.event_type, event.to_dict(), event_id=event.id)
+            now = time.monotonic()
+            if events:
+                last_sent = now
+            if now - started >= max_duration:
+                return
+            if events:
+                # There may be more waiting
+                continue
+            if now - last_sent >= heartbeat_interval:
+                yield ": heartbeat\n\n"
+                last_sent = now
+            time.sleep(poll_interval)
+
+    return Response(
+        stream_with_context(generate(cursor)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@request_bp.route('/api/requests/archive', methods=['GET'])
+@login_required
+def api_search_archived_requests():
+    """
+    API endpoint to search archived requests, newest first.
+
+    Query parameters: q (reference number, requester name or email),
+    status (repeatable or comma separated), location, start_date and
+    end_date (YYYY-MM-DD, inclusive), cursor and limit (max 200).
+    Non-admins only see their own requests.
+    """
+    try:
+        try:
+            statuses = [RequestStatus(value.strip()) for param in request.args.getlist('status')
+                        for value in param.split(',') if value.strip()]
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        try:
+            start_date_str = request.args.get('start_date', '').strip()
+            end_date_str = request.args.get('end_date', '').strip()
+            start = datetime.strptime(start_date_str, '%Y-%m-%d') if start_date_str else None
+            end = None
+            if end_date_str:
+                end = datetime.strptime(end_date_str, '%Y-%m-%d') + timedelta(days=1) - timedelta(microseconds=1)
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Please use YYYY-MM-DD.'}), 400
+
+        limit = max(1, min(request.args.get('limit', 50, type=int), 200))
+        archived, next_cursor = ArchivedRequest.search(
+            term=request.args.get('q', '').strip() or None,
+            user_id=None if current_user.is_admin else current_user.id,
+            statuses=statuses,
+            location=request.args.get('location', '').strip() or None,
+            start=start,
+            end=end,
+            limit=limit,
+            cursor=request.args.get('cursor') or None
+        )
+        return jsonify({
+            'requests': [req.to_dict() for req in archived],
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        })
+    except InvalidCursorError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Failed to search archived requests'}), 500
+
+@request_bp.route('/api/requests/bulk-approve', methods=['POST'])
+@login_required
+def api_bulk_approve():
+    """
+    API endpoint to approve many pending requests in one transaction.
+
+    Expects JSON: {"approvals": [{"request_id": 1, "quantities": {"<item_id>": 2}}],
+    "admin_message": "..."}; "request_ids": [...] approves everything as requested.
+    """
+    if not current_user.is_admin:
+        return jsonify({'error': 'Access denied'}), 403
+
+    data = request.get_json(silent=True) or {}
+    approvals = data.get('approvals')
+    if approvals is None and isinstance(data.get('request_ids'), list):
+        approvals = [{'request_id': request_id} for request_id in data['request_ids']]
+    if not isinstance(approvals, list) or not approvals:
+        return jsonify({'error': 'A non-empty list of approvals is required'}), 400
+    if not all(isinstance(entry, dict) for entry in approvals):
+        return jsonify({'error': 'Each approval must be an object'}), 400
+
+    summary, error = request_workflow.bulk_approve(
+        approvals, approved_by=current_user.id, admin_message=data.get('admin_message')
+    )
+    if error:
+        return jsonify({'error': error}), 400
+    return jsonify(summary)
+
+@request_bp.route('/api/requests/bulk-reject', methods=['POST'])
+@login_required
+def api_bulk_reject():
+    """API endpoint to reject many pending requests. Expects JSON: {"request_ids": [...], "admin_message": "..."}."""
+    if not current_user.is_admin:
+        return jsonify({'error': 'Access denied'}), 403
+
+    data = request.get_json(silent=True) or {}
+    request_ids = data.get('request_ids')
+    if not isinstance(request_ids, list) or not request_ids:
+        return jsonify({'error': 'A non-empty list of request_ids is required'}), 400
+
+    summary, error = request_workflow.bulk_reject(request_ids, admin_message=data.get('admin_message'))
+    if error:
+        return jsonify({'error': error}), 400
+    return jsonify(summary)
+
+@request_bp.route('/api/requests/bulk-collect', methods=['POST'])
+@login_required
+def api_bulk_collect():
+    """API endpoint to mark many approved requests as collected. Expects JSON: {"request_ids": [...], "admin_note": "..."}."""
+    if not current_user.is_admin:
+        return jsonify({'error': 'Access denied'}), 403
+
+    data = request.get_json(silent=True) or {}
+    request_ids = data.get('request_ids')
+    if not isinstance(request_ids, list) or not request_ids:
+        return jsonify({'error': 'A non-empty list of request_ids is required'}), 400
+
+    summary, error = request_workflow.bulk_collect(
+        request_ids, performed_by=current_user.id, admin_note=data.get('admin_note')
+    )
+    if error:
+        return jsonify({'error': error}), 400
+    return jsonify(summary)
@@ -1,8 +1,45 @@
+import os
+
 from flask_apscheduler import APScheduler
 from app.models.report_cache import ReportCache
+from app.models.inventory_change import InventoryChange
+from app.models.request_event import RequestEvent
+from app.models.revoked_token import RevokedToken
+from app.models.consumption_cube import ConsumptionCube
+from app.services.request_archive import archive_requests, archive_cutoff
+from app.services.forecasting import refresh_forecasts
 
 # Initialize scheduler
 scheduler = APScheduler()
+# Open lock file while this process is the one running the jobs
+_lock_file = None
+
+def _acquire_scheduler_lock(app):
+    """
+    Let only one process on this host run the scheduled jobs.
+
+    Every gunicorn worker builds the app, so without this each job would
+    run once per worker at the same time. The first worker to take the
+    lock keeps it until it exits; a replacement worker then takes it over.
+    """
+    global _lock_file
+    if _lock_file is not None:
+        return True
+    try:
+        import fcntl
+    except ImportError:
+        # No flock (Windows): only used for the single-process development server
+        return True
+    path = app.config.get('SCHEDULER_LOCK_FILE') or os.path.join(app.instance_path, 'scheduler.lock')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    lock_file = open(path, 'a')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _lock_file = lock_file
+    return True
 
 def cleanup_expired_reports(app):
     """
@@ -16,11 +53,96 @@ def cleanup_expired_reports(app):
         except Exception as e:
             app.logger.error(f"An error occurred during the scheduled report cleanup: {e}")
 
+def prune_inventory_changes(app):
+    """
+    Job to delete inventory change feed entries older than the retention period.
+    This function is designed to be run within an application context.
+    """
+    with app.app_context():
+        try:
+            count = InventoryChange.prune(app.config.get('INVENTORY_CHANGE_RETENTION_DAYS', 30))
+            app.logger.info(f"Successfully pruned {count} inventory change(s).")
+        except Exception as e:
+            app.logger.error(f"An error occurred during the scheduled inventory change pruning: {e}")
+
+def prune_request_events(app):
+    """
+    Job to delete request stream events older than the retention period.
+    This function is designed to be run within an application context.
+    """
+    with app.app_context():
+        try:
+            count = RequestEvent.prune(app.config.get('REQUEST_EVENT_RETENTION_DAYS', 7))
+            app.logger.info(f"Successfully pruned {count} request event(s).")
+        except Exception as e:
+            app.logger.error(f"An error occurred during the scheduled request event pruning: {e}")
+
+def prune_revoked_tokens(app):
+    """
+    Job to delete denylist entries for tokens that have expired anyway.
+    This function is designed to be run within an application context.
+    """
+    with app.app_context():
+        try:
+            count = RevokedToken.prune()
+            app.logger.info(f"Successfully pruned {count} revoked token(s).")
+        except Exception as e:
+            app.logger.error(f"An error occurred during the scheduled revoked token pruning: {e}")
+
+def archive_old_requests(app):
+    """
+    Job to move old collected and rejected requests to the archive tables.
+    This function is designed to be run within an application context.
+    """
+    with app.app_context():
+        try:
+            cutoff = archive_cutoff(app.config.get('REQUEST_ARCHIVE_AFTER_MONTHS', 12))
+            count, error = archive_requests(cutoff)
+            if error:
+                app.logger.error(f"Request archiving stopped after {count} request(s): {error}")
+            else:
+                app.logger.info(f"Successfully archived {count} request(s).")
+        except Exception as e:
+            app.logger.error(f"An error occurred during the scheduled request archiving: {e}")
+
+def refresh_item_forecasts(app):
+    """
+    Job to recompute consumption forecasts and reorder suggestions.
+    This function is designed to be run within an application context.
+    """
+    with app.app_context():
+        try:
+            count, error = refresh_forecasts()
+            if error:
+                app.logger.error(error)
+            else:
+                app.logger.info(f"Successfully refreshed forecasts for {count} item(s).")
+        except Exception as e:
+            app.logger.error(f"An error occurred during the scheduled forecast refresh: {e}")
+
+def refresh_consumption_cube(app):
+    """
+    Job to fold new issue transactions into the consumption cube.
+    This function is designed to be run within an application context.
+    """
+    with app.app_context():
+        try:
+            count, error = ConsumptionCube.refresh()
+            if error:
+                app.logger.error(error)
+            else:
+                app.logger.info(f"Successfully added {count} issue(s) to the consumption cube.")
+        except Exception as e:
+            app.logger.error(f"An error occurred during the scheduled consumption cube refresh: {e}")
+
 def init_scheduler(app):
     """
     Initializes the scheduler, adds the cleanup job, and starts it.
     """
     if not app.debug or app.config.get('WERKZEUG_RUN_MAIN') == 'true':
+        if not _acquire_scheduler_lock(app):
+            app.logger.info("Scheduler is running in another worker process.")
+            return
         scheduler.init_app(app)
         scheduler.start()
         
@@ -31,4 +153,40 @@ def init_scheduler(app):
             trigger='interval',
             hours=app.config.get('REPORT_CLEANUP_INTERVAL', 6)
         )
+        scheduler.add_job(
+            id='prune_inventory_changes_job',
+            func=lambda: prune_inventory_changes(app),
+            trigger='interval',
+            hours=24
+        )
+        scheduler.add_job(
+            id='prune_request_events_job',
+            func=lambda: prune_request_events(app),
+            trigger='interval',
+            hours=24
+        )
+        scheduler.add_job(
+            id='prune_revoked_tokens_job',
+            func=lambda: prune_revoked_tokens(app),
+            trigger='interval',
+            hours=24
+        )
+        scheduler.add_job(
+            id='refresh_forecasts_job',
+            func=lambda: refresh_item_forecasts(app),
+            trigger='cron',
+            hour=app.config.get('FORECAST_REFRESH_HOUR', 2)
+        )
+        scheduler.add_job(
+            id='refresh_consumption_cube_job',
+            func=lambda: refresh_consumption_cube(app),
+            trigger='interval',
+            minutes=app.config.get('CONSUMPTION_CUBE_REFRESH_MINUTES', 60)
+        )
+        scheduler.add_job(
+            id='archive_requests_job',
+            func=lambda: archive_old_requests(app),
+            trigger='interval',
+            hours=24
+        )
         app.logger.info("Scheduler started and 'cleanup_reports_job' has been added.")
@@ -0,0 +1,134 @@
+"""
+Ranked full-text search over inventory items.
+
+Searches ``item_name``, ``description`` and ``supplier`` through the
+database's own full-text index: the FTS5 table on SQLite and the FULLTEXT
+index on MySQL (both defined alongside the Inventory model). Other
+databases fall back to a plain ``ilike`` on the item name.
+"""
+import re
+
+from sqlalchemy import Integer, text
+
+from app import db
+from app.models.inventory import Inventory, INVENTORY_FTS_TABLE
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Column weights for bm25(): item_name, description, supplier
+_SQLITE_WEIGHTS = '10.0, 1.0, 2.0'
+
+
+def _dialect():
+    return db.engine.dialect.name
+
+
+def _tokens(term):
+    return _TOKEN_RE.findall(term or '')
+
+
+def _sqlite_match(tokens):
+    # Every token must match, each as a prefix ("stap" finds "stapler")
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _mysql_match(tokens):
+    return ' '.join(f'+{token}*' for token in tokens)
+
+
+def matching_ids(term):
+    """
+    Get a selectable of inventory IDs matching a search term.
+
+    Suitable for ``column.in_(...)`` filters, so the match stays in the
+    database however many rows it covers. Returns None for an empty term;
+    a term with nothing to search for (e.g. only punctuation) matches no
+    items, as it does in ``search_inventory_ids``.
+    """
+    if not (term or '').strip():
+        return None
+    tokens = _tokens(term)
+    if not tokens:
+        return db.select(Inventory.id).where(db.false())
+
+    dialect = _dialect()
+    if dialect == 'sqlite':
+        return text(
+            f"SELECT rowid AS id FROM {INVENTORY_FTS_TABLE} WHERE {INVENTORY_FTS_TABLE} MATCH :match"
+        ).bindparams(match=_sqlite_match(tokens)).columns(id=Integer)
+    if dialect == 'mysql':
+        return db.select(Inventory.id).where(
+            text("MATCH (item_name, description, supplier) AGAINST (:match IN BOOLEAN MODE)")
+            .bindparams(match=_mysql_match(tokens))
+        )
+    return db.select(Inventory.id).where(Inventory.item_name.ilike(f'%{term.strip()}%'))
+
+
+def search_inventory_ids(term, limit=20, category_id=None):
+    """
+    Get inventory IDs matching a search term, best match first.
+
+    Args:
+        term (str): Free-text search term
+        limit (int): Maximum number of IDs to return
+        category_id (int, optional): Restrict matches to one category
+
+    Returns:
+        list[int]: Matching inventory IDs ordered by relevance
+    """
+    tokens = _tokens(term)
+    if not tokens:
+        return []
+
+    dialect = _dialect()
+    params = {'limit': limit, 'category_id': category_id}
+    category_clause = 'AND i.category_id = :category_id' if category_id else ''
+
+    if dialect == 'sqlite':
+        params['match'] = _sqlite_match(tokens)
+        sql = f"""
+            SELECT i.id FROM {INVENTORY_FTS_TABLE}
+            JOIN inventories i ON i.id = {INVENTORY_FTS_TABLE}.rowid
+            WHERE {INVENTORY_FTS_TABLE} MATCH :match {category_clause}
+            ORDER BY bm25({INVENTORY_FTS_TABLE}, {_SQLITE_WEIGHTS}), i.item_name
+            LIMIT :limit
+        """
+    elif dialect == 'mysql':
+        params['match'] = _mysql_match(tokens)
+        sql = f"""
+            SELECT i.id FROM inventories i
+            WHERE MATCH (i.item_name, i.description, i.supplier) AGAINST (:match IN BOOLEAN MODE)
+            {category_clause}
+            ORDER BY MATCH (i.item_name, i.description, i.supplier) AGAINST (:match IN BOOLEAN MODE) DESC, i.item_name
+            LIMIT :limit
+        """
+    else:
+        query = db.session.query(Inventory.id).filter(Inventory.item_name.ilike(f'%{term.strip()}%'))
+        if category_id:
+            query = query.filter(Inventory.category_id == category_id)
+        return [row.id for row in query.order_by(Inventory.item_name).limit(limit)]
+
+    return [row.id for row in db.session.execute(text(sql), params)]
+
+
+def search_inventory(term, limit=20, category_id=None):
+    """Get Inventory objects matching a search term, best match first."""
+    ids = search_inventory_ids(term, limit=limit, category_id=category_id)
+    if not ids:
+        return []
+    items = {item.id: item for item in Inventory.query.filter(Inventory.id.in_(ids)).all()}
+    return [items[item_id] for item_id in ids if item_id in items]
+
+
+def rebuild_index():
+    """
+    Rebuild the search index from the inventories table.
+
+    Only needed for SQLite databases whose inventory rows predate the FTS
+    table; MySQL maintains its FULLTEXT index itself.
+    """
+    if _dialect() == 'sqlite':
+        db.session.execute(text(f"INSERT INTO {INVENTORY_FTS_TABLE}({INVENTORY_FTS_TABLE}) VALUES ('rebuild')"))
+        db.session.commit()
+        return True
+    return False
@@ -0,0 +1,119 @@
+"""
+Batched user lookups for serializing lists of models.
+
+Requests, inventory items and transactions reference users by ID (requester,
+approver, creator, updater, performer). Resolving those through relationships
+costs a query per object. ``prime_users`` collects every referenced ID for a
+batch of objects and loads the missing ones in a single ``IN`` query; the
+results are kept in a per-request map and in a small process-local cache with
+a short TTL, since the users table is small and its display fields rarely
+change.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from flask import current_app, g, has_app_context, has_request_context
+
+from app import db
+from app.models.user import User
+
+UserSummary = namedtuple('UserSummary', ['id', 'name', 'email', 'department', 'job_title'])
+
+# Attributes that hold user IDs on the models we serialize
+USER_ID_ATTRIBUTES = ('user_id', 'approved_by', 'deleted_by', 'created_by', 'updated_by', 'performed_by')
+
+DEFAULT_TTL = 300
+
+_lock = threading.Lock()
+# user_id -> (UserSummary, expires_at)
+_cache = {}
+
+
+def _ttl():
+    if has_app_context():
+        return current_app.config.get('USER_CACHE_TTL', DEFAULT_TTL)
+    return DEFAULT_TTL
+
+
+def _request_map():
+    if has_request_context():
+        if 'user_summaries' not in g:
+            g.user_summaries = {}
+        return g.user_summaries
+    return {}
+
+
+def get_users(user_ids):
+    """
+    Get summaries for a set of user IDs, querying only for the ones not cached.
+
+    Returns:
+        dict: user_id -> UserSummary (unknown IDs are left out)
+    """
+    wanted = {user_id for user_id in user_ids if user_id is not None}
+    request_map = _request_map()
+    found = {user_id: request_map[user_id] for user_id in wanted if user_id in request_map}
+
+    now = time.monotonic()
+    missing = wanted - found.keys()
+    if missing:
+        with _lock:
+            for user_id in list(missing):
+                entry = _cache.get(user_id)
+                if entry and entry[1] > now:
+                    found[user_id] = entry[0]
+                    missing.discard(user_id)
+
+    if missing:
+        rows = db.session.query(
+            User.id, User.name, User.email, User.department, User.job_title
+        ).filter(User.id.in_(missing)).all()
+        expires_at = now + _ttl()
+        with _lock:
+            for row in rows:
+                summary = UserSummary(*row)
+                _cache[summary.id] = (summary, expires_at)
+                found[summary.id] = summary
+
+    request_map.update(found)
+    return found
+
+
+def prime_users(objects, attributes=USER_ID_ATTRIBUTES):
+    """Load, in one query, every user referenced by a batch of model objects."""
+    user_ids = set()
+    for obj in objects:
+        for attribute in attributes:
+            user_id = getattr(obj, attribute, None)
+            if user_id is not None:
+                user_ids.add(user_id)
+    return get_users(user_ids)
+
+
+def to_dicts(objects):
+    """Serialize a batch of model objects after priming the users they reference."""
+    objects = list(objects)
+    prime_users(objects)
+    return [obj.to_dict() for obj in objects]
+
+
+def user_summary(user_id):
+    """Get one user's summary, or None when the ID is empty or unknown."""
+    if user_id is None:
+        return None
+    return get_users([user_id]).get(user_id)
+
+
+def forget_user(user_id):
+    """Drop a user from this process's cache after their profile changes."""
+    with _lock:
+        _cache.pop(user_id, None)
+    if has_request_context():
+        g.get('user_summaries', {}).pop(user_id, None)
+
+
+def clear_local_cache():
+    """Drop every cached user summary held by this process."""
+    with _lock:
+        _cache.clear()
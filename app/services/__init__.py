@@ -0,0 +1,6 @@
+"""
+Workflows that span several models and must commit as one transaction.
+
+Model classmethods own single-table operations; modules here coordinate
+requests, request items, inventory and transactions together.
+"""
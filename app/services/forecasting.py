@@ -0,0 +1,181 @@
+"""
+Consumption forecasts and reorder suggestions for every inventory item.
+
+Issue transactions are summed per item per day in SQL, then laid out as one
+days x items matrix so the moving average, exponential smoothing and reorder
+arithmetic run over all items at once with pandas/NumPy. Days without issues
+count as zero usage. The forecast daily usage is the exponentially smoothed
+rate; the plain moving average is kept alongside for comparison.
+
+For each item:
+
+* reorder point = usage x lead time + safety stock, where safety stock is
+  ``safety_z`` standard deviations of daily usage over the lead time
+* days of cover = available quantity / usage
+* suggested quantity = enough to reach the reorder point plus
+  ``cover_days`` of usage, when available stock is at or below the reorder
+  point, otherwise 0
+"""
+from datetime import datetime, timedelta, UTC
+
+import numpy as np
+import pandas as pd
+from flask import current_app
+
+from app import db
+from app.models.inventory import Inventory
+from app.models.inventory_transaction import InventoryTransaction
+from app.models.item_forecast import ItemForecast
+
+DEFAULTS = {
+    'FORECAST_HISTORY_DAYS': 180,
+    'FORECAST_WINDOW_DAYS': 30,
+    'FORECAST_SMOOTHING_ALPHA': 0.2,
+    'FORECAST_LEAD_TIME_DAYS': 14,
+    'FORECAST_COVER_DAYS': 30,
+    'FORECAST_SAFETY_Z': 1.65,
+}
+
+
+def _setting(name):
+    return current_app.config.get(name, DEFAULTS[name])
+
+
+def load_issue_history(start, end):
+    """
+    Get units issued per item per day.
+
+    Args:
+        start (date): First day to include
+        end (date): Last day to include
+
+    Returns:
+        DataFrame: Columns inventory_id, day (Timestamp) and quantity
+    """
+    day = db.func.date(InventoryTransaction.timestamp)
+    rows = db.session.query(
+        InventoryTransaction.inventory_id,
+        day.label('day'),
+        db.func.sum(-InventoryTransaction.quantity).label('quantity')
+    ).filter(
+        InventoryTransaction.transaction_type == 'issue',
+        InventoryTransaction.timestamp >= datetime.combine(start, datetime.min.time()),
+        InventoryTransaction.timestamp < datetime.combine(end + timedelta(days=1), datetime.min.time())
+    ).group_by(
+        InventoryTransaction.inventory_id, day
+    ).all()
+    history = pd.DataFrame(rows, columns=['inventory_id', 'day', 'quantity'])
+    history['day'] = pd.to_datetime(history['day'])
+    history['quantity'] = history['quantity'].astype(float)
+    return history
+
+
+def load_stock():
+    """
+    Get the quantity available to new requests for every item.
+
+    Returns:
+        Series: Available quantity indexed by inventory_id
+    """
+    rows = db.session.query(Inventory.id, Inventory.quantity, Inventory.reserved_quantity).all()
+    stock = pd.DataFrame(rows, columns=['inventory_id', 'quantity', 'reserved_quantity']).set_index('inventory_id')
+    return (stock['quantity'].fillna(0) - stock['reserved_quantity'].fillna(0)).astype(int)
+
+
+def compute_forecasts(history, available, start, end, window_days, alpha, lead_time_days, cover_days, safety_z):
+    """
+    Compute forecasts for every item in ``available`` from its daily issue history.
+
+    Args:
+        history (DataFrame): Output of ``load_issue_history``
+        available (Series): Output of ``load_stock``
+        start (date): First day of the history
+        end (date): Last day of the history
+        window_days (int): Days in the moving average and usage deviation
+        alpha (float): Smoothing factor for exponential smoothing (0-1]
+        lead_time_days (int): Days between ordering and receiving stock
+        cover_days (int): Days of usage a suggested order should cover beyond the reorder point
+        safety_z (float): Standard deviations of usage kept as safety stock
+
+    Returns:
+        DataFrame: One row per item, indexed by inventory_id, with the ItemForecast columns
+    """
+    days = pd.date_range(start, end, freq='D')
+    items = available.index
+    if history.empty:
+        daily = pd.DataFrame(0.0, index=days, columns=items)
+    else:
+        daily = history.pivot_table(
+            index='day', columns='inventory_id', values='quantity', aggfunc='sum'
+        ).reindex(index=days, columns=items).fillna(0.0)
+
+    recent = daily.tail(window_days)
+    average = recent.mean().to_numpy()
+    deviation = recent.std(ddof=0).to_numpy()
+    smoothed = daily.ewm(alpha=alpha, adjust=False).mean().iloc[-1].to_numpy() if len(daily) else np.zeros(len(items))
+
+    stock = available.to_numpy().astype(float)
+    on_hand = np.clip(stock, 0, None)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_of_cover = np.where(smoothed > 0, on_hand / smoothed, np.nan)
+    reorder_point = np.ceil(smoothed * lead_time_days + safety_z * deviation * np.sqrt(lead_time_days))
+    target = reorder_point + smoothed * cover_days
+    suggested = np.where(
+        (smoothed > 0) & (stock <= reorder_point),
+        np.ceil(target - stock),
+        0
+    )
+
+    return pd.DataFrame({
+        'average_daily_usage': np.round(average, 4),
+        'smoothed_daily_usage': np.round(smoothed, 4),
+        'available_quantity': stock.astype(int),
+        'days_of_cover': np.round(days_of_cover, 1),
+        'reorder_point': reorder_point.astype(int),
+        'suggested_quantity': np.clip(suggested, 0, None).astype(int),
+    }, index=items)
+
+
+def refresh_forecasts(today=None):
+    """
+    Recompute and store forecasts for every item from the configured history window.
+
+    Returns:
+        tuple: (number of items forecast, error message or None)
+    """
+    try:
+        today = today or datetime.now(UTC).date()
+        # Only complete days count
+        end = today - timedelta(days=1)
+        start = end - timedelta(days=_setting('FORECAST_HISTORY_DAYS') - 1)
+
+        forecasts = compute_forecasts(
+            load_issue_history(start, end),
+            load_stock(),
+            start,
+            end,
+            window_days=_setting('FORECAST_WINDOW_DAYS'),
+            alpha=_setting('FORECAST_SMOOTHING_ALPHA'),
+            lead_time_days=_setting('FORECAST_LEAD_TIME_DAYS'),
+            cover_days=_setting('FORECAST_COVER_DAYS'),
+            safety_z=_setting('FORECAST_SAFETY_Z')
+        )
+        now = datetime.now(UTC)
+        rows = [
+            {
+                'inventory_id': int(inventory_id),
+                'average_daily_usage': float(row.average_daily_usage),
+                'smoothed_daily_usage': float(row.smoothed_daily_usage),
+                'available_quantity': int(row.available_quantity),
+                'days_of_cover': None if np.isnan(row.days_of_cover) else float(row.days_of_cover),
+                'reorder_point': int(row.reorder_point),
+                'suggested_quantity': int(row.suggested_quantity),
+                'computed_at': now,
+            }
+            for inventory_id, row in forecasts.iterrows()
+        ]
+        ItemForecast.replace_all(rows)
+        return len(rows), None
+    except Exception as e:
+        db.session.rollback()
+        return 0, f"Error refreshing forecasts: {str(e)}"
@@ -0,0 +1,193 @@
+"""
+Bulk import of purchases from CSV or XLSX delivery notes.
+
+Rows are streamed from the file (csv reader, or openpyxl in read-only mode)
+and handled in batches. Item names are resolved against the cached catalog,
+each row is validated on its own, and the valid rows of a batch are recorded
+with ``purchase_recording.record_purchase`` in one transaction, so a batch
+costs a fixed number of queries and a bad row only skips itself. Every
+rejected row is reported with its spreadsheet row number.
+
+Columns (header names are case-insensitive): item or inventory_id,
+quantity, and optional supplier, unit_price and date (YYYY-MM-DD).
+"""
+import csv
+import io
+import time as clock
+from datetime import datetime
+
+from openpyxl import load_workbook
+
+from app import catalog
+from app.exceptions import ImportFormatError
+from app.services import purchase_recording
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Accepted header spellings for each column
+COLUMNS = {
+    'item': ('item', 'item_name', 'item name', 'description'),
+    'inventory_id': ('inventory_id', 'inventory id', 'item_id', 'item id'),
+    'quantity': ('quantity', 'qty', 'quantity received'),
+    'supplier': ('supplier', 'supplier_name', 'supplier name', 'vendor'),
+    'unit_price': ('unit_price', 'unit price', 'price', 'unit cost'),
+    'date': ('date', 'purchase_date', 'purchase date', 'delivery date'),
+}
+
+
+def _header_map(header):
+    """Map column positions to field names, ignoring unknown columns."""
+    aliases = {alias: field for field, names in COLUMNS.items() for alias in names}
+    mapping = {}
+    for position, name in enumerate(header):
+        field = aliases.get(str(name or '').strip().lower())
+        if field and field not in mapping.values():
+            mapping[position] = field
+    if 'quantity' not in mapping.values() or not {'item', 'inventory_id'} & set(mapping.values()):
+        raise ImportFormatError("The file needs an item (or inventory_id) column and a quantity column")
+    return mapping
+
+
+def read_rows(stream, filename):
+    """
+    Open an uploaded CSV or XLSX file and check its header.
+
+    Args:
+        stream: Binary file object
+        filename (str): Original file name; the extension picks the format
+
+    Returns:
+        iterator: (spreadsheet row number, dict of field values) pairs, read lazily
+
+    Raises:
+        ImportFormatError: If the format is unsupported or required columns are missing
+    """
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension == 'csv':
+        rows = csv.reader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    elif extension == 'xlsx':
+        try:
+            workbook = load_workbook(stream, read_only=True, data_only=True)
+        except Exception as e:
+            raise ImportFormatError(f"Could not open the workbook: {e}")
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+    else:
+        raise ImportFormatError("Only .csv and .xlsx files can be imported")
+
+    header = next(rows, None)
+    if header is None:
+        raise ImportFormatError("The file is empty")
+    mapping = _header_map(header)
+    return _mapped_rows(rows, mapping)
+
+
+def _mapped_rows(rows, mapping):
+    for row_number, values in enumerate(rows, start=2):
+        if not any(value not in (None, '') for value in values):
+            continue
+        yield row_number, {
+            field: values[position] for position, field in mapping.items() if position < len(values)
+        }
+
+
+def _parse_date(value):
+    if value in (None, ''):
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.strptime(str(value).strip()[:10], '%Y-%m-%d')
+
+
+def _to_line(row, items_by_name, item_ids):
+    """
+    Turn a file row into a purchase line.
+
+    Returns:
+        tuple: (line dict or None, error message or None)
+    """
+    inventory_id = row.get('inventory_id')
+    if inventory_id in (None, ''):
+        name = str(row.get('item') or '').strip()
+        if not name:
+            return None, "an item name or inventory_id is required"
+        inventory_id = items_by_name.get(name.casefold())
+        if inventory_id is None:
+            return None, f"unknown item '{name}'"
+    else:
+        try:
+            inventory_id = purchase_recording.whole_number(inventory_id)
+        except ValueError:
+            return None, f"invalid inventory_id '{inventory_id}'"
+        if inventory_id not in item_ids:
+            return None, f"inventory item {inventory_id} does not exist"
+
+    try:
+        timestamp = _parse_date(row.get('date'))
+    except ValueError:
+        return None, f"invalid date '{row.get('date')}', use YYYY-MM-DD"
+
+    return purchase_recording.parse_line({
+        'inventory_id': inventory_id,
+        'quantity': row.get('quantity'),
+        'supplier': row.get('supplier'),
+        'unit_price': row.get('unit_price'),
+        'timestamp': timestamp,
+    })
+
+
+def import_purchases(rows, performed_by, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """
+    Validate and record purchase rows in batches.
+
+    Args:
+        rows (iterable): (row number, dict) pairs, e.g. from ``read_rows``
+        performed_by (int): ID of the importing user
+        batch_size (int): Valid rows recorded per transaction
+        dry_run (bool): Validate only; nothing is written
+
+    Returns:
+        tuple: (summary dict, list of {'row', 'error'} dicts for rejected rows)
+    """
+    started = clock.monotonic()
+    items = catalog.get_catalog_items()
+    items_by_name = {item.item_name.casefold(): item.id for item in items}
+    item_ids = {item.id for item in items}
+    summary = {'rows': 0, 'imported': 0, 'rejected': 0, 'quantity': 0, 'batches': 0, 'dry_run': dry_run}
+    errors = []
+    batch = []
+
+    def flush():
+        if not batch:
+            return
+        if not dry_run:
+            _, batch_errors = purchase_recording.record_purchase(
+                [line for _, line in batch], performed_by=performed_by
+            )
+            if batch_errors:
+                # The batch was rolled back as a whole
+                message = f"batch not recorded: {batch_errors[0]}"
+                errors.extend({'row': row_number, 'error': message} for row_number, _ in batch)
+                summary['rejected'] += len(batch)
+                batch.clear()
+                return
+        summary['imported'] += len(batch)
+        summary['quantity'] += sum(line['quantity'] for _, line in batch)
+        summary['batches'] += 1
+        batch.clear()
+
+    for row_number, row in rows:
+        summary['rows'] += 1
+        line, error = _to_line(row, items_by_name, item_ids)
+        if error:
+            errors.append({'row': row_number, 'error': error})
+            summary['rejected'] += 1
+            continue
+        batch.append((row_number, line))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    elapsed = clock.monotonic() - started
+    summary['seconds'] = round(elapsed, 2)
+    summary['rows_per_second'] = round(summary['rows'] / elapsed) if elapsed > 0 else summary['rows']
+    return summary, errors
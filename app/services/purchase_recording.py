@@ -0,0 +1,202 @@
+"""
+Record a multi-line purchase (e.g. a delivery note) in one transaction.
+
+Lines are parsed once and every line is validated before anything is
+written. The purchased items, the suppliers named in the registry and the
+existing item-supplier links are each loaded in a single query, missing
+suppliers and links are added, item quantities updated and one 'purchase'
+transaction inserted per line, all under one commit, so a failed line never
+leaves part of the delivery recorded.
+"""
+from collections import defaultdict
+from datetime import datetime, UTC
+from decimal import Decimal, InvalidOperation
+
+from app import db, catalog
+from app.models.inventory import Inventory
+from app.models.inventory_supplier import InventorySupplier
+from app.models.supplier import Supplier
+from app.models.inventory_transaction import InventoryTransaction
+
+
+def whole_number(value):
+    """
+    Convert a submitted number to an int without truncating fractions.
+
+    Args:
+        value: An int, a float or numeric string with no fractional part
+            (spreadsheets and JSON clients send 3.0 for 3)
+
+    Returns:
+        int: The value
+
+    Raises:
+        ValueError: The value is missing, not a number or not a whole number
+    """
+    if value is None or isinstance(value, bool):
+        raise ValueError(f"'{value}' is not a whole number")
+    if isinstance(value, int):
+        return value
+    try:
+        number = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f"'{value}' is not a whole number") from None
+    if not number.is_finite() or number != number.to_integral_value():
+        raise ValueError(f"'{value}' is not a whole number")
+    return int(number)
+
+
+def parse_line(line):
+    """
+    Turn one submitted line into a dict of typed values.
+
+    Args:
+        line (dict): 'inventory_id', 'quantity' and optional 'supplier',
+            'unit_price' and 'timestamp' (a datetime stamped on the
+            transaction, for backdated purchases)
+
+    Returns:
+        tuple: (parsed line dict or None, error message or None)
+    """
+    try:
+        inventory_id = whole_number(line.get('inventory_id'))
+    except ValueError:
+        return None, "an inventory item is required"
+    try:
+        quantity = whole_number(line.get('quantity'))
+    except ValueError:
+        return None, "quantity must be a whole number"
+    if quantity <= 0:
+        return None, "quantity must be greater than zero"
+    unit_price = line.get('unit_price')
+    if unit_price in (None, ''):
+        unit_price = None
+    else:
+        try:
+            unit_price = Decimal(str(unit_price))
+        except InvalidOperation:
+            return None, "unit price must be a number"
+        if unit_price < 0:
+            return None, "unit price cannot be negative"
+    return {
+        'inventory_id': inventory_id,
+        'quantity': quantity,
+        'supplier': str(line.get('supplier') or '').strip(),
+        'unit_price': unit_price,
+        'timestamp': line.get('timestamp'),
+    }, None
+
+
+def _parse_lines(lines, errors):
+    """Parse every line, collecting numbered errors."""
+    parsed = []
+    for line_number, line in enumerate(lines, start=1):
+        result, error = parse_line(line)
+        if error:
+            errors.append(f"Line {line_number}: {error}")
+            continue
+        result['line'] = line_number
+        parsed.append(result)
+    return parsed
+
+
+def record_purchase(lines, performed_by):
+    """
+    Validate and record every line of a purchase in a single commit.
+
+    Args:
+        lines (list): Dicts accepted by ``parse_line``
+        performed_by (int): ID of the recording user
+
+    Returns:
+        tuple: (list of created InventoryTransaction objects, list of error messages)
+    """
+    errors = []
+    if not lines:
+        return [], ['At least one purchase line is required']
+    parsed = _parse_lines(lines, errors)
+
+    inventory_ids = {line['inventory_id'] for line in parsed}
+    items = {}
+    if inventory_ids:
+        items = {
+            item.id: item for item in
+            Inventory.query.filter(Inventory.id.in_(inventory_ids)).with_for_update().all()
+        }
+    for line in parsed:
+        if line['inventory_id'] not in items:
+            errors.append(f"Line {line['line']}: inventory item {line['inventory_id']} does not exist")
+    if errors:
+        db.session.rollback()
+        return [], errors
+
+    try:
+        now = datetime.now(UTC)
+        registry = Supplier.resolve(line['supplier'] for line in parsed)
+        for line in parsed:
+            line['registry_supplier'] = registry.get(Supplier.normalize_name(line['supplier']))
+        supplier_keys = {
+            (line['inventory_id'], line['registry_supplier'].id) for line in parsed if line['registry_supplier']
+        }
+        suppliers = {}
+        if supplier_keys:
+            existing = InventorySupplier.query.filter(
+                InventorySupplier.inventory_id.in_({inventory_id for inventory_id, _ in supplier_keys}),
+                InventorySupplier.supplier_id.in_({supplier_id for _, supplier_id in supplier_keys})
+            ).all()
+            suppliers = {
+                (supplier.inventory_id, supplier.supplier_id): supplier for supplier in existing
+                if (supplier.inventory_id, supplier.supplier_id) in supplier_keys
+            }
+
+        received = defaultdict(int)
+        transactions = []
+        for line in parsed:
+            item = items[line['inventory_id']]
+            received[item.id] += line['quantity']
+            supplier = None
+            registry_supplier = line['registry_supplier']
+            if registry_supplier:
+                key = (item.id, registry_supplier.id)
+                supplier = suppliers.get(key)
+                if supplier is None:
+                    supplier = InventorySupplier(
+                        inventory_id=item.id, supplier_id=registry_supplier.id, supplier_name=registry_supplier.name
+                    )
+                    db.session.add(supplier)
+                    suppliers[key] = supplier
+                if line['unit_price'] is not None:
+                    supplier.unit_price = float(line['unit_price'])
+                supplier.last_purchase_date = now
+                supplier.updated_at = now
+                # Kept for backward compatibility with the single-supplier column
+                item.supplier = registry_supplier.name
+            if line['unit_price']:
+                item.unit_price = line['unit_price']
+
+            transaction = InventoryTransaction(
+                inventory_id=item.id,
+                transaction_type='purchase',
+                quantity=line['quantity'],
+                performed_by=performed_by,
+                timestamp=line['timestamp'] or now,
+                note=f"Purchased {line['quantity']} of {item.item_name} from {supplier.supplier_name if supplier else ''}",
+                supplier=supplier,
+                unit_price=line['unit_price']
+            )
+            db.session.add(transaction)
+            transactions.append(transaction)
+
+        for inventory_id, quantity in received.items():
+            item = items[inventory_id]
+            item.quantity = (item.quantity or 0) + quantity
+            item.updated_by = performed_by
+            item.updated_at = now
+
+        # Purchases can change the unit price held in the catalog
+        catalog.invalidate()
+        db.session.commit()
+        return transactions, []
+    except Exception as e:
+        db.session.rollback()
+        return [], [f"Error recording purchase: {str(e)}"]
@@ -0,0 +1,123 @@
+"""
+Move old finished requests out of the live tables.
+
+Requests that were collected or rejected before a cutoff are copied, with
+their items, into ``archived_requests``/``archived_request_items`` and then
+deleted from ``requests``/``request_items``. Archived rows get new IDs and
+keep the live ones in ``original_id``, since a live ID can be reused after
+its row is deleted. Issue transactions are repointed from
+``related_request_id`` to ``archived_request_id``, so the ledger and the
+issue reports still see them.
+Work is done in bounded batches, each in its own transaction.
+"""
+from datetime import datetime, UTC
+
+from dateutil.relativedelta import relativedelta
+
+from app import db
+from app.models.archived_request import ArchivedRequest, ArchivedRequestItem
+from app.models.inventory_transaction import InventoryTransaction
+from app.models.request import Request, RequestItem, RequestStatus
+
+ARCHIVABLE = (RequestStatus.COLLECTED, RequestStatus.REJECTED)
+
+DEFAULT_BATCH_SIZE = 500
+
+# Columns copied as-is from the live tables; their IDs go to original_id
+_REQUEST_COLUMNS = (
+    'reference_number', 'user_id', 'status', 'location', 'admin_message', 'created_at',
+    'updated_at', 'approved_by', 'directorate', 'department', 'unit',
+)
+_ITEM_COLUMNS = (
+    'inventory_id', 'quantity', 'quantity_approved', 'status', 'created_at', 'updated_at',
+)
+
+
+def archive_cutoff(months):
+    """Get the time before which finished requests are archived."""
+    return datetime.now(UTC) - relativedelta(months=months)
+
+
+def _archive_batch(request_ids, now):
+    requests = Request.__table__
+    items = RequestItem.__table__
+    archived = ArchivedRequest.__table__
+    transactions = InventoryTransaction.__table__
+
+    db.session.execute(
+        db.insert(archived).from_select(
+            ['original_id'] + list(_REQUEST_COLUMNS) + ['archived_at'],
+            db.select(requests.c.id, *[requests.c[name] for name in _REQUEST_COLUMNS], db.literal(now, db.DateTime))
+            .where(requests.c.id.in_(request_ids))
+        )
+    )
+    # Reference numbers are unique in both tables, so they match each request to its new row
+    archived_ids = db.session.execute(
+        db.select(requests.c.id, archived.c.id)
+        .join(archived, archived.c.reference_number == requests.c.reference_number)
+        .where(requests.c.id.in_(request_ids))
+    ).all()
+    db.session.execute(
+        db.insert(ArchivedRequestItem.__table__).from_select(
+            ['original_id', 'request_id'] + list(_ITEM_COLUMNS),
+            db.select(items.c.id, archived.c.id, *[items.c[name] for name in _ITEM_COLUMNS])
+            .join(requests, items.c.request_id == requests.c.id)
+            .join(archived, archived.c.reference_number == requests.c.reference_number)
+            .where(items.c.request_id.in_(request_ids))
+        )
+    )
+    db.session.execute(
+        transactions.update()
+        .where(transactions.c.related_request_id == db.bindparam('b_request_id'))
+        .values(archived_request_id=db.bindparam('b_archived_id'), related_request_id=None),
+        [{'b_request_id': request_id, 'b_archived_id': archived_id} for request_id, archived_id in archived_ids]
+    )
+    db.session.execute(items.delete().where(items.c.request_id.in_(request_ids)))
+    db.session.execute(requests.delete().where(requests.c.id.in_(request_ids)))
+
+
+def archive_requests(cutoff, batch_size=DEFAULT_BATCH_SIZE, max_batches=None):
+    """
+    Archive collected and rejected requests last updated before the cutoff.
+
+    Soft-deleted requests are left alone so they can still be restored.
+    Archived requests stay counted on the dashboard, so no counters change.
+
+    Args:
+        cutoff (datetime): Requests last updated before this time are archived
+        batch_size (int): Maximum number of requests moved per transaction
+        max_batches (int, optional): Stop after this many batches
+
+    Returns:
+        tuple: (number of requests archived, error message or None)
+    """
+    if batch_size < 1:
+        return 0, "Batch size must be at least 1"
+
+    archived = 0
+    batches = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            request_ids = db.session.execute(
+                db.select(Request.id)
+                .where(
+                    Request.status.in_(ARCHIVABLE),
+                    Request.deleted_at.is_(None),
+                    Request.updated_at < cutoff,
+                )
+                .order_by(Request.id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not request_ids:
+                break
+
+            _archive_batch(request_ids, datetime.now(UTC))
+            db.session.commit()
+            # The ORM may still hold the deleted rows
+            db.session.expire_all()
+            archived += len(request_ids)
+            batches += 1
+        return archived, None
+    except Exception as e:
+        db.session.rollback()
+        return archived, f"Error archiving requests: {str(e)}"
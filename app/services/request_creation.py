@@ -0,0 +1,107 @@
+"""
+Create a request and all of its items in one transaction.
+
+All requested inventory rows are loaded in a single query and every line is
+validated before anything is written, so a failed submission never leaves a
+half-created request behind.
+"""
+import uuid
+from collections import defaultdict
+
+from app import db
+from app.models.inventory import Inventory
+from app.models.request import Request, RequestItem, DirectorateEnum
+
+
+def _parse_lines(items, errors):
+    """Turn submitted lines into (inventory_id, quantity) pairs, collecting errors."""
+    lines = []
+    for line_number, item in enumerate(items, start=1):
+        try:
+            inventory_id = int(item.get('inventory_id'))
+        except (TypeError, ValueError):
+            errors.append(f"Line {line_number}: an inventory item is required")
+            continue
+        try:
+            quantity = int(item.get('quantity'))
+        except (TypeError, ValueError):
+            errors.append(f"Line {line_number}: quantity must be a whole number")
+            continue
+        if quantity <= 0:
+            errors.append(f"Line {line_number}: quantity must be greater than zero")
+            continue
+        lines.append((inventory_id, quantity))
+    return lines
+
+
+def create_request(user_id, location, directorate, department, unit, items):
+    """
+    Validate and create a request with its items in a single commit.
+
+    Args:
+        user_id (int): ID of the requesting user
+        location (str): Collection location
+        directorate (str): A DirectorateEnum value
+        department (str, optional): Requesting department
+        unit (str): Requesting unit
+        items (list): Dicts with 'inventory_id' and 'quantity'
+
+    Returns:
+        tuple: (Request or None, list of error messages)
+    """
+    errors = []
+    if not directorate:
+        errors.append('Directorate is required.')
+    else:
+        try:
+            directorate = DirectorateEnum(directorate)
+        except ValueError:
+            errors.append(f"Invalid directorate: {directorate}")
+    if not unit:
+        errors.append('Unit is required.')
+    if not location or not items:
+        errors.append('Location and items are required')
+
+    lines = _parse_lines(items or [], errors)
+    requested = defaultdict(int)
+    for inventory_id, quantity in lines:
+        requested[inventory_id] += quantity
+
+    stock = {}
+    if requested:
+        stock = {
+            row.id: row for row in db.session.query(
+                Inventory.id, Inventory.item_name,
+                (Inventory.quantity - Inventory.reserved_quantity).label('available')
+            ).filter(Inventory.id.in_(requested))
+        }
+    for inventory_id, quantity in requested.items():
+        row = stock.get(inventory_id)
+        if row is None:
+            errors.append('Selected inventory item does not exist.')
+        elif quantity > row.available:
+            errors.append(
+                f"Requested quantity for {row.item_name} exceeds available stock ({row.available})."
+            )
+    if errors:
+        return None, errors
+
+    try:
+        new_request = Request(
+            reference_number=f"REQ-{uuid.uuid4().hex[:8].upper()}",
+            user_id=user_id,
+            location=location,
+            directorate=directorate,
+            department=department,
+            unit=unit
+        )
+        new_request.items = [
+            RequestItem(inventory_id=inventory_id, quantity=quantity, quantity_approved=quantity)
+            for inventory_id, quantity in lines
+        ]
+        db.session.add(new_request)
+        db.session.commit()
+        return new_request, []
+    except Exception as e:
+        db.session.rollback()
+        return None, [f"Error creating request: {str(e)}"]
@@ -0,0 +1,335 @@
+"""
+Bulk approve, reject and collect for requests.
+
+Each operation loads the selected requests and their items in one query,
+validates every request against the current stock, then applies the valid
+ones with bulk UPDATE/INSERT statements and a single commit. Bulk statements
+bypass the flush listeners, so dashboard counters and request events are
+written explicitly. Requests that
+fail validation are skipped and reported; they do not block the rest.
+"""
+from collections import defaultdict
+from datetime import datetime, UTC
+
+from sqlalchemy.orm import selectinload
+
+from app import db, serialization
+from app.models.inventory import Inventory
+from app.models.dashboard_stat import DashboardStat
+from app.models.inventory_change import InventoryChange
+from app.models.inventory_transaction import InventoryTransaction
+from app.models.request_event import RequestEvent
+from app.models.request import Request, RequestItem, RequestStatus, ItemRequestStatus
+
+APPROVABLE = (RequestStatus.PENDING,)
+COLLECTABLE = (RequestStatus.APPROVED, RequestStatus.PARTIALLY_APPROVED)
+
+
+def _load_requests(request_ids):
+    """Load non-deleted requests with their items, keyed by ID, locking the rows."""
+    requests = (
+        Request.query.options(selectinload(Request.items))
+        .filter(Request.id.in_(request_ids), Request.deleted_at.is_(None))
+        .with_for_update()
+        .all()
+    )
+    return {req.id: req for req in requests}
+
+
+def _load_stock(requests, lock=False):
+    """Get current quantity, reservation and name for every item on the given requests."""
+    inventory_ids = {item.inventory_id for req in requests for item in req.items}
+    if not inventory_ids:
+        return {}
+    query = db.session.query(
+        Inventory.id, Inventory.item_name, Inventory.quantity, Inventory.reserved_quantity
+    ).filter(
+        Inventory.id.in_(inventory_ids)
+    )
+    if lock:
+        query = query.with_for_update()
+    return {row.id: row for row in query}
+
+
+def _parse_ids(request_ids):
+    ids = []
+    for request_id in request_ids:
+        try:
+            ids.append(int(request_id))
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid request ID: {request_id}")
+    return list(dict.fromkeys(ids))
+
+
+def _summary(results):
+    succeeded = sum(1 for result in results if result['success'])
+    return {
+        'processed': len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'results': results,
+    }
+
+
+def _result(request_id, req=None, error=None, status=None):
+    return {
+        'request_id': request_id,
+        'reference_number': req.reference_number if req else None,
+        'success': error is None,
+        'status': status.value if status else (req.status.value if req else None),
+        'error': error,
+    }
+
+
+def bulk_approve(approvals, approved_by, admin_message=None):
+    """
+    Approve many pending requests in one transaction.
+
+    Args:
+        approvals (list): Entries of {"request_id": int, "quantities": {item_id: qty}}.
+            Items without a quantity are approved for the requested amount;
+            a quantity of 0 rejects that item.
+        approved_by (int): ID of the approving admin
+        admin_message (str, optional): Message stored on every approved request
+
+    Returns:
+        tuple: (summary dict with per-request results, error message or None)
+    """
+    try:
+        quantities_by_request = {}
+        for entry in approvals:
+            request_id = _parse_ids([entry.get('request_id')])[0]
+            quantities = {}
+            for item_id, quantity in (entry.get('quantities') or {}).items():
+                try:
+                    quantities[int(item_id)] = int(quantity)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Invalid approved quantity for item {item_id} on request {request_id}")
+            quantities_by_request[request_id] = quantities
+
+        requests = _load_requests(list(quantities_by_request))
+        stock = _load_stock(requests.values(), lock=True)
+        # Checked cumulatively so the batch cannot reserve the same stock twice
+        available = {inventory_id: row.quantity - row.reserved_quantity for inventory_id, row in stock.items()}
+        now = datetime.now(UTC)
+        results, request_rows, item_rows = [], [], []
+        reserved = defaultdict(int)
+
+        for request_id, quantities in quantities_by_request.items():
+            req = requests.get(request_id)
+            if not req:
+                results.append(_result(request_id, error="Request not found"))
+                continue
+            if req.status not in APPROVABLE:
+                results.append(_result(request_id, req, error=f"Cannot approve a {req.status.value} request"))
+                continue
+            unknown = set(quantities) - {item.id for item in req.items}
+            if unknown:
+                results.append(_result(request_id, req, error=f"Items not on this request: {sorted(unknown)}"))
+                continue
+
+            error = None
+            decisions = []
+            deltas = defaultdict(int)
+            for item in req.items:
+                quantity = quantities.get(item.id, item.quantity_approved)
+                if quantity < 0:
+                    error = f"Approved quantity for item {item.id} cannot be negative"
+                    break
+                decisions.append((item, quantity))
+                deltas[item.inventory_id] += quantity - item.reserved_amount()
+            if not error:
+                short = [inventory_id for inventory_id, delta in deltas.items()
+                         if delta > 0 and (inventory_id not in available or available[inventory_id] < delta)]
+                if short:
+                    names = ', '.join(
+                        stock[inventory_id].item_name if inventory_id in stock else str(inventory_id)
+                        for inventory_id in short
+                    )
+                    error = f"Insufficient inventory for {names}"
+            if error:
+                results.append(_result(request_id, req, error=error))
+                continue
+
+            for inventory_id, delta in deltas.items():
+                available[inventory_id] = available.get(inventory_id, 0) - delta
+                reserved[inventory_id] += delta
+
+            approved = [quantity > 0 for _, quantity in decisions]
+            if all(approved):
+                status, approver = RequestStatus.APPROVED, approved_by
+            elif not any(approved):
+                status, approver = RequestStatus.REJECTED, None
+            else:
+                status, approver = RequestStatus.PARTIALLY_APPROVED, approved_by
+
+            request_row = {'id': req.id, 'status': status, 'approved_by': approver, 'updated_at': now}
+            if admin_message:
+                request_row['admin_message'] = admin_message
+            request_rows.append(request_row)
+            item_rows.extend(
+                {'id': item.id,
+                 'status': ItemRequestStatus.APPROVED if quantity > 0 else ItemRequestStatus.REJECTED,
+                 'quantity_approved': quantity, 'updated_at': now}
+                for item, quantity in decisions
+            )
+            results.append(_result(request_id, req, status=status))
+
+        with DashboardStat.track(request_ids=[row['id'] for row in request_rows]):
+            if request_rows:
+                db.session.execute(db.update(Request), request_rows)
+        if item_rows:
+            db.session.execute(db.update(RequestItem), item_rows)
+        Inventory.adjust_reserved(reserved)
+        RequestEvent.record(row['id'] for row in request_rows)
+        db.session.commit()
+        return _summary(results), None
+    except ValueError as e:
+        db.session.rollback()
+        return None, str(e)
+    except Exception as e:
+        db.session.rollback()
+        return None, f"Error approving requests: {str(e)}"
+
+
+def bulk_reject(request_ids, admin_message=None):
+    """
+    Reject many pending requests in one transaction.
+
+    Returns:
+        tuple: (summary dict with per-request results, error message or None)
+    """
+    try:
+        ids = _parse_ids(request_ids)
+        requests = _load_requests(ids)
+        now = datetime.now(UTC)
+        results, request_rows, item_rows = [], [], []
+        released = defaultdict(int)
+
+        for request_id in ids:
+            req = requests.get(request_id)
+            if not req:
+                results.append(_result(request_id, error="Request not found"))
+                continue
+            if req.status not in APPROVABLE:
+                results.append(_result(request_id, req, error=f"Cannot reject a {req.status.value} request"))
+                continue
+            request_row = {'id': req.id, 'status': RequestStatus.REJECTED, 'approved_by': None, 'updated_at': now}
+            if admin_message:
+                request_row['admin_message'] = admin_message
+            request_rows.append(request_row)
+            for item in req.items:
+                released[item.inventory_id] -= item.reserved_amount()
+                item_rows.append(
+                    {'id': item.id, 'status': ItemRequestStatus.REJECTED, 'quantity_approved': 0, 'updated_at': now}
+                )
+            results.append(_result(request_id, req, status=RequestStatus.REJECTED))
+
+        with DashboardStat.track(request_ids=[row['id'] for row in request_rows]):
+            if request_rows:
+                db.session.execute(db.update(Request), request_rows)
+        if item_rows:
+            db.session.execute(db.update(RequestItem), item_rows)
+        Inventory.adjust_reserved(released)
+        RequestEvent.record(row['id'] for row in request_rows)
+        db.session.commit()
+        return _summary(results), None
+    except ValueError as e:
+        db.session.rollback()
+        return None, str(e)
+    except Exception as e:
+        db.session.rollback()
+        return None, f"Error rejecting requests: {str(e)}"
+
+
+def bulk_collect(request_ids, performed_by, admin_note=None):
+    """
+    Mark many approved requests as collected in one transaction.
+
+    Stock is checked cumulatively in request order, so two requests that
+    each fit the current stock but not together are not both collected.
+    Approved items become collected, inventory is decremented once per item
+    and an 'issue' transaction is written for each collected item.
+
+    Returns:
+        tuple: (summary dict with per-request results, error message or None)
+    """
+    try:
+        ids = _parse_ids(request_ids)
+        requests = _load_requests(ids)
+        stock = _load_stock(requests.values(), lock=True)
+        remaining = {inventory_id: row.quantity for inventory_id, row in stock.items()}
+        performer = serialization.user_summary(performed_by)
+        note = f"Collected by {performer.name}" if performer else None
+        now = datetime.now(UTC)
+        results, request_rows, item_rows, transaction_rows = [], [], [], []
+        issued = defaultdict(int)
+        released = defaultdict(int)
+
+        for request_id in ids:
+            req = requests.get(request_id)
+            if not req:
+                results.append(_result(request_id, error="Request not found"))
+                continue
+            if req.status not in COLLECTABLE:
+                results.append(_result(
+                    request_id, req,
+                    error="Only approved or partially approved requests can be marked as collected"
+                ))
+                continue
+
+            collected = [item for item in req.items if item.status == ItemRequestStatus.APPROVED]
+            needed = defaultdict(int)
+            for item in collected:
+                needed[item.inventory_id] += item.quantity_approved
+            short = [inventory_id for inventory_id, quantity in needed.items()
+                     if remaining.get(inventory_id, 0) < quantity]
+            if short:
+                names = ', '.join(
+                    stock[inventory_id].item_name if inventory_id in stock else str(inventory_id)
+                    for inventory_id in short
+                )
+                results.append(_result(request_id, req, error=f"Insufficient inventory for {names}"))
+                continue
+
+            for inventory_id, quantity in needed.items():
+                remaining[inventory_id] -= quantity
+                issued[inventory_id] += quantity
+            request_row = {'id': req.id, 'status': RequestStatus.COLLECTED, 'updated_at': now}
+            if admin_note:
+                request_row['admin_message'] = admin_note
+            request_rows.append(request_row)
+            for item in collected:
+                released[item.inventory_id] -= item.reserved_amount()
+                item_rows.append({'id': item.id, 'status': ItemRequestStatus.COLLECTED, 'updated_at': now})
+                transaction_rows.append({
+                    'inventory_id': item.inventory_id, 'transaction_type': 'issue',
+                    'quantity': -item.quantity_approved, 'related_request_id': req.id,
+                    'performed_by': performed_by, 'timestamp': now, 'note': note,
+                })
+            results.append(_result(request_id, req, status=RequestStatus.COLLECTED))
+
+        with DashboardStat.track(inventory_ids=issued, request_ids=[row['id'] for row in request_rows]):
+            if request_rows:
+                db.session.execute(db.update(Request), request_rows)
+            if issued:
+                db.session.execute(db.update(Inventory), [
+                    {'id': inventory_id, 'quantity': remaining[inventory_id], 'updated_at': now}
+                    for inventory_id in issued
+                ])
+                # Bulk UPDATEs bypass the flush listener, so log the feed entries directly
+                InventoryChange.record(issued)
+        if item_rows:
+            db.session.execute(db.update(RequestItem), item_rows)
+        Inventory.adjust_reserved(released)
+        RequestEvent.record(row['id'] for row in request_rows)
+        if transaction_rows:
+            db.session.execute(db.insert(InventoryTransaction), transaction_rows)
+        db.session.commit()
+        return _summary(results), None
+    except ValueError as e:
+        db.session.rollback()
+        return None, str(e)
+    except Exception as e:
+        db.session.rollback()
+        return None, f"Error collecting requests: {str(e)}"
@@ -0,0 +1,755 @@
+"""
+Import monthly stock reports (CSV) into a category.
+
+Each report row describes one item for one month: opening stock, purchases,
+issues and closing stock. The first report for an item creates it with an
+'initial' transaction; later months add an 'adjustment' when the opening
+stock differs from the stock on record. Purchases become 'purchase'
+transactions, issues a collected request with an 'issue' transaction, and the
+item ends up holding the closing stock. A report for a month older than the
+latest one imported for an item only adds that month's purchases and issues,
+so reports can be imported in any order. Items are matched by name, ignoring
+case and spacing.
+
+Every imported row is kept in ``stock_import_rows`` with a hash of its
+figures. Importing a month again skips unchanged rows; in upsert mode a
+changed row writes only its differences from the previous import, so
+re-running a corrected report is cheap and deletes nothing.
+
+Rows are streamed and written in batches with set-based statements: one
+multi-row INSERT or UPDATE per table per batch. New IDs are read back by each
+table's unique key (item name, request reference number), which works on
+every backend, including MySQL where multi-row INSERT ... RETURNING is not
+available. The statements bypass the ORM, so the dashboard counters, item
+change feed and request events are updated explicitly, in the same
+transaction as each batch.
+
+Several files (a directory or glob of monthly reports) are scanned for
+their report dates and then parsed and validated in a process pool, while
+the main process loads them one at a time, oldest report first. Parsing
+runs only a few files ahead of the loader and each file's rows are dropped
+once it is loaded, so memory use does not grow with the number of files.
+Each file's progress is checkpointed in ``stock_import_files``, so an
+interrupted import resumes after its last committed batch and files already
+imported are skipped by content hash.
+"""
+import csv
+import glob
+import hashlib
+import os
+import time as clock
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, UTC
+from decimal import Decimal, InvalidOperation
+
+from app import db
+from app.models.cache_version import CacheVersion
+from app.models.consumption_cube import ConsumptionCube
+from app.models.dashboard_stat import DashboardStat
+from app.models.inventory import Inventory
+from app.models.inventory_change import InventoryChange
+from app.models.inventory_transaction import InventoryTransaction
+from app.models.request import Request, RequestItem, DirectorateEnum, RequestStatus, ItemRequestStatus
+from app.models.request_event import RequestEvent
+from app.models.stock_import_file import StockImportFile
+from app.models.stock_import_row import StockImportRow
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def _chunks(values, size):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def read_rows(path):
+    """
+    Stream rows from a stock report CSV.
+
+    Yields:
+        tuple: (CSV line number, row dict)
+    """
+    with open(path, mode='r', encoding='utf-8-sig', newline='') as csvfile:
+        for row_number, row in enumerate(csv.DictReader(csvfile), start=2):
+            yield row_number, row
+
+
+def _whole_number(value):
+    return int(float(value or 0))
+
+
+def parse_row(row):
+    """
+    Validate one report row.
+
+    Returns:
+        tuple: (dict of typed values or None, error message or None)
+    """
+    item_name = (row.get('Item Name') or '').strip()
+    if not item_name:
+        return None, "'Item Name' is missing"
+    report_date = (row.get('Report Start Date') or '').strip()
+    if not report_date:
+        return None, "'Report Start Date' is missing"
+    try:
+        return {
+            'item_name': item_name,
+            'description': row.get('DESCRIPTION'),
+            'report_date': datetime.strptime(report_date, '%Y-%m-%d'),
+            'opening_stock': _whole_number(row.get('Opening Stock')),
+            'purchases': _whole_number(row.get('Purchases')),
+            'issued': _whole_number(row.get('Issued')),
+            'closing_stock': _whole_number(row.get('Closing Stock')),
+            'unit_price': Decimal(row.get('Unit Price') or '0.0'),
+        }, None
+    except (ValueError, TypeError, InvalidOperation) as e:
+        return None, f"invalid value: {e}"
+
+
+def normalize_item_name(name):
+    """Case-fold an item name and collapse runs of whitespace."""
+    return ' '.join((name or '').casefold().split())
+
+
+def report_month(row):
+    """Get the first day of a parsed row's report month."""
+    return date(row['report_date'].year, row['report_date'].month, 1)
+
+
+def row_hash(row):
+    """Fingerprint the figures of a parsed row."""
+    figures = (row['opening_stock'], row['purchases'], row['issued'], row['closing_stock'],
+               row['unit_price'].quantize(Decimal('0.01')))
+    return hashlib.sha256('|'.join(str(value) for value in figures).encode('utf-8')).hexdigest()
+
+
+def _parsed(rows):
+    for row_number, raw in rows:
+        row, error = parse_row(raw)
+        yield row_number, row, error
+
+
+def file_hash(path):
+    """Get the SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, mode='rb') as report:
+        for block in iter(lambda: report.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_file(path):
+    """
+    Find the earliest report date in a report file, streaming its rows.
+
+    Runs in worker processes, so it touches neither the app nor the database.
+
+    Returns:
+        tuple: (path, earliest report date or None)
+    """
+    earliest = None
+    for _, row in read_rows(path):
+        try:
+            report_date = datetime.strptime((row.get('Report Start Date') or '').strip(), '%Y-%m-%d')
+        except ValueError:
+            continue
+        if earliest is None or report_date < earliest:
+            earliest = report_date
+    return path, earliest
+
+
+def parse_file(path, resume_after=0):
+    """
+    Parse and validate the rows of a report file that come after a row number.
+
+    Runs in worker processes, so it touches neither the app nor the database.
+
+    Returns:
+        list: (row number, parsed row or None, error message or None) tuples
+    """
+    return list(_parsed(entry for entry in read_rows(path) if entry[0] > resume_after))
+
+
+def collect_files(source):
+    """
+    Expand a CSV path, a directory of CSV files or a glob pattern.
+
+    Returns:
+        list: File paths, sorted
+    """
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, '*.csv')))
+    if any(character in source for character in '*?['):
+        return sorted(path for path in glob.glob(source) if os.path.isfile(path))
+    return [source]
+
+
+def clear_category(category_id, chunk_size=DEFAULT_BATCH_SIZE):
+    """
+    Delete a category's items with their transactions and the requests that include them.
+
+    Deletes run in chunks of IDs, each a single set-based statement.
+    Transactions of other items that point at a deleted request are kept
+    and unlinked from it, and stock reserved by the request's approved items
+    is released. The category's file import records are removed too, so the
+    same reports can be imported again. The caller commits.
+
+    Returns:
+        dict: Number of items, requests and transactions deleted
+    """
+    table = InventoryTransaction.__table__
+    inventory_ids = db.session.scalars(db.select(Inventory.id).where(Inventory.category_id == category_id)).all()
+    request_ids = set()
+    for chunk in _chunks(inventory_ids, chunk_size):
+        request_ids.update(db.session.scalars(
+            db.select(RequestItem.request_id).where(RequestItem.inventory_id.in_(chunk)).distinct()
+        ))
+    counts = {'items': len(inventory_ids), 'requests': len(request_ids), 'transactions': 0}
+
+    for chunk in _chunks(inventory_ids, chunk_size):
+        counts['transactions'] += db.session.execute(table.delete().where(table.c.inventory_id.in_(chunk))).rowcount
+
+    for chunk in _chunks(sorted(request_ids), chunk_size):
+        # Approved items of these requests, in any category, hold stock that is now free again
+        reserved = db.session.execute(
+            db.select(RequestItem.inventory_id, db.func.sum(RequestItem.quantity_approved))
+            .join(Request, RequestItem.request_id == Request.id)
+            .where(RequestItem.request_id.in_(chunk), RequestItem.status == ItemRequestStatus.APPROVED,
+                   Request.deleted_at.is_(None))
+            .group_by(RequestItem.inventory_id)
+        ).all()
+        Inventory.adjust_reserved({inventory_id: -int(quantity or 0) for inventory_id, quantity in reserved})
+        RequestEvent.record(chunk, RequestEvent.DELETED)
+        db.session.execute(
+            table.update().where(table.c.related_request_id.in_(chunk)).values(related_request_id=None)
+        )
+        with DashboardStat.track(request_ids=chunk):
+            db.session.execute(RequestItem.__table__.delete().where(RequestItem.__table__.c.request_id.in_(chunk)))
+            db.session.execute(Request.__table__.delete().where(Request.__table__.c.id.in_(chunk)))
+
+    rows_table = StockImportRow.__table__
+    for chunk in _chunks(inventory_ids, chunk_size):
+        db.session.execute(rows_table.delete().where(rows_table.c.inventory_id.in_(chunk)))
+        with DashboardStat.track(inventory_ids=chunk):
+            db.session.execute(Inventory.__table__.delete().where(Inventory.__table__.c.id.in_(chunk)))
+        InventoryChange.record(chunk, InventoryChange.DELETE)
+
+    db.session.execute(StockImportFile.__table__.delete().where(StockImportFile.__table__.c.category_id == category_id))
+    # Issues were deleted or unlinked from their requests
+    ConsumptionCube.invalidate()
+    CacheVersion.bump(CacheVersion.CATALOG)
+    CacheVersion.bump(CacheVersion.PURCHASES)
+    return counts
+
+
+def _create_requests(rows, item_ids, requester_id, location, directorate):
+    """
+    Insert a collected request with one item for each row's issued quantity.
+
+    Returns:
+        dict: row number -> request ID
+    """
+    references = {
+        row_number: f"REQ-IMPORT-{item_ids[row_number]}-{row['report_date']:%Y%m}-{row_number}"
+        for row_number, row in rows
+    }
+    if not references:
+        return {}
+    db.session.execute(Request.__table__.insert(), [
+        {
+            'reference_number': references[row_number], 'user_id': requester_id, 'location': location,
+            'directorate': directorate, 'unit': directorate.value,
+            # Historical issues have already been collected
+            'status': RequestStatus.COLLECTED,
+            'created_at': row['report_date'], 'updated_at': row['report_date'],
+        }
+        for row_number, row in rows
+    ])
+    ids = dict(db.session.execute(
+        db.select(Request.reference_number, Request.id).where(Request.reference_number.in_(references.values()))
+    ).all())
+    request_ids = {row_number: ids[reference] for row_number, reference in references.items()}
+    db.session.execute(RequestItem.__table__.insert(), [
+        {
+            'request_id': request_ids[row_number], 'inventory_id': item_ids[row_number],
+            'quantity': row['issued'], 'quantity_approved': row['issued'],
+            'status': ItemRequestStatus.COLLECTED, 'created_at': row['report_date'],
+            'updated_at': row['report_date'],
+        }
+        for row_number, row in rows
+    ])
+    return request_ids
+
+
+def _row_record(row, inventory_id, request_id):
+    return {
+        'inventory_id': inventory_id, 'report_month': report_month(row), 'row_hash': row_hash(row),
+        'opening_stock': row['opening_stock'], 'purchases': row['purchases'], 'issued': row['issued'],
+        'closing_stock': row['closing_stock'], 'unit_price': row['unit_price'], 'request_id': request_id,
+        'imported_at': datetime.now(UTC),
+    }
+
+
+def _insert_rows(rows, items, quantities, latest_months, category_id, admin_id, requester_id, location,
+                 directorate):
+    """
+    Write report months not imported before, creating items that do not exist yet.
+
+    A month older than the latest one imported for an item is history: only
+    its purchases and issues are recorded, and the item's quantity and price
+    are left as the later report set them.
+
+    Args:
+        rows (list): (row number, parsed row) pairs
+        items (dict): normalized item name -> inventory ID; new items are added to it
+        quantities (dict): inventory ID -> quantity on record, for existing items
+        latest_months (dict): inventory ID -> latest report month imported, for existing items
+
+    Returns:
+        tuple: (number of transactions inserted, inventory IDs touched, request IDs created)
+    """
+    item_ids = {
+        row_number: items[normalize_item_name(row['item_name'])]
+        for row_number, row in rows if normalize_item_name(row['item_name']) in items
+    }
+    existing = set(item_ids)
+    older = {
+        row_number for row_number, row in rows
+        if row_number in existing and report_month(row) < latest_months.get(item_ids[row_number], date.min)
+    }
+    new_rows = [(row_number, row) for row_number, row in rows if row_number not in existing]
+    if new_rows:
+        db.session.execute(Inventory.__table__.insert(), [
+            {
+                'item_name': row['item_name'], 'description': row['description'], 'quantity': row['closing_stock'],
+                'reserved_quantity': 0, 'unit_price': row['unit_price'], 'category_id': category_id,
+                'location': location, 'created_by': admin_id, 'updated_by': admin_id,
+                'created_at': row['report_date'], 'updated_at': row['report_date'],
+            }
+            for _, row in new_rows
+        ])
+        ids = dict(db.session.execute(
+            db.select(Inventory.item_name, Inventory.id)
+            .where(Inventory.item_name.in_([row['item_name'] for _, row in new_rows]))
+        ).all())
+        for row_number, row in new_rows:
+            item_ids[row_number] = ids[row['item_name']]
+            items[normalize_item_name(row['item_name'])] = ids[row['item_name']]
+
+    current = existing - older
+    if current:
+        table = Inventory.__table__
+        with DashboardStat.track(inventory_ids=[item_ids[row_number] for row_number in current]):
+            db.session.execute(
+                table.update()
+                .where(table.c.id == db.bindparam('b_id'))
+                .values(quantity=db.bindparam('b_quantity'), unit_price=db.bindparam('b_unit_price'),
+                        updated_by=admin_id, updated_at=db.bindparam('b_updated_at')),
+                [
+                    {'b_id': item_ids[row_number], 'b_quantity': row['closing_stock'],
+                     'b_unit_price': row['unit_price'], 'b_updated_at': row['report_date']}
+                    for row_number, row in rows if row_number in current
+                ]
+            )
+
+    request_ids = _create_requests(
+        [(row_number, row) for row_number, row in rows if row['issued'] > 0],
+        item_ids, requester_id, location, directorate
+    )
+
+    transactions = []
+    for row_number, row in rows:
+        report = f"{row['report_date']:%B %Y} report"
+        common = {'inventory_id': item_ids[row_number], 'performed_by': admin_id,
+                  'timestamp': row['report_date'], 'related_request_id': None}
+        # Months older than the latest import only add their movements
+        if row_number in current:
+            difference = row['opening_stock'] - quantities.get(item_ids[row_number], 0)
+            if difference:
+                transactions.append({**common, 'transaction_type': 'adjustment', 'quantity': difference,
+                                     'note': f"Opening stock reconciled with {report}."})
+        elif row_number not in existing and row['opening_stock'] > 0:
+            transactions.append({**common, 'transaction_type': 'initial', 'quantity': row['opening_stock'],
+                                 'note': f"Initial stock from {report}."})
+        if row['purchases'] > 0:
+            transactions.append({**common, 'transaction_type': 'purchase', 'quantity': row['purchases'],
+                                 'note': f"Purchases from {report}."})
+        if row['issued'] > 0:
+            transactions.append({**common, 'transaction_type': 'issue', 'quantity': -row['issued'],
+                                 'note': f"Issued stock from {report}.",
+                                 'related_request_id': request_ids[row_number]})
+    if transactions:
+        db.session.execute(InventoryTransaction.__table__.insert(), transactions)
+    db.session.execute(StockImportRow.__table__.insert(), [
+        _row_record(row, item_ids[row_number], request_ids.get(row_number)) for row_number, row in rows
+    ])
+
+    connection = db.session.connection()
+    new_ids = [item_ids[row_number] for row_number, _ in new_rows]
+    DashboardStat.apply(DashboardStat.snapshot(connection, new_ids, request_ids.values()), connection=connection)
+    return len(transactions), set(item_ids.values()), set(request_ids.values())
+
+
+def _revise_rows(revisions, admin_id, requester_id, location, directorate):
+    """
+    Apply changed figures for report months that were imported before.
+
+    Only the differences from the previous import are written: an
+    'adjustment' for the opening stock, a 'purchase' and an 'issue'
+    transaction for the change in purchases and issues, the month's request
+    quantity, and the change in closing stock added to the item's quantity,
+    so stock movements recorded since then are kept.
+
+    Args:
+        revisions (list): (row number, parsed row, previous StockImportRow) triples
+
+    Returns:
+        tuple: (number of transactions inserted, inventory IDs touched, request IDs created)
+    """
+    now = datetime.now(UTC)
+    item_ids = {row_number: record.inventory_id for row_number, _, record in revisions}
+    table = Inventory.__table__
+    with DashboardStat.track(inventory_ids=item_ids.values()):
+        db.session.execute(
+            table.update()
+            .where(table.c.id == db.bindparam('b_id'))
+            .values(quantity=table.c.quantity + db.bindparam('b_delta'), unit_price=db.bindparam('b_unit_price'),
+                    updated_by=admin_id, updated_at=now),
+            [
+                {'b_id': record.inventory_id, 'b_delta': row['closing_stock'] - record.closing_stock,
+                 'b_unit_price': row['unit_price']}
+                for _, row, record in revisions
+            ]
+        )
+
+    request_ids = {row_number: record.request_id for row_number, _, record in revisions if record.request_id}
+    changed_requests = [
+        {'b_request_id': request_ids[row_number], 'b_inventory_id': record.inventory_id, 'b_issued': row['issued']}
+        for row_number, row, record in revisions if row_number in request_ids and row['issued'] != record.issued
+    ]
+    if changed_requests:
+        items_table = RequestItem.__table__
+        db.session.execute(
+            items_table.update()
+            .where(items_table.c.request_id == db.bindparam('b_request_id'),
+                   items_table.c.inventory_id == db.bindparam('b_inventory_id'))
+            .values(quantity=db.bindparam('b_issued'), quantity_approved=db.bindparam('b_issued'), updated_at=now),
+            changed_requests
+        )
+    created = _create_requests(
+        [(row_number, row) for row_number, row, _ in revisions if row_number not in request_ids and row['issued'] > 0],
+        item_ids, requester_id, location, directorate
+    )
+    request_ids.update(created)
+
+    transactions = []
+    for row_number, row, record in revisions:
+        report = f"{row['report_date']:%B %Y} report"
+        common = {'inventory_id': record.inventory_id, 'performed_by': admin_id,
+                  'timestamp': row['report_date'], 'related_request_id': None}
+        for transaction_type, field, sign, label in (
+            ('adjustment', 'opening_stock', 1, 'Opening stock'),
+            ('purchase', 'purchases', 1, 'Purchases'),
+            ('issue', 'issued', -1, 'Issued stock'),
+        ):
+            difference = row[field] - getattr(record, field)
+            if difference:
+                transactions.append({
+                    **common, 'transaction_type': transaction_type, 'quantity': sign * difference,
+                    'note': f"{label} revised in {report} (was {getattr(record, field)}).",
+                    'related_request_id': request_ids.get(row_number) if field == 'issued' else None,
+                })
+    if transactions:
+        db.session.execute(InventoryTransaction.__table__.insert(), transactions)
+
+    records = StockImportRow.__table__
+    db.session.execute(
+        records.update().where(records.c.id == db.bindparam('b_id')).values(
+            row_hash=db.bindparam('b_row_hash'), opening_stock=db.bindparam('b_opening_stock'),
+            purchases=db.bindparam('b_purchases'), issued=db.bindparam('b_issued'),
+            closing_stock=db.bindparam('b_closing_stock'), unit_price=db.bindparam('b_unit_price'),
+            request_id=db.bindparam('b_request_id'), imported_at=now
+        ),
+        [
+            {'b_id': record.id, 'b_row_hash': row_hash(row), 'b_opening_stock': row['opening_stock'],
+             'b_purchases': row['purchases'], 'b_issued': row['issued'], 'b_closing_stock': row['closing_stock'],
+             'b_unit_price': row['unit_price'], 'b_request_id': request_ids.get(row_number)}
+            for row_number, row, record in revisions
+        ]
+    )
+
+    connection = db.session.connection()
+    DashboardStat.apply(DashboardStat.snapshot(connection, request_ids=created.values()), connection=connection)
+    return len(transactions), set(item_ids.values()), set(created.values())
+
+
+def _write_batch(batch, items, upsert, category_id, admin_id, requester_id, location, directorate):
+    """
+    Sort a batch into new, unchanged and changed report months and write it in the current transaction.
+
+    Returns:
+        dict: 'written', 'updated' and 'unchanged' row counts, 'transactions'
+            inserted, and 'rejected' as (row number, error) pairs
+    """
+    outcome = {'written': 0, 'updated': 0, 'unchanged': 0, 'transactions': 0, 'rejected': []}
+    matched = {items[key] for key in (normalize_item_name(row['item_name']) for _, row in batch) if key in items}
+    quantities, latest_months, previous = {}, {}, {}
+    if matched:
+        quantities = dict(db.session.execute(
+            db.select(Inventory.id, Inventory.quantity).where(Inventory.id.in_(matched))
+        ).all())
+        latest_months = dict(db.session.execute(
+            db.select(StockImportRow.inventory_id, db.func.max(StockImportRow.report_month))
+            .where(StockImportRow.inventory_id.in_(matched))
+            .group_by(StockImportRow.inventory_id)
+        ).all())
+        for record in StockImportRow.query.filter(
+            StockImportRow.inventory_id.in_(matched),
+            StockImportRow.report_month.in_({report_month(row) for _, row in batch})
+        ):
+            previous[(record.inventory_id, record.report_month)] = record
+
+    new_rows, revisions = [], []
+    for row_number, row in batch:
+        record = previous.get((items.get(normalize_item_name(row['item_name'])), report_month(row)))
+        if record is None:
+            new_rows.append((row_number, row))
+        elif record.row_hash == row_hash(row):
+            outcome['unchanged'] += 1
+        elif upsert:
+            revisions.append((row_number, row, record))
+        else:
+            outcome['rejected'].append((
+                row_number,
+                f"'{row['item_name']}' was already imported for {row['report_date']:%B %Y} with different "
+                f"figures; import in upsert mode to apply the changes"
+            ))
+
+    inventory_ids, request_ids = set(), set()
+    for rows, write in (
+        (new_rows, lambda: _insert_rows(new_rows, items, quantities, latest_months, category_id, admin_id,
+                                        requester_id, location, directorate)),
+        (revisions, lambda: _revise_rows(revisions, admin_id, requester_id, location, directorate)),
+    ):
+        if rows:
+            transactions, touched_items, created_requests = write()
+            outcome['transactions'] += transactions
+            inventory_ids |= touched_items
+            request_ids |= created_requests
+    outcome['written'] = len(new_rows) + len(revisions)
+    outcome['updated'] = len(revisions)
+
+    if outcome['written']:
+        connection = db.session.connection()
+        InventoryChange.record(inventory_ids, connection=connection)
+        RequestEvent.record(request_ids, connection=connection)
+        CacheVersion.bump(CacheVersion.CATALOG)
+        CacheVersion.bump(CacheVersion.PURCHASES)
+    return outcome
+
+
+def load_rows(rows, category_id, admin_id, requester_id, location='Headquarters',
+              directorate=DirectorateEnum.ACE, month=None, batch_size=DEFAULT_BATCH_SIZE, upsert=False,
+              checkpoint=None):
+    """
+    Write parsed report rows in batches, committing after each batch.
+
+    Items are matched by normalized name (case and spacing are ignored). A
+    row for a month not imported before creates the item or adds that
+    month's movements to it. A row for a month that was imported before is
+    skipped when its figures are unchanged; when they differ it is rejected,
+    or in upsert mode its differences are applied. An item appearing twice
+    in the rows is rejected the second time.
+
+    Args:
+        rows (iterable): (row number, parsed row or None, error or None) triples
+        category_id (int): Category new items are created in
+        admin_id (int): User recorded as creating the items and transactions
+        requester_id (int): User the historical issue requests are filed under
+        location (str): Location of new items and of the requests
+        directorate (DirectorateEnum): Directorate of the issue requests
+        month (tuple, optional): (year, month) to import; other rows are skipped
+        batch_size (int): Rows written per transaction
+        upsert (bool): Apply changed figures for months imported before
+        checkpoint (callable, optional): Called as ``checkpoint(last row number,
+            imported, rejected)`` before each commit, to record progress in
+            the same transaction
+
+    Returns:
+        tuple: (summary dict, list of {'row', 'error'} dicts for rejected rows)
+    """
+    started = clock.monotonic()
+    summary = {'rows': 0, 'imported': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'rejected': 0,
+               'transactions': 0, 'batches': 0}
+    errors = []
+    seen = set()
+    batch = []
+    progress = {'last_row': 0, 'checkpointed': 0, 'rejected': 0}
+    items = {}
+    # Lowest ID wins when existing names differ only in case or spacing
+    for inventory_id, item_name in db.session.execute(
+        db.select(Inventory.id, Inventory.item_name).order_by(Inventory.id.desc())
+    ):
+        items[normalize_item_name(item_name)] = inventory_id
+
+    def reject(row_number, error):
+        errors.append({'row': row_number, 'error': error})
+        summary['rejected'] += 1
+        progress['rejected'] += 1
+
+    def flush():
+        if not batch and (checkpoint is None or progress['last_row'] <= progress['checkpointed']):
+            return
+        snapshot = dict(items)
+        try:
+            outcome = None
+            if batch:
+                outcome = _write_batch(batch, items, upsert, category_id, admin_id, requester_id, location,
+                                       directorate)
+                for row_number, error in outcome['rejected']:
+                    reject(row_number, error)
+            if checkpoint:
+                checkpoint(progress['last_row'], outcome['written'] if outcome else 0, progress['rejected'])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            items.clear()
+            items.update(snapshot)
+            rejected = {row_number for row_number, _ in outcome['rejected']} if outcome else set()
+            for row_number, _ in batch:
+                if row_number not in rejected:
+                    reject(row_number, f"batch not imported: {e}")
+        else:
+            if outcome:
+                summary['transactions'] += outcome['transactions']
+                summary['imported'] += outcome['written']
+                summary['updated'] += outcome['updated']
+                summary['unchanged'] += outcome['unchanged']
+                summary['batches'] += 1 if outcome['written'] else 0
+            progress['checkpointed'], progress['rejected'] = progress['last_row'], 0
+        batch.clear()
+
+    for row_number, row, error in rows:
+        summary['rows'] += 1
+        progress['last_row'] = row_number
+        if error:
+            reject(row_number, error)
+            continue
+        if month and (row['report_date'].year, row['report_date'].month) != month:
+            summary['skipped'] += 1
+            continue
+        key = normalize_item_name(row['item_name'])
+        if key in seen:
+            reject(row_number, f"item '{row['item_name']}' appears more than once")
+            continue
+        seen.add(key)
+        batch.append((row_number, row))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    elapsed = clock.monotonic() - started
+    summary['seconds'] = round(elapsed, 2)
+    summary['rows_per_second'] = round(summary['rows'] / elapsed) if elapsed > 0 else summary['rows']
+    return summary, errors
+
+
+def import_rows(rows, category_id, admin_id, requester_id, **options):
+    """
+    Import raw report rows, e.g. from ``read_rows``. Options are those of ``load_rows``.
+
+    Returns:
+        tuple: (summary dict, list of {'row', 'error'} dicts for rejected rows)
+    """
+    return load_rows(_parsed(rows), category_id, admin_id, requester_id, **options)
+
+
+def import_files(paths, category_id, admin_id, requester_id, workers=DEFAULT_WORKERS, **options):
+    """
+    Import several report files, oldest report first, resuming where a previous run stopped.
+
+    Files whose content was already imported into the category are skipped.
+    The others are scanned for their report dates and parsed in a pool of
+    ``workers`` processes, at most ``workers`` files ahead of the loader,
+    which writes them one at a time with a checkpoint after every batch; a
+    file left unfinished by an interrupted run continues after its last
+    checkpoint. With one worker, each file is streamed in the main process.
+    Options are those of ``load_rows``.
+
+    Returns:
+        tuple: (summary dict with totals and a 'files' list,
+                list of {'file', 'row', 'error'} dicts for rejected rows)
+    """
+    started = clock.monotonic()
+    totals = {'rows': 0, 'imported': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'rejected': 0,
+              'transactions': 0, 'batches': 0}
+    summary = {**totals, 'files': [], 'skipped_files': 0, 'resumed_files': 0}
+    errors = []
+
+    hashes = {path: file_hash(path) for path in paths}
+    records = StockImportFile.for_hashes(category_id, set(hashes.values()))
+    pending, queued = [], set()
+    for path in paths:
+        content_hash = hashes[path]
+        record = records.get(content_hash)
+        if content_hash in queued or (record and record.status == StockImportFile.COMPLETED):
+            summary['skipped_files'] += 1
+            summary['files'].append({'file': path, 'status': 'skipped'})
+            continue
+        queued.add(content_hash)
+        pending.append(path)
+
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(pending))) if workers > 1 and len(pending) > 1 else None
+    try:
+        if pool:
+            report_dates = dict(pool.map(scan_file, pending))
+        else:
+            report_dates = dict(scan_file(path) for path in pending)
+        pending.sort(key=lambda path: (report_dates[path] is None, report_dates[path] or datetime.min, path))
+        resume_after = {
+            path: records[hashes[path]].last_row if hashes[path] in records else 0 for path in pending
+        }
+
+        parsing = {}
+        for position, path in enumerate(pending):
+            if pool:
+                # Keep the pool parsing the next files while this one loads
+                for upcoming in pending[position:position + workers]:
+                    if upcoming not in parsing:
+                        parsing[upcoming] = pool.submit(parse_file, upcoming, resume_after[upcoming])
+                rows = parsing.pop(path).result()
+            else:
+                rows = _parsed(entry for entry in read_rows(path) if entry[0] > resume_after[path])
+
+            record = records.get(hashes[path])
+            resumed = record is not None
+            if record is None:
+                record = StockImportFile(
+                    category_id=category_id, content_hash=hashes[path], filename=os.path.basename(path)[:255],
+                    report_date=report_dates[path], imported_by=admin_id
+                )
+                db.session.add(record)
+                db.session.commit()
+            file_summary, file_errors = load_rows(
+                rows, category_id, admin_id, requester_id, checkpoint=record.checkpoint, **options
+            )
+            # The file's rows are not needed once it is loaded
+            del rows
+            record.complete()
+            db.session.commit()
+
+            for key in totals:
+                summary[key] += file_summary[key]
+            summary['resumed_files'] += 1 if resumed else 0
+            summary['files'].append({'file': path, 'status': 'resumed' if resumed else 'imported', **file_summary})
+            errors.extend({'file': path, **row_error} for row_error in file_errors)
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = clock.monotonic() - started
+    summary['seconds'] = round(elapsed, 2)
+    summary['rows_per_second'] = round(summary['rows'] / elapsed) if elapsed > 0 else summary['rows']
+    return summary, errors
@@ -0,0 +1,277 @@
+"""
+Supplier spend, volume and price-history analytics over purchase transactions.
+
+Totals and monthly price statistics are aggregated in SQL; Python only folds
+the monthly rows (a handful per item and supplier) into per-item and
+per-supplier-item summaries. Spend values each purchase at its own unit price,
+falling back to the item's current price like the purchases list does, while
+price statistics only use purchases that recorded a price.
+
+Results are cached per worker for each (date range, filters) combination and
+checked against the ``purchases`` and ``catalog`` counters in
+``cache_versions``: any flush that adds, edits or deletes a purchase bumps the
+first, and item or category edits bump the second, so a cached result is
+never served after the data behind it changed.
+"""
+import threading
+from collections import OrderedDict
+
+from app import db
+from app.models.cache_version import CacheVersion
+from app.models.inventory import Inventory
+from app.models.inventory_supplier import InventorySupplier
+from app.models.inventory_transaction import InventoryTransaction
+from app.models.supplier import Supplier
+
+# Most (range, filters) combinations kept per worker
+MAX_CACHED_RESULTS = 64
+
+_lock = threading.Lock()
+_cache = OrderedDict()
+
+
+def _filtered(query, start, end, supplier_name, inventory_id, category_id):
+    """Apply the purchase type and the analytics filters to a query joined to Inventory."""
+    query = query.filter(InventoryTransaction.transaction_type == 'purchase')
+    if start:
+        query = query.filter(InventoryTransaction.timestamp >= start)
+    if end:
+        query = query.filter(InventoryTransaction.timestamp <= end)
+    if supplier_name:
+        query = query.filter(InventorySupplier.supplier_id.in_(Supplier.matching_ids(supplier_name)))
+    if inventory_id is not None:
+        query = query.filter(InventoryTransaction.inventory_id == inventory_id)
+    if category_id is not None:
+        query = query.filter(Inventory.category_id == category_id)
+    return query
+
+
+def _joined(*columns):
+    return db.session.query(*columns).join(
+        Inventory, InventoryTransaction.inventory_id == Inventory.id
+    ).outerjoin(
+        InventorySupplier, InventoryTransaction.supplier_id == InventorySupplier.id
+    ).outerjoin(
+        Supplier, InventorySupplier.supplier_id == Supplier.id
+    )
+
+
+def _spend():
+    return InventoryTransaction.quantity * db.func.coalesce(InventoryTransaction.unit_price, Inventory.unit_price, 0)
+
+
+def _supplier_totals(filters):
+    """Spend and volume per supplier, largest spend first."""
+    rows = _filtered(_joined(
+        Supplier.id.label('supplier_id'),
+        Supplier.name.label('supplier_name'),
+        db.func.count(InventoryTransaction.id).label('purchases'),
+        db.func.count(db.distinct(InventoryTransaction.inventory_id)).label('items'),
+        db.func.sum(InventoryTransaction.quantity).label('quantity'),
+        db.func.sum(_spend()).label('spend'),
+        db.func.min(InventoryTransaction.timestamp).label('first_purchase'),
+        db.func.max(InventoryTransaction.timestamp).label('last_purchase'),
+    ), **filters).group_by(Supplier.id, Supplier.name).order_by(db.func.sum(_spend()).desc()).all()
+    return [
+        {
+            'supplier_id': row.supplier_id,
+            'supplier_name': row.supplier_name,
+            'purchases': row.purchases,
+            'items': row.items,
+            'quantity': int(row.quantity or 0),
+            'spend': round(float(row.spend or 0), 2),
+            'first_purchase': row.first_purchase.isoformat() if row.first_purchase else None,
+            'last_purchase': row.last_purchase.isoformat() if row.last_purchase else None,
+        }
+        for row in rows
+    ]
+
+
+def _monthly_rows(filters):
+    """Volume, spend and price range per item, supplier and month."""
+    year = db.extract('year', InventoryTransaction.timestamp)
+    month = db.extract('month', InventoryTransaction.timestamp)
+    priced = InventoryTransaction.unit_price.isnot(None)
+    return _filtered(_joined(
+        InventoryTransaction.inventory_id,
+        Inventory.item_name,
+        Supplier.id.label('supplier_id'),
+        Supplier.name.label('supplier_name'),
+        year.label('year'),
+        month.label('month'),
+        db.func.sum(InventoryTransaction.quantity).label('quantity'),
+        db.func.sum(_spend()).label('spend'),
+        db.func.sum(db.case((priced, InventoryTransaction.quantity), else_=0)).label('priced_quantity'),
+        db.func.sum(InventoryTransaction.quantity * InventoryTransaction.unit_price).label('priced_spend'),
+        db.func.min(InventoryTransaction.unit_price).label('min_price'),
+        db.func.max(InventoryTransaction.unit_price).label('max_price'),
+    ), **filters).group_by(
+        InventoryTransaction.inventory_id, Inventory.item_name, Supplier.id, Supplier.name, year, month
+    ).order_by(InventoryTransaction.inventory_id, year, month).all()
+
+
+def _last_prices(filters):
+    """Most recent recorded unit price per item and supplier, with its timestamp and ID."""
+    rank = db.func.row_number().over(
+        partition_by=(InventoryTransaction.inventory_id, Supplier.id),
+        order_by=(InventoryTransaction.timestamp.desc(), InventoryTransaction.id.desc())
+    ).label('rank')
+    ranked = _filtered(_joined(
+        InventoryTransaction.inventory_id,
+        Supplier.id.label('supplier_id'),
+        Supplier.name.label('supplier_name'),
+        InventoryTransaction.unit_price,
+        InventoryTransaction.timestamp,
+        InventoryTransaction.id,
+        rank,
+    ), **filters).filter(InventoryTransaction.unit_price.isnot(None)).subquery()
+    rows = db.session.query(ranked).filter(ranked.c.rank == 1).all()
+    return {(row.inventory_id, row.supplier_id): row for row in rows}
+
+
+class _MergedMonth:
+    """Sum of several suppliers' monthly rows for one item, shaped like a monthly row."""
+
+    def __init__(self, rows):
+        self.quantity = sum(int(row.quantity or 0) for row in rows)
+        self.spend = sum(float(row.spend or 0) for row in rows)
+        priced = [row for row in rows if row.priced_quantity]
+        self.priced_quantity = sum(int(row.priced_quantity) for row in priced)
+        self.priced_spend = sum(float(row.priced_spend) for row in priced)
+        self.min_price = min((row.min_price for row in priced), default=None)
+        self.max_price = max((row.max_price for row in priced), default=None)
+
+
+def _price_summary(months, last):
+    """
+    Fold monthly rows into volume, spend and price statistics.
+
+    The trend is the percentage change in average price from the first to
+    the last month with a recorded price, or None with fewer than two.
+    """
+    quantity = sum(int(row.quantity or 0) for row in months)
+    spend = sum(float(row.spend or 0) for row in months)
+    priced = [row for row in months if row.priced_quantity]
+    monthly_averages = [float(row.priced_spend) / int(row.priced_quantity) for row in priced]
+    priced_quantity = sum(int(row.priced_quantity) for row in priced)
+    trend = None
+    if len(monthly_averages) > 1 and monthly_averages[0]:
+        trend = round((monthly_averages[-1] - monthly_averages[0]) / monthly_averages[0] * 100, 2)
+    return {
+        'quantity': quantity,
+        'spend': round(spend, 2),
+        'min_price': min((float(row.min_price) for row in priced), default=None),
+        'max_price': max((float(row.max_price) for row in priced), default=None),
+        'avg_price': round(sum(float(row.priced_spend) for row in priced) / priced_quantity, 2) if priced_quantity else None,
+        'last_price': float(last.unit_price) if last is not None else None,
+        'last_purchase': last.timestamp.isoformat() if last is not None and last.timestamp else None,
+        'trend_pct': trend,
+    }
+
+
+def _compute(filters):
+    monthly = _monthly_rows(filters)
+    last_prices = _last_prices(filters)
+
+    by_pair = OrderedDict()
+    by_item = OrderedDict()
+    for row in monthly:
+        by_pair.setdefault((row.inventory_id, row.supplier_id), []).append(row)
+        by_item.setdefault(row.inventory_id, []).append(row)
+
+    prices = []
+    for (inventory_id, supplier_id), months in by_pair.items():
+        summary = _price_summary(months, last_prices.get((inventory_id, supplier_id)))
+        summary.update(
+            inventory_id=inventory_id,
+            item_name=months[0].item_name,
+            supplier_id=supplier_id,
+            supplier_name=months[0].supplier_name,
+            history=[
+                {
+                    'month': f"{int(row.year):04d}-{int(row.month):02d}",
+                    'quantity': int(row.quantity or 0),
+                    'spend': round(float(row.spend or 0), 2),
+                    'min_price': float(row.min_price) if row.min_price is not None else None,
+                    'max_price': float(row.max_price) if row.max_price is not None else None,
+                    'avg_price': round(float(row.priced_spend) / int(row.priced_quantity), 2) if row.priced_quantity else None,
+                }
+                for row in months
+            ]
+        )
+        prices.append(summary)
+
+    items = []
+    for inventory_id, rows in by_item.items():
+        # Several suppliers can share a month; merge them before computing the trend
+        merged = OrderedDict()
+        for row in rows:
+            merged.setdefault((row.year, row.month), []).append(row)
+        months = [_MergedMonth(group) for group in merged.values()]
+        candidates = [last for (item_id, _), last in last_prices.items() if item_id == inventory_id]
+        last = max(candidates, key=lambda row: (row.timestamp, row.id), default=None)
+        summary = _price_summary(months, last)
+        summary.update(
+            inventory_id=inventory_id,
+            item_name=rows[0].item_name,
+            suppliers=len({row.supplier_id for row in rows}),
+            last_supplier=last.supplier_name if last is not None else None,
+        )
+        items.append(summary)
+    items.sort(key=lambda item: item['spend'], reverse=True)
+
+    suppliers = _supplier_totals(filters)
+    return {
+        'suppliers': suppliers,
+        'items': items,
+        'prices': prices,
+        'total_quantity': sum(supplier['quantity'] for supplier in suppliers),
+        'total_spend': round(sum(supplier['spend'] for supplier in suppliers), 2),
+    }
+
+
+def get_supplier_analytics(start=None, end=None, supplier_name=None, inventory_id=None, category_id=None):
+    """
+    Get supplier spend, per-item spend and price history for purchases in a range.
+
+    Args:
+        start (datetime, optional): Only include purchases at or after this time
+        end (datetime, optional): Only include purchases at or before this time
+        supplier_name (str, optional): Part of the supplier's name, in any spelling
+        inventory_id (int, optional): Only include this item
+        category_id (int, optional): Only include items in this category
+
+    Returns:
+        dict: 'suppliers' (totals per supplier), 'items' (totals and price
+        statistics per item), 'prices' (price statistics and monthly history
+        per item and supplier), 'total_quantity' and 'total_spend'. The dict
+        is shared with the cache and must not be modified.
+    """
+    filters = {
+        'start': start, 'end': end, 'supplier_name': supplier_name or None,
+        'inventory_id': inventory_id, 'category_id': category_id,
+    }
+    key = tuple(filters.values())
+    versions = (
+        CacheVersion.get_version(CacheVersion.PURCHASES),
+        CacheVersion.get_version(CacheVersion.CATALOG),
+    )
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == versions:
+            _cache.move_to_end(key)
+            return cached[1]
+
+    result = _compute(filters)
+    with _lock:
+        _cache[key] = (versions, result)
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHED_RESULTS:
+            _cache.popitem(last=False)
+    return result
+
+
+def clear_local_cache():
+    """Drop this process's cached results so the next read recomputes them."""
+    with _lock:
+        _cache.clear()
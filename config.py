@@ -1,4 +1,5 @@
 import os
+from datetime import timedelta
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -25,9 +26,74 @@ class Config:
     ADMIN_EMAILS = [email.strip().lower() for email in 
                     os.environ.get('ADMIN_EMAILS', '').split(',') 
                     if email.strip()]
+    MICROSOFT_GRAPH_URL = os.environ.get('MICROSOFT_GRAPH_URL', 'https://graph.microsoft.com/v1.0')
+
+    # Microsoft login/Graph HTTP calls, in seconds
+    GRAPH_CONNECT_TIMEOUT = float(os.environ.get('GRAPH_CONNECT_TIMEOUT', 3.05))
+    GRAPH_READ_TIMEOUT = float(os.environ.get('GRAPH_READ_TIMEOUT', 10))
+    GRAPH_RETRIES = int(os.environ.get('GRAPH_RETRIES', 2))
+    # Graph calls fail fast for GRAPH_BREAKER_COOLDOWN seconds after this many failures in a row
+    GRAPH_BREAKER_THRESHOLD = int(os.environ.get('GRAPH_BREAKER_THRESHOLD', 5))
+    GRAPH_BREAKER_COOLDOWN = int(os.environ.get('GRAPH_BREAKER_COOLDOWN', 60))
 
    # Scheduler settings
     REPORT_CLEANUP_INTERVAL = int(os.environ.get('REPORT_CLEANUP_INTERVAL', 6))
+    # File locked by the one worker process that runs the scheduled jobs (default: instance/scheduler.lock)
+    SCHEDULER_LOCK_FILE = os.environ.get('SCHEDULER_LOCK_FILE')
+    # Days of inventory change feed history kept for incremental sync
+    INVENTORY_CHANGE_RETENTION_DAYS = int(os.environ.get('INVENTORY_CHANGE_RETENTION_DAYS', 30))
+    # Seconds a change must have been logged before the feed serves it, so changes committed out of
+    # ID order are not skipped. Only holds while every transaction that logs changes commits within
+    # this time; the longest are the bulk approve/collect requests and one batch of the stock import,
+    # purchase import or request archive commands. Raise it when running those with a larger --batch-size.
+    INVENTORY_CHANGE_VISIBILITY_DELAY = int(os.environ.get('INVENTORY_CHANGE_VISIBILITY_DELAY', 120))
+    # Collected and rejected requests older than this are moved to the archive tables
+    REQUEST_ARCHIVE_AFTER_MONTHS = int(os.environ.get('REQUEST_ARCHIVE_AFTER_MONTHS', 12))
+    # Days of request events kept for resuming the live request stream
+    REQUEST_EVENT_RETENTION_DAYS = int(os.environ.get('REQUEST_EVENT_RETENTION_DAYS', 7))
+    # Seconds a request event must have been logged before the stream and poll serve it, so events
+    # committed out of ID order are not skipped; same limits as INVENTORY_CHANGE_VISIBILITY_DELAY.
+    # Request lists show status changes this much later.
+    REQUEST_EVENT_VISIBILITY_DELAY = int(os.environ.get('REQUEST_EVENT_VISIBILITY_DELAY', 120))
+
+    # Live request stream (server-sent events). Each open stream holds a worker thread for up to
+    # REQUEST_STREAM_MAX_DURATION, so only enable it on threaded or async workers (see procfile);
+    # otherwise request lists poll for changes every REQUEST_EVENTS_POLL_INTERVAL seconds.
+    REQUEST_STREAM_ENABLED = os.environ.get('REQUEST_STREAM_ENABLED', 'False').lower() == 'true'
+    REQUEST_EVENTS_POLL_INTERVAL = int(os.environ.get('REQUEST_EVENTS_POLL_INTERVAL', 30))
+    # Stream timings, in seconds
+    REQUEST_STREAM_POLL_INTERVAL = float(os.environ.get('REQUEST_STREAM_POLL_INTERVAL', 2))
+    REQUEST_STREAM_HEARTBEAT_INTERVAL = int(os.environ.get('REQUEST_STREAM_HEARTBEAT_INTERVAL', 15))
+    # Streams are closed after this long so workers are released; browsers reconnect with Last-Event-ID
+    REQUEST_STREAM_MAX_DURATION = int(os.environ.get('REQUEST_STREAM_MAX_DURATION', 300))
+
+    # Consumption forecasting (refreshed nightly at FORECAST_REFRESH_HOUR UTC)
+    FORECAST_REFRESH_HOUR = int(os.environ.get('FORECAST_REFRESH_HOUR', 2))
+    FORECAST_HISTORY_DAYS = int(os.environ.get('FORECAST_HISTORY_DAYS', 180))
+    FORECAST_WINDOW_DAYS = int(os.environ.get('FORECAST_WINDOW_DAYS', 30))
+    FORECAST_SMOOTHING_ALPHA = float(os.environ.get('FORECAST_SMOOTHING_ALPHA', 0.2))
+    FORECAST_LEAD_TIME_DAYS = int(os.environ.get('FORECAST_LEAD_TIME_DAYS', 14))
+    FORECAST_COVER_DAYS = int(os.environ.get('FORECAST_COVER_DAYS', 30))
+    FORECAST_SAFETY_Z = float(os.environ.get('FORECAST_SAFETY_Z', 1.65))
+
+    # Minutes between folding new issue transactions into the consumption cube
+    CONSUMPTION_CUBE_REFRESH_MINUTES = int(os.environ.get('CONSUMPTION_CUBE_REFRESH_MINUTES', 60))
+    # Seconds before a transaction ID seen by one refresh is folded in by a later one, so
+    # transactions committing out of ID order are not skipped
+    CONSUMPTION_CUBE_SETTLE_SECONDS = int(os.environ.get('CONSUMPTION_CUBE_SETTLE_SECONDS', 300))
+
+    # Seconds a worker may serve cached user names/emails before reloading them
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 300))
+
+    # Stateless token authentication for the React API (off by default)
+    JWT_AUTH_ENABLED = os.environ.get('JWT_AUTH_ENABLED', 'False').lower() == 'true'
+    # Falls back to SECRET_KEY when unset
+    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
+    JWT_TOKEN_LOCATION = ['headers']
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.environ.get('JWT_ACCESS_TOKEN_MINUTES', 15)))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.environ.get('JWT_REFRESH_TOKEN_DAYS', 7)))
+    # Seconds a worker may use its cached list of revoked tokens before reloading it
+    REVOKED_TOKEN_CACHE_TTL = int(os.environ.get('REVOKED_TOKEN_CACHE_TTL', 30))
 
 class DevelopmentConfig(Config):
     """Development configuration."""
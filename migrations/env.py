@@ -90,9 +90,22 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # the inventory search index (FTS5 tables on SQLite, FULLTEXT index on
+    # MySQL) is managed outside the model metadata; keep autogenerate from
+    # trying to drop it
+    def include_object(object, name, type_, reflected, compare_to):
+        if reflected and compare_to is None:
+            if type_ == 'table' and name.startswith('inventory_fts'):
+                return False
+            if type_ == 'index' and name == 'ft_inventories_search':
+                return False
+        return True
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
 
     connectable = get_engine()
 
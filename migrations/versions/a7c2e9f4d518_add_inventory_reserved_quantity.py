@@ -0,0 +1,38 @@
+"""Add reserved quantity to inventories
+
+Revision ID: a7c2e9f4d518
+Revises: f3a9b5d7c214
+Create Date: 2026-10-19 15:06:42.117930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c2e9f4d518'
+down_revision = 'f3a9b5d7c214'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('inventories', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('reserved_quantity', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from approved items on live requests that have not been collected yet
+    op.execute("""
+        UPDATE inventories SET reserved_quantity = COALESCE((
+            SELECT SUM(request_items.quantity_approved)
+            FROM request_items
+            JOIN requests ON requests.id = request_items.request_id
+            WHERE request_items.inventory_id = inventories.id
+              AND request_items.status = 'APPROVED'
+              AND requests.deleted_at IS NULL
+        ), 0)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('inventories', schema=None) as batch_op:
+        batch_op.drop_column('reserved_quantity')
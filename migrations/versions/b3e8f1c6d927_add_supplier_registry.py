@@ -0,0 +1,152 @@
+"""Add supplier registry and link inventory_suppliers to it
+
+Revision ID: b3e8f1c6d927
+Revises: a1c6e8f2b485
+Create Date: 2026-10-19 23:12:44.905317
+
+"""
+from datetime import datetime, UTC
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e8f1c6d927'
+down_revision = 'a1c6e8f2b485'
+branch_labels = None
+depends_on = None
+
+
+def normalize_name(name):
+    # Same rule as Supplier.normalize_name, frozen here for the migration
+    return ' '.join(re.sub(r'[^\w\s]', ' ', (name or '').casefold()).split())
+
+
+def merge_existing_suppliers():
+    """
+    Register every supplier spelling found in inventory_suppliers and
+    inventories.supplier, merge item links that are spelling variants of the
+    same supplier into the most recently used one, and link items whose
+    free-text supplier has no link yet.
+    """
+    bind = op.get_bind()
+    inventory_suppliers = sa.table(
+        'inventory_suppliers',
+        sa.column('id', sa.Integer), sa.column('inventory_id', sa.Integer),
+        sa.column('supplier_name', sa.String), sa.column('last_purchase_date', sa.DateTime)
+    )
+    inventories = sa.table('inventories', sa.column('id', sa.Integer), sa.column('supplier', sa.String))
+    links = bind.execute(sa.select(inventory_suppliers)).fetchall()
+    items = bind.execute(
+        sa.select(inventories).where(inventories.c.supplier.isnot(None))
+    ).fetchall()
+
+    # Display name per supplier: the spelling on its most recently used link
+    def recency(link):
+        return (link.last_purchase_date or datetime.min, link.id)
+
+    names = {}
+    for link in sorted(links, key=recency):
+        normalized = normalize_name(link.supplier_name)
+        if normalized:
+            names[normalized] = link.supplier_name.strip()
+    for item in items:
+        normalized = normalize_name(item.supplier)
+        if normalized:
+            names.setdefault(normalized, item.supplier.strip())
+
+    suppliers = sa.table(
+        'suppliers',
+        sa.column('name', sa.String), sa.column('normalized_name', sa.String),
+        sa.column('created_at', sa.DateTime), sa.column('updated_at', sa.DateTime)
+    )
+    now = datetime.now(UTC)
+    if names:
+        op.bulk_insert(suppliers, [
+            {'name': name, 'normalized_name': normalized, 'created_at': now, 'updated_at': now}
+            for normalized, name in names.items()
+        ])
+    supplier_ids = dict(bind.execute(sa.text("SELECT normalized_name, id FROM suppliers")).fetchall())
+
+    groups = {}
+    for link in links:
+        groups.setdefault((link.inventory_id, normalize_name(link.supplier_name)), []).append(link)
+
+    for (inventory_id, normalized), group in groups.items():
+        group.sort(key=recency, reverse=True)
+        if not normalized:
+            # Blank names cannot be registered; purchases keep no supplier
+            keep, dropped = None, group
+        else:
+            keep, dropped = group[0], group[1:]
+            bind.execute(
+                sa.text("UPDATE inventory_suppliers SET supplier_id = :supplier_id, supplier_name = :name WHERE id = :id"),
+                {'supplier_id': supplier_ids[normalized], 'name': names[normalized], 'id': keep.id}
+            )
+        for link in dropped:
+            bind.execute(
+                sa.text("UPDATE inventory_transactions SET supplier_id = :keep_id WHERE supplier_id = :id"),
+                {'keep_id': keep.id if keep else None, 'id': link.id}
+            )
+            bind.execute(sa.text("DELETE FROM inventory_suppliers WHERE id = :id"), {'id': link.id})
+
+    new_links = []
+    for item in items:
+        normalized = normalize_name(item.supplier)
+        if normalized and (item.id, normalized) not in groups:
+            groups[(item.id, normalized)] = []
+            new_links.append({
+                'inventory_id': item.id, 'supplier_id': supplier_ids[normalized], 'supplier_name': names[normalized],
+                'created_at': now, 'updated_at': now
+            })
+    if new_links:
+        op.bulk_insert(sa.table(
+            'inventory_suppliers',
+            sa.column('inventory_id', sa.Integer), sa.column('supplier_id', sa.Integer),
+            sa.column('supplier_name', sa.String), sa.column('created_at', sa.DateTime),
+            sa.column('updated_at', sa.DateTime)
+        ), new_links)
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('suppliers',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('normalized_name', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_suppliers'))
+    )
+    with op.batch_alter_table('suppliers', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_suppliers_normalized_name'), ['normalized_name'], unique=True)
+
+    with op.batch_alter_table('inventory_suppliers', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('supplier_id', sa.Integer(), nullable=True))
+
+    # ### end Alembic commands ###
+    merge_existing_suppliers()
+
+    with op.batch_alter_table('inventory_suppliers', schema=None) as batch_op:
+        batch_op.alter_column('supplier_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_inventory_suppliers_supplier_id'), ['supplier_id'], unique=False)
+        batch_op.create_unique_constraint('uq_inventory_suppliers_inventory_supplier', ['inventory_id', 'supplier_id'])
+        batch_op.create_foreign_key(batch_op.f('fk_inventory_suppliers_supplier_id_suppliers'), 'suppliers', ['supplier_id'], ['id'])
+
+
+def downgrade():
+    # Merged spelling variants are not split apart again
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('inventory_suppliers', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_inventory_suppliers_supplier_id_suppliers'), type_='foreignkey')
+        batch_op.drop_constraint('uq_inventory_suppliers_inventory_supplier', type_='unique')
+        batch_op.drop_index(batch_op.f('ix_inventory_suppliers_supplier_id'))
+        batch_op.drop_column('supplier_id')
+
+    with op.batch_alter_table('suppliers', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_suppliers_normalized_name'))
+
+    op.drop_table('suppliers')
+    # ### end Alembic commands ###
@@ -0,0 +1,57 @@
+"""Add dashboard stats counters
+
+Revision ID: b8d3f1a6e729
+Revises: a7c2e9f4d518
+Create Date: 2026-10-19 15:48:20.640153
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8d3f1a6e729'
+down_revision = 'a7c2e9f4d518'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('dashboard_stats',
+    sa.Column('stat_group', sa.String(length=30), nullable=False),
+    sa.Column('stat_key', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.Numeric(precision=16, scale=2), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('stat_group', 'stat_key')
+    )
+
+    # Seed the counters; `flask rebuild-dashboard-stats` recomputes them the same way
+    op.execute("""
+        INSERT INTO dashboard_stats (stat_group, stat_key, value, updated_at)
+        SELECT 'requests', status, COUNT(*), CURRENT_TIMESTAMP
+        FROM requests WHERE deleted_at IS NULL
+        GROUP BY status
+    """)
+    op.execute("""
+        INSERT INTO dashboard_stats (stat_group, stat_key, value, updated_at)
+        SELECT 'stock_status', stock_status, COUNT(*), CURRENT_TIMESTAMP
+        FROM (
+            SELECT CASE
+                WHEN COALESCE(quantity, 0) <= 0 THEN 'out_of_stock'
+                WHEN quantity < 15 THEN 'low_stock'
+                ELSE 'in_stock'
+            END AS stock_status
+            FROM inventories
+        ) AS statuses
+        GROUP BY stock_status
+    """)
+    op.execute("""
+        INSERT INTO dashboard_stats (stat_group, stat_key, value, updated_at)
+        SELECT 'stock_value', CAST(category_id AS CHAR), SUM(COALESCE(quantity, 0) * COALESCE(unit_price, 0)), CURRENT_TIMESTAMP
+        FROM inventories
+        GROUP BY category_id
+    """)
+
+
+def downgrade():
+    op.drop_table('dashboard_stats')
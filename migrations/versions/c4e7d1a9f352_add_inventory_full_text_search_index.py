@@ -0,0 +1,69 @@
+"""Add inventory full-text search index
+
+Revision ID: c4e7d1a9f352
+Revises: a3c91f2d7b10
+Create Date: 2026-10-19 10:03:17.550912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e7d1a9f352'
+down_revision = 'a3c91f2d7b10'
+branch_labels = None
+depends_on = None
+
+
+# Same DDL as app.models.inventory, frozen here for the migration
+INVENTORY_FTS_TABLE = 'inventory_fts'
+
+SQLITE_SEARCH_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {INVENTORY_FTS_TABLE} USING fts5(
+        item_name, description, supplier,
+        content='inventories', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS inventories_fts_ai AFTER INSERT ON inventories BEGIN
+        INSERT INTO {INVENTORY_FTS_TABLE}(rowid, item_name, description, supplier)
+        VALUES (new.id, new.item_name, new.description, new.supplier);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS inventories_fts_ad AFTER DELETE ON inventories BEGIN
+        INSERT INTO {INVENTORY_FTS_TABLE}({INVENTORY_FTS_TABLE}, rowid, item_name, description, supplier)
+        VALUES ('delete', old.id, old.item_name, old.description, old.supplier);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS inventories_fts_au AFTER UPDATE OF item_name, description, supplier ON inventories BEGIN
+        INSERT INTO {INVENTORY_FTS_TABLE}({INVENTORY_FTS_TABLE}, rowid, item_name, description, supplier)
+        VALUES ('delete', old.id, old.item_name, old.description, old.supplier);
+        INSERT INTO {INVENTORY_FTS_TABLE}(rowid, item_name, description, supplier)
+        VALUES (new.id, new.item_name, new.description, new.supplier);
+    END""",
+]
+
+MYSQL_SEARCH_DDL = [
+    "ALTER TABLE inventories ADD FULLTEXT INDEX ft_inventories_search (item_name, description, supplier)",
+]
+
+
+def upgrade():
+    # Not autogenerated: FTS5 tables, triggers and FULLTEXT indexes are dialect-specific
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+        # Index the rows that already exist
+        op.execute(f"INSERT INTO {INVENTORY_FTS_TABLE}({INVENTORY_FTS_TABLE}) VALUES ('rebuild')")
+    elif dialect == 'mysql':
+        for statement in MYSQL_SEARCH_DDL:
+            op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('inventories_fts_ai', 'inventories_fts_ad', 'inventories_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute(f"DROP TABLE IF EXISTS {INVENTORY_FTS_TABLE}")
+    elif dialect == 'mysql':
+        op.execute("ALTER TABLE inventories DROP INDEX ft_inventories_search")
@@ -0,0 +1,125 @@
+import re
+import unittest
+from sqlalchemy import event
+from jinja2 import ChoiceLoader, DictLoader
+from app import create_app, db, catalog
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.cache_version import CacheVersion
+
+class CatalogCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+        catalog.clear_local_cache()
+
+        self.user = User(name="Test User", email="test@example.com", is_admin=True)
+        db.session.add(self.user)
+        self.category = Category(name="Stationery")
+        db.session.add(self.category)
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        catalog.clear_local_cache()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _add_item(self, name):
+        item = Inventory(
+            item_name=name,
+            category_id=self.category.id,
+            quantity=10,
+            unit_price=5,
+            location='Headquarters',
+            created_by=self.user.id,
+            updated_by=self.user.id
+        )
+        db.session.add(item)
+        return item
+
+    def test_bump_creates_and_increments_version(self):
+        self.assertEqual(CacheVersion.get_version(CacheVersion.CATALOG), 0)
+        CacheVersion.bump(CacheVersion.CATALOG)
+        db.session.commit()
+        self.assertEqual(CacheVersion.get_version(CacheVersion.CATALOG), 1)
+        CacheVersion.bump(CacheVersion.CATALOG)
+        db.session.commit()
+        self.assertEqual(CacheVersion.get_version(CacheVersion.CATALOG), 2)
+
+    def test_first_bump_racing_another_first_bump_increments_its_row(self):
+        # Another transaction created the counter after this one's update ran
+        with db.engine.begin() as connection:
+            connection.execute(CacheVersion.__table__.insert().values(name=CacheVersion.CATALOG, version=1))
+
+        missed = []
+
+        def miss_first_update(state):
+            if state.is_update and not missed:
+                missed.append(state.statement)
+                return state.invoke_statement(statement=state.statement.where(CacheVersion.name != CacheVersion.CATALOG))
+
+        event.listen(db.session, 'do_orm_execute', miss_first_update)
+        try:
+            CacheVersion.bump(CacheVersion.CATALOG)
+            db.session.commit()
+        finally:
+            event.remove(db.session, 'do_orm_execute', miss_first_update)
+
+        self.assertEqual(len(missed), 1)
+        self.assertEqual(CacheVersion.get_version(CacheVersion.CATALOG), 2)
+
+    def test_catalog_is_served_from_cache_until_version_changes(self):
+        self._add_item("Stapler")
+        db.session.commit()
+
+        items = catalog.get_catalog_items()
+        self.assertEqual([item.item_name for item in items], ["Stapler"])
+        self.assertEqual(items[0].category_name, "Stationery")
+
+        # A write that does not bump the version is not picked up
+        self._add_item("Envelope")
+        db.session.commit()
+        self.assertEqual(len(catalog.get_catalog_items()), 1)
+
+        # Bumping the version invalidates the cached copy
+        catalog.invalidate()
+        db.session.commit()
+        names = [item.item_name for item in catalog.get_catalog_items()]
+        self.assertEqual(names, ["Envelope", "Stapler"])
+        self.assertEqual(catalog.get_catalog_item(items[0].id).item_name, "Stapler")
+
+    def test_categories_and_locations(self):
+        self._add_item("Stapler")
+        db.session.commit()
+        self.assertEqual([c.name for c in catalog.get_categories()], ["Stationery"])
+        self.assertEqual(catalog.get_locations(), ["Headquarters"])
+
+    def test_categories_page_shows_item_counts(self):
+        self._add_item("Stapler")
+        self._add_item("Envelope")
+        db.session.add(Category(name="Cleaning"))
+        db.session.commit()
+        self.app.config['SECRET_KEY'] = 'test'
+        # The site layout is served by the React app; stand in for it
+        self.app.jinja_env.loader = ChoiceLoader([self.app.jinja_env.loader, DictLoader({
+            'home/base.html': '{% block extra_css %}{% endblock %}{% block content %}{% endblock %}'
+        })])
+
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(self.user.id)
+        with self.app.app_context():
+            page = client.get('/inventory/categories').get_data(as_text=True)
+
+        counts = re.findall(r'<td>(\w+)</td>\s*<td>[^<]*</td>\s*<td>(\d+)</td>', page)
+        self.assertEqual(sorted(counts), [('Cleaning', '0'), ('Stationery', '2')])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import unittest
+from datetime import date, datetime, timedelta, UTC
+from app import create_app, db
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.inventory_transaction import InventoryTransaction
+from app.models.consumption_cube import ConsumptionCube
+from app.models.cache_version import CacheVersion
+from app.models.request import Request, RequestItem, RequestStatus, ItemRequestStatus, DirectorateEnum
+from app.services import request_archive, stock_import
+
+class ConsumptionCubeTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        # Fold transactions in as soon as they commit, except where a test sets a delay
+        self.app.config['CONSUMPTION_CUBE_SETTLE_SECONDS'] = 0
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+
+        self.admin = User(name="Admin User", email="admin@example.com", is_admin=True)
+        db.session.add(self.admin)
+        self.category = Category(name="Stationery")
+        db.session.add(self.category)
+        db.session.commit()
+        self.paper = Inventory(
+            item_name="Paper", category_id=self.category.id, quantity=100, location='Headquarters',
+            created_by=self.admin.id, updated_by=self.admin.id, unit_price=5
+        )
+        db.session.add(self.paper)
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _issue(self, quantity, timestamp, directorate=DirectorateEnum.ICT, department='Infra', unit='Ops'):
+        req = Request(
+            reference_number=f"REQ-{Request.query.count():04d}", user_id=self.admin.id, location='Headquarters',
+            directorate=directorate, department=department, unit=unit, status=RequestStatus.COLLECTED,
+            created_at=timestamp, updated_at=timestamp
+        )
+        db.session.add(req)
+        db.session.flush()
+        db.session.add(InventoryTransaction(
+            inventory_id=self.paper.id, transaction_type='issue', quantity=-quantity,
+            related_request_id=req.id, performed_by=self.admin.id, timestamp=timestamp
+        ))
+        db.session.commit()
+        return req.id
+
+    def test_refresh_is_incremental(self):
+        self._issue(3, datetime(2026, 1, 5))
+        self._issue(2, datetime(2026, 1, 20))
+        self.assertEqual(ConsumptionCube.refresh(), (2, None))
+        # Nothing new: nothing counted twice
+        self.assertEqual(ConsumptionCube.refresh(), (0, None))
+
+        self._issue(4, datetime(2026, 1, 25))
+        self._issue(1, datetime(2026, 2, 1), directorate=DirectorateEnum.Audit, department=None)
+        self.assertEqual(ConsumptionCube.refresh(), (2, None))
+
+        cells = {(cell.month, cell.directorate, cell.department): (cell.quantity, cell.value)
+                 for cell in ConsumptionCube.query.all()}
+        self.assertEqual(cells, {
+            (date(2026, 1, 1), 'ICT', 'Infra'): (9, 45),
+            (date(2026, 2, 1), 'Audit', ''): (1, 5),
+        })
+
+    def test_rollups_and_archived_requests(self):
+        self._issue(3, datetime(2025, 1, 5))
+        self._issue(2, datetime(2026, 1, 5), unit='Desk')
+        request_archive.archive_requests(request_archive.archive_cutoff(6))
+
+        ConsumptionCube.refresh(rebuild=True)
+
+        by_directorate = ConsumptionCube.rollup(['directorate'])
+        self.assertEqual(by_directorate, [{'directorate': 'ICT', 'quantity': 5, 'value': 25.0}])
+        by_month = ConsumptionCube.rollup(['month', 'item'], start_month=date(2026, 1, 1))
+        self.assertEqual(by_month, [{'month': '2026-01', 'inventory_id': self.paper.id, 'item_name': 'Paper',
+                                     'quantity': 2, 'value': 10.0}])
+        by_unit = ConsumptionCube.rollup(['unit', 'category'], directorates=['ICT'])
+        self.assertEqual({row['unit']: row['quantity'] for row in by_unit}, {'Ops': 3, 'Desk': 2})
+        self.assertEqual(by_unit[0]['category_name'], 'Stationery')
+        with self.assertRaises(ValueError):
+            ConsumptionCube.rollup(['colour'])
+
+    def test_watermark_lags_behind_transactions_that_may_still_be_committing(self):
+        self.app.config['CONSUMPTION_CUBE_SETTLE_SECONDS'] = 300
+        self._issue(3, datetime(2026, 1, 5))
+        # The first run only notes the latest transaction
+        self.assertEqual(ConsumptionCube.refresh(), (0, None))
+        self._issue(2, datetime(2026, 1, 20))
+        self.assertEqual(ConsumptionCube.refresh(), (0, None))
+
+        # Once noted long enough ago, everything up to it is folded in; later IDs wait for the next run
+        CacheVersion.query.filter_by(name=ConsumptionCube.OBSERVED).update(
+            {'updated_at': datetime.now(UTC) - timedelta(minutes=10)}
+        )
+        db.session.commit()
+        self.assertEqual(ConsumptionCube.refresh(), (1, None))
+        self.assertEqual(ConsumptionCube.rollup([])[0]['quantity'], 3)
+
+        CacheVersion.query.filter_by(name=ConsumptionCube.OBSERVED).update(
+            {'updated_at': datetime.now(UTC) - timedelta(minutes=10)}
+        )
+        db.session.commit()
+        self.assertEqual(ConsumptionCube.refresh(), (1, None))
+        self.assertEqual(ConsumptionCube.rollup([])[0]['quantity'], 5)
+
+    def test_deleted_issues_trigger_a_rebuild(self):
+        self._issue(3, datetime(2026, 1, 5))
+        issue_id = self._issue(2, datetime(2026, 1, 20))
+        ConsumptionCube.refresh()
+
+        db.session.delete(InventoryTransaction.query.filter_by(related_request_id=issue_id).one())
+        db.session.commit()
+        self.assertEqual(ConsumptionCube.refresh(), (1, None))
+        self.assertEqual(ConsumptionCube.rollup([])[0]['quantity'], 3)
+        # Rebuilt once, then incremental again
+        self.assertEqual(ConsumptionCube.refresh(), (0, None))
+
+    def test_clearing_a_category_rebuilds_issues_it_unlinked(self):
+        other = Category(name="Printing")
+        db.session.add(other)
+        db.session.flush()
+        ink = Inventory(item_name="Ink", category_id=other.id, quantity=10, location='Headquarters',
+                        created_by=self.admin.id, updated_by=self.admin.id, unit_price=2)
+        db.session.add(ink)
+        db.session.flush()
+        request_id = self._issue(3, datetime(2026, 1, 5))
+        db.session.add(RequestItem(request_id=request_id, inventory_id=self.paper.id, quantity=3,
+                                   quantity_approved=3, status=ItemRequestStatus.COLLECTED))
+        db.session.add(InventoryTransaction(
+            inventory_id=ink.id, transaction_type='issue', quantity=-1, related_request_id=request_id,
+            performed_by=self.admin.id, timestamp=datetime(2026, 1, 5)
+        ))
+        db.session.commit()
+        ConsumptionCube.refresh()
+
+        stock_import.clear_category(self.category.id)
+        db.session.commit()
+        ConsumptionCube.refresh()
+
+        # The ink issue lost its request, so it is filed under empty values like other unlinked issues
+        self.assertEqual(ConsumptionCube.rollup(['directorate', 'item']), [
+            {'directorate': '', 'inventory_id': ink.id, 'item_name': 'Ink', 'quantity': 1, 'value': 2.0}
+        ])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from decimal import Decimal
+from app import create_app, db, serialization
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.request import Request, RequestStatus
+from app.models.dashboard_stat import DashboardStat
+from app.services import request_creation, request_workflow
+
+class DashboardStatTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+        serialization.clear_local_cache()
+
+        self.admin = User(name="Admin User", email="admin@example.com", is_admin=True)
+        db.session.add(self.admin)
+        self.category = Category(name="Stationery")
+        db.session.add(self.category)
+        db.session.commit()
+
+        self.stapler = self._add_item("Stapler", 20, "2.50")
+        self.toner = self._add_item("Toner", 5, "40.00")
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _add_item(self, name, quantity, unit_price):
+        item = Inventory(
+            item_name=name, category_id=self.category.id, quantity=quantity, unit_price=Decimal(unit_price),
+            location='Headquarters', created_by=self.admin.id, updated_by=self.admin.id
+        )
+        db.session.add(item)
+        return item
+
+    def _stats(self):
+        stats = DashboardStat.get_all()
+        return {
+            group: {key: value for key, value in counters.items() if value}
+            for group, counters in stats.items()
+        }
+
+    def _assert_matches_rebuild(self):
+        incremental = self._stats()
+        DashboardStat.rebuild()
+        self.assertEqual(incremental, self._stats())
+
+    def test_counters_follow_inventory_changes(self):
+        stats = self._stats()
+        self.assertEqual(stats[DashboardStat.STOCK_STATUS], {'in_stock': 1, 'low_stock': 1})
+        self.assertEqual(stats[DashboardStat.STOCK_VALUE][str(self.category.id)], Decimal('250.00'))
+
+        self.toner.quantity = 0
+        db.session.commit()
+        Inventory.batch_adjust([{'item_name': 'Stapler', 'counted': 10}], performed_by=self.admin.id)
+        stats = self._stats()
+        self.assertEqual(stats[DashboardStat.STOCK_STATUS], {'low_stock': 1, 'out_of_stock': 1})
+        self.assertEqual(stats[DashboardStat.STOCK_VALUE][str(self.category.id)], Decimal('25.00'))
+
+        db.session.delete(db.session.get(Inventory, self.toner.id))
+        db.session.commit()
+        self._assert_matches_rebuild()
+
+    def test_counters_follow_request_workflow(self):
+        ids = []
+        for quantity in (1, 2, 3):
+            new_request, _ = request_creation.create_request(
+                user_id=self.admin.id, location='Headquarters', directorate='ICT', department=None,
+                unit='Unit', items=[{'inventory_id': self.stapler.id, 'quantity': quantity}]
+            )
+            ids.append(new_request.id)
+        self.assertEqual(self._stats()[DashboardStat.REQUESTS], {'PENDING': 3})
+
+        request_workflow.bulk_approve([{'request_id': ids[0]}, {'request_id': ids[1]}], approved_by=self.admin.id)
+        request_workflow.bulk_reject([ids[2]])
+        request_workflow.bulk_collect([ids[0]], performed_by=self.admin.id)
+        db.session.get(Request, ids[1]).soft_delete(self.admin.id)
+        self.assertEqual(self._stats()[DashboardStat.REQUESTS], {'COLLECTED': 1, 'REJECTED': 1})
+        self._assert_matches_rebuild()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+from datetime import date, datetime, timedelta
+import pandas as pd
+from app import create_app, db
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.inventory_transaction import InventoryTransaction
+from app.models.item_forecast import ItemForecast
+from app.services import forecasting
+
+class ForecastingTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app.config.update(
+            FORECAST_HISTORY_DAYS=30, FORECAST_WINDOW_DAYS=10, FORECAST_SMOOTHING_ALPHA=0.5,
+            FORECAST_LEAD_TIME_DAYS=5, FORECAST_COVER_DAYS=10, FORECAST_SAFETY_Z=0
+        )
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+
+        self.admin = User(name="Admin User", email="admin@example.com", is_admin=True)
+        db.session.add(self.admin)
+        category = Category(name="Stationery")
+        db.session.add(category)
+        db.session.commit()
+
+        self.paper = self._add_item("Paper", 8, category)
+        self.stapler = self._add_item("Stapler", 50, category)
+        self.toner = self._add_item("Toner", 0, category)
+        db.session.commit()
+        self.today = date(2026, 3, 31)
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _add_item(self, name, quantity, category):
+        item = Inventory(
+            item_name=name, category_id=category.id, quantity=quantity, location='Headquarters',
+            created_by=self.admin.id, updated_by=self.admin.id, supplier="Acme", unit_price=2
+        )
+        db.session.add(item)
+        return item
+
+    def _issue(self, item, quantity, day):
+        db.session.add(InventoryTransaction(
+            inventory_id=item.id, transaction_type='issue', quantity=-quantity,
+            performed_by=self.admin.id, timestamp=datetime.combine(day, datetime.min.time()) + timedelta(hours=10)
+        ))
+
+    def test_compute_forecasts_for_all_items_at_once(self):
+        start, end = date(2026, 3, 1), date(2026, 3, 10)
+        history = pd.DataFrame({
+            'inventory_id': [1, 1, 2],
+            'day': pd.to_datetime(['2026-03-09', '2026-03-10', '2026-03-10']),
+            'quantity': [4.0, 4.0, 10.0],
+        })
+        available = pd.Series([6, 100, 5], index=pd.Index([1, 2, 3], name='inventory_id'))
+
+        result = forecasting.compute_forecasts(
+            history, available, start, end, window_days=2, alpha=1.0, lead_time_days=2, cover_days=3, safety_z=0
+        )
+
+        self.assertEqual(list(result.index), [1, 2, 3])
+        self.assertEqual(result.loc[1, 'average_daily_usage'], 4.0)
+        self.assertEqual(result.loc[1, 'days_of_cover'], 1.5)
+        self.assertEqual(result.loc[1, 'reorder_point'], 8)
+        # Up to reorder point plus three days of usage: 8 + 12 - 6
+        self.assertEqual(result.loc[1, 'suggested_quantity'], 14)
+        self.assertEqual(result.loc[2, 'suggested_quantity'], 0)
+        # No usage: no cover figure and nothing to order
+        self.assertTrue(pd.isna(result.loc[3, 'days_of_cover']))
+        self.assertEqual(result.loc[3, 'suggested_quantity'], 0)
+
+    def test_refresh_stores_forecasts_and_draft_rows(self):
+        for offset in range(1, 11):
+            self._issue(self.paper, 2, self.today - timedelta(days=offset))
+        self._issue(self.stapler, 1, self.today - timedelta(days=3))
+        # Today's issues are incomplete and ignored
+        self._issue(self.paper, 100, self.today)
+        db.session.commit()
+
+        count, error = forecasting.refresh_forecasts(today=self.today)
+
+        self.assertIsNone(error)
+        self.assertEqual(count, 3)
+        paper = db.session.get(ItemForecast, self.paper.id)
+        self.assertEqual(paper.average_daily_usage, 2.0)
+        self.assertEqual(paper.available_quantity, 8)
+        self.assertGreater(paper.suggested_quantity, 0)
+        self.assertIsNone(db.session.get(ItemForecast, self.toner.id).days_of_cover)
+
+        rows = ItemForecast.get_draft_purchase_rows()
+        self.assertEqual([row['inventory_id'] for row in rows], [self.paper.id])
+        self.assertEqual(rows[0]['supplier'], "Acme")
+
+        # Refreshing replaces rather than appends
+        forecasting.refresh_forecasts(today=self.today)
+        self.assertEqual(ItemForecast.query.count(), 3)
+
+if __name__ == '__main__':
+    unittest.main()
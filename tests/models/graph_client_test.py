@@ -0,0 +1,163 @@
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from app import create_app, db
+from app.auth import graph
+from app.exceptions import GraphUnavailableError
+from app.models.user import User
+
+
+class StandInGraph(BaseHTTPRequestHandler):
+    """Answers /me from a queue of scripted responses: (status, body) or ('sleep', seconds)."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        server.hits.append((self.path, self.client_address[1]))
+        step = server.script.pop(0) if server.script else (200, server.profile)
+        if step[0] == 'sleep':
+            time.sleep(step[1])
+            step = (200, server.profile)
+        status, body = step
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GraphClientTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment with a local stand-in for Microsoft Graph."""
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInGraph)
+        self.server.daemon_threads = True
+        self.server.hits = []
+        self.server.script = []
+        self.server.profile = {
+            'id': 'azure-1', 'displayName': 'Jane Doe', 'userPrincipalName': 'Jane.Doe@example.com',
+            'jobTitle': 'Engineer', 'department': 'Operations'
+        }
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.app = create_app('testing')
+        self.app.config.update(
+            MICROSOFT_GRAPH_URL=f'http://127.0.0.1:{self.server.server_port}/v1.0',
+            GRAPH_CONNECT_TIMEOUT=0.5, GRAPH_READ_TIMEOUT=0.3, GRAPH_RETRIES=1,
+            GRAPH_BREAKER_THRESHOLD=2, GRAPH_BREAKER_COOLDOWN=60,
+            MICROSOFT_CLIENT_ID='client-id', MICROSOFT_CLIENT_SECRET='secret',
+            MICROSOFT_AUTHORITY='https://login.microsoftonline.com/tenant',
+            MICROSOFT_REDIRECT_URI='http://localhost/auth/callback', ADMIN_EMAILS=[]
+        )
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+        graph.reset()
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        graph.reset()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _login(self, claims=None):
+        client = mock.Mock()
+        client.acquire_token_by_authorization_code.return_value = {
+            'access_token': 'graph-token',
+            'id_token_claims': claims or {'oid': 'azure-1', 'preferred_username': 'jane.doe@example.com',
+                                          'name': 'Jane Doe'}
+        }
+        with mock.patch.object(User, 'get_microsoft_client', return_value=client):
+            return User.authenticate_microsoft_user('auth-code')
+
+    def test_profile_is_fetched_over_a_pooled_connection(self):
+        first = User.get_user_info('graph-token')
+        second = User.get_user_info('graph-token')
+
+        self.assertEqual((first['mail'], second['jobTitle']), ('jane.doe@example.com', 'Engineer'))
+        self.assertTrue(self.server.hits[0][0].startswith('/v1.0/me?%24select=id%2CdisplayName'))
+        # Both requests reused one keep-alive connection
+        self.assertEqual(len({port for _, port in self.server.hits}), 1)
+
+    def test_transient_errors_are_retried(self):
+        self.server.script = [(503, {'error': 'busy'})]
+
+        self.assertEqual(User.get_user_info('graph-token')['displayName'], 'Jane Doe')
+        self.assertEqual(len(self.server.hits), 2)
+
+    def test_rejected_token_returns_none(self):
+        self.server.script = [(401, {'error': 'InvalidAuthenticationToken'})]
+
+        self.assertIsNone(User.get_user_info('bad-token'))
+        self.assertEqual(len(self.server.hits), 1)
+        self.assertEqual(graph.breaker.state, graph.CircuitBreaker.CLOSED)
+
+    def test_slow_response_is_bounded_by_timeouts(self):
+        self.server.script = [('sleep', 2), ('sleep', 2)]
+
+        started = time.monotonic()
+        with self.assertRaises(GraphUnavailableError):
+            User.get_user_info('graph-token')
+        # One try and one retry, each cut off by the 0.3s read timeout
+        self.assertLess(time.monotonic() - started, 1.5)
+
+    def test_breaker_opens_and_recovers_after_cooldown(self):
+        self.server.script = [(500, {})] * 4
+        for _ in range(2):
+            with self.assertRaises(GraphUnavailableError):
+                User.get_user_info('graph-token')
+        self.assertEqual(graph.breaker.state, graph.CircuitBreaker.OPEN)
+
+        # While open, Graph is not called at all
+        hits = len(self.server.hits)
+        with self.assertRaises(GraphUnavailableError):
+            User.get_user_info('graph-token')
+        self.assertEqual(len(self.server.hits), hits)
+
+        # After the cooldown a trial call goes through and closes the circuit
+        self.app.config['GRAPH_BREAKER_COOLDOWN'] = 0
+        self.assertEqual(User.get_user_info('graph-token')['mail'], 'jane.doe@example.com')
+        self.assertEqual(graph.breaker.state, graph.CircuitBreaker.CLOSED)
+
+    def test_login_falls_back_to_stored_profile(self):
+        user = self._login()
+        self.assertEqual(user.job_title, 'Engineer')
+
+        self.server.profile = {**self.server.profile, 'jobTitle': 'Director'}
+        self.server.script = [(503, {})] * 2
+        user = self._login()
+
+        self.assertEqual((user.email, user.job_title), ('jane.doe@example.com', 'Engineer'))
+        self.assertEqual(User.query.count(), 1)
+
+        # A new user can still sign in; the profile is filled in on a later login
+        graph.breaker.record_failure()
+        user = self._login({'oid': 'azure-2', 'preferred_username': 'Sam@example.com', 'name': 'Sam'})
+        self.assertEqual((user.email, user.name, user.job_title), ('sam@example.com', 'Sam', ''))
+
+    def test_msal_client_is_built_once_per_worker(self):
+        with mock.patch.object(graph, 'ConfidentialClientApplication') as application:
+            first = User.get_microsoft_client()
+            second = User.get_microsoft_client()
+
+        self.assertIs(first, second)
+        application.assert_called_once()
+        kwargs = application.call_args.kwargs
+        self.assertIs(kwargs['http_client'], graph.http_session())
+        self.assertIsNotNone(kwargs['token_cache'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+from datetime import datetime, timedelta, UTC
+from app import create_app, db
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.inventory_change import InventoryChange
+
+class InventoryChangeFeedTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        # Serve changes as soon as they commit, except where a test sets a delay
+        self.app.config['INVENTORY_CHANGE_VISIBILITY_DELAY'] = 0
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+
+        self.user = User(name="Test User", email="test@example.com", is_admin=True)
+        db.session.add(self.user)
+        self.category = Category(name="Stationery")
+        db.session.add(self.category)
+        db.session.commit()
+
+        self.stapler = self._add_item("Stapler")
+        self.envelope = self._add_item("Envelope")
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _add_item(self, name):
+        item = Inventory(
+            item_name=name, category_id=self.category.id, quantity=10, location='Headquarters',
+            created_by=self.user.id, updated_by=self.user.id
+        )
+        db.session.add(item)
+        return item
+
+    def test_flush_records_creates_updates_and_deletes(self):
+        cursor = InventoryChange.latest_cursor()
+        changes, _, _ = InventoryChange.get_changes_since(0)
+        self.assertEqual(changes, {self.stapler.id: 'upsert', self.envelope.id: 'upsert'})
+
+        self.stapler.quantity = 5
+        db.session.commit()
+        deleted_id = self.envelope.id
+        db.session.delete(self.envelope)
+        db.session.commit()
+
+        changes, new_cursor, has_more = InventoryChange.get_changes_since(cursor)
+        self.assertEqual(changes, {self.stapler.id: 'upsert', deleted_id: 'delete'})
+        self.assertGreater(new_cursor, cursor)
+        self.assertFalse(has_more)
+        self.assertEqual(InventoryChange.get_changes_since(new_cursor)[0], {})
+
+    def test_rolled_back_changes_are_not_logged(self):
+        cursor = InventoryChange.latest_cursor()
+        self.stapler.quantity = 1
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(InventoryChange.get_changes_since(cursor)[0], {})
+
+    def test_category_rename_and_bulk_adjust_are_logged(self):
+        cursor = InventoryChange.latest_cursor()
+        self.category.name = "Office Supplies"
+        db.session.commit()
+        changes, cursor, _ = InventoryChange.get_changes_since(cursor)
+        self.assertEqual(set(changes), {self.stapler.id, self.envelope.id})
+
+        summary, error = Inventory.batch_adjust([{'item_name': 'Stapler', 'delta': 2}], performed_by=self.user.id)
+        self.assertIsNone(error)
+        self.assertEqual(InventoryChange.get_changes_since(cursor)[0], {self.stapler.id: 'upsert'})
+
+    def test_paging_and_prune_expiry(self):
+        changes, cursor, has_more = InventoryChange.get_changes_since(0, limit=1)
+        self.assertEqual(len(changes), 1)
+        self.assertTrue(has_more)
+
+        InventoryChange.query.update({'changed_at': datetime.now(UTC) - timedelta(days=60)})
+        db.session.commit()
+        self.assertEqual(InventoryChange.prune(30), 2)
+        self.assertTrue(InventoryChange.is_expired(cursor))
+        self.assertFalse(InventoryChange.is_expired(2))
+
+    def test_feed_does_not_pass_changes_that_may_still_be_committing(self):
+        self.app.config['INVENTORY_CHANGE_VISIBILITY_DELAY'] = 60
+        InventoryChange.query.update({'changed_at': datetime.now(UTC) - timedelta(minutes=5)})
+        db.session.commit()
+        cursor = InventoryChange.latest_cursor()
+
+        # A lower ID logged just now, next to a higher one that looks settled
+        self.stapler.quantity = 3
+        db.session.commit()
+        recent_id = InventoryChange.query.order_by(InventoryChange.id.desc()).first().id
+        InventoryChange.record([self.envelope.id])
+        settled = InventoryChange.query.order_by(InventoryChange.id.desc()).first()
+        settled.changed_at = datetime.now(UTC) - timedelta(minutes=5)
+        db.session.commit()
+
+        self.assertEqual(InventoryChange.latest_cursor(), cursor)
+        self.assertEqual(InventoryChange.get_changes_since(cursor), ({}, cursor, False))
+
+        InventoryChange.query.filter_by(id=recent_id).update({'changed_at': datetime.now(UTC) - timedelta(minutes=2)})
+        db.session.commit()
+        changes, new_cursor, _ = InventoryChange.get_changes_since(cursor)
+        self.assertEqual(changes, {self.stapler.id: 'upsert', self.envelope.id: 'upsert'})
+        self.assertEqual(new_cursor, settled.id)
+        self.assertEqual(InventoryChange.latest_cursor(), settled.id)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from datetime import datetime, timedelta
+from app import create_app, db
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.inventory_transaction import InventoryTransaction
+from app.exceptions import InvalidCursorError
+
+class InventoryLedgerTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+
+        self.user = User(name="Test User", email="test@example.com", is_admin=True)
+        db.session.add(self.user)
+        category = Category(name="Stationery")
+        db.session.add(category)
+        db.session.commit()
+
+        self.item = Inventory(
+            item_name="Stapler", category_id=category.id, quantity=0, location='Headquarters',
+            created_by=self.user.id, updated_by=self.user.id
+        )
+        db.session.add(self.item)
+        db.session.commit()
+
+        # initial 100, then alternating purchases and issues, oldest first
+        self.base = datetime(2025, 1, 1, 9, 0)
+        movements = [('initial', 100), ('issue', -10), ('purchase', 50), ('issue', -20),
+                     ('adjustment', -5), ('issue', -15), ('purchase', 30)]
+        for day, (transaction_type, quantity) in enumerate(movements):
+            db.session.add(InventoryTransaction(
+                inventory_id=self.item.id, transaction_type=transaction_type, quantity=quantity,
+                performed_by=self.user.id, timestamp=self.base + timedelta(days=day)
+            ))
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_pages_newest_first_with_running_balance(self):
+        page, cursor = InventoryTransaction.get_item_ledger(self.item.id, limit=3)
+        self.assertEqual([row['quantity'] for row in page], [30, -15, -5])
+        self.assertEqual([row['balance'] for row in page], [130, 100, 115])
+        self.assertIsNotNone(cursor)
+
+        page, cursor = InventoryTransaction.get_item_ledger(self.item.id, limit=3, cursor=cursor)
+        self.assertEqual([row['quantity'] for row in page], [-20, 50, -10])
+        self.assertEqual([row['balance'] for row in page], [120, 140, 90])
+
+        page, cursor = InventoryTransaction.get_item_ledger(self.item.id, limit=3, cursor=cursor)
+        self.assertEqual([row['balance'] for row in page], [100])
+        self.assertIsNone(cursor)
+
+    def test_type_filter_keeps_ledger_balance(self):
+        page, cursor = InventoryTransaction.get_item_ledger(self.item.id, limit=10, transaction_types=['issue'])
+        self.assertEqual([row['quantity'] for row in page], [-15, -20, -10])
+        self.assertEqual([row['balance'] for row in page], [100, 120, 90])
+        self.assertIsNone(cursor)
+
+    def test_type_filter_balance_across_many_other_movements(self):
+        # 40 single-unit purchases between each pair of issues
+        for day in range(1, 6):
+            for minute in range(40):
+                db.session.add(InventoryTransaction(
+                    inventory_id=self.item.id, transaction_type='purchase', quantity=1, performed_by=self.user.id,
+                    timestamp=self.base + timedelta(days=day, minutes=minute + 1)
+                ))
+        db.session.commit()
+
+        page, cursor = InventoryTransaction.get_item_ledger(self.item.id, limit=2, transaction_types=['issue'])
+        self.assertEqual([(row['quantity'], row['balance']) for row in page], [(-15, 260), (-20, 200)])
+        page, cursor = InventoryTransaction.get_item_ledger(
+            self.item.id, limit=2, transaction_types=['issue'], cursor=cursor
+        )
+        self.assertEqual([(row['quantity'], row['balance']) for row in page], [(-10, 90)])
+        self.assertIsNone(cursor)
+
+    def test_date_range_filter(self):
+        page, _ = InventoryTransaction.get_item_ledger(
+            self.item.id, start=self.base + timedelta(days=2), end=self.base + timedelta(days=3)
+        )
+        self.assertEqual([(row['quantity'], row['balance']) for row in page], [(-20, 120), (50, 140)])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(InvalidCursorError):
+            InventoryTransaction.get_item_ledger(self.item.id, cursor='not-a-cursor')
+
+if __name__ == '__main__':
+    unittest.main()
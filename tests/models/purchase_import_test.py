@@ -0,0 +1,133 @@
+import io
+import unittest
+from datetime import datetime
+from openpyxl import Workbook
+from app import create_app, db, catalog
+from app.exceptions import ImportFormatError
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.inventory_transaction import InventoryTransaction
+from app.models.supplier import Supplier
+from app.services import purchase_import
+
+class PurchaseImportTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app.config['SECRET_KEY'] = 'test'
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+        catalog.clear_local_cache()
+
+        admin = User(name="Admin User", email="admin@example.com", is_admin=True)
+        db.session.add(admin)
+        category = Category(name="Stationery")
+        db.session.add(category)
+        db.session.commit()
+        paper = Inventory(item_name="A4 Paper", category_id=category.id, quantity=10, location='Headquarters',
+                          created_by=admin.id, updated_by=admin.id)
+        toner = Inventory(item_name="Toner", category_id=category.id, quantity=0, location='Headquarters',
+                          created_by=admin.id, updated_by=admin.id)
+        db.session.add_all([paper, toner])
+        db.session.commit()
+        self.admin_id, self.paper_id, self.toner_id = admin.id, paper.id, toner.id
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _csv(self, text):
+        return purchase_import.read_rows(io.BytesIO(text.encode('utf-8')), 'delivery.csv')
+
+    def test_csv_import_in_batches_reports_bad_rows(self):
+        rows = self._csv(
+            "Item,Qty,Supplier,Unit Price,Date\n"
+            "a4 paper,5,Acme Ltd.,2.50,2025-03-01\n"
+            "Toner,2,ACME LTD,40,\n"
+            "Stapler,1,Acme,1,\n"
+            ",,,,\n"
+            "Toner,0,Acme,1,\n"
+            "A4 Paper,3,Globex,abc,\n"
+            "A4 Paper,7,Globex,2.40,01/03/2025\n"
+            "A4 Paper,4,,,\n"
+        )
+        summary, errors = purchase_import.import_purchases(rows, performed_by=self.admin_id, batch_size=2)
+
+        self.assertEqual(summary['rows'], 7)
+        self.assertEqual(summary['imported'], 3)
+        self.assertEqual(summary['rejected'], 4)
+        self.assertEqual(summary['batches'], 2)
+        self.assertEqual([error['row'] for error in errors], [4, 6, 7, 8])
+        self.assertIn("unknown item 'Stapler'", errors[0]['error'])
+
+        self.assertEqual(db.session.get(Inventory, self.paper_id).quantity, 19)
+        self.assertEqual(db.session.get(Inventory, self.toner_id).quantity, 2)
+        self.assertEqual(Supplier.query.count(), 1)
+        dated = InventoryTransaction.query.filter_by(inventory_id=self.paper_id, quantity=5).one()
+        self.assertEqual(dated.timestamp, datetime(2025, 3, 1))
+
+    def test_dry_run_writes_nothing(self):
+        rows = self._csv(f"inventory_id,quantity\n{self.paper_id},5\n9999,1\n")
+        summary, errors = purchase_import.import_purchases(rows, performed_by=self.admin_id, dry_run=True)
+
+        self.assertEqual((summary['imported'], summary['rejected']), (1, 1))
+        self.assertEqual(errors, [{'row': 3, 'error': 'inventory item 9999 does not exist'}])
+        self.assertEqual(InventoryTransaction.query.count(), 0)
+        self.assertEqual(db.session.get(Inventory, self.paper_id).quantity, 10)
+
+    def test_fractional_numbers_are_rejected_per_row(self):
+        rows = self._csv(f"inventory_id,quantity\n{self.paper_id},2.5\n{self.toner_id}.5,1\n{self.toner_id}.0,2\n")
+        summary, errors = purchase_import.import_purchases(rows, performed_by=self.admin_id)
+
+        self.assertEqual((summary['imported'], summary['rejected']), (1, 2))
+        self.assertEqual(errors, [
+            {'row': 2, 'error': 'quantity must be a whole number'},
+            {'row': 3, 'error': f"invalid inventory_id '{self.toner_id}.5'"},
+        ])
+        self.assertEqual(db.session.get(Inventory, self.paper_id).quantity, 10)
+        self.assertEqual(db.session.get(Inventory, self.toner_id).quantity, 2)
+
+    def test_xlsx_import(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['Item Name', 'Quantity', 'Supplier', 'Price'])
+        sheet.append(['Toner', 3, 'Globex', 35.5])
+        sheet.append(['A4 Paper', 2.0, None, None])
+        stream = io.BytesIO()
+        workbook.save(stream)
+        stream.seek(0)
+
+        summary, errors = purchase_import.import_purchases(
+            purchase_import.read_rows(stream, 'delivery.xlsx'), performed_by=self.admin_id
+        )
+        self.assertEqual(errors, [])
+        self.assertEqual(summary['imported'], 2)
+        self.assertEqual(db.session.get(Inventory, self.toner_id).quantity, 3)
+
+    def test_rejects_unusable_files(self):
+        with self.assertRaises(ImportFormatError):
+            self._csv("name,amount\nToner,1\n")
+        with self.assertRaises(ImportFormatError):
+            purchase_import.read_rows(io.BytesIO(b"x"), 'delivery.pdf')
+
+    def test_upload_api(self):
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(self.admin_id)
+        data = {'file': (io.BytesIO(b"item,quantity\nToner,4\nStapler,1\n"), 'delivery.csv')}
+        # A fresh app context gives the request its own session and login state
+        with self.app.app_context():
+            response = client.post('/purchases/api/purchases/import', data=data, content_type='multipart/form-data')
+            self.assertEqual(response.status_code, 201)
+            body = response.get_json()
+        self.assertEqual(body['summary']['imported'], 1)
+        self.assertEqual(body['errors'], [{'row': 3, 'error': "unknown item 'Stapler'"}])
+        self.assertEqual(db.session.get(Inventory, self.toner_id).quantity, 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import create_app, db, serialization
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.inventory_supplier import InventorySupplier
+from app.models.supplier import Supplier
+from app.models.inventory_transaction import InventoryTransaction
+
+class PurchasePageTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+        serialization.clear_local_cache()
+
+        self.admin = User(name="Admin User", email="admin@example.com", is_admin=True)
+        db.session.add(self.admin)
+        category = Category(name="Stationery")
+        db.session.add(category)
+        db.session.commit()
+
+        self.paper = Inventory(
+            item_name="Paper", category_id=category.id, quantity=100, location='Headquarters',
+            created_by=self.admin.id, updated_by=self.admin.id, unit_price=4
+        )
+        self.toner = Inventory(
+            item_name="Toner", category_id=category.id, quantity=10, location='Headquarters',
+            created_by=self.admin.id, updated_by=self.admin.id, unit_price=50
+        )
+        db.session.add_all([self.paper, self.toner])
+        db.session.commit()
+        self.acme = InventorySupplier(
+            inventory_id=self.paper.id, supplier=Supplier.get_or_create("Acme Supplies"), supplier_name="Acme Supplies"
+        )
+        self.globex = InventorySupplier(
+            inventory_id=self.toner.id, supplier=Supplier.get_or_create("Globex"), supplier_name="Globex"
+        )
+        db.session.add_all([self.acme, self.globex])
+        db.session.commit()
+
+        # Six purchases a day apart, alternating items; one issue that must not appear
+        self.base = datetime(2025, 5, 1, 9, 0)
+        for day in range(6):
+            paper = day % 2 == 0
+            db.session.add(InventoryTransaction(
+                inventory_id=self.paper.id if paper else self.toner.id, transaction_type='purchase',
+                quantity=10 if paper else 2, performed_by=self.admin.id,
+                supplier_id=self.acme.id if paper else self.globex.id,
+                unit_price=5 if paper else None, timestamp=self.base + timedelta(days=day)
+            ))
+        db.session.add(InventoryTransaction(
+            inventory_id=self.paper.id, transaction_type='issue', quantity=-1,
+            performed_by=self.admin.id, timestamp=self.base + timedelta(days=7)
+        ))
+        db.session.commit()
+        db.session.expire_all()
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_pages_follow_the_cursor_with_page_totals(self):
+        first, cursor, totals = InventoryTransaction.get_purchases_page(limit=4)
+        self.assertEqual([row.timestamp for row in first], [self.base + timedelta(days=d) for d in (5, 4, 3, 2)])
+        # Two paper purchases at 5 and two toner purchases at the item price of 50
+        self.assertEqual(totals, {'quantity': 24, 'spend': 300.0})
+
+        second, cursor, totals = InventoryTransaction.get_purchases_page(limit=4, cursor=cursor)
+        self.assertEqual(len(second), 2)
+        self.assertIsNone(cursor)
+        self.assertEqual(totals['quantity'], 12)
+
+    def test_filters(self):
+        rows, _, _ = InventoryTransaction.get_purchases_page(supplier_name="acme")
+        self.assertEqual({row.inventory_id for row in rows}, {self.paper.id})
+        rows, _, _ = InventoryTransaction.get_purchases_page(
+            start=self.base + timedelta(days=1), end=self.base + timedelta(days=2, hours=1)
+        )
+        self.assertEqual(len(rows), 2)
+        # A name with no searchable words matches nothing rather than everything
+        rows, _, _ = InventoryTransaction.get_purchases_page(item_name="--")
+        self.assertEqual(rows, [])
+
+    def test_page_uses_a_fixed_number_of_queries(self):
+        statements = []
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            rows, _, _ = InventoryTransaction.get_purchases_page(limit=10)
+            data = [row.to_dict() for row in rows]
+            names = [(row.inventory.item_name, row.supplier.supplier_name) for row in rows]
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+
+        self.assertEqual(len(data), 6)
+        self.assertEqual(data[0]['performed_by_name'], "Admin User")
+        self.assertIn(("Toner", "Globex"), names)
+        # page with items and suppliers, totals, users
+        self.assertLessEqual(len(statements), 3)
+
+if __name__ == '__main__':
+    unittest.main()
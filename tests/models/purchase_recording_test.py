@@ -0,0 +1,139 @@
+import unittest
+from decimal import Decimal
+from sqlalchemy import event
+from app import create_app, db
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.inventory_supplier import InventorySupplier
+from app.models.supplier import Supplier
+from app.models.inventory_transaction import InventoryTransaction
+from app.services import purchase_recording
+
+class PurchaseRecordingTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+
+        self.admin = User(name="Admin User", email="admin@example.com", is_admin=True)
+        db.session.add(self.admin)
+        category = Category(name="Stationery")
+        db.session.add(category)
+        db.session.commit()
+        self.items = []
+        for number in range(20):
+            item = Inventory(
+                item_name=f"Item {number}", category_id=category.id, quantity=5, location='Headquarters',
+                created_by=self.admin.id, updated_by=self.admin.id
+            )
+            db.session.add(item)
+            self.items.append(item)
+        db.session.commit()
+        db.session.add(InventorySupplier(
+            inventory_id=self.items[0].id, supplier=Supplier.get_or_create("Acme"), supplier_name="Acme", unit_price=1.0
+        ))
+        db.session.commit()
+        self.item_ids = [item.id for item in self.items]
+        self.admin_id = self.admin.id
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_records_every_line_in_one_commit(self):
+        lines = [{'inventory_id': inventory_id, 'quantity': 3, 'supplier': 'Acme', 'unit_price': '2.50'}
+                 for inventory_id in self.item_ids]
+        lines.append({'inventory_id': self.item_ids[0], 'quantity': 1, 'supplier': 'Globex', 'unit_price': ''})
+        commits = []
+        def count(conn):
+            commits.append(conn)
+        event.listen(db.engine, 'commit', count)
+        try:
+            transactions, errors = purchase_recording.record_purchase(lines, performed_by=self.admin_id)
+        finally:
+            event.remove(db.engine, 'commit', count)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(transactions), 21)
+        self.assertEqual(len(commits), 1)
+        db.session.expire_all()
+        first = db.session.get(Inventory, self.item_ids[0])
+        self.assertEqual(first.quantity, 9)
+        self.assertEqual(first.unit_price, Decimal('2.50'))
+        self.assertEqual(db.session.get(Inventory, self.item_ids[5]).quantity, 8)
+        # The existing Acme record is updated rather than duplicated
+        acme = InventorySupplier.query.filter_by(inventory_id=self.item_ids[0], supplier_name="Acme").all()
+        self.assertEqual(len(acme), 1)
+        self.assertEqual(acme[0].unit_price, 2.5)
+        self.assertEqual(InventorySupplier.query.count(), 21)
+        self.assertEqual(InventoryTransaction.query.filter_by(transaction_type='purchase').count(), 21)
+
+    def test_any_invalid_line_records_nothing(self):
+        transactions, errors = purchase_recording.record_purchase([
+            {'inventory_id': self.item_ids[0], 'quantity': 4},
+            {'inventory_id': 9999, 'quantity': 1},
+            {'inventory_id': self.item_ids[1], 'quantity': 0},
+        ], performed_by=self.admin_id)
+
+        self.assertEqual(transactions, [])
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(any("Line 2" in error for error in errors))
+        self.assertEqual(db.session.get(Inventory, self.item_ids[0]).quantity, 5)
+        self.assertEqual(InventoryTransaction.query.count(), 0)
+
+    def test_fractional_numbers_are_rejected(self):
+        transactions, errors = purchase_recording.record_purchase([
+            {'inventory_id': self.item_ids[0], 'quantity': 2.5},
+            {'inventory_id': self.item_ids[1] + 0.5, 'quantity': 1},
+            {'inventory_id': str(self.item_ids[2]), 'quantity': '3.0'},
+        ], performed_by=self.admin_id)
+
+        self.assertEqual(transactions, [])
+        self.assertEqual(errors, ["Line 1: quantity must be a whole number",
+                                  "Line 2: an inventory item is required"])
+        self.assertEqual(db.session.get(Inventory, self.item_ids[0]).quantity, 5)
+
+    def test_form_with_uneven_columns_is_rejected(self):
+        self.app.config['SECRET_KEY'] = 'test'
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(self.admin_id)
+        # The second line has no supplier or unit price field
+        data = {
+            'inventory_id': [str(self.item_ids[0]), str(self.item_ids[1])],
+            'quantity': ['2', '3'],
+            'supplier': ['Acme'],
+            'unit_price': ['1.00'],
+        }
+        with self.app.app_context():
+            response = client.post('/purchases/new', data=data)
+            self.assertEqual(response.status_code, 302)
+            self.assertTrue(response.headers['Location'].endswith('/purchases/new'))
+
+        self.assertEqual(InventoryTransaction.query.count(), 0)
+        self.assertEqual(db.session.get(Inventory, self.item_ids[0]).quantity, 5)
+
+    def test_query_count_does_not_grow_with_lines(self):
+        statements = []
+        def count(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append(statement)
+        lines = [{'inventory_id': inventory_id, 'quantity': 1, 'supplier': 'Acme'} for inventory_id in self.item_ids]
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            _, errors = purchase_recording.record_purchase(lines, performed_by=self.admin_id)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+
+        self.assertEqual(errors, [])
+        # Items, registry suppliers and item links are each loaded once, however many lines there are
+        self.assertLessEqual(len(statements), 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+from datetime import datetime, timedelta, UTC
+from app import create_app, db, serialization
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.inventory_transaction import InventoryTransaction
+from app.models.archived_request import ArchivedRequest, ArchivedRequestItem
+from app.models.dashboard_stat import DashboardStat
+from app.models.request import Request, RequestItem, RequestStatus, ItemRequestStatus, DirectorateEnum
+from app.services import request_archive
+
+class RequestArchiveTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+        serialization.clear_local_cache()
+
+        self.admin = User(name="Admin User", email="admin@example.com", is_admin=True)
+        self.user = User(name="Requester", email="requester@example.com")
+        db.session.add_all([self.admin, self.user])
+        category = Category(name="Stationery")
+        db.session.add(category)
+        db.session.commit()
+
+        self.stapler = Inventory(
+            item_name="Stapler", category_id=category.id, quantity=10, location='Headquarters',
+            created_by=self.admin.id, updated_by=self.admin.id
+        )
+        db.session.add(self.stapler)
+        db.session.commit()
+        self.old = datetime.now(UTC) - timedelta(days=500)
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _add_request(self, status, updated_at, location='Headquarters'):
+        item_status = {
+            RequestStatus.COLLECTED: ItemRequestStatus.COLLECTED,
+            RequestStatus.REJECTED: ItemRequestStatus.REJECTED,
+        }.get(status, ItemRequestStatus.PENDING)
+        req = Request(
+            reference_number=f"REQ-{Request.query.count() + ArchivedRequest.query.count():04d}", user_id=self.user.id, location=location,
+            directorate=DirectorateEnum.ICT, unit='Unit', status=status,
+            created_at=updated_at, updated_at=updated_at
+        )
+        req.items.append(RequestItem(
+            inventory_id=self.stapler.id, quantity=2, quantity_approved=2, status=item_status,
+            created_at=updated_at, updated_at=updated_at
+        ))
+        db.session.add(req)
+        db.session.flush()
+        if status == RequestStatus.COLLECTED:
+            db.session.add(InventoryTransaction(
+                inventory_id=self.stapler.id, transaction_type='issue', quantity=-2,
+                related_request_id=req.id, performed_by=self.admin.id
+            ))
+        db.session.commit()
+        # Bypass onupdate so the request keeps its old timestamp
+        db.session.execute(db.update(Request).where(Request.id == req.id).values(updated_at=updated_at))
+        db.session.commit()
+        return req.id
+
+    def test_archive_moves_old_finished_requests_in_batches(self):
+        collected = [self._add_request(RequestStatus.COLLECTED, self.old) for _ in range(3)]
+        rejected = self._add_request(RequestStatus.REJECTED, self.old)
+        recent = self._add_request(RequestStatus.COLLECTED, datetime.now(UTC))
+        pending = self._add_request(RequestStatus.PENDING, self.old)
+        stats_before = DashboardStat.get_all()
+
+        count, error = request_archive.archive_requests(request_archive.archive_cutoff(12), batch_size=2)
+
+        self.assertIsNone(error)
+        self.assertEqual(count, 4)
+        self.assertEqual(sorted(r.id for r in Request.query.all()), sorted([recent, pending]))
+        self.assertEqual(sorted(a.original_id for a in ArchivedRequest.query.all()), sorted(collected + [rejected]))
+        self.assertEqual(ArchivedRequestItem.query.count(), 4)
+        self.assertEqual(RequestItem.query.count(), 2)
+        # Counters keep counting archived requests
+        self.assertEqual(DashboardStat.get_all(), stats_before)
+
+        archived_issues = InventoryTransaction.query.filter(InventoryTransaction.archived_request_id.isnot(None)).all()
+        self.assertEqual(sorted(txn.archived_request.original_id for txn in archived_issues), sorted(collected))
+        self.assertTrue(all(txn.related_request_id is None for txn in archived_issues))
+        self.assertEqual(archived_issues[0].request_location, 'Headquarters')
+
+    def test_reused_request_ids_archive_as_new_rows(self):
+        first = self._add_request(RequestStatus.COLLECTED, self.old)
+        request_archive.archive_requests(request_archive.archive_cutoff(12))
+        # With the live table empty, the next request gets the archived request's ID again
+        second = self._add_request(RequestStatus.COLLECTED, self.old)
+        self.assertEqual(first, second)
+
+        count, error = request_archive.archive_requests(request_archive.archive_cutoff(12))
+
+        self.assertIsNone(error)
+        self.assertEqual(count, 1)
+        rows = ArchivedRequest.query.order_by(ArchivedRequest.id).all()
+        self.assertEqual([row.original_id for row in rows], [first, first])
+        self.assertEqual([len(row.items) for row in rows], [1, 1])
+        self.assertNotEqual(rows[0].items[0].id, rows[1].items[0].id)
+        issues = InventoryTransaction.query.order_by(InventoryTransaction.id).all()
+        self.assertEqual([txn.archived_request_id for txn in issues], [row.id for row in rows])
+
+    def test_archive_respects_max_batches(self):
+        for _ in range(3):
+            self._add_request(RequestStatus.COLLECTED, self.old)
+
+        count, error = request_archive.archive_requests(request_archive.archive_cutoff(12), batch_size=1, max_batches=2)
+
+        self.assertIsNone(error)
+        self.assertEqual(count, 2)
+        self.assertEqual(Request.query.count(), 1)
+
+    def test_rebuild_counts_archived_requests(self):
+        self._add_request(RequestStatus.COLLECTED, self.old)
+        self._add_request(RequestStatus.COLLECTED, datetime.now(UTC))
+        request_archive.archive_requests(request_archive.archive_cutoff(12))
+
+        DashboardStat.rebuild()
+
+        self.assertEqual(DashboardStat.get_all()[DashboardStat.REQUESTS]['COLLECTED'], 2)
+
+    def test_search_archived_requests(self):
+        first = self._add_request(RequestStatus.COLLECTED, self.old)
+        second = self._add_request(RequestStatus.REJECTED, self.old + timedelta(days=1), location='Jabi')
+        request_archive.archive_requests(request_archive.archive_cutoff(12))
+
+        rows, cursor = ArchivedRequest.search(limit=1)
+        self.assertEqual([row.original_id for row in rows], [second])
+        rows, cursor = ArchivedRequest.search(limit=1, cursor=cursor)
+        self.assertEqual([row.original_id for row in rows], [first])
+        self.assertIsNone(cursor)
+
+        rows, _ = ArchivedRequest.search(term="requester@", statuses=[RequestStatus.COLLECTED])
+        self.assertEqual([row.original_id for row in rows], [first])
+        rows, _ = ArchivedRequest.search(location='Jabi')
+        self.assertEqual(rows[0].to_dict()['user_name'], "Requester")
+        self.assertEqual(ArchivedRequest.search(user_id=self.admin.id)[0], [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from app import create_app, db
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.request import Request, RequestItem
+from app.services import request_creation
+
+class RequestCreationTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+
+        self.user = User(name="Test User", email="test@example.com", is_admin=True)
+        db.session.add(self.user)
+        category = Category(name="Stationery")
+        db.session.add(category)
+        db.session.commit()
+
+        self.stapler = Inventory(
+            item_name="Stapler", category_id=category.id, quantity=5, location='Headquarters',
+            created_by=self.user.id, updated_by=self.user.id
+        )
+        self.toner = Inventory(
+            item_name="Toner", category_id=category.id, quantity=2, location='Headquarters',
+            created_by=self.user.id, updated_by=self.user.id
+        )
+        db.session.add_all([self.stapler, self.toner])
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _create(self, items, directorate='ICT'):
+        return request_creation.create_request(
+            user_id=self.user.id, location='Headquarters', directorate=directorate,
+            department='IT', unit='Support', items=items
+        )
+
+    def test_creates_request_and_items_together(self):
+        new_request, errors = self._create([
+            {'inventory_id': str(self.stapler.id), 'quantity': '3'},
+            {'inventory_id': self.toner.id, 'quantity': 2},
+        ])
+        self.assertEqual(errors, [])
+        self.assertTrue(new_request.reference_number.startswith("REQ-"))
+        self.assertEqual(sorted(item.quantity_approved for item in new_request.items), [2, 3])
+
+    def test_any_invalid_line_writes_nothing(self):
+        new_request, errors = self._create([
+            {'inventory_id': self.stapler.id, 'quantity': 3},
+            {'inventory_id': self.toner.id, 'quantity': 1},
+            {'inventory_id': self.toner.id, 'quantity': 2},
+            {'inventory_id': 999, 'quantity': 1},
+            {'inventory_id': self.stapler.id, 'quantity': 0},
+        ], directorate='Nowhere')
+
+        self.assertIsNone(new_request)
+        self.assertIn("Invalid directorate: Nowhere", errors)
+        self.assertIn("Requested quantity for Toner exceeds available stock (2).", errors)
+        self.assertIn("Selected inventory item does not exist.", errors)
+        self.assertIn("Line 5: quantity must be greater than zero", errors)
+        self.assertEqual(Request.query.count(), 0)
+        self.assertEqual(RequestItem.query.count(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
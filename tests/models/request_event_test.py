@@ -0,0 +1,174 @@
+import unittest
+from jinja2 import ChoiceLoader, DictLoader
+from datetime import datetime, timedelta, UTC
+from app import create_app, db, serialization
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.request import Request, RequestItem, RequestStatus, ItemRequestStatus, DirectorateEnum
+from app.models.request_event import RequestEvent
+from app.services import request_workflow
+
+class RequestEventTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app.config.update(
+            SECRET_KEY='test', REQUEST_STREAM_ENABLED=True, REQUEST_STREAM_POLL_INTERVAL=0,
+            REQUEST_STREAM_MAX_DURATION=0, REQUEST_EVENT_VISIBILITY_DELAY=0
+        )
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+        serialization.clear_local_cache()
+
+        self.admin = User(name="Admin User", email="admin@example.com", is_admin=True)
+        self.user = User(name="Requester", email="requester@example.com")
+        self.other = User(name="Other", email="other@example.com")
+        db.session.add_all([self.admin, self.user, self.other])
+        category = Category(name="Stationery")
+        db.session.add(category)
+        db.session.commit()
+        self.stapler = Inventory(
+            item_name="Stapler", category_id=category.id, quantity=10, location='Headquarters',
+            created_by=self.admin.id, updated_by=self.admin.id
+        )
+        db.session.add(self.stapler)
+        db.session.commit()
+        self.admin_id, self.user_id, self.other_id = self.admin.id, self.user.id, self.other.id
+        self.stapler_id = self.stapler.id
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _add_request(self, user_id):
+        req = Request(
+            reference_number=f"REQ-{Request.query.count():04d}", user_id=user_id, location='Headquarters',
+            directorate=DirectorateEnum.ICT, unit='Unit'
+        )
+        req.items.append(RequestItem(
+            inventory_id=self.stapler_id, quantity=2, quantity_approved=2, status=ItemRequestStatus.PENDING
+        ))
+        db.session.add(req)
+        db.session.commit()
+        return req.id
+
+    def _stream(self, user_id, last_event_id=None):
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+        headers = {'Last-Event-ID': str(last_event_id)} if last_event_id is not None else {}
+        # A fresh app context gives the request its own session and login state
+        with self.app.app_context():
+            response = client.get('/request/api/requests/stream', headers=headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.mimetype, 'text/event-stream')
+            return response.get_data(as_text=True)
+
+    def _get(self, user_id, url):
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+        with self.app.app_context():
+            return client.get(url)
+
+    def test_orm_and_bulk_changes_are_logged(self):
+        request_id = self._add_request(self.user_id)
+        req = db.session.get(Request, request_id)
+        req.soft_delete(self.admin_id)
+        req.restore()
+        summary, error = request_workflow.bulk_approve([{'request_id': request_id}], approved_by=self.admin_id)
+        self.assertIsNone(error)
+
+        events = RequestEvent.get_events_since(0)
+        self.assertEqual([event.event_type for event in events], ['created', 'deleted', 'restored', 'approved'])
+        self.assertEqual(events[-1].status, 'approved')
+        self.assertTrue(all(event.user_id == self.user_id for event in events))
+
+    def test_stream_filters_by_user_and_resumes(self):
+        own = self._add_request(self.user_id)
+        self._add_request(self.other_id)
+
+        body = self._stream(self.user_id, last_event_id=0)
+        self.assertIn("event: created", body)
+        self.assertIn(f'"request_id": {own}', body)
+        self.assertEqual(body.count("event: created"), 1)
+
+        admin_body = self._stream(self.admin_id, last_event_id=0)
+        self.assertEqual(admin_body.count("event: created"), 2)
+
+        cursor = RequestEvent.latest_cursor()
+        request_workflow.bulk_reject([own])
+        body = self._stream(self.user_id, last_event_id=cursor)
+        self.assertIn(f"id: {cursor + 1}\nevent: rejected", body)
+        self.assertNotIn("event: created", body)
+
+    def test_stream_resets_after_pruned_events(self):
+        self._add_request(self.user_id)
+        RequestEvent.query.update({'created_at': datetime.now(UTC) - timedelta(days=30)})
+        db.session.commit()
+        self.assertEqual(RequestEvent.prune(7), 1)
+
+        body = self._stream(self.user_id, last_event_id=0)
+        self.assertIn("event: reset", body)
+
+    def test_polling_returns_events_since_cursor(self):
+        cursor = self._get(self.user_id, '/request/api/requests/events').get_json()['cursor']
+        own = self._add_request(self.user_id)
+        self._add_request(self.other_id)
+
+        body = self._get(self.user_id, f'/request/api/requests/events?last_event_id={cursor}').get_json()
+        self.assertEqual([(event['event_type'], event['request_id']) for event in body['events']],
+                         [('created', own)])
+        self.assertEqual(body['cursor'], RequestEvent.latest_cursor() - 1)
+        self.assertFalse(body['reset'])
+
+        response = self._get(self.user_id, '/request/api/requests/events?last_event_id=abc')
+        self.assertEqual(response.status_code, 400)
+
+    def test_events_committed_out_of_order_are_not_skipped(self):
+        self.app.config['REQUEST_EVENT_VISIBILITY_DELAY'] = 60
+        cursor = RequestEvent.latest_cursor()
+
+        # A lower ID logged just now, next to a higher one that looks settled
+        first = self._add_request(self.user_id)
+        recent_id = RequestEvent.query.filter_by(request_id=first).one().id
+        second = self._add_request(self.user_id)
+        RequestEvent.query.filter(RequestEvent.id > recent_id).update(
+            {'created_at': datetime.now(UTC) - timedelta(minutes=5)}
+        )
+        db.session.commit()
+
+        self.assertEqual(RequestEvent.latest_cursor(), cursor)
+        body = self._get(self.user_id, f'/request/api/requests/events?last_event_id={cursor}').get_json()
+        self.assertEqual((body['events'], body['cursor']), ([], cursor))
+        self.assertNotIn("event: created", self._stream(self.user_id, last_event_id=cursor))
+
+        RequestEvent.query.filter_by(id=recent_id).update({'created_at': datetime.now(UTC) - timedelta(minutes=2)})
+        db.session.commit()
+        body = self._get(self.user_id, f'/request/api/requests/events?last_event_id={cursor}').get_json()
+        self.assertEqual([event['request_id'] for event in body['events']], [first, second])
+        self.assertEqual(body['cursor'], RequestEvent.latest_cursor())
+
+    def test_lists_poll_when_stream_is_disabled(self):
+        # The site layout is served by the React app; stand in for it
+        self.app.jinja_env.loader = ChoiceLoader([self.app.jinja_env.loader, DictLoader({
+            'home/base.html': '{% block extra_css %}{% endblock %}{% block content %}{% endblock %}'
+        })])
+        self.app.config['REQUEST_STREAM_ENABLED'] = False
+        self.assertEqual(self._get(self.user_id, '/request/api/requests/stream').status_code, 404)
+
+        page = self._get(self.user_id, '/request/my-requests').get_data(as_text=True)
+        self.assertIn('/request/api/requests/events', page)
+        self.assertNotIn('new EventSource', page)
+
+        self.app.config['REQUEST_STREAM_ENABLED'] = True
+        page = self._get(self.admin_id, '/request/all').get_data(as_text=True)
+        self.assertIn('new EventSource', page)
+
+if __name__ == '__main__':
+    unittest.main()
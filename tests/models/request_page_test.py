@@ -0,0 +1,98 @@
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import create_app, db, serialization
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.request import Request, RequestItem, RequestStatus, DirectorateEnum
+
+class RequestPageTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+        serialization.clear_local_cache()
+
+        self.admin = User(name="Admin User", email="admin@example.com", is_admin=True)
+        self.alice = User(name="Alice Mensah", email="alice@example.com")
+        self.bob = User(name="Bob Owusu", email="bob@example.com")
+        db.session.add_all([self.admin, self.alice, self.bob])
+        category = Category(name="Stationery")
+        db.session.add(category)
+        db.session.commit()
+
+        self.item = Inventory(
+            item_name="Stapler", category_id=category.id, quantity=100, location='Headquarters',
+            created_by=self.admin.id, updated_by=self.admin.id
+        )
+        db.session.add(self.item)
+        db.session.commit()
+
+        # Ten requests a day apart, alternating requesters and directorates
+        self.base = datetime(2025, 3, 1, 9, 0)
+        for day in range(10):
+            requester = self.alice if day % 2 == 0 else self.bob
+            req = Request(
+                reference_number=f"REQ-{day:04d}",
+                user_id=requester.id,
+                location='Headquarters',
+                directorate=DirectorateEnum.ICT if day % 2 == 0 else DirectorateEnum.Audit,
+                unit='Unit',
+                status=RequestStatus.APPROVED if day < 3 else RequestStatus.PENDING,
+                approved_by=self.admin.id if day < 3 else None,
+                created_at=self.base + timedelta(days=day),
+                updated_at=self.base + timedelta(days=day)
+            )
+            req.items.append(RequestItem(inventory_id=self.item.id, quantity=2, quantity_approved=2))
+            db.session.add(req)
+        db.session.commit()
+        db.session.expire_all()
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_pages_newest_first(self):
+        page, cursor = Request.get_requests_page(limit=4)
+        self.assertEqual([r.reference_number for r in page], ["REQ-0009", "REQ-0008", "REQ-0007", "REQ-0006"])
+        page, cursor = Request.get_requests_page(limit=4, cursor=cursor)
+        self.assertEqual([r.reference_number for r in page], ["REQ-0005", "REQ-0004", "REQ-0003", "REQ-0002"])
+        page, cursor = Request.get_requests_page(limit=4, cursor=cursor)
+        self.assertEqual([r.reference_number for r in page], ["REQ-0001", "REQ-0000"])
+        self.assertIsNone(cursor)
+
+    def test_filters(self):
+        page, _ = Request.get_requests_page(statuses=[RequestStatus.APPROVED], directorates=[DirectorateEnum.ICT])
+        self.assertEqual([r.reference_number for r in page], ["REQ-0002", "REQ-0000"])
+
+        page, _ = Request.get_requests_page(
+            requester="owusu", start=self.base + timedelta(days=2), end=self.base + timedelta(days=6),
+            descending=False
+        )
+        self.assertEqual([r.reference_number for r in page], ["REQ-0003", "REQ-0005"])
+
+    def test_serializing_a_page_uses_a_fixed_number_of_queries(self):
+        statements = []
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            page, _ = Request.get_requests_page(limit=10)
+            data = [req.to_dict() for req in page]
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+
+        self.assertEqual(len(data), 10)
+        self.assertEqual(data[-1]['approved_by_name'], "Admin User")
+        self.assertEqual(data[0]['items'][0]['item_name'], "Stapler")
+        # page, items with inventory, users
+        self.assertLessEqual(len(statements), 3)
+
+if __name__ == '__main__':
+    unittest.main()
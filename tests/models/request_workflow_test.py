@@ -0,0 +1,113 @@
+import unittest
+from app import create_app, db, serialization
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.inventory_transaction import InventoryTransaction
+from app.models.request import Request, RequestItem, RequestStatus, ItemRequestStatus, DirectorateEnum
+from app.services import request_workflow
+
+class RequestWorkflowTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+        serialization.clear_local_cache()
+
+        self.admin = User(name="Admin User", email="admin@example.com", is_admin=True)
+        self.user = User(name="Requester", email="requester@example.com")
+        db.session.add_all([self.admin, self.user])
+        category = Category(name="Stationery")
+        db.session.add(category)
+        db.session.commit()
+
+        self.stapler = self._add_item("Stapler", 10, category)
+        self.toner = self._add_item("Toner", 3, category)
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _add_item(self, name, quantity, category):
+        item = Inventory(
+            item_name=name, category_id=category.id, quantity=quantity, location='Headquarters',
+            created_by=self.admin.id, updated_by=self.admin.id
+        )
+        db.session.add(item)
+        return item
+
+    def _add_request(self, *lines, status=RequestStatus.PENDING):
+        req = Request(
+            reference_number=f"REQ-{Request.query.count():04d}", user_id=self.user.id,
+            location='Headquarters', directorate=DirectorateEnum.ICT, unit='Unit', status=status
+        )
+        item_status = ItemRequestStatus.APPROVED if status == RequestStatus.APPROVED else ItemRequestStatus.PENDING
+        for inventory, quantity in lines:
+            req.items.append(RequestItem(
+                inventory_id=inventory.id, quantity=quantity, quantity_approved=quantity, status=item_status
+            ))
+        db.session.add(req)
+        db.session.commit()
+        return req.id
+
+    def test_bulk_approve_with_partial_and_failed_requests(self):
+        full = self._add_request((self.stapler, 2))
+        partial = self._add_request((self.stapler, 1), (self.toner, 1))
+        too_many = self._add_request((self.toner, 5))
+        partial_items = {item.inventory_id: item.id for item in db.session.get(Request, partial).items}
+
+        summary, error = request_workflow.bulk_approve([
+            {'request_id': full},
+            {'request_id': partial, 'quantities': {str(partial_items[self.toner.id]): 0}},
+            {'request_id': too_many},
+            {'request_id': 999},
+        ], approved_by=self.admin.id)
+
+        self.assertIsNone(error)
+        self.assertEqual((summary['succeeded'], summary['failed']), (2, 2))
+        self.assertIn("Insufficient inventory for Toner", summary['results'][2]['error'])
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Request, full).status, RequestStatus.APPROVED)
+        self.assertEqual(db.session.get(Request, full).approved_by, self.admin.id)
+        self.assertEqual(db.session.get(Request, partial).status, RequestStatus.PARTIALLY_APPROVED)
+        self.assertEqual(db.session.get(Request, too_many).status, RequestStatus.PENDING)
+
+    def test_bulk_reject(self):
+        pending = self._add_request((self.stapler, 2))
+        approved = self._add_request((self.stapler, 2), status=RequestStatus.APPROVED)
+
+        summary, error = request_workflow.bulk_reject([pending, approved], admin_message="Out of budget")
+
+        self.assertIsNone(error)
+        self.assertEqual([r['success'] for r in summary['results']], [True, False])
+        db.session.expire_all()
+        req = db.session.get(Request, pending)
+        self.assertEqual(req.status, RequestStatus.REJECTED)
+        self.assertEqual(req.admin_message, "Out of budget")
+        self.assertEqual([(i.status, i.quantity_approved) for i in req.items], [(ItemRequestStatus.REJECTED, 0)])
+
+    def test_bulk_collect_checks_stock_across_the_batch(self):
+        first = self._add_request((self.stapler, 4), (self.toner, 2), status=RequestStatus.APPROVED)
+        second = self._add_request((self.toner, 2), status=RequestStatus.APPROVED)
+
+        summary, error = request_workflow.bulk_collect([first, second], performed_by=self.admin.id)
+
+        self.assertIsNone(error)
+        self.assertEqual([r['success'] for r in summary['results']], [True, False])
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Inventory, self.stapler.id).quantity, 6)
+        self.assertEqual(db.session.get(Inventory, self.toner.id).quantity, 1)
+        self.assertEqual(db.session.get(Request, first).status, RequestStatus.COLLECTED)
+        self.assertEqual(db.session.get(Request, second).status, RequestStatus.APPROVED)
+        issues = InventoryTransaction.query.filter_by(transaction_type='issue', related_request_id=first).all()
+        self.assertEqual(sorted(t.quantity for t in issues), [-4, -2])
+        self.assertEqual(issues[0].note, "Collected by Admin User")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from app import create_app, db, serialization
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.request import Request, RequestItem, RequestStatus, DirectorateEnum
+from app.services import request_creation, request_workflow
+
+class ReservationTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+        serialization.clear_local_cache()
+
+        self.admin = User(name="Admin User", email="admin@example.com", is_admin=True)
+        db.session.add(self.admin)
+        category = Category(name="Stationery")
+        db.session.add(category)
+        db.session.commit()
+
+        self.toner = Inventory(
+            item_name="Toner", category_id=category.id, quantity=10, location='Headquarters',
+            created_by=self.admin.id, updated_by=self.admin.id
+        )
+        db.session.add(self.toner)
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _request(self, quantity):
+        new_request, errors = request_creation.create_request(
+            user_id=self.admin.id, location='Headquarters', directorate='ICT', department=None,
+            unit='Unit', items=[{'inventory_id': self.toner.id, 'quantity': quantity}]
+        )
+        self.assertEqual(errors, [])
+        return new_request.id
+
+    def _toner(self):
+        db.session.expire_all()
+        return db.session.get(Inventory, self.toner.id)
+
+    def test_reservation_follows_the_request_lifecycle(self):
+        first, second = self._request(6), self._request(4)
+        request_workflow.bulk_approve([{'request_id': first}], approved_by=self.admin.id)
+        self.assertEqual((self._toner().reserved_quantity, self._toner().available_quantity), (6, 4))
+
+        # Only four are left to promise, so a new request for five is refused
+        _, errors = request_creation.create_request(
+            user_id=self.admin.id, location='Headquarters', directorate='ICT', department=None,
+            unit='Unit', items=[{'inventory_id': self.toner.id, 'quantity': 5}]
+        )
+        self.assertIn("Requested quantity for Toner exceeds available stock (4).", errors)
+
+        db.session.get(Request, first).soft_delete(self.admin.id)
+        self.assertEqual(self._toner().reserved_quantity, 0)
+        db.session.get(Request, first).restore()
+        self.assertEqual(self._toner().reserved_quantity, 6)
+
+        request_workflow.bulk_approve([{'request_id': second}], approved_by=self.admin.id)
+        request_workflow.bulk_collect([first], performed_by=self.admin.id)
+        toner = self._toner()
+        self.assertEqual((toner.quantity, toner.reserved_quantity, toner.available_quantity), (4, 4, 0))
+
+    def test_item_level_approve_and_reject(self):
+        item = db.session.get(Request, self._request(3)).items[0]
+        self.assertTrue(item.validate_inventory_quantity(3))
+        item.approve(3)
+        db.session.commit()
+        self.assertEqual(self._toner().reserved_quantity, 3)
+
+        item = db.session.get(RequestItem, item.id)
+        item.approve(5)
+        db.session.commit()
+        self.assertEqual(self._toner().reserved_quantity, 5)
+
+        item = db.session.get(RequestItem, item.id)
+        item.reject()
+        db.session.commit()
+        self.assertEqual(self._toner().reserved_quantity, 0)
+
+    def test_rebuild_reservations(self):
+        request_id = self._request(2)
+        request_workflow.bulk_approve([{'request_id': request_id}], approved_by=self.admin.id)
+        db.session.execute(db.update(Inventory).values(reserved_quantity=9))
+        db.session.commit()
+
+        self.assertEqual(Inventory.rebuild_reservations(), (1, None))
+        self.assertEqual(self._toner().reserved_quantity, 2)
+
+if __name__ == '__main__':
+    unittest.main()
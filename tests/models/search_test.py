@@ -0,0 +1,82 @@
+import unittest
+from app import create_app, db, search
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+
+class InventorySearchTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+
+        self.user = User(name="Test User", email="test@example.com", is_admin=True)
+        db.session.add(self.user)
+        self.stationery = Category(name="Stationery")
+        self.cleaning = Category(name="Cleaning")
+        db.session.add_all([self.stationery, self.cleaning])
+        db.session.commit()
+
+        self.stapler = self._add_item("Heavy Duty Stapler", self.stationery, description="Metal body", supplier="Acme Office")
+        self.staples = self._add_item("Staples 24/6", self.stationery, description="Refill for stapler")
+        self.bleach = self._add_item("Bleach", self.cleaning, supplier="Acme Chemicals")
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _add_item(self, name, category, description=None, supplier=None):
+        item = Inventory(
+            item_name=name,
+            description=description,
+            supplier=supplier,
+            category_id=category.id,
+            quantity=10,
+            location='Headquarters',
+            created_by=self.user.id,
+            updated_by=self.user.id
+        )
+        db.session.add(item)
+        return item
+
+    def test_prefix_search(self):
+        ids = search.search_inventory_ids("stapl")
+        self.assertCountEqual(ids, [self.stapler.id, self.staples.id])
+        self.assertEqual(search.search_inventory_ids("heavy stapl"), [self.stapler.id])
+
+    def test_search_covers_description_and_supplier(self):
+        self.assertEqual(search.search_inventory_ids("metal"), [self.stapler.id])
+        self.assertEqual(set(search.search_inventory_ids("acme")), {self.stapler.id, self.bleach.id})
+
+    def test_category_filter_and_empty_term(self):
+        self.assertEqual(search.search_inventory_ids("acme", category_id=self.cleaning.id), [self.bleach.id])
+        self.assertEqual(search.search_inventory_ids("  ?! "), [])
+        self.assertIsNone(search.matching_ids(""))
+        self.assertEqual(Inventory.query.filter(Inventory.id.in_(search.matching_ids("?!"))).count(), 0)
+
+    def test_index_follows_updates_and_deletes(self):
+        self.bleach.item_name = "Disinfectant"
+        db.session.commit()
+        self.assertEqual(search.search_inventory_ids("bleach"), [])
+        self.assertEqual(search.search_inventory_ids("disinfect"), [self.bleach.id])
+
+        db.session.delete(self.stapler)
+        db.session.commit()
+        self.assertEqual(search.search_inventory_ids("metal"), [])
+
+    def test_matching_ids_can_be_used_as_a_filter(self):
+        ids = [row.id for row in Inventory.query.filter(Inventory.id.in_(search.matching_ids("acme"))).all()]
+        self.assertEqual(set(ids), {self.stapler.id, self.bleach.id})
+
+    def test_rebuild_index(self):
+        self.assertTrue(search.rebuild_index())
+        self.assertEqual(search.search_inventory_ids("metal"), [self.stapler.id])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from sqlalchemy import event
+from app import create_app, db, serialization
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+
+class SerializationContextTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+        serialization.clear_local_cache()
+
+        self.creator = User(name="Creator", email="creator@example.com", is_admin=True)
+        self.updater = User(name="Updater", email="updater@example.com", department="Stores")
+        db.session.add_all([self.creator, self.updater])
+        category = Category(name="Stationery")
+        db.session.add(category)
+        db.session.commit()
+
+        for index in range(5):
+            db.session.add(Inventory(
+                item_name=f"Item {index}", category_id=category.id, quantity=index, location='Headquarters',
+                created_by=self.creator.id, updated_by=self.updater.id
+            ))
+        db.session.commit()
+        self.creator_id, self.updater_id = self.creator.id, self.updater.id
+        db.session.expire_all()
+
+        self.statements = []
+        event.listen(db.engine, 'before_cursor_execute', self._count)
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        event.remove(db.engine, 'before_cursor_execute', self._count)
+        serialization.clear_local_cache()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def _user_queries(self):
+        return [s for s in self.statements if 'FROM users' in s]
+
+    def test_batch_resolves_users_in_one_query(self):
+        data = serialization.to_dicts(Inventory.query.all())
+        self.assertEqual({row['creator_name'] for row in data}, {"Creator"})
+        self.assertEqual({row['updater_name'] for row in data}, {"Updater"})
+        self.assertEqual(len(self._user_queries()), 1)
+
+    def test_process_cache_serves_later_lookups(self):
+        serialization.get_users([self.creator_id, self.updater_id])
+        self.assertEqual(serialization.user_summary(self.updater_id).department, "Stores")
+        self.assertEqual(len(self._user_queries()), 1)
+
+        serialization.forget_user(self.updater_id)
+        serialization.user_summary(self.updater_id)
+        self.assertEqual(len(self._user_queries()), 2)
+
+    def test_unknown_and_empty_ids(self):
+        self.assertIsNone(serialization.user_summary(None))
+        self.assertIsNone(serialization.user_summary(999))
+
+if __name__ == '__main__':
+    unittest.main()
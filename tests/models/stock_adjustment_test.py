@@ -0,0 +1,81 @@
+import unittest
+from app import create_app, db
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.inventory_transaction import InventoryTransaction
+
+class BatchAdjustTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+
+        self.user = User(name="Test User", email="test@example.com", is_admin=True)
+        db.session.add(self.user)
+        category = Category(name="Stationery")
+        db.session.add(category)
+        db.session.commit()
+
+        self.items = {}
+        for name, quantity in [("Stapler", 10), ("Envelope", 100), ("Toner", 4)]:
+            item = Inventory(
+                item_name=name, category_id=category.id, quantity=quantity, location='Headquarters',
+                created_by=self.user.id, updated_by=self.user.id
+            )
+            db.session.add(item)
+            self.items[name] = item
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _quantities(self):
+        db.session.expire_all()
+        return {name: db.session.get(Inventory, item.id).quantity for name, item in self.items.items()}
+
+    def test_counted_and_delta_adjustments_apply_together(self):
+        summary, error = Inventory.batch_adjust([
+            {'inventory_id': self.items["Stapler"].id, 'counted': 7},
+            {'item_name': 'envelope', 'delta': 5, 'note': 'Found a box'},
+            {'item_name': 'Toner', 'counted': 4},
+        ], performed_by=self.user.id)
+
+        self.assertIsNone(error)
+        self.assertEqual(summary['adjusted'], 2)
+        self.assertEqual(summary['unchanged'], 1)
+        self.assertEqual(summary['net_change'], 2)
+        self.assertEqual(self._quantities(), {"Stapler": 7, "Envelope": 105, "Toner": 4})
+
+        transactions = InventoryTransaction.query.filter_by(transaction_type='adjustment').all()
+        self.assertEqual(sorted(t.quantity for t in transactions), [-3, 5])
+        self.assertIn('Found a box', [t.note for t in transactions])
+
+    def test_invalid_entry_rejects_whole_batch(self):
+        summary, error = Inventory.batch_adjust([
+            {'inventory_id': self.items["Stapler"].id, 'counted': 7},
+            {'item_name': 'Toner', 'delta': -10},
+            {'item_name': 'Unknown', 'delta': 1},
+        ], performed_by=self.user.id)
+
+        self.assertIsNotNone(error)
+        self.assertEqual([e['line'] for e in summary['errors']], [2, 3])
+        self.assertEqual(self._quantities(), {"Stapler": 10, "Envelope": 100, "Toner": 4})
+        self.assertEqual(InventoryTransaction.query.count(), 0)
+
+    def test_dry_run_writes_nothing(self):
+        summary, error = Inventory.batch_adjust(
+            [{'item_name': 'Stapler', 'counted': 0}], performed_by=self.user.id, dry_run=True
+        )
+        self.assertIsNone(error)
+        self.assertEqual(summary['items'][0]['delta'], -10)
+        self.assertEqual(self._quantities()["Stapler"], 10)
+
+if __name__ == '__main__':
+    unittest.main()
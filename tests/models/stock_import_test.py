@@ -0,0 +1,377 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from unittest import mock
+from app import create_app, db, catalog
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.inventory_change import InventoryChange
+from app.models.inventory_transaction import InventoryTransaction
+from app.models.dashboard_stat import DashboardStat
+from app.models.request import Request, RequestItem, RequestStatus, ItemRequestStatus, DirectorateEnum
+from app.models.request_event import RequestEvent
+from app.models.stock_import_file import StockImportFile
+from app.services import stock_import
+
+HEADER = ['Item Name', 'DESCRIPTION', 'Report Start Date', 'Opening Stock', 'Purchases', 'Issued',
+          'Closing Stock', 'Unit Price']
+
+
+def nonzero(stats):
+    return {(group, key): value for group, values in stats.items() for key, value in values.items() if value}
+
+
+def report(*rows):
+    """Build (row number, row dict) pairs the way read_rows yields them."""
+    return [(number, dict(zip(HEADER, row))) for number, row in enumerate(rows, start=2)]
+
+
+class StockImportTestBase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+        catalog.clear_local_cache()
+
+        admin = User(name="Admin User", email="admin@example.com", is_admin=True)
+        requester = User(name="Staff User", email="staff@example.com", is_admin=False)
+        consumables = Category(name="OFFICE CONSUMABLES")
+        other = Category(name="Cleaning")
+        db.session.add_all([admin, requester, consumables, other])
+        db.session.commit()
+        self.admin_id, self.requester_id = admin.id, requester.id
+        self.category_id, self.other_category_id = consumables.id, other.id
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _import(self, rows, **kwargs):
+        return stock_import.import_rows(rows, self.category_id, self.admin_id, self.requester_id, **kwargs)
+
+
+class StockImportTestCase(StockImportTestBase):
+    def test_import_in_batches(self):
+        rows = report(
+            ['A4 Paper', 'Ream', '2025-06-01', '10', '5', '3', '12', '2.50'],
+            ['Toner', '', '2025-06-01', '0', '4', '0', '4', '40'],
+            ['', '', '2025-06-01', '1', '0', '0', '1', '1'],
+            ['Stapler', '', '2025-06-01', 'x', '0', '0', '1', '1'],
+            ['Pens', '', '2025-06-01', '20', '0', '5', '15', ''],
+            ['a4 paper', '', '2025-06-01', '1', '0', '0', '1', '1'],
+        )
+        summary, errors = self._import(rows, batch_size=2)
+
+        self.assertEqual(summary['rows'], 6)
+        self.assertEqual(summary['imported'], 3)
+        self.assertEqual(summary['rejected'], 3)
+        self.assertEqual(summary['batches'], 2)
+        self.assertEqual(summary['transactions'], 6)
+        self.assertEqual([error['row'] for error in errors], [4, 5, 7])
+
+        paper = Inventory.query.filter_by(item_name='A4 Paper').one()
+        self.assertEqual(paper.quantity, 12)
+        self.assertEqual(paper.created_at, datetime(2025, 6, 1))
+        issue = InventoryTransaction.query.filter_by(inventory_id=paper.id, transaction_type='issue').one()
+        self.assertEqual(issue.quantity, -3)
+        self.assertEqual(issue.note, 'Issued stock from June 2025 report.')
+        request = db.session.get(Request, issue.related_request_id)
+        self.assertEqual(request.status, RequestStatus.COLLECTED)
+        self.assertEqual(request.user_id, self.requester_id)
+        self.assertEqual(request.items[0].quantity_approved, 3)
+        self.assertEqual(Request.query.count(), 2)
+
+    def test_later_month_extends_existing_items(self):
+        self._import(report(['Toner', '', '2025-06-01', '0', '4', '1', '3', '40']))
+        summary, errors = self._import(report(['Toner', '', '2025-07-01', '2', '5', '2', '5', '42']))
+
+        self.assertEqual((summary['imported'], errors), (1, []))
+        toner = Inventory.query.filter_by(item_name='Toner').one()
+        self.assertEqual(toner.quantity, 5)
+        self.assertEqual(str(toner.unit_price), '42.00')
+        self.assertEqual(toner.updated_at, datetime(2025, 7, 1))
+        adjustment = InventoryTransaction.query.filter_by(transaction_type='adjustment').one()
+        self.assertEqual(adjustment.quantity, -1)
+        self.assertEqual(adjustment.note, 'Opening stock reconciled with July 2025 report.')
+        self.assertEqual(InventoryTransaction.query.filter_by(transaction_type='initial').count(), 0)
+        self.assertEqual(Request.query.count(), 2)
+
+        counters = nonzero(DashboardStat.get_all())
+        DashboardStat.rebuild()
+        self.assertEqual(counters, nonzero(DashboardStat.get_all()))
+
+    def test_older_month_only_adds_its_movements(self):
+        self._import(report(['Toner', '', '2025-02-01', '10', '4', '2', '12', '42']))
+        summary, errors = self._import(report(['Toner', '', '2025-01-01', '6', '5', '1', '10', '40']))
+
+        self.assertEqual((summary['imported'], errors), (1, []))
+        toner = Inventory.query.filter_by(item_name='Toner').one()
+        self.assertEqual((toner.quantity, str(toner.unit_price)), (12, '42.00'))
+        self.assertEqual(toner.updated_at, datetime(2025, 2, 1))
+        self.assertEqual(InventoryTransaction.query.filter_by(transaction_type='adjustment').count(), 0)
+        january = InventoryTransaction.query.filter_by(timestamp=datetime(2025, 1, 1))
+        self.assertEqual(sorted((t.transaction_type, t.quantity) for t in january), [('issue', -1), ('purchase', 5)])
+
+        # A later month still reconciles against the quantity the latest report left
+        self._import(report(['Toner', '', '2025-03-01', '11', '0', '0', '11', '42']))
+        self.assertEqual(Inventory.query.filter_by(item_name='Toner').one().quantity, 11)
+        adjustment = InventoryTransaction.query.filter_by(transaction_type='adjustment').one()
+        self.assertEqual(adjustment.quantity, -1)
+
+        counters = nonzero(DashboardStat.get_all())
+        DashboardStat.rebuild()
+        self.assertEqual(counters, nonzero(DashboardStat.get_all()))
+
+    def test_reimport_skips_unchanged_rows_and_rejects_changed_ones(self):
+        june = [['A4 Paper', '', '2025-06-01', '10', '5', '3', '12', '2.50'],
+                ['Toner', '', '2025-06-01', '0', '4', '0', '4', '40']]
+        self._import(report(*june))
+        transactions = InventoryTransaction.query.count()
+
+        summary, errors = self._import(report(june[0], ['TONER ', '', '2025-06-01', '0', '6', '0', '6', '40']))
+
+        self.assertEqual((summary['imported'], summary['unchanged'], summary['rejected']), (0, 1, 1))
+        self.assertIn("import in upsert mode", errors[0]['error'])
+        self.assertEqual(InventoryTransaction.query.count(), transactions)
+        self.assertEqual(Inventory.query.count(), 2)
+
+    def test_upsert_writes_only_differences(self):
+        self._import(report(
+            ['A4 Paper', '', '2025-06-01', '10', '5', '3', '12', '2.50'],
+            ['Toner', '', '2025-06-01', '0', '4', '0', '4', '40'],
+            ['Pens', '', '2025-06-01', '20', '0', '5', '15', '1'],
+        ))
+        paper = Inventory.query.filter_by(item_name='A4 Paper').one()
+        # Stock issued through the app since the import is kept
+        paper.quantity = 11
+        db.session.commit()
+        transactions = InventoryTransaction.query.count()
+
+        summary, errors = self._import(report(
+            ['a4  paper', '', '2025-06-01', '10', '7', '4', '13', '2.50'],
+            ['Toner', '', '2025-06-01', '0', '4', '2', '2', '40'],
+            ['Pens', '', '2025-06-01', '20', '0', '5', '15', '1'],
+        ), upsert=True)
+
+        self.assertEqual(errors, [])
+        self.assertEqual((summary['imported'], summary['updated'], summary['unchanged']), (2, 2, 1))
+        self.assertEqual(summary['transactions'], 3)
+        self.assertEqual(InventoryTransaction.query.count(), transactions + 3)
+        self.assertEqual(Inventory.query.count(), 3)
+        self.assertEqual(db.session.get(Inventory, paper.id).quantity, 12)
+
+        purchase = InventoryTransaction.query.filter_by(inventory_id=paper.id, quantity=2).one()
+        self.assertEqual(purchase.transaction_type, 'purchase')
+        self.assertEqual(purchase.note, 'Purchases revised in June 2025 report (was 5).')
+        issue = InventoryTransaction.query.filter_by(inventory_id=paper.id, quantity=-1).one()
+        self.assertEqual(db.session.get(Request, issue.related_request_id).items[0].quantity, 4)
+
+        toner = Inventory.query.filter_by(item_name='Toner').one()
+        self.assertEqual(toner.quantity, 2)
+        toner_issue = InventoryTransaction.query.filter_by(inventory_id=toner.id, transaction_type='issue').one()
+        self.assertEqual(toner_issue.quantity, -2)
+        self.assertEqual(db.session.get(Request, toner_issue.related_request_id).items[0].quantity_approved, 2)
+
+        counters = nonzero(DashboardStat.get_all())
+        DashboardStat.rebuild()
+        self.assertEqual(counters, nonzero(DashboardStat.get_all()))
+
+    def test_month_filter(self):
+        rows = report(
+            ['A4 Paper', '', '2025-06-01', '10', '0', '0', '10', '2'],
+            ['Toner', '', '2025-07-01', '5', '0', '0', '5', '40'],
+        )
+        summary, errors = self._import(rows, month=(2025, 7))
+
+        self.assertEqual((summary['imported'], summary['skipped']), (1, 1))
+        self.assertEqual(errors, [])
+        self.assertEqual([item.item_name for item in Inventory.query.all()], ['Toner'])
+
+    def test_side_tables_match_orm_writes(self):
+        self._import(report(
+            ['A4 Paper', '', '2025-06-01', '10', '5', '3', '12', '2.50'],
+            ['Toner', '', '2025-06-01', '0', '0', '0', '0', '40'],
+        ))
+        item_ids = {item.id for item in Inventory.query.all()}
+        request_ids = {request.id for request in Request.query.all()}
+
+        self.assertEqual({change.inventory_id for change in InventoryChange.query.all()}, item_ids)
+        self.assertEqual({event.request_id for event in RequestEvent.query.all()}, request_ids)
+
+        counters = nonzero(DashboardStat.get_all())
+        DashboardStat.rebuild()
+        self.assertEqual(counters, nonzero(DashboardStat.get_all()))
+
+    def test_clear_category_in_chunks(self):
+        self._import(report(
+            ['A4 Paper', '', '2025-06-01', '10', '5', '3', '12', '2.50'],
+            ['Toner', '', '2025-06-01', '2', '0', '1', '1', '40'],
+            ['Pens', '', '2025-06-01', '20', '0', '5', '15', '1'],
+        ))
+        kept = Inventory(item_name='Mop', category_id=self.other_category_id, quantity=3, location='Headquarters',
+                         created_by=self.admin_id, updated_by=self.admin_id)
+        db.session.add(kept)
+        db.session.commit()
+
+        counts = stock_import.clear_category(self.category_id, chunk_size=2)
+        db.session.commit()
+
+        self.assertEqual(counts, {'items': 3, 'requests': 3, 'transactions': 7})
+        self.assertEqual([item.item_name for item in Inventory.query.all()], ['Mop'])
+        self.assertEqual(Request.query.count(), 0)
+        self.assertEqual(RequestItem.query.count(), 0)
+        self.assertEqual(InventoryTransaction.query.count(), 0)
+        deleted = InventoryChange.query.filter_by(change_type=InventoryChange.DELETE).count()
+        self.assertEqual(deleted, 3)
+
+        counters = nonzero(DashboardStat.get_all())
+        DashboardStat.rebuild()
+        self.assertEqual(counters, nonzero(DashboardStat.get_all()))
+
+    def test_clear_category_releases_reservations_of_deleted_requests(self):
+        self._import(report(['A4 Paper', '', '2025-06-01', '10', '0', '0', '10', '2.50']))
+        paper = Inventory.query.filter_by(item_name='A4 Paper').one()
+        mop = Inventory(item_name='Mop', category_id=self.other_category_id, quantity=5, location='Headquarters',
+                        created_by=self.admin_id, updated_by=self.admin_id)
+        db.session.add(mop)
+        db.session.flush()
+        req = Request(
+            reference_number='REQ-MIXED', user_id=self.requester_id, location='Headquarters',
+            directorate=DirectorateEnum.ICT, unit='Unit', status=RequestStatus.APPROVED
+        )
+        for inventory, quantity in ((paper, 4), (mop, 3)):
+            req.items.append(RequestItem(inventory_id=inventory.id, quantity=quantity, quantity_approved=quantity,
+                                         status=ItemRequestStatus.APPROVED))
+        db.session.add(req)
+        Inventory.adjust_reserved({paper.id: 4, mop.id: 3})
+        db.session.commit()
+        mop_id = mop.id
+
+        stock_import.clear_category(self.category_id)
+        db.session.commit()
+
+        self.assertEqual(db.session.get(Inventory, mop_id).reserved_quantity, 0)
+        self.assertEqual(Inventory.rebuild_reservations(), (0, None))
+
+
+class StockImportFilesTestCase(StockImportTestBase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super().tearDown()
+
+    def _write(self, filename, *rows):
+        path = os.path.join(self.directory, filename)
+        with open(path, 'w', newline='', encoding='utf-8') as report_file:
+            writer = csv.writer(report_file)
+            writer.writerow(HEADER)
+            writer.writerows(rows)
+        return path
+
+    def _import_files(self, **kwargs):
+        return stock_import.import_files(
+            stock_import.collect_files(self.directory), self.category_id, self.admin_id, self.requester_id, **kwargs
+        )
+
+    def test_files_load_in_report_order_and_are_not_imported_twice(self):
+        # Named so that the later month sorts first
+        self._write('a-july.csv', ['Toner', '', '2025-07-01', '3', '0', '1', '2', '40'])
+        self._write('b-june.csv', ['Toner', '', '2025-06-01', '0', '5', '2', '3', '40'],
+                    ['Pens', '', '2025-06-01', '10', '0', '0', '10', '1'])
+        self._write('copy-of-june.csv', ['Toner', '', '2025-06-01', '0', '5', '2', '3', '40'],
+                    ['Pens', '', '2025-06-01', '10', '0', '0', '10', '1'])
+
+        summary, errors = self._import_files(workers=2)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(summary['skipped_files'], 1)
+        self.assertEqual([entry['status'] for entry in summary['files']], ['skipped', 'imported', 'imported'])
+        self.assertEqual([os.path.basename(entry['file']) for entry in summary['files'][1:]],
+                         ['b-june.csv', 'a-july.csv'])
+        self.assertEqual(Inventory.query.filter_by(item_name='Toner').one().quantity, 2)
+        self.assertEqual(InventoryTransaction.query.filter_by(transaction_type='adjustment').count(), 0)
+        records = StockImportFile.query.order_by(StockImportFile.report_date).all()
+        self.assertEqual([(record.filename, record.status, record.rows_imported) for record in records],
+                         [('b-june.csv', 'completed', 2), ('a-july.csv', 'completed', 1)])
+
+        summary, _ = self._import_files(workers=1)
+        self.assertEqual(summary['skipped_files'], 3)
+        self.assertEqual(summary['rows'], 0)
+
+    def test_interrupted_import_resumes_after_last_checkpoint(self):
+        self._write('june.csv', *[['Item %d' % i, '', '2025-06-01', '1', '0', '0', '1', '1'] for i in range(5)])
+        write_batch = stock_import._write_batch
+        calls = []
+
+        def fail_third_batch(*args):
+            calls.append(args)
+            if len(calls) == 3:
+                raise KeyboardInterrupt
+            return write_batch(*args)
+
+        with mock.patch.object(stock_import, '_write_batch', side_effect=fail_third_batch):
+            with self.assertRaises(KeyboardInterrupt):
+                self._import_files(batch_size=2)
+        db.session.rollback()
+
+        record = StockImportFile.query.one()
+        self.assertEqual((record.status, record.last_row, record.rows_imported), ('running', 5, 4))
+        self.assertEqual(Inventory.query.count(), 4)
+
+        summary, errors = self._import_files(batch_size=2)
+        self.assertEqual(errors, [])
+        self.assertEqual((summary['resumed_files'], summary['rows'], summary['imported']), (1, 1, 1))
+        self.assertEqual(Inventory.query.count(), 5)
+        record = StockImportFile.query.one()
+        self.assertEqual((record.status, record.last_row, record.rows_imported), ('completed', 6, 5))
+
+    def test_files_are_parsed_in_the_pool_from_their_resume_point(self):
+        june = self._write('june.csv', *[['Item %d' % i, '', '2025-06-01', '1', '0', '0', '1', '1'] for i in range(3)])
+        self._write('july.csv', ['Toner', '', '2025-07-01', '0', '5', '2', '3', '40'],
+                    ['Pens', '', 'not a date', '10', '0', '0', '10', '1'])
+        # June was interrupted after its first two rows
+        db.session.add(StockImportFile(
+            category_id=self.category_id, content_hash=stock_import.file_hash(june), filename='june.csv',
+            report_date=datetime(2025, 6, 1), imported_by=self.admin_id, last_row=3
+        ))
+        db.session.commit()
+
+        # Threads stand in for processes so the submitted calls can be observed
+        with mock.patch.object(stock_import, 'ProcessPoolExecutor', ThreadPoolExecutor), \
+                mock.patch.object(stock_import, 'parse_file', wraps=stock_import.parse_file) as parse_file:
+            summary, errors = self._import_files(workers=2)
+
+        self.assertEqual(sorted((os.path.basename(path), resume_after) for path, resume_after
+                                in (call.args for call in parse_file.call_args_list)),
+                         [('july.csv', 0), ('june.csv', 3)])
+        self.assertEqual([entry['status'] for entry in summary['files']], ['resumed', 'imported'])
+        self.assertEqual((summary['rows'], summary['imported']), (3, 2))
+        self.assertEqual(errors[0]['row'], 3)
+        self.assertEqual(Inventory.query.filter_by(item_name='Item 2').count(), 1)
+
+    def test_clear_category_forgets_imported_files(self):
+        self._write('june.csv', ['Toner', '', '2025-06-01', '0', '5', '2', '3', '40'])
+        self._import_files()
+
+        stock_import.clear_category(self.category_id)
+        db.session.commit()
+        summary, _ = self._import_files()
+
+        self.assertEqual((summary['skipped_files'], summary['imported']), (0, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import io
+import unittest
+from datetime import datetime
+import pandas as pd
+from sqlalchemy import event
+from app import create_app, db, serialization
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.inventory_supplier import InventorySupplier
+from app.models.supplier import Supplier
+from app.models.inventory_transaction import InventoryTransaction
+from app.services import purchase_recording, supplier_analytics
+
+class SupplierAnalyticsTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app.config['SECRET_KEY'] = 'test'
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+        serialization.clear_local_cache()
+        supplier_analytics.clear_local_cache()
+
+        admin = User(name="Admin User", email="admin@example.com", is_admin=True)
+        db.session.add(admin)
+        category = Category(name="Stationery")
+        db.session.add(category)
+        db.session.commit()
+        paper = Inventory(item_name="Paper", category_id=category.id, quantity=0, location='Headquarters',
+                          unit_price=5, created_by=admin.id, updated_by=admin.id)
+        pens = Inventory(item_name="Pens", category_id=category.id, quantity=0, location='Headquarters',
+                         created_by=admin.id, updated_by=admin.id)
+        db.session.add_all([paper, pens])
+        db.session.commit()
+        registry = Supplier.resolve(["Acme", "Globex"])
+        acme = InventorySupplier(inventory_id=paper.id, supplier=registry['acme'], supplier_name="Acme")
+        globex = InventorySupplier(inventory_id=paper.id, supplier=registry['globex'], supplier_name="Globex")
+        acme_pens = InventorySupplier(inventory_id=pens.id, supplier=registry['acme'], supplier_name="Acme")
+        db.session.add_all([acme, globex, acme_pens])
+        db.session.commit()
+
+        for inventory_id, supplier, quantity, price, timestamp in [
+            (paper.id, acme, 10, 10, datetime(2025, 1, 10)),
+            (paper.id, acme, 10, 12, datetime(2025, 1, 20)),
+            (paper.id, globex, 20, 9, datetime(2025, 2, 5)),
+            (paper.id, acme, 10, 13, datetime(2025, 3, 1)),
+            (pens.id, acme_pens, 100, 1, datetime(2025, 2, 1)),
+            (paper.id, acme, 5, None, datetime(2025, 3, 2)),
+        ]:
+            db.session.add(InventoryTransaction(
+                inventory_id=inventory_id, transaction_type='purchase', quantity=quantity,
+                performed_by=admin.id, timestamp=timestamp, supplier_id=supplier.id, unit_price=price
+            ))
+        db.session.commit()
+        self.admin_id, self.paper_id, self.pens_id = admin.id, paper.id, pens.id
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_supplier_and_item_totals(self):
+        analytics = supplier_analytics.get_supplier_analytics()
+
+        suppliers = {supplier['supplier_name']: supplier for supplier in analytics['suppliers']}
+        # The unpriced purchase is valued at the item's current price
+        self.assertEqual(suppliers['Acme']['spend'], 100 + 120 + 130 + 25 + 100)
+        self.assertEqual(suppliers['Acme']['quantity'], 135)
+        self.assertEqual(suppliers['Acme']['items'], 2)
+        self.assertEqual(suppliers['Globex']['spend'], 180)
+        self.assertEqual(analytics['total_spend'], 655)
+
+        paper = next(item for item in analytics['items'] if item['inventory_id'] == self.paper_id)
+        self.assertEqual(paper['quantity'], 55)
+        self.assertEqual(paper['min_price'], 9)
+        self.assertEqual(paper['max_price'], 13)
+        self.assertEqual(paper['avg_price'], round(530 / 50, 2))
+        self.assertEqual(paper['last_price'], 13)
+        self.assertEqual(paper['last_supplier'], 'Acme')
+        self.assertEqual(paper['suppliers'], 2)
+        # January averages 11, March 13
+        self.assertEqual(paper['trend_pct'], round(2 / 11 * 100, 2))
+
+        acme_paper = next(price for price in analytics['prices']
+                          if price['inventory_id'] == self.paper_id and price['supplier_name'] == 'Acme')
+        self.assertEqual([month['month'] for month in acme_paper['history']], ['2025-01', '2025-03'])
+        self.assertEqual(acme_paper['history'][0]['avg_price'], 11)
+
+    def test_filters(self):
+        analytics = supplier_analytics.get_supplier_analytics(
+            start=datetime(2025, 2, 1), end=datetime(2025, 2, 28), supplier_name='glob'
+        )
+        self.assertEqual([supplier['supplier_name'] for supplier in analytics['suppliers']], ['Globex'])
+        self.assertEqual(analytics['total_quantity'], 20)
+
+        analytics = supplier_analytics.get_supplier_analytics(inventory_id=self.pens_id)
+        self.assertEqual([item['item_name'] for item in analytics['items']], ['Pens'])
+
+    def test_cached_until_purchases_change(self):
+        first = supplier_analytics.get_supplier_analytics()
+
+        statements = []
+        def count(conn, cursor, statement, parameters, context, executemany):
+            if 'inventory_transactions' in statement:
+                statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            self.assertIs(supplier_analytics.get_supplier_analytics(), first)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+        self.assertEqual(statements, [])
+
+        _, errors = purchase_recording.record_purchase(
+            [{'inventory_id': self.pens_id, 'quantity': 50, 'supplier': 'Acme', 'unit_price': '2'}],
+            performed_by=self.admin_id
+        )
+        self.assertEqual(errors, [])
+        refreshed = supplier_analytics.get_supplier_analytics()
+        self.assertIsNot(refreshed, first)
+        self.assertEqual(refreshed['total_quantity'], first['total_quantity'] + 50)
+
+        purchase = InventoryTransaction.query.filter_by(inventory_id=self.pens_id, quantity=50).one()
+        db.session.delete(purchase)
+        db.session.commit()
+        self.assertEqual(supplier_analytics.get_supplier_analytics()['total_quantity'], first['total_quantity'])
+
+    def test_excel_export(self):
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(self.admin_id)
+        # A fresh app context gives the request its own session and login state
+        with self.app.app_context():
+            response = client.get('/purchases/analytics/download/excel?start_date=2025-01-01')
+            self.assertEqual(response.status_code, 200)
+            workbook = pd.read_excel(io.BytesIO(response.data), sheet_name=None)
+        self.assertEqual(list(workbook), ['Suppliers', 'Items', 'Price History'])
+        self.assertEqual(len(workbook['Price History']), 4)
+
+if __name__ == '__main__':
+    unittest.main()
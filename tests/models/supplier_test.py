@@ -0,0 +1,123 @@
+import unittest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import create_app, db
+from app.models.user import User
+from app.models.inventory import Category, Inventory
+from app.models.inventory_supplier import InventorySupplier
+from app.models.inventory_transaction import InventoryTransaction
+from app.models.supplier import Supplier
+from app.services import purchase_recording
+
+class SupplierTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+
+        admin = User(name="Admin User", email="admin@example.com", is_admin=True)
+        db.session.add(admin)
+        category = Category(name="Stationery")
+        db.session.add(category)
+        db.session.commit()
+        paper = Inventory(item_name="Paper", category_id=category.id, quantity=0, location='Headquarters',
+                          created_by=admin.id, updated_by=admin.id)
+        toner = Inventory(item_name="Toner", category_id=category.id, quantity=0, location='Headquarters',
+                          created_by=admin.id, updated_by=admin.id)
+        db.session.add_all([paper, toner])
+        db.session.commit()
+        self.admin_id, self.paper_id, self.toner_id = admin.id, paper.id, toner.id
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_normalize_name(self):
+        self.assertEqual(Supplier.normalize_name("  Acme   Ltd. "), "acme ltd")
+        self.assertEqual(Supplier.normalize_name("ACME-LTD"), "acme ltd")
+        self.assertEqual(Supplier.normalize_name(" . "), "")
+        self.assertEqual(Supplier.normalize_name(None), "")
+
+    def test_resolve_dedupes_spelling_variants(self):
+        suppliers = Supplier.resolve(["Acme Ltd.", "ACME LTD", "Globex", "  "])
+        db.session.commit()
+        self.assertEqual(set(suppliers), {"acme ltd", "globex"})
+        self.assertEqual(Supplier.query.count(), 2)
+        self.assertEqual(suppliers["acme ltd"].name, "Acme Ltd.")
+
+        again = Supplier.resolve(["acme ltd"])
+        self.assertEqual(again["acme ltd"].id, suppliers["acme ltd"].id)
+        self.assertEqual(Supplier.get_by_name("Acme, Ltd").id, suppliers["acme ltd"].id)
+        self.assertIsNone(Supplier.get_by_name("Initech"))
+
+    def test_resolve_picks_up_a_supplier_added_concurrently(self):
+        # Another worker commits "Acme Ltd" after this transaction took its snapshot
+        with db.engine.begin() as connection:
+            connection.execute(Supplier.__table__.insert().values(name="Acme Ltd", normalized_name="acme ltd"))
+            concurrent_id = connection.execute(db.select(Supplier.id)).scalar_one()
+
+        def hide_from_snapshot(state):
+            # Plain reads see the snapshot; only locking reads see the committed row
+            if state.is_select and state.statement._for_update_arg is None:
+                state.statement = state.statement.where(Supplier.id != concurrent_id)
+        event.listen(Session, 'do_orm_execute', hide_from_snapshot)
+        try:
+            suppliers = Supplier.resolve(["ACME LTD."])
+        finally:
+            event.remove(Session, 'do_orm_execute', hide_from_snapshot)
+
+        self.assertEqual(suppliers['acme ltd'].id, concurrent_id)
+        db.session.commit()
+        self.assertEqual(Supplier.query.count(), 1)
+
+    def test_autocomplete_matches_prefix(self):
+        Supplier.resolve(["Acme Ltd", "Acme Office Supplies", "Globex", "100% Paper"])
+        db.session.commit()
+        self.assertEqual([supplier.name for supplier in Supplier.autocomplete("ac")], ["Acme Ltd", "Acme Office Supplies"])
+        self.assertEqual([supplier.name for supplier in Supplier.autocomplete("ACME  O")], ["Acme Office Supplies"])
+        # LIKE wildcards in the prefix are matched literally
+        self.assertEqual(Supplier.autocomplete("_"), [])
+        self.assertEqual(len(Supplier.autocomplete("", limit=3)), 3)
+
+    def test_item_links_share_registry_supplier(self):
+        _, errors = purchase_recording.record_purchase([
+            {'inventory_id': self.paper_id, 'quantity': 5, 'supplier': 'Acme Ltd.', 'unit_price': '3'},
+            {'inventory_id': self.toner_id, 'quantity': 1, 'supplier': 'ACME LTD', 'unit_price': '40'},
+        ], performed_by=self.admin_id)
+        self.assertEqual(errors, [])
+        _, errors = purchase_recording.record_purchase([
+            {'inventory_id': self.paper_id, 'quantity': 5, 'supplier': 'acme ltd', 'unit_price': '4'},
+        ], performed_by=self.admin_id)
+        self.assertEqual(errors, [])
+
+        self.assertEqual(Supplier.query.count(), 1)
+        links = InventorySupplier.query.order_by(InventorySupplier.inventory_id).all()
+        self.assertEqual([(link.inventory_id, link.supplier_name) for link in links],
+                         [(self.paper_id, "Acme Ltd."), (self.toner_id, "Acme Ltd.")])
+        self.assertEqual(links[0].unit_price, 4)
+        self.assertEqual(InventorySupplier.get_supplier_by_name("Acme ltd").supplier_id, links[0].supplier_id)
+
+        rows, _, _ = InventoryTransaction.get_purchases_page(supplier_name="ACME")
+        self.assertEqual(len(rows), 3)
+
+    def test_autocomplete_api(self):
+        Supplier.resolve(["Acme Ltd", "Globex"])
+        db.session.commit()
+        self.app.config['SECRET_KEY'] = 'test'
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(self.admin_id)
+        # A fresh app context gives the request its own session and login state
+        with self.app.app_context():
+            response = client.get('/purchases/api/suppliers?q=glo')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([supplier['name'] for supplier in response.get_json()['suppliers']], ["Globex"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+import unittest
+from unittest import mock
+from sqlalchemy import event
+from app import create_app, db
+from app.auth import tokens
+from app.models.user import User
+from app.models.revoked_token import RevokedToken
+
+class TokenAuthTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a test environment."""
+        self.app = create_app('testing')
+        self.app.config['SECRET_KEY'] = 'test-secret-key-that-is-long-enough-for-hs256'
+        self.app.config['JWT_AUTH_ENABLED'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Ensure a clean slate for each test
+        db.drop_all()
+        db.create_all()
+        tokens.clear_local_cache()
+
+        User.create_local_user('admin@example.com', 'Admin User', 'secret-password', is_admin=True)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        """Clean up the test environment."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _login(self):
+        with self.app.app_context():
+            response = self.client.post('/api/login/local', json={
+                'email': 'admin@example.com', 'password': 'secret-password'
+            })
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def _request(self, method, url, token, client=None, **kwargs):
+        # A fresh client has no session cookie, so only the token authenticates it
+        client = client or self.app.test_client()
+        with self.app.app_context():
+            return client.open(url, method=method, headers={'Authorization': f'Bearer {token}'}, **kwargs)
+
+    def _get(self, url, token):
+        return self._request('GET', url, token)
+
+    def test_login_issues_tokens_only_when_enabled(self):
+        body = self._login()
+        self.assertEqual(body['token_type'], 'Bearer')
+        self.assertTrue(body['access_token'] and body['refresh_token'])
+        self.assertEqual(body['expires_in'], 15 * 60)
+
+        # No session is started in token mode
+        with self.app.app_context():
+            self.assertEqual(self.client.get('/api/auth/verify').status_code, 401)
+
+        self.app.config['JWT_AUTH_ENABLED'] = False
+        body = self._login()
+        self.assertNotIn('access_token', body)
+        # Without token mode a bearer token is ignored
+        self.assertEqual(self._get('/api/auth/verify', tokens.issue_tokens(User.query.one())['access_token'])
+                         .status_code, 401)
+
+    def test_api_request_is_authorized_without_loading_the_user(self):
+        token = self._login()['access_token']
+        # A browser client also holds a session cookie from before token mode was enabled
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(User.query.one().id)
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            response = self._request('GET', '/purchases/api/suppliers?q=a', token, client=self.client)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([statement for statement in statements if 'FROM users' in statement])
+        # Only the denylist and the suppliers were read
+        self.assertEqual(len(statements), 2)
+
+    def test_claims_outside_the_token_are_loaded_on_use(self):
+        token = self._login()['access_token']
+        response = self._get('/api/auth/verify', token)
+
+        self.assertEqual(response.status_code, 200)
+        user = response.get_json()['user']
+        self.assertEqual((user['name'], user['is_admin']), ('Admin User', True))
+        self.assertIsNotNone(user['last_login'])
+
+    def test_revoked_token_is_rejected(self):
+        body = self._login()
+        access = body['access_token']
+        response = self._request('POST', '/api/auth/token/revoke', access,
+                                 json={'refresh_token': body['refresh_token']})
+
+        self.assertEqual(response.get_json()['revoked'], 2)
+        self.assertEqual(RevokedToken.query.count(), 2)
+        self.assertEqual(self._get('/api/auth/verify', access).status_code, 401)
+        response = self._request('POST', '/api/auth/token/refresh', body['refresh_token'])
+        self.assertEqual(response.status_code, 401)
+
+    def test_logout_revokes_the_refresh_token(self):
+        body = self._login()
+        response = self._request('POST', '/api/logout', body['access_token'],
+                                 json={'refresh_token': body['refresh_token']})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(RevokedToken.query.count(), 2)
+        response = self._request('POST', '/api/auth/token/refresh', body['refresh_token'])
+        self.assertEqual(response.status_code, 401)
+
+    def test_denylist_is_cached_per_worker(self):
+        self.app.config['REVOKED_TOKEN_CACHE_TTL'] = 3600
+        access = self._login()['access_token']
+        self.assertEqual(self._get('/api/auth/verify', access).status_code, 200)
+
+        # Revoked by another worker: seen once the cached denylist is reloaded
+        RevokedToken.revoke([tokens.decode(access)])
+        self.assertEqual(self._get('/api/auth/verify', access).status_code, 200)
+        tokens.clear_local_cache()
+        self.assertEqual(self._get('/api/auth/verify', access).status_code, 401)
+
+    def test_refresh_rotates_the_refresh_token(self):
+        body = self._login()
+        user = User.query.one()
+        user.is_admin = False
+        db.session.commit()
+
+        response = self._request('POST', '/api/auth/token/refresh', body['refresh_token'])
+        self.assertEqual(response.status_code, 200)
+        refreshed = response.get_json()
+        self.assertFalse(tokens.decode(refreshed['access_token'])['is_admin'])
+
+        response = self._request('POST', '/api/auth/token/refresh', body['refresh_token'])
+        self.assertEqual(response.status_code, 401)
+
+    def test_replayed_refresh_token_revokes_its_family(self):
+        body = self._login()
+        response = self._request('POST', '/api/auth/token/refresh', body['refresh_token'])
+        self.assertEqual(response.status_code, 200)
+        rotated = response.get_json()['refresh_token']
+
+        # Replayed on a worker whose cached denylist does not have the rotation yet
+        with mock.patch.object(tokens, 'is_revoked', return_value=False):
+            response = self._request('POST', '/api/auth/token/refresh', body['refresh_token'])
+        self.assertEqual(response.status_code, 401)
+        self.assertNotIn('access_token', response.get_json())
+
+        # The token rotated from the same login is revoked with it
+        self.assertEqual(RevokedToken.query.filter_by(token_type='family').count(), 1)
+        tokens.clear_local_cache()
+        self.assertIsNone(tokens.decode(rotated, token_type='refresh'))
+        response = self._request('POST', '/api/auth/token/refresh', rotated)
+        self.assertEqual(response.status_code, 401)
+
+        # A new login starts a new family
+        response = self._request('POST', '/api/auth/token/refresh', self._login()['refresh_token'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_prune_removes_expired_entries(self):
+        access = tokens.decode(self._login()['access_token'])
+        RevokedToken.revoke([access, {**access, 'jti': 'expired', 'exp': 1}])
+
+        self.assertEqual(RevokedToken.prune(), 1)
+        self.assertEqual(RevokedToken.active_jtis(), {access['jti']})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import patch, MagicMock
 from app.models.user import User
+from app.auth import graph
 from flask import current_app
 import pytest
 from dotenv import load_dotenv
@@ -52,7 +53,7 @@ def test_get_user_info_regular_user(mocker, caplog):
         'id': '12345'
     }
 
-    mocker.patch('requests.get', return_value=mock_response)
+    mocker.patch.object(graph.http_session(), 'get', return_value=mock_response)
     
     result = User.get_user_info('fake_token')
     
@@ -75,7 +76,7 @@ def test_get_user_info_guest_user(mocker):
         'id': '12345'
     }
     
-    mocker.patch('requests.get', return_value=mock_response)
+    mocker.patch.object(graph.http_session(), 'get', return_value=mock_response)
     
     result = User.get_user_info('fake_token')
     
@@ -88,7 +89,7 @@ def test_get_user_info_invalid_token(mocker, app_context):
     mock_response = MagicMock()
     mock_response.status_code = 401
     
-    mocker.patch('requests.get', return_value=mock_response)
+    mocker.patch.object(graph.http_session(), 'get', return_value=mock_response)
     
     result = User.get_user_info('invalid_token')
     